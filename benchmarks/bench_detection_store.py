@@ -0,0 +1,79 @@
+# bench_detection_store.py
+# Perbandingan memori dan throughput: list of dict (cara lama all_session_detections_details)
+# vs DetectionStore kolumnar, termasuk pembuatan DataFrame untuk ringkasan.
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_detection_store.py --detections 1000000
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from detection_store import DetectionStore
+
+def make_frame_details(rng, n_frames, per_frame):
+    """Daftar info lubang per frame seperti keluaran frame_processor (dibuat sebelum pengukuran)."""
+    frames = []
+    for frame_index in range(1, n_frames + 1):
+        boxes = rng.integers(0, 1900, (per_frame, 4))
+        frames.append([{"confidence": float(rng.random()), "area_m2": float(rng.random()), "is_new": bool(rng.random() < 0.1),
+                        "track_id": int(rng.integers(1, 500)), "x1": int(b[0]), "y1": int(b[1]), "x2": int(b[2]), "y2": int(b[3]),
+                        "frame": frame_index} for b in boxes])
+    return frames
+
+def run_list_of_dicts(frame_details):
+    session = []
+    for details in frame_details:
+        # Seperti main_app lama: dict per deteksi disimpan (salinan dict karena frame_details dipakai ulang)
+        session.extend(dict(d) for d in details)
+    return session
+
+def run_store(frame_details):
+    store = DetectionStore()
+    for details in frame_details:
+        store.extend(details)
+    return store
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DetectionStore vs list of dict.")
+    parser.add_argument("--detections", type=int, default=1_000_000)
+    parser.add_argument("--per-frame", type=int, default=5, help="Jumlah deteksi per frame.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    n_frames = max(1, args.detections // args.per_frame)
+    frame_details = make_frame_details(rng, n_frames, args.per_frame)
+    n_detections = n_frames * args.per_frame
+    print(f"{n_detections:,} deteksi ({n_frames:,} frame x {args.per_frame})")
+
+    session_list, list_s, list_mem, list_peak = measure(lambda: run_list_of_dicts(frame_details))
+    store, store_s, store_mem, store_peak = measure(lambda: run_store(frame_details))
+    list_df, list_df_s, list_df_mem, _ = measure(lambda: pd.DataFrame(session_list))
+    store_df, store_df_s, store_df_mem, _ = measure(store.to_dataframe)
+
+    # Kebenaran: isi kedua DataFrame harus sama
+    expected = list_df[store_df.columns.tolist()]
+    for column in store_df.columns:
+        if not np.allclose(store_df[column].to_numpy(dtype=np.float64), expected[column].to_numpy(dtype=np.float64), atol=1e-6):
+            raise AssertionError(f"Kolom {column} tidak sama.")
+
+    print(f"{'':>22} | {'list of dict':>14} | {'DetectionStore':>14}")
+    print("-" * 58)
+    print(f"{'Append (deteksi/s)':>22} | {n_detections / list_s:>14,.0f} | {n_detections / store_s:>14,.0f}")
+    print(f"{'Memori tersimpan (MB)':>22} | {list_mem / 1e6:>14.1f} | {store_mem / 1e6:>14.1f}")
+    print(f"{'Puncak saat append (MB)':>22} | {list_peak / 1e6:>14.1f} | {store_peak / 1e6:>14.1f}")
+    print(f"{'Buat DataFrame (ms)':>22} | {list_df_s * 1e3:>14.1f} | {store_df_s * 1e3:>14.3f}")
+    print(f"{'Memori DataFrame (MB)':>22} | {list_df_mem / 1e6:>14.1f} | {store_df_mem / 1e6:>14.3f}")
+    print("Hasil identik: OK")
+
+if __name__ == "__main__":
+    main()
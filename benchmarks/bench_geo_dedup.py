@@ -0,0 +1,116 @@
+# bench_geo_dedup.py
+# Deduplikasi lubang bergeoreferensi (geo_dedup.GeoDeduplicator) pada survei sintetis multi-jam:
+#   - rute melingkar dilalui berkali-kali; setiap lintasan memberi galat GPS (bias per lintasan + derau)
+#     dan sebagian track terputus (satu lubang -> dua track), seperti pada rekaman dashcam nyata
+#   - jumlah lubang unik: hitungan IoU gambar saja (setiap track tiap lintasan) vs GeoDeduplicator vs jumlah sebenarnya
+#   - biaya pencarian per pengamatan pada grid hash spasial vs pencarian linear, untuk jumlah lubang yang bertambah
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_geo_dedup.py --potholes 400 --passes 6 --loop-km 10
+
+import argparse
+import time
+import numpy as np
+from geo_dedup import GeoDeduplicator, EARTH_RADIUS_M, DEFAULT_MERGE_RADIUS_M
+
+ORIGIN = (-6.2, 106.8) # Lintang/bujur pusat rute sintetis
+
+def to_degrees(x, y):
+    return ORIGIN[0] + np.degrees(y / EARTH_RADIUS_M), ORIGIN[1] + np.degrees(x / (EARTH_RADIUS_M * np.cos(np.radians(ORIGIN[0]))))
+
+def to_metres(lat, lon):
+    return (np.radians(lon - ORIGIN[1]) * np.cos(np.radians(ORIGIN[0])) * EARTH_RADIUS_M,
+            np.radians(lat - ORIGIN[0]) * EARTH_RADIUS_M)
+
+def make_route_potholes(n, loop_m, rng):
+    """Lubang pada rute melingkar: posisi (x, y) meter dan luas sebenarnya."""
+    radius = loop_m / (2 * np.pi)
+    angle = rng.uniform(0, 2 * np.pi, n)
+    offset = rng.uniform(-1.5, 1.5, n) # Posisi lateral di lajur
+    positions = np.c_[(radius + offset) * np.cos(angle), (radius + offset) * np.sin(angle)]
+    return positions, angle, rng.uniform(0.05, 1.0, n)
+
+def simulate_survey(positions, angles, areas, passes, loop_m, speed_ms, gps_bias_m, gps_noise_m, detect_rate,
+                    split_rate, rng):
+    """Pengamatan (waktu, x, y, luas, lintasan) per track seperti yang diberikan add_session."""
+    observations = []
+    for survey_pass in range(passes):
+        bias = rng.normal(0, gps_bias_m, 2) # Galat GPS yang bergeser lambat: hampir konstan dalam satu lintasan
+        for i in np.flatnonzero(rng.random(len(positions)) < detect_rate):
+            for _ in range(2 if rng.random() < split_rate else 1): # Track terputus: lubang sama, dua track
+                timestamp = (survey_pass * loop_m + angles[i] / (2 * np.pi) * loop_m) / speed_ms
+                x, y = positions[i] + bias + rng.normal(0, gps_noise_m + 0.3, 2) # + galat proyeksi kamera
+                observations.append((timestamp, x, y, areas[i] * rng.normal(1.0, 0.1), survey_pass))
+    observations.sort()
+    return observations
+
+def lookup_cost(n_potholes, queries, radius, rng):
+    """µs per pengamatan: grid hash spasial vs pencarian linear (vektor NumPy) atas n_potholes lubang tersimpan."""
+    spread = np.sqrt(n_potholes) * 50.0 # Kepadatan tetap ± 1 lubang per 2500 m² jalan, area tumbuh dengan n
+    positions = rng.uniform(0, spread, (n_potholes, 2))
+    dedup = GeoDeduplicator(radius)
+    lats, lons = to_degrees(positions[:, 0], positions[:, 1])
+    for lat, lon in zip(lats, lons):
+        dedup.add(lat, lon, 0.1, 0.0)
+    query_lats, query_lons = to_degrees(*rng.uniform(0, spread, (2, queries)))
+    start = time.perf_counter()
+    for lat, lon in zip(query_lats, query_lons):
+        dedup.add(lat, lon, 0.1, 0.0)
+    grid_us = (time.perf_counter() - start) / queries * 1e6
+    stored = np.array([(p["x"], p["y"]) for p in dedup.potholes])
+    query_xy = np.array([dedup._to_metres(lat, lon) for lat, lon in zip(query_lats, query_lons)])
+    start = time.perf_counter()
+    for x, y in query_xy:
+        distances = np.hypot(stored[:, 0] - x, stored[:, 1] - y)
+        nearest = np.argmin(distances)
+        _ = distances[nearest] <= radius
+    linear_us = (time.perf_counter() - start) / queries * 1e6
+    return grid_us, linear_us
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark deduplikasi lubang berbasis GPS dengan grid hash spasial.")
+    parser.add_argument("--potholes", type=int, default=400, help="Jumlah lubang sebenarnya di rute.")
+    parser.add_argument("--passes", type=int, default=6, help="Berapa kali rute dilalui.")
+    parser.add_argument("--loop-km", type=float, default=10.0, help="Panjang rute melingkar (km).")
+    parser.add_argument("--speed-kmh", type=float, default=36.0)
+    parser.add_argument("--gps-bias", type=float, default=1.5, help="Simpangan bias GPS per lintasan (m).")
+    parser.add_argument("--gps-noise", type=float, default=0.8, help="Simpangan derau GPS per pengamatan (m).")
+    parser.add_argument("--radius", type=float, nargs="+", default=[2.0, DEFAULT_MERGE_RADIUS_M, 6.0],
+                        help="Radius penggabungan (m) yang dibandingkan.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Jumlah lubang tersimpan untuk pengukuran biaya pencarian.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    loop_m, speed_ms = args.loop_km * 1000, args.speed_kmh / 3.6
+    positions, angles, areas = make_route_potholes(args.potholes, loop_m, rng)
+    observations = simulate_survey(positions, angles, areas, args.passes, loop_m, speed_ms, args.gps_bias, args.gps_noise,
+                                   detect_rate=0.9, split_rate=0.15, rng=rng)
+    hours = args.passes * loop_m / speed_ms / 3600
+    print(f"Survei {hours:.1f} jam: {args.passes} lintasan x {args.loop_km:g} km, {args.potholes} lubang sebenarnya, "
+          f"{len(observations)} track terdeteksi")
+    print(f"{'Metode':>26} | {'Lubang unik':>11} | {'vs sebenarnya':>13} | {'Terwakili':>9} | {'Duplikat':>8} | {'Galat posisi':>12} | {'µs/track':>8}")
+    print("-" * 106)
+    print(f"{'IoU gambar saja':>26} | {len(observations):>11} | {len(observations) / args.potholes:>12.2f}x | {'-':>9} | {'-':>8} | {'-':>12} | {'-':>8}")
+    for radius in args.radius:
+        dedup = GeoDeduplicator(radius)
+        start = time.perf_counter()
+        for timestamp, x, y, area, survey_pass in observations:
+            lat, lon = to_degrees(x, y)
+            dedup.add(lat, lon, area, timestamp, source=f"lintasan_{survey_pass + 1}")
+        dedup_us = (time.perf_counter() - start) / len(observations) * 1e6
+        # Setiap lubang unik dicocokkan ke lubang sebenarnya terdekat: duplikat = lebih dari satu lubang unik per lubang sebenarnya
+        unique_xy = np.array([to_metres(*dedup._to_degrees(p["x"], p["y"])) for p in dedup.potholes])
+        nearest_truth = np.argmin(np.hypot(unique_xy[:, None, 0] - positions[None, :, 0],
+                                           unique_xy[:, None, 1] - positions[None, :, 1]), axis=1)
+        matched = len(np.unique(nearest_truth))
+        position_error = np.median(np.hypot(*(unique_xy - positions[nearest_truth]).T))
+        print(f"{f'GeoDeduplicator r={radius:g} m':>26} | {len(dedup):>11} | {len(dedup) / args.potholes:>12.2f}x | "
+              f"{matched:>9} | {len(dedup) - matched:>8} | {position_error:>10.2f} m | {dedup_us:>8.1f}")
+
+    print(f"\n{'Lubang tersimpan':>16} | {'Grid hash (µs)':>14} | {'Linear (µs)':>11}")
+    print("-" * 48)
+    for size in args.sizes:
+        grid_us, linear_us = lookup_cost(size, 2000, DEFAULT_MERGE_RADIUS_M, rng)
+        print(f"{size:>16,} | {grid_us:>14.1f} | {linear_us:>11.1f}")
+
+if __name__ == "__main__":
+    main()
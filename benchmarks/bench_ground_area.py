@@ -0,0 +1,127 @@
+# bench_ground_area.py
+# Luas terkoreksi perspektif (ground_calibration.GroundCalibration + mask_utils.compute_mask_ground_areas)
+# dibanding skala tunggal piksel per meter, pada kamera dashcam pinhole sintetis:
+#   - lubang elips dengan luas sebenarnya diketahui diproyeksikan ke gambar pada berbagai jarak
+#   - kalibrasi dari 4 titik sudut lajur (seperti yang dimasukkan pengguna), skala tunggal diambil di jarak referensi
+#   - galat luas per pita jarak untuk kedua metode, dan biaya per frame dibanding jumlah piksel biasa
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_ground_area.py --resolution 1920x1080 --density 6
+
+import argparse
+import time
+import numpy as np
+import torch
+from ground_calibration import GroundCalibration
+from mask_utils import compute_mask_pixel_counts, compute_mask_ground_areas, pixel_counts_to_area_m2
+
+DISTANCE_BANDS = [(4, 8), (8, 12), (12, 18), (18, 25), (25, 35)]
+LANE_POINTS = [(-1.75, 5.0), (1.75, 5.0), (1.75, 20.0), (-1.75, 20.0)]
+
+def camera_homography(width, height, camera_height=1.4, pitch_deg=10.0, focal_ratio=0.9):
+    """Homografi sebenarnya dari bidang jalan (X ke samping, Y ke depan, meter) ke piksel kamera pinhole."""
+    pitch = np.radians(pitch_deg)
+    focal = focal_ratio * width
+    intrinsics = np.array([[focal, 0, (width - 1) / 2], [0, focal, (height - 1) / 2], [0, 0, 1]])
+    # Kolom: sumbu X jalan, sumbu Y jalan, posisi kamera (tinggi di atas jalan) dalam koordinat kamera
+    extrinsics = np.array([[1, 0, 0],
+                           [0, -np.sin(pitch), camera_height * np.cos(pitch)],
+                           [0, np.cos(pitch), camera_height * np.sin(pitch)]])
+    return intrinsics @ extrinsics
+
+def project(points, matrix):
+    points = np.asarray(points, dtype=np.float64)
+    projected = np.c_[points, np.ones(len(points))] @ matrix.T
+    return projected[:, :2] / projected[:, 2:3]
+
+def render_pothole(shape, matrix, center, semi_axes, angle):
+    """
+    Mask frame penuh (uint8) sebuah elips di bidang jalan; mengembalikan (mask, box xyxy, luas sebenarnya m²).
+    Piksel masuk mask jika titik tengahnya (diproyeksikan balik ke jalan) berada di dalam elips, sehingga tepi
+    mask tidak bias membesar seperti rasterisasi polygon inklusif.
+    """
+    t = np.linspace(0, 2 * np.pi, 180, endpoint=False)
+    cos_a, sin_a = np.cos(angle), np.sin(angle)
+    x = semi_axes[0] * np.cos(t)
+    y = semi_axes[1] * np.sin(t)
+    outline = project(np.c_[center[0] + x * cos_a - y * sin_a, center[1] + x * sin_a + y * cos_a], matrix)
+    x1, y1 = np.maximum(np.floor(outline.min(axis=0)).astype(int) - 1, 0)
+    x2, y2 = np.minimum(np.ceil(outline.max(axis=0)).astype(int) + 2, (shape[1], shape[0]))
+    mask = np.zeros(shape, dtype=np.uint8)
+    if x2 <= x1 or y2 <= y1:
+        return mask, (0, 0, 0, 0), np.pi * semi_axes[0] * semi_axes[1]
+    xs, ys = np.meshgrid(np.arange(x1, x2), np.arange(y1, y2))
+    ground = project(np.c_[xs.ravel(), ys.ravel()], np.linalg.inv(matrix)) - np.asarray(center)
+    u = (ground[:, 0] * cos_a + ground[:, 1] * sin_a) / semi_axes[0]
+    v = (-ground[:, 0] * sin_a + ground[:, 1] * cos_a) / semi_axes[1]
+    mask[y1:y2, x1:x2] = (u * u + v * v <= 1).reshape(xs.shape)
+    ys_in, xs_in = np.nonzero(mask)
+    box = (xs_in.min(), ys_in.min(), xs_in.max() + 1, ys_in.max() + 1) if len(xs_in) else (0, 0, 0, 0)
+    return mask, box, np.pi * semi_axes[0] * semi_axes[1]
+
+def make_potholes(shape, matrix, n, seed):
+    rng = np.random.default_rng(seed)
+    masks, boxes, true_areas, distances = [], [], [], []
+    while len(masks) < n:
+        distance = rng.uniform(DISTANCE_BANDS[0][0], DISTANCE_BANDS[-1][1])
+        semi_axes = rng.uniform(0.15, 0.6, size=2)
+        mask, box, area = render_pothole(shape, matrix, (rng.uniform(-2.5, 2.5), distance), semi_axes, rng.uniform(0, np.pi))
+        if box[2] - box[0] < 3 or box[3] - box[1] < 3: # Terlalu kecil untuk tersegmentasi
+            continue
+        masks.append(mask)
+        boxes.append(box)
+        true_areas.append(area)
+        distances.append(distance)
+    return np.stack(masks), np.array(boxes, dtype=np.float32), np.array(true_areas), np.array(distances)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark luas terkoreksi perspektif vs skala piksel per meter tunggal.")
+    parser.add_argument("--resolution", default="1920x1080")
+    parser.add_argument("--potholes", type=int, default=300, help="Jumlah lubang sintetis untuk pengukuran galat.")
+    parser.add_argument("--density", type=int, default=6, help="Lubang per frame untuk pengukuran waktu.")
+    parser.add_argument("--reference-distance", type=float, default=10.0,
+                        help="Jarak (m) tempat skala tunggal piksel per meter diukur.")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    width, height = map(int, args.resolution.lower().split("x"))
+    shape = (height, width)
+    matrix = camera_homography(width, height)
+    lane_image = project(LANE_POINTS, matrix) / np.array([width - 1, height - 1])
+    calibration = GroundCalibration("bench", lane_image, LANE_POINTS)
+    start = time.perf_counter()
+    area_map = calibration.area_map(shape)
+    map_ms = (time.perf_counter() - start) * 1000
+    reference_x, reference_y = project([(0.0, args.reference_distance)], matrix)[0]
+    pixels_per_meter = calibration.pixels_per_meter_at(shape, reference_x, reference_y)
+    print(f"Frame {width}x{height}; peta luas dihitung sekali dalam {map_ms:.1f} ms ({area_map.nbytes / 1e6:.1f} MB)")
+    print(f"Skala tunggal di {args.reference_distance:g} m: {pixels_per_meter:.1f} piksel/m")
+
+    masks, boxes, true_areas, distances = make_potholes(shape, matrix, args.potholes, seed=0)
+    masks_tensor = torch.from_numpy(masks)
+    single_areas = pixel_counts_to_area_m2(compute_mask_pixel_counts(masks_tensor), pixels_per_meter)
+    ground_areas = compute_mask_ground_areas(masks_tensor, boxes, area_map)
+    single_errors = np.abs(single_areas - true_areas) / true_areas * 100
+    ground_errors = np.abs(ground_areas - true_areas) / true_areas * 100
+
+    print(f"\n{'Jarak (m)':>10} | {'Lubang':>6} | {'Galat skala tunggal':>19} | {'Galat perspektif':>16}")
+    print("-" * 62)
+    for low, high in DISTANCE_BANDS:
+        band = (distances >= low) & (distances < high)
+        if band.any():
+            print(f"{f'{low}-{high}':>10} | {band.sum():>6} | {np.mean(single_errors[band]):>18.1f}% | {np.mean(ground_errors[band]):>15.1f}%")
+    print(f"{'Semua':>10} | {len(true_areas):>6} | {np.mean(single_errors):>18.1f}% | {np.mean(ground_errors):>15.1f}%")
+
+    # Biaya per frame: density mask frame penuh (seperti keluaran Ultralytics retina_masks di CPU)
+    frame_masks, frame_boxes = masks_tensor[:args.density], boxes[:args.density]
+    timings = {}
+    for label, func in (("Jumlah piksel", lambda: compute_mask_pixel_counts(frame_masks)),
+                        ("Luas perspektif", lambda: compute_mask_ground_areas(frame_masks, frame_boxes, area_map))):
+        func()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            func()
+        timings[label] = (time.perf_counter() - start) / args.repeat * 1000
+    print(f"\nBiaya per frame ({args.density} mask {width}x{height}): "
+          + ", ".join(f"{label} {ms:.2f} ms" for label, ms in timings.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench_mask_area.py
+# Benchmark + uji kebenaran perhitungan luas mask:
+#   - cara lama: per mask .cpu().numpy(), cv2.resize ke ukuran box, lalu sum
+#   - loop per mask pada resolusi penuh (acuan yang benar secara naif)
+#   - cara baru: mask_utils.compute_mask_pixel_counts (semua mask sekaligus, satu transfer ke host)
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_mask_area.py
+
+import argparse
+import time
+import cv2
+import numpy as np
+from mask_utils import compute_mask_pixel_counts
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+def make_synthetic_masks(n_masks, frame_h, frame_w, rng):
+    """Membuat mask elips acak (seperti bentuk lubang) beserta bbox-nya pada resolusi frame."""
+    masks = np.zeros((n_masks, frame_h, frame_w), dtype=np.uint8)
+    boxes = []
+    for i in range(n_masks):
+        axis_x, axis_y = int(rng.integers(10, 150)), int(rng.integers(10, 100))
+        cx = int(rng.integers(axis_x, frame_w - axis_x))
+        cy = int(rng.integers(axis_y, frame_h - axis_y))
+        cv2.ellipse(masks[i], (cx, cy), (axis_x, axis_y), float(rng.uniform(0, 180)), 0, 360, 1, -1)
+        ys, xs = np.nonzero(masks[i])
+        boxes.append((xs.min(), ys.min(), xs.max() + 1, ys.max() + 1))
+    return masks, np.array(boxes)
+
+def legacy_pixel_counts(masks_tensor, boxes):
+    """Perhitungan lama dari frame_processor (mask penuh diregangkan ke ukuran box)."""
+    counts = []
+    for i, (x1, y1, x2, y2) in enumerate(boxes):
+        mask = masks_tensor[i].cpu().numpy() if hasattr(masks_tensor, "cpu") else masks_tensor[i]
+        resized = cv2.resize(mask, (int(x2 - x1), int(y2 - y1)), interpolation=cv2.INTER_NEAREST)
+        counts.append(np.sum(resized > 0.5))
+    return np.array(counts)
+
+def loop_full_res_pixel_counts(masks_tensor):
+    """Referensi loop per mask pada resolusi penuh (tanpa regang), satu salinan host per mask."""
+    counts = []
+    for mask in masks_tensor:
+        mask = mask.cpu().numpy() if hasattr(mask, "cpu") else mask
+        counts.append(np.sum(mask > 0.5))
+    return np.array(counts)
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        out = fn()
+    return (time.perf_counter() - start) / repeats, out
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark perhitungan luas mask.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 5, 20, 50], help="Jumlah deteksi per frame.")
+    parser.add_argument("--frame", type=int, nargs=2, default=[1920, 1080], metavar=("W", "H"))
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--device", default="cpu", help="Device torch (cpu/cuda) jika torch tersedia.")
+    parser.add_argument("--float-masks", action="store_true",
+                        help="Gunakan mask float32 (Ultralytics lama) alih-alih uint8 0/1 (Ultralytics terbaru).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    frame_w, frame_h = args.frame
+    backend = f"torch ({args.device})" if torch is not None else "numpy"
+    print(f"Resolusi {frame_w}x{frame_h}, backend {backend}")
+    print(f"{'Deteksi':>8} | {'Lama (ms)':>10} | {'Loop penuh (ms)':>15} | {'Baru (ms)':>10} | Kebenaran")
+    print("-" * 75)
+    for n_masks in args.counts:
+        masks_u8, boxes = make_synthetic_masks(n_masks, frame_h, frame_w, rng)
+        # Jumlah piksel referensi dihitung langsung dari mask yang digambar
+        reference = np.array([cv2.countNonZero(m) for m in masks_u8])
+
+        masks_np = masks_u8.astype(np.float32) if args.float_masks else masks_u8
+        masks_input = torch.from_numpy(masks_np).to(args.device) if torch is not None else masks_np
+
+        legacy_s, legacy_counts = timed(lambda: legacy_pixel_counts(masks_input, boxes), args.repeats)
+        loop_s, _ = timed(lambda: loop_full_res_pixel_counts(masks_input), args.repeats)
+        new_s, new_counts = timed(lambda: compute_mask_pixel_counts(masks_input), args.repeats)
+
+        if not np.array_equal(new_counts, reference):
+            raise AssertionError(f"Jumlah piksel tidak sesuai referensi untuk {n_masks} deteksi.")
+        legacy_error = np.mean(np.abs(legacy_counts - reference) / np.maximum(reference, 1)) * 100
+        print(f"{n_masks:>8} | {legacy_s * 1e3:>10.2f} | {loop_s * 1e3:>15.2f} | {new_s * 1e3:>10.2f} | "
+              f"OK (error cara lama: {legacy_error:.1f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# bench_mask_store.py
+# Penyimpanan mask deteksi (mask_store.MaskStore) pada sesi sintetis ala dashcam:
+#   - waktu encode RLE per frame dibanding anggaran waktu real-time (1 / fps)
+#   - ukuran per jam footage: RLE MaskStore, string RLE COCO, polygon COCO, dan PNG biner frame penuh per mask
+#   - pemeriksaan bahwa RLE lossless (mask hasil decode identik) dan waktu ekspor COCO
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_mask_store.py --frames 300 --resolution 1920x1080 --density 6
+
+import argparse
+import json
+import time
+import numpy as np
+from bench_pipeline import SyntheticDetector
+from detection_store import DetectionStore
+from frame_processor import analyze_frames_batch
+from mask_store import MaskStore, build_coco, coco_json_bytes
+from tracker import PotholeTracker
+
+def run_session(width, height, n_frames, density, fps, batch_size=4):
+    """Memproses n_frames frame sintetis lewat analyze_frames_batch dengan MaskStore; mengembalikan (store, DataFrame, mask asli)."""
+    detector, tracker, detections = SyntheticDetector(density, seed=0), PotholeTracker(), DetectionStore()
+    mask_store = MaskStore(fps=fps, metadata={"source": "bench_mask_store.mp4"}, png_sample_every=1)
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    original_masks = []
+    for start in range(0, n_frames, batch_size):
+        batch = [frame] * min(batch_size, n_frames - start)
+        for offset, (result, details, _) in enumerate(analyze_frames_batch(batch, detector, 0.25, 0.5, 300, tracker, True,
+                                                                           mask_store=mask_store)):
+            for pothole in details:
+                pothole["frame"] = start + offset + 1
+            detections.extend(details)
+            if result.masks is not None:
+                original_masks.extend(result.masks.data.numpy())
+    mask_store.flush()
+    return mask_store, detections.to_dataframe(), original_masks
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark penyimpanan mask RLE vs PNG + ekspor COCO.")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--resolution", default="1920x1080")
+    parser.add_argument("--density", type=int, default=6, help="Lubang per frame.")
+    parser.add_argument("--fps", type=int, default=30)
+    args = parser.parse_args()
+
+    width, height = map(int, args.resolution.lower().split("x"))
+    mask_store, df, original_masks = run_session(width, height, args.frames, args.density, args.fps)
+    n_masks = len(mask_store)
+    lossless = all(np.array_equal(mask_store.full_mask(i), (mask > 0).astype(np.uint8)) for i, mask in enumerate(original_masks))
+    encode_ms = mask_store.encode_seconds / args.frames * 1000
+    png_bytes_per_mask = mask_store.png_bytes_estimate / n_masks # png_sample_every=1: semua mask di-encode PNG
+    print(f"{args.frames} frame {width}x{height}, {n_masks} mask; RLE lossless: {'ya' if lossless else 'TIDAK'}")
+    print(f"Encode RLE (+ PNG pembanding): {encode_ms:.2f} ms/frame; anggaran real-time {1000 / args.fps:.1f} ms/frame")
+    start = time.perf_counter()
+    for i in range(min(n_masks, 500)):
+        (rx, ry), crop = mask_store.mask(i)
+    decode_us = (time.perf_counter() - start) / min(n_masks, 500) * 1e6
+
+    # Waktu encode RLE saja (tanpa PNG pembanding) pada sesi yang sama
+    rle_only = MaskStore(fps=args.fps, png_sample_every=0)
+    detector = SyntheticDetector(args.density, seed=0)
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(args.frames):
+        rle_only.add_frame(detector.predict(frame)[0])
+    print(f"Encode RLE saja: {rle_only.encode_seconds / args.frames * 1000:.2f} ms/frame "
+          f"({n_masks / rle_only.encode_seconds:,.0f} mask/s); decode {decode_us:.0f} µs/mask")
+    rle_only.close()
+
+    exports = {}
+    for segmentation in ("rle", "polygon"):
+        start = time.perf_counter()
+        coco = build_coco(mask_store, df, segmentation=segmentation)
+        data = coco_json_bytes(coco)
+        exports[segmentation] = (time.perf_counter() - start, data, coco)
+    coco_rle_bytes = sum(len(a["segmentation"]["counts"]) for a in exports["rle"][2]["annotations"])
+    polygon_bytes = sum(len(json.dumps(a["segmentation"], separators=(",", ":"))) for a in exports["polygon"][2]["annotations"])
+
+    hours = args.frames / args.fps / 3600
+    rows = [
+        ("PNG frame penuh/mask", png_bytes_per_mask * n_masks),
+        ("MaskStore RLE+indeks", mask_store.nbytes),
+        ("COCO RLE (string)", coco_rle_bytes),
+        ("COCO polygon", polygon_bytes),
+    ]
+    png_total = rows[0][1]
+    print(f"\n{'Format':>21} | {'Byte/mask':>10} | {'MB per jam':>11} | {'vs PNG':>7}")
+    print("-" * 60)
+    for label, nbytes in rows:
+        print(f"{label:>21} | {nbytes / n_masks:>10.0f} | {nbytes / hours / 1e6:>11.1f} | {png_total / nbytes:>6.0f}x")
+    for segmentation, (seconds, data, _) in exports.items():
+        print(f"Ekspor COCO {segmentation}: {seconds:.2f} s ({seconds / hours / 60:.1f} menit per jam footage), JSON {len(data) / 1e6:.1f} MB")
+    mask_store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+# bench_pipeline.py
+# Benchmark per tahap untuk pipeline frame (process_and_draw_frame + loop video):
+#   decode, predict, mask_area, tracking, drawing, encode, preview
+# pada footage sintetis (dan opsional footage contoh) di beberapa resolusi dan kepadatan deteksi.
+# Hasil (p50/p95/p99 + throughput per tahap) ditulis ke JSON agar dapat dibandingkan antar commit.
+# Contoh (dari folder repo):
+#   PYTHONPATH=pothole_app python benchmarks/bench_pipeline.py --output bench_hasil.json
+#   PYTHONPATH=pothole_app python benchmarks/bench_pipeline.py --videos contoh.mp4 --model pothole_app/best.pt --compare bench_sebelumnya.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from functools import partial
+import cv2
+import numpy as np
+from frame_processor import process_and_draw_frame, analyze_frames_batch, draw_frame_annotations
+from tracker import PotholeTracker
+from video_pipeline import VideoPipeline
+from preview import RateLimitedPreview, DEFAULT_PREVIEW_MAX_FPS, DEFAULT_PREVIEW_MAX_WIDTH
+
+STAGES = ["decode", "predict", "mask_area", "tracking", "drawing", "encode", "preview"]
+DEFAULT_RESOLUTIONS = ["640x360", "1280x720", "1920x1080"]
+
+class SyntheticDetector:
+    """
+    Pengganti model YOLO dengan jumlah deteksi per frame yang dapat diatur (density).
+    Lubang berbentuk elips bergerak perlahan ke bawah frame (seperti dari dashcam), sehingga
+    mask_area, tracking, dan drawing bekerja pada data yang realistis tanpa memerlukan bobot model.
+    Tahap predict untuk detektor ini hanya mengukur pembuatan objek Results, bukan inferensi.
+    """
+    def __init__(self, density, seed=0):
+        self.density = density
+        self.rng = np.random.default_rng(seed)
+        self._potholes = None
+        self._frame_index = 0
+
+    def _init_potholes(self, frame_h, frame_w):
+        n = self.density
+        self._potholes = {
+            "cx": self.rng.uniform(0.1, 0.9, n) * frame_w,
+            "cy": self.rng.uniform(0.1, 0.9, n) * frame_h,
+            "ax": self.rng.uniform(0.02, 0.08, n) * frame_w,
+            "ay": self.rng.uniform(0.02, 0.05, n) * frame_h,
+            "angle": self.rng.uniform(0, 180, n),
+            "conf": self.rng.uniform(0.6, 0.95, n),
+        }
+
+    def predict(self, source, conf=0.25, **kwargs):
+        import torch
+        from ultralytics.engine.results import Results
+
+        frames = source if isinstance(source, list) else [source]
+        results = []
+        for frame in frames:
+            frame_h, frame_w = frame.shape[:2]
+            if self._potholes is None:
+                self._init_potholes(frame_h, frame_w)
+            p = self._potholes
+            cy = (p["cy"] + self._frame_index * 0.004 * frame_h) % frame_h # Bergerak ke bawah lalu muncul lagi
+            self._frame_index += 1
+
+            masks = np.zeros((self.density, frame_h, frame_w), dtype=np.uint8)
+            boxes = []
+            for i in range(self.density):
+                center, axes = (int(p["cx"][i]), int(cy[i])), (int(p["ax"][i]), int(p["ay"][i]))
+                cv2.ellipse(masks[i], center, axes, float(p["angle"][i]), 0, 360, 1, -1)
+                x, y, w, h = cv2.boundingRect(masks[i])
+                if w > 0 and h > 0 and p["conf"][i] >= conf:
+                    boxes.append((i, [x, y, x + w, y + h, p["conf"][i], 0]))
+            keep = [i for i, _ in boxes]
+            results.append(Results(
+                frame, path="", names={0: "pothole"},
+                boxes=torch.tensor([b for _, b in boxes], dtype=torch.float32).reshape(-1, 6),
+                masks=torch.from_numpy(masks[keep]) if keep else None,
+            ))
+        return results
+
+def make_synthetic_frames(width, height, n_frames, seed=0):
+    """Footage jalan sintetis: tekstur aspal bergerak + marka jalan, agar encoder/decoder bekerja realistis."""
+    rng = np.random.default_rng(seed)
+    texture = rng.normal(90, 18, (height * 2, width)).clip(0, 255).astype(np.uint8)
+    texture = cv2.GaussianBlur(texture, (5, 5), 0)
+    for k in range(n_frames):
+        offset = (k * max(1, height // 60)) % height
+        frame = cv2.cvtColor(texture[offset:offset + height], cv2.COLOR_GRAY2BGR)
+        for lane_x in (width // 3, 2 * width // 3):
+            for y in range(-height // 4 + offset % (height // 4), height, height // 4):
+                cv2.line(frame, (lane_x, y), (lane_x, y + height // 8), (230, 230, 230), max(2, width // 200))
+        yield frame
+
+def write_clip(frames, path, width, height, fps=30):
+    """Menulis frame ke file video (tidak diukur) sebagai masukan tahap decode."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    count = 0
+    for frame in frames:
+        if frame.shape[1] != width or frame.shape[0] != height:
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        writer.write(frame)
+        count += 1
+    writer.release()
+    return count
+
+def read_clip_frames(video_path, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    while max_frames > 0:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        max_frames -= 1
+        yield frame
+    cap.release()
+
+class _NullPlaceholder:
+    """Pengganti st.empty(): menerima bytes pratinjau tanpa mengirimnya ke mana pun."""
+    def image(self, *args, **kwargs):
+        pass
+
+def make_preview(args):
+    """Tahap preview seperti di main_app (JPEG diperkecil, dibatasi FPS)."""
+    return RateLimitedPreview(_NullPlaceholder(), max_fps=args.preview_fps, max_width=args.preview_width)
+
+def run_sequential(clip_path, detector, args, work_dir):
+    """Loop video berurutan; durasi setiap tahap dicatat per frame (detik)."""
+    samples = {stage: [] for stage in STAGES + ["total"]}
+    tracker = PotholeTracker()
+    cap = cv2.VideoCapture(clip_path)
+    width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    writer = cv2.VideoWriter(os.path.join(work_dir, "bench_out.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 30, (width, height))
+    preview = make_preview(args)
+    frame_index, detections = 0, 0
+    try:
+        while True:
+            frame_start = time.perf_counter()
+            ret, frame = cap.read()
+            decode_s = time.perf_counter() - frame_start
+            if not ret:
+                break
+            stage_timings = {"decode": decode_s}
+            annotated, details, _ = process_and_draw_frame(
+                frame, detector, args.conf, args.iou, args.ppm, True, (0, 0, 255), True,
+                tracked_potholes_session_bboxes=tracker, update_tracked_list=True,
+                draw_in_place=True, stage_timings=stage_timings)
+            start = time.perf_counter()
+            writer.write(annotated)
+            stage_timings["encode"] = time.perf_counter() - start
+            start = time.perf_counter()
+            preview.offer(annotated)
+            stage_timings["preview"] = time.perf_counter() - start
+            total_s = time.perf_counter() - frame_start
+
+            frame_index += 1
+            if frame_index <= args.warmup:
+                continue
+            detections += len(details)
+            for stage in STAGES:
+                samples[stage].append(stage_timings.get(stage, 0.0))
+            samples["total"].append(total_s)
+    finally:
+        cap.release()
+        writer.release()
+    return samples, detections
+
+def run_pipelined(clip_path, detector, args, work_dir):
+    """Loop video melalui VideoPipeline (seperti main_app); mengembalikan throughput ujung ke ujung (frame/detik)."""
+    cap = cv2.VideoCapture(clip_path)
+    width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    writer = cv2.VideoWriter(os.path.join(work_dir, "bench_out.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 30, (width, height))
+    tracker = PotholeTracker()
+    pipeline = VideoPipeline(
+        cap, writer,
+        analyze_batch_fn=partial(analyze_frames_batch, yolo_model=detector, confidence_thresh=args.conf,
+                                 iou_thresh=args.iou, pixels_per_meter=args.ppm,
+                                 tracked_potholes_session_bboxes=tracker, update_tracked_list=True),
+        annotate_fn=lambda frame, result, details: draw_frame_annotations(
+            frame, result, details, True, (0, 0, 255), True, in_place=True),
+        batch_size=args.batch_size, queue_size=args.queue_size)
+    preview = make_preview(args)
+    frames = 0
+    start = time.perf_counter()
+    try:
+        for frames, _, _ in pipeline.run():
+            latest = pipeline.pop_latest_preview()
+            if latest is not None:
+                preview.offer(latest[1])
+    finally:
+        cap.release()
+        writer.release()
+    elapsed = time.perf_counter() - start
+    return frames / elapsed if elapsed > 0 else 0.0
+
+def summarize(durations):
+    """Statistik latensi (ms) dan throughput (frame/detik) dari daftar durasi per frame (detik)."""
+    if not durations:
+        return None
+    values = np.asarray(durations) * 1e3
+    mean_ms = float(values.mean())
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": mean_ms,
+        "throughput_fps": 1e3 / mean_ms if mean_ms > 0 else None,
+    }
+
+def environment_info():
+    info = {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "opencv": cv2.__version__, "numpy": np.__version__}
+    try:
+        info["git_commit"] = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                                     cwd=os.path.dirname(os.path.abspath(__file__)),
+                                                     stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        info["git_commit"] = None
+    for module_name in ("torch", "ultralytics"):
+        try:
+            info[module_name] = __import__(module_name).__version__
+        except ImportError:
+            info[module_name] = None
+    return info
+
+def parse_resolution(text):
+    width, height = (int(v) for v in text.lower().split("x"))
+    return width, height
+
+def print_scenario(scenario):
+    label = f"{scenario['source']} {scenario['resolution']} | detektor {scenario['detector']}"
+    if scenario["density"] is not None:
+        label += f" ({scenario['density']} deteksi/frame)"
+    print(f"\n{label} | {scenario['frames']} frame, rata-rata {scenario['detections_per_frame']:.1f} deteksi/frame")
+    print(f"{'Tahap':>10} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'p99 (ms)':>9} | {'fps':>8}")
+    for stage in STAGES + ["total"]:
+        s = scenario["stages"][stage]
+        fps = f"{s['throughput_fps']:.1f}" if s["throughput_fps"] else "-"
+        print(f"{stage:>10} | {s['p50_ms']:>9.2f} | {s['p95_ms']:>9.2f} | {s['p99_ms']:>9.2f} | {fps:>8}")
+    if scenario.get("pipeline_fps") is not None:
+        print(f"  VideoPipeline (batch {scenario['pipeline_batch_size']}): {scenario['pipeline_fps']:.1f} frame/detik")
+
+def scenario_key(scenario):
+    return (scenario["source"], scenario["resolution"], scenario["detector"], scenario["density"])
+
+def print_comparison(results, baseline_path):
+    """Membandingkan p50 total dan per tahap dengan hasil JSON sebelumnya (misal dari commit lain)."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    baseline_by_key = {scenario_key(s): s for s in baseline.get("scenarios", [])}
+    print(f"\nPerbandingan p50 dengan {baseline_path} (commit {baseline.get('environment', {}).get('git_commit')}):")
+    for scenario in results["scenarios"]:
+        old = baseline_by_key.get(scenario_key(scenario))
+        if old is None:
+            continue
+        parts = []
+        for stage in STAGES + ["total"]:
+            new_ms, old_ms = scenario["stages"][stage]["p50_ms"], old["stages"][stage]["p50_ms"]
+            change = (new_ms - old_ms) / old_ms * 100 if old_ms > 0 else 0.0
+            parts.append(f"{stage} {change:+.0f}%")
+        print(f"  {scenario['source']} {scenario['resolution']} {scenario['detector']}/{scenario['density']}: " + ", ".join(parts))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per tahap pipeline frame.")
+    parser.add_argument("--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS, help="Resolusi WxH.")
+    parser.add_argument("--densities", type=int, nargs="+", default=[0, 5, 20],
+                        help="Jumlah deteksi per frame untuk detektor sintetis.")
+    parser.add_argument("--frames", type=int, default=90, help="Jumlah frame per skenario.")
+    parser.add_argument("--warmup", type=int, default=5, help="Frame awal yang tidak diukur.")
+    parser.add_argument("--videos", nargs="*", default=[], help="Footage contoh (opsional).")
+    parser.add_argument("--model", default=None,
+                        help="Bobot YOLO untuk footage contoh; tanpa ini footage contoh memakai detektor sintetis.")
+    parser.add_argument("--backend", default="pytorch", help="Backend inferensi untuk --model.")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--ppm", type=float, default=300)
+    parser.add_argument("--batch-size", type=int, default=4, help="Ukuran batch untuk pengukuran VideoPipeline.")
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--preview-fps", type=float, default=DEFAULT_PREVIEW_MAX_FPS, help="Batas FPS pratinjau.")
+    parser.add_argument("--preview-width", type=int, default=DEFAULT_PREVIEW_MAX_WIDTH, help="Lebar maksimum pratinjau.")
+    parser.add_argument("--no-pipeline", action="store_true", help="Lewati pengukuran VideoPipeline.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_pipeline.json", help="File JSON hasil.")
+    parser.add_argument("--compare", default=None, help="File JSON hasil sebelumnya untuk dibandingkan.")
+    args = parser.parse_args()
+
+    model = None
+    if args.videos and args.model:
+        from model_loader import load_yolo_model_uncached
+        model = load_yolo_model_uncached(args.model, args.backend)
+        if model is None:
+            return 1
+
+    results = {"environment": environment_info(), "settings": vars(args), "scenarios": []}
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as work_dir:
+        jobs = [] # (sumber, resolusi, nama detektor, kepadatan, fungsi pembuat frame)
+        for resolution in args.resolutions:
+            width, height = parse_resolution(resolution)
+            for density in args.densities:
+                jobs.append(("synthetic", resolution, "synthetic", density,
+                             partial(make_synthetic_frames, width, height, args.frames, args.seed)))
+            for video_path in args.videos:
+                source = os.path.basename(video_path)
+                frames_fn = partial(read_clip_frames, video_path, args.frames)
+                if model is not None:
+                    jobs.append((source, resolution, f"model:{args.backend}", None, frames_fn))
+                else:
+                    jobs.extend((source, resolution, "synthetic", density, frames_fn) for density in args.densities)
+
+        for source, resolution, detector_name, density, frames_fn in jobs:
+            width, height = parse_resolution(resolution)
+            clip_path = os.path.join(work_dir, "clip.mp4")
+            if write_clip(frames_fn(), clip_path, width, height) <= args.warmup:
+                print(f"Lewati {source} {resolution}: frame terlalu sedikit.")
+                continue
+            make_detector = (lambda: model) if density is None else (lambda: SyntheticDetector(density, args.seed))
+
+            samples, detections = run_sequential(clip_path, make_detector(), args, work_dir)
+            scenario = {
+                "source": source, "resolution": resolution, "detector": detector_name, "density": density,
+                "frames": len(samples["total"]),
+                "detections_per_frame": detections / max(1, len(samples["total"])),
+                "stages": {stage: summarize(values) for stage, values in samples.items()},
+                "pipeline_fps": None, "pipeline_batch_size": args.batch_size,
+            }
+            if not args.no_pipeline:
+                scenario["pipeline_fps"] = run_pipelined(clip_path, make_detector(), args, work_dir)
+            results["scenarios"].append(scenario)
+            print_scenario(scenario)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nHasil disimpan ke {args.output}")
+    if args.compare:
+        print_comparison(results, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+# bench_replay.py
+# Ukuran log prediksi mentah (raw_predictions.RawPredictionLog) dan waktu hitung ulang sesi
+# (replay_session) terhadap panjang sesi, pada deteksi sintetis yang bergerak seperti footage dashcam.
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_replay.py --minutes 5 30 60
+#   --verify: periksa juga bahwa replay identik dengan pemrosesan langsung (klip pendek, SyntheticDetector).
+
+import argparse
+import time
+import numpy as np
+from raw_predictions import RawPredictionLog, RAW_PREDICTION_DTYPE, replay_session
+
+def make_log(n_frames, detections_per_frame, seed=0):
+    """Log berisi lubang yang bergerak ke bawah frame 1080p dengan confidence acak di atas floor."""
+    rng = np.random.default_rng(seed)
+    log = RawPredictionLog(confidence_floor=0.05)
+    frames = np.repeat(np.arange(1, n_frames + 1), detections_per_frame)
+    records = np.empty(len(frames), dtype=RAW_PREDICTION_DTYPE)
+    records["frame"] = frames
+    records["confidence"] = rng.uniform(0.05, 1.0, len(frames))
+    lane = np.tile(np.arange(detections_per_frame), n_frames)
+    x1 = 100 + lane * (1700 // max(1, detections_per_frame))
+    y1 = (frames * 7 + lane * 131) % 1000
+    records["x1"], records["y1"] = x1, y1
+    records["x2"], records["y2"] = x1 + rng.integers(40, 120, len(frames)), y1 + rng.integers(20, 60, len(frames))
+    records["pixels"] = rng.integers(500, 5000, len(frames))
+    records["ground_area"] = np.nan # Sesi tanpa kalibrasi perspektif
+    log.extend_records(records, n_frames)
+    log.flush()
+    return log
+
+def verify_against_live(n_frames=120):
+    """
+    Replay dari log harus identik dengan pemrosesan langsung pada confidence/IoU/skala yang sama, dan hasil
+    langsung saat log aktif harus identik dengan hasil tanpa log. Kasus bertile (frame 640x360, tile 320)
+    di-replay pada confidence sesi dengan IoU/skala berbeda.
+    """
+    from bench_pipeline import SyntheticDetector, make_synthetic_frames
+    from frame_processor import analyze_frames_batch
+    from tiled_inference import TilingConfig
+    from tracker import PotholeTracker
+    from detection_store import DetectionStore
+
+    frames = list(make_synthetic_frames(640, 360, n_frames))
+
+    def live(confidence, iou, ppm, raw_log=None, tiling=None):
+        detector, tracker, store = SyntheticDetector(12, seed=1), PotholeTracker(), DetectionStore()
+        for start in range(0, n_frames, 4):
+            for offset, (_, details, _) in enumerate(analyze_frames_batch(frames[start:start + 4], detector, confidence, 0.5, ppm,
+                                                                          tracker, True, iou, raw_log=raw_log, tiling=tiling)):
+                for pothole in details:
+                    pothole["frame"] = start + offset + 1
+                store.extend(details)
+        return store.to_dataframe(), len(tracker)
+
+    cases = (("tanpa tile", None, 0.8, ((0.8, 0.3, 300), (0.65, 0.5, 150), (0.9, 0.1, 500))),
+             ("bertile", TilingConfig(tile_size=320), 0.7, ((0.7, 0.3, 300), (0.7, 0.1, 500))))
+    for label, tiling, session_confidence, replays in cases:
+        log = RawPredictionLog(confidence_floor=0.05)
+        logged_df, logged_unique = live(session_confidence, 0.3, 300, log, tiling)
+        plain_df, plain_unique = live(session_confidence, 0.3, 300, None, tiling)
+        same = logged_df.equals(plain_df) and logged_unique == plain_unique
+        print(f"{label}: hasil langsung dengan log {'identik' if same else 'BERBEDA'} dengan tanpa log")
+        for confidence, iou, ppm in replays:
+            expected_df, expected_unique = live(confidence, iou, ppm, tiling=tiling)
+            replayed = replay_session(log, confidence, iou, ppm)
+            same = replayed["detections"].to_dataframe().equals(expected_df) and len(replayed["tracker"]) == expected_unique
+            print(f"{label} conf={confidence} iou={iou} ppm={ppm}: replay {'identik' if same else 'BERBEDA'} dengan pemrosesan langsung")
+        log.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark log prediksi mentah + hitung ulang sesi.")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5, 30])
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--detections", type=int, default=6, help="Deteksi mentah per frame (di atas floor).")
+    parser.add_argument("--verify", action="store_true")
+    args = parser.parse_args()
+
+    if args.verify:
+        verify_against_live()
+    print(f"\n{'Menit':>6} | {'Frame':>7} | {'Deteksi mentah':>14} | {'Ukuran log (MB)':>15} | {'Hitung ulang (s)':>16}")
+    print("-" * 70)
+    for minutes in args.minutes:
+        n_frames = int(minutes * 60 * args.fps)
+        log = make_log(n_frames, args.detections)
+        start = time.perf_counter()
+        replay_session(log, 0.6, 0.5, 300)
+        elapsed = time.perf_counter() - start
+        print(f"{minutes:>6g} | {n_frames:>7} | {len(log):>14} | {log.nbytes / 1e6:>15.1f} | {elapsed:>16.2f}")
+        log.close()
+
+if __name__ == "__main__":
+    main()
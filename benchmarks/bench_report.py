@@ -0,0 +1,94 @@
+# bench_report.py
+# Waktu pembuatan dan puncak memori laporan PDF lengkap terhadap jumlah lubang unik:
+#   - streaming : create_detection_report_pdf(full_appendix=True), lampiran ditulis per halaman
+#   - streaming A85: sama, tetapi stream dikodekan ASCII85 (bawaan ReportLab; FULL_REPORT_BINARY_STREAMS=False)
+#   - satu tabel: semua baris lampiran dalam satu Table ReportLab (cara naif)
+# Thumbnail sintetis dibuat lewat ThumbnailStore (bisa dimatikan dengan --no-thumbnails).
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_report.py --rows 1000 5000 20000 50000
+
+import argparse
+import os
+import time
+import tracemalloc
+import numpy as np
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate
+import report_generator
+from detection_store import DetectionStore
+from pothole_thumbnails import ThumbnailStore
+from report_generator import create_detection_report_pdf, _appendix_rows, _appendix_table
+
+def make_session(n_rows, with_thumbnails, seed=0):
+    """DetectionStore berisi n_rows lubang unik dan ThumbnailStore yang sesuai."""
+    rng = np.random.default_rng(seed)
+    store = DetectionStore()
+    thumbnails = ThumbnailStore() if with_thumbnails else None
+    frame = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    for i in range(n_rows):
+        x1, y1 = int(rng.integers(0, 200)), int(rng.integers(0, 150))
+        pothole = {"frame": i + 1, "track_id": i + 1, "confidence": float(rng.uniform(0.5, 1.0)), "area_m2": float(rng.random()),
+                   "is_new": True, "x1": x1, "y1": y1, "x2": x1 + 100, "y2": y1 + 80}
+        store.extend([pothole])
+        if thumbnails is not None:
+            thumbnails.add_from_frame(i + 1, frame, [pothole])
+    return store, thumbnails
+
+def make_report_data(store):
+    df = store.to_dataframe()
+    return {'confidence_threshold': 0.6, 'iou_threshold': 0.5, 'pixels_per_meter': 300, 'total_unique_potholes': len(df),
+            'total_new_area_session': float(df['area_m2'].sum()), 'avg_area_new': None, 'max_area_new': None,
+            'min_area_new': None, 'df_all_detections': df}
+
+def build_streaming(report_data, thumbnails, binary_streams=True):
+    report_generator.FULL_REPORT_BINARY_STREAMS = binary_streams
+    try:
+        return create_detection_report_pdf(report_data, full_appendix=True, thumbnails=thumbnails)
+    finally:
+        report_generator.FULL_REPORT_BINARY_STREAMS = True
+
+def build_single_table(report_data, thumbnails, path):
+    """Semua baris lampiran dalam satu Table (isi baris sama dengan mode streaming)."""
+    table = _appendix_table(list(_appendix_rows(report_data['df_all_detections'], thumbnails)))
+    SimpleDocTemplate(path, pagesize=letter, topMargin=0.6*inch, bottomMargin=0.6*inch).build([table])
+    return path
+
+def measure(fn):
+    """Waktu diukur tanpa tracemalloc (overhead-nya besar), puncak memori pada pemanggilan kedua."""
+    start = time.perf_counter()
+    path = fn()
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    os.remove(path)
+    tracemalloc.start()
+    os.remove(fn())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, size / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark laporan PDF lengkap.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--single-table-max", type=int, default=5000, help="Batas baris untuk cara satu tabel (lambat).")
+    parser.add_argument("--no-thumbnails", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'Baris':>7} | {'Cara':>13} | {'Waktu (s)':>9} | {'Puncak memori (MB)':>18} | {'Ukuran PDF (MB)':>15}")
+    print("-" * 75)
+    for n_rows in args.rows:
+        store, thumbnails = make_session(n_rows, not args.no_thumbnails)
+        report_data = make_report_data(store)
+        cases = [("streaming", lambda: build_streaming(report_data, thumbnails))]
+        if n_rows <= args.single_table_max:
+            cases.append(("streaming A85", lambda: build_streaming(report_data, thumbnails, binary_streams=False)))
+            cases.append(("satu tabel", lambda: build_single_table(report_data, thumbnails, f"bench_single_{n_rows}.pdf")))
+        for label, fn in cases:
+            elapsed, peak_mb, size_mb = measure(fn)
+            print(f"{n_rows:>7} | {label:>13} | {elapsed:>9.2f} | {peak_mb:>18.1f} | {size_mb:>15.1f}")
+        if thumbnails is not None:
+            thumbnails.close()
+    print("\nCatatan: puncak memori = alokasi Python (tracemalloc) selama pembuatan PDF, termasuk objek halaman yang")
+    print("disimpan ReportLab hingga file ditulis; data sesi dibuat sebelum pengukuran.")
+
+if __name__ == "__main__":
+    main()
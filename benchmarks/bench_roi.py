@@ -0,0 +1,104 @@
+# bench_roi.py
+# Efek ROI jalan (roi.RoiProfile) dibanding frame utuh pada frame dashcam sintetis:
+#   - piksel input model per inferensi (letterbox imgsz=640, kelipatan stride 32)
+#   - deteksi di luar jalan (bayangan/objek gelap di langit & pinggir jalan) yang ikut terdeteksi
+#   - recall lubang di jalan dan galat luasnya (harus tetap sama: luas dihitung di koordinat frame asli)
+#   - waktu predict dengan ScaleLimitedDetector, atau dengan model asli jika --model diberikan
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_roi.py --frames 20 --model pothole_app/best.pt
+
+import argparse
+import time
+import cv2
+import numpy as np
+from bench_tiled_inference import ScaleLimitedDetector, evaluate
+from frame_processor import _predict_frames
+from roi import RoiProfile, DEFAULT_TRAPEZOID
+
+def make_dashcam_frame(width, height, roi, n_road, n_outside, rng):
+    """Frame dengan n_road lubang di dalam ROI dan n_outside objek gelap di luar ROI; mengembalikan (frame, GT lubang)."""
+    frame = np.full((height, width, 3), 128, dtype=np.uint8)
+    frame[: int(height * 0.45)] = (200, 170, 140) # Langit
+    (rx1, ry1, rx2, ry2), inside, _ = roi.geometry(frame.shape)
+    inside_full = np.zeros((height, width), dtype=np.uint8)
+    inside_full[ry1:ry2, rx1:rx2] = inside
+    occupied = np.zeros((height, width), dtype=np.uint8)
+    gt_masks, n_distractors = [], 0
+    while len(gt_masks) < n_road or n_distractors < n_outside:
+        axes = (int(rng.uniform(15, 80)), int(rng.uniform(10, 40)))
+        center = (int(rng.uniform(axes[0], width - axes[0])), int(rng.uniform(axes[1], height - axes[1])))
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.ellipse(mask, center, axes, 0, 0, 360, 1, -1)
+        area = np.count_nonzero(mask)
+        in_roi = np.count_nonzero(mask & inside_full)
+        if np.any(occupied & cv2.dilate(mask, np.ones((9, 9), np.uint8))):
+            continue
+        if in_roi == area and len(gt_masks) < n_road:
+            gt_masks.append(mask)
+        elif in_roi == 0 and n_distractors < n_outside:
+            n_distractors += 1
+        else:
+            continue
+        occupied |= mask
+        frame[mask > 0] = 25
+    return frame, gt_masks
+
+def letterbox_pixels(shape, imgsz=640, stride=32):
+    """Jumlah piksel input model untuk predict rect (letterbox minimum) Ultralytics."""
+    height, width = shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_h, new_w = round(height * scale), round(width * scale)
+    return int(np.ceil(new_h / stride) * stride) * int(np.ceil(new_w / stride) * stride)
+
+def time_predict(model, frames, roi, repeats, conf):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for frame in frames:
+            _predict_frames(model, [frame], conf, 0.5, None, roi)
+    return (time.perf_counter() - start) / (repeats * len(frames))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ROI jalan vs frame utuh.")
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--resolution", default="1920x1080")
+    parser.add_argument("--road-potholes", type=int, default=6)
+    parser.add_argument("--outside-objects", type=int, default=6, help="Objek gelap di luar jalan per frame (calon false positive).")
+    parser.add_argument("--model", default=None, help="Model YOLO untuk mengukur waktu predict asli.")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    width, height = map(int, args.resolution.lower().split("x"))
+    roi = RoiProfile.from_trapezoid("bench", **DEFAULT_TRAPEZOID)
+    rng = np.random.default_rng(args.seed)
+    samples = [make_dashcam_frame(width, height, roi, args.road_potholes, args.outside_objects, rng) for _ in range(args.frames)]
+    crop_shape = roi.crop(samples[0][0]).shape
+    print(f"{args.frames} frame {width}x{height}; potongan ROI {crop_shape[1]}x{crop_shape[0]} "
+          f"({roi.pixel_fraction(samples[0][0].shape):.0%} piksel frame)")
+
+    detector = ScaleLimitedDetector()
+    print(f"\n{'Mode':>11} | {'Piksel input':>12} | {'Recall jalan':>12} | {'Deteksi di luar jalan':>21} | {'Galat luas (median)':>19} | {'Waktu (ms)':>10}")
+    print("-" * 102)
+    for label, mode_roi in (("frame utuh", None), ("ROI", roi)):
+        hits, extras, area_errors = 0, 0, []
+        for frame, gt_masks in samples:
+            result = _predict_frames(detector, [frame], 0.25, 0.5, None, mode_roi)[0]
+            h, e, errors = evaluate(result, gt_masks)
+            hits, extras, area_errors = hits + h, extras + e, area_errors + errors
+        input_pixels = letterbox_pixels(crop_shape if mode_roi is not None else samples[0][0].shape)
+        seconds = time_predict(detector, [frame for frame, _ in samples], mode_roi, args.repeats, 0.25)
+        print(f"{label:>11} | {input_pixels:>12} | {hits / (args.frames * args.road_potholes):>12.1%} | {extras:>21} | "
+              f"{np.median(area_errors) if area_errors else float('nan'):>19.1%} | {seconds * 1000:>10.1f}")
+
+    if args.model:
+        from model_loader import load_yolo_model_uncached
+        model = load_yolo_model_uncached(args.model)
+        frames = [frame for frame, _ in samples]
+        _predict_frames(model, frames[:1], args.conf, 0.5) # Pemanasan
+        full_s = time_predict(model, frames, None, args.repeats, args.conf)
+        roi_s = time_predict(model, frames, roi, args.repeats, args.conf)
+        print(f"\nModel {args.model}: frame utuh {full_s * 1000:.1f} ms/frame, ROI {roi_s * 1000:.1f} ms/frame "
+              f"({full_s / roi_s:.2f}x lebih cepat)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# bench_tiled_inference.py
+# Biaya throughput vs kenaikan recall inferensi bertile (tiled_inference) dibanding satu kali predict imgsz=640.
+#   - Recall diukur pada citra jalan sintetis 4K dengan lubang berukuran kecil hingga besar (ground truth diketahui)
+#     memakai ScaleLimitedDetector: detektor sintetis yang hanya "melihat" lubang jika ukurannya pada input
+#     yang sudah diperkecil ke imgsz minimal --min-px piksel (meniru hilangnya objek kecil saat downscale).
+#   - Throughput diukur dengan detektor yang sama, atau dengan model asli jika --model diberikan
+#     (recall untuk model asli tidak bermakna pada citra sintetis, sehingga hanya waktu yang dilaporkan).
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_tiled_inference.py --images 5 --model pothole_app/best.pt
+
+import argparse
+import time
+import cv2
+import numpy as np
+from bench_pipeline import make_synthetic_frames
+from frame_processor import _predict_frames
+from tiled_inference import TilingConfig, compute_tiles
+
+class ScaleLimitedDetector:
+    """Mendeteksi area gelap (lubang sintetis) yang cukup besar setelah input diperkecil ke imgsz."""
+
+    names = {0: "pothole"}
+
+    def __init__(self, min_px=8, dark_threshold=50):
+        self.min_px = min_px
+        self.dark_threshold = dark_threshold
+
+    def predict(self, source, imgsz=640, conf=0.25, **kwargs):
+        import torch
+        from ultralytics.engine.results import Results
+
+        images = source if isinstance(source, list) else [source]
+        results = []
+        for image in images:
+            height, width = image.shape[:2]
+            scale = min(1.0, imgsz / max(height, width))
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            small = cv2.resize(gray, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+            n_labels, labels, stats, _ = cv2.connectedComponentsWithStats((small < self.dark_threshold).astype(np.uint8))
+            boxes, masks = [], []
+            for label in range(1, n_labels):
+                x, y, w, h, _ = stats[label]
+                if min(w, h) < self.min_px:
+                    continue
+                # Mask diperbesar kembali ke resolusi input (seperti retina_masks=True)
+                mask = cv2.resize((labels == label).astype(np.uint8), (width, height), interpolation=cv2.INTER_NEAREST)
+                bx, by, bw, bh = cv2.boundingRect(mask)
+                boxes.append([bx, by, bx + bw, by + bh, 0.9, 0])
+                masks.append(mask)
+            results.append(Results(image, path="", names=self.names,
+                                   boxes=torch.tensor(boxes, dtype=torch.float32).reshape(-1, 6),
+                                   masks=torch.from_numpy(np.stack(masks)) if masks else None))
+        return results
+
+def make_survey_image(width, height, n_potholes, rng):
+    """Citra jalan sintetis dengan lubang gelap berbentuk elips (sumbu 6-150 px) yang tidak saling bertumpuk."""
+    image = next(make_synthetic_frames(width, height, 1, seed=int(rng.integers(1 << 31)))).copy()
+    occupied = np.zeros((height, width), dtype=np.uint8)
+    gt_masks = []
+    while len(gt_masks) < n_potholes:
+        axes = (int(rng.uniform(6, 150)), int(rng.uniform(6, 100)))
+        center = (int(rng.uniform(axes[0], width - axes[0])), int(rng.uniform(axes[1], height - axes[1])))
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.ellipse(mask, center, axes, float(rng.uniform(0, 180)), 0, 360, 1, -1)
+        if np.any(occupied & cv2.dilate(mask, np.ones((9, 9), np.uint8))):
+            continue
+        occupied |= mask
+        image[mask > 0] = 25
+        gt_masks.append(mask)
+    return image, gt_masks
+
+def box_iou(a, b):
+    x1, y1, x2, y2 = max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def evaluate(result, gt_masks, iou_threshold=0.5):
+    """(jumlah GT terdeteksi, jumlah deteksi ganda/salah, list selisih luas relatif GT terdeteksi)."""
+    pred_boxes = result.boxes.xyxy.cpu().numpy() if result.boxes is not None else np.zeros((0, 4))
+    pred_areas = (result.masks.data.cpu().numpy().reshape(len(pred_boxes), -1).sum(1, dtype=np.int64)
+                  if result.masks is not None else np.zeros(0, dtype=np.int64))
+    matched_preds, hits, area_errors = set(), 0, []
+    for gt in gt_masks:
+        x, y, w, h = cv2.boundingRect(gt)
+        gt_box = (x, y, x + w, y + h)
+        ious = [box_iou(gt_box, box) if i not in matched_preds else 0.0 for i, box in enumerate(pred_boxes)]
+        if ious and max(ious) >= iou_threshold:
+            best = int(np.argmax(ious))
+            matched_preds.add(best)
+            hits += 1
+            gt_area = int(np.count_nonzero(gt))
+            area_errors.append(abs(int(pred_areas[best]) - gt_area) / gt_area)
+    return hits, len(pred_boxes) - len(matched_preds), area_errors
+
+def time_predict(model, images, tiling, repeats, conf=0.25):
+    times = []
+    for _ in range(repeats):
+        for image in images:
+            start = time.perf_counter()
+            _predict_frames(model, [image], conf, 0.5, tiling)
+            times.append(time.perf_counter() - start)
+    return float(np.mean(times))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inferensi bertile vs satu kali predict 640.")
+    parser.add_argument("--images", type=int, default=5)
+    parser.add_argument("--resolution", default="3840x2160")
+    parser.add_argument("--potholes", type=int, default=40, help="Jumlah lubang per citra.")
+    parser.add_argument("--tile-size", type=int, default=640)
+    parser.add_argument("--overlap", type=float, default=0.2)
+    parser.add_argument("--no-full-frame", action="store_true", help="Jangan ikutkan frame utuh dalam batch tile.")
+    parser.add_argument("--min-px", type=int, default=8, help="Ukuran lubang minimum (piksel input model) untuk detektor sintetis.")
+    parser.add_argument("--model", default=None, help="Model YOLO untuk mengukur throughput asli.")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold untuk model asli.")
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    width, height = map(int, args.resolution.lower().split("x"))
+    rng = np.random.default_rng(args.seed)
+    samples = [make_survey_image(width, height, args.potholes, rng) for _ in range(args.images)]
+    tiling = TilingConfig(args.tile_size, args.overlap, include_full_frame=not args.no_full_frame)
+    n_tiles = len(compute_tiles(height, width, tiling.tile_size, tiling.overlap)) + (0 if args.no_full_frame else 1)
+    print(f"{args.images} citra {width}x{height}, {args.potholes} lubang/citra, {n_tiles} input per citra dalam mode tile")
+
+    detector = ScaleLimitedDetector(min_px=args.min_px)
+    print(f"\n{'Mode':>10} | {'Recall':>7} | {'Deteksi lebih':>13} | {'Galat luas (median)':>19} | {'Waktu/citra (s)':>15}")
+    print("-" * 78)
+    for label, mode_tiling in (("640 tunggal", None), ("bertile", tiling)):
+        hits, extras, area_errors = 0, 0, []
+        for image, gt_masks in samples:
+            result = _predict_frames(detector, [image], 0.25, 0.5, mode_tiling)[0]
+            h, e, errors = evaluate(result, gt_masks)
+            hits, extras, area_errors = hits + h, extras + e, area_errors + errors
+        recall = hits / (len(samples) * args.potholes)
+        seconds = time_predict(detector, [image for image, _ in samples], mode_tiling, args.repeats)
+        print(f"{label:>10} | {recall:>7.1%} | {extras:>13} | {np.median(area_errors) if area_errors else float('nan'):>19.1%} | {seconds:>15.3f}")
+
+    if args.model:
+        from model_loader import load_yolo_model_uncached
+        model = load_yolo_model_uncached(args.model)
+        images = [image for image, _ in samples]
+        _predict_frames(model, images[:1], args.conf, 0.5, None) # Pemanasan
+        single_s = time_predict(model, images, None, args.repeats, args.conf)
+        tiled_s = time_predict(model, images, tiling, args.repeats, args.conf)
+        print(f"\nModel {args.model}: 640 tunggal {single_s:.3f} s/citra ({1 / single_s:.2f} citra/s), "
+              f"bertile {tiled_s:.3f} s/citra ({1 / tiled_s:.2f} citra/s), biaya {tiled_s / single_s:.1f}x")
+
+if __name__ == "__main__":
+    main()
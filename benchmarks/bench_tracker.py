@@ -0,0 +1,88 @@
+# bench_tracker.py
+# Biaya penentuan lubang baru per frame seiring sesi bertambah panjang:
+#   - cara lama: is_new_pothole (loop Python) terhadap daftar bbox semua lubang yang pernah terlihat
+#   - PotholeTracker: IoU tervektorisasi hanya terhadap track aktif (track kedaluwarsa dihapus setelah max_age)
+# Diukur saat sesi telah melihat 1k / 10k / 100k lubang unik, pada aliran deteksi dashcam sintetis. Cara lama berhenti
+# memindai saat menemukan bbox lama yang tumpang tindih, sehingga biayanya dilaporkan untuk deteksi yang memang baru
+# (pindai penuh) dan bersama porsi deteksi yang masih dianggap baru (daftar lama makin menutupi seluruh frame).
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_tracker.py --sizes 1000 10000 100000
+
+import argparse
+import time
+import numpy as np
+from tracker import PotholeTracker
+
+def legacy_is_new_pothole(new_bbox_coords, tracked_potholes_bboxes, iou_threshold=0.5):
+    """Salinan utils.is_new_pothole sebelum digantikan PotholeTracker (pembanding)."""
+    x1_new, y1_new, x2_new, y2_new = new_bbox_coords
+    for x1_tracked, y1_tracked, x2_tracked, y2_tracked in tracked_potholes_bboxes:
+        inter_width = max(0, min(x2_new, x2_tracked) - max(x1_new, x1_tracked))
+        inter_height = max(0, min(y2_new, y2_tracked) - max(y1_new, y1_tracked))
+        intersection = inter_width * inter_height
+        union = (x2_new - x1_new) * (y2_new - y1_new) + (x2_tracked - x1_tracked) * (y2_tracked - y1_tracked) - intersection
+        if union != 0 and intersection / union > iou_threshold:
+            return False
+    return True
+
+class DashcamStream:
+    """
+    Deteksi per frame (density lubang sekaligus) yang bergerak ke bawah frame 1080p lalu keluar; lubang yang
+    keluar digantikan lubang baru di posisi acak di bagian atas, sehingga jumlah lubang unik terus bertambah.
+    """
+
+    def __init__(self, density, speed_px=30, frame_w=1920, frame_h=1080, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.frame_w, self.frame_h, self.speed_px = frame_w, frame_h, speed_px
+        self.boxes = np.array([self._spawn(self.rng.uniform(0, frame_h)) for _ in range(density)], dtype=np.float32)
+
+    def _spawn(self, y):
+        w, h = self.rng.uniform(60, 240), self.rng.uniform(40, 120)
+        x = self.rng.uniform(0, self.frame_w - w)
+        return [x, y, x + w, y + h]
+
+    def next_frame(self):
+        self.boxes[:, [1, 3]] += self.speed_px * (0.5 + self.boxes[:, [3]] / self.frame_h) # Lebih cepat di dekat kamera
+        for i in np.flatnonzero(self.boxes[:, 1] >= self.frame_h):
+            self.boxes[i] = self._spawn(0.0)
+        return self.boxes.astype(int)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark is_new_pothole (daftar bbox) vs PotholeTracker.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Jumlah lubang unik dalam sesi.")
+    parser.add_argument("--density", type=int, default=12, help="Deteksi per frame.")
+    parser.add_argument("--frames", type=int, default=200, help="Frame yang diukur pada setiap ukuran.")
+    parser.add_argument("--iou", type=float, default=0.3)
+    args = parser.parse_args()
+
+    stream, tracker = DashcamStream(args.density), PotholeTracker()
+    seen_boxes = [] # Yang akan disimpan jalur daftar bbox lama: bbox pertama setiap lubang baru
+    print(f"{'Lubang unik':>11} | {'Track aktif':>11} | {'is_new_pothole pindai penuh':>27} | {'PotholeTracker':>14} | "
+          f"{'Rasio':>6} | {'Baru (lama / tracker)':>21}")
+    print(f"{'':>11} | {'':>11} | {'(µs/frame)':>27} | {'(µs/frame)':>14} | {'':>6} |")
+    print("-" * 108)
+    for size in sorted(args.sizes):
+        while len(tracker) < size: # Sesi berjalan hingga jumlah lubang unik tercapai
+            boxes = stream.next_frame()
+            _, is_new = tracker.update(boxes, args.iou)
+            seen_boxes.extend(tuple(box) for box, new in zip(boxes.tolist(), is_new) if new)
+        frames = [stream.next_frame() for _ in range(args.frames)]
+
+        # Daftar lama dibandingkan tanpa ditambah agar ukurannya tetap; loop Python dibatasi jumlah framenya
+        n_legacy = max(3, min(args.frames, 20_000_000 // (len(seen_boxes) * args.density)))
+        start = time.perf_counter()
+        for boxes in frames[:n_legacy]:
+            [legacy_is_new_pothole(tuple(box), seen_boxes, 1.0) for box in boxes.tolist()] # IoU tidak pernah > 1: pindai penuh
+        legacy_us = (time.perf_counter() - start) / n_legacy * 1e6
+        legacy_new = np.mean([legacy_is_new_pothole(tuple(box), seen_boxes, args.iou)
+                              for boxes in frames[:n_legacy] for box in boxes.tolist()])
+
+        tracker_new = []
+        start = time.perf_counter()
+        for boxes in frames:
+            tracker_new.extend(tracker.update(boxes, args.iou)[1])
+        tracker_us = (time.perf_counter() - start) / len(frames) * 1e6
+        print(f"{len(tracker):>11,} | {tracker.num_active:>11} | {legacy_us:>27.1f} | {tracker_us:>14.1f} | "
+              f"{legacy_us / tracker_us:>5.0f}x | {legacy_new:>10.1%} / {np.mean(tracker_new):>8.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# bench_upload_ingest.py
+# Membandingkan puncak memori saat menerima unggahan (di luar buffer unggahan milik Streamlit):
+#   - cara lama: video -> getvalue() lalu ditulis ke file sementara; gambar -> bytearray(read()) + np.asarray
+#   - cara baru (upload_ingest): video -> UploadSpooler (chunk dari buffer unggahan) + decode dari stream;
+#     gambar -> decode langsung dari buffer unggahan
+# Selain memori, diukur juga waktu hingga frame video pertama ter-decode.
+# Beberapa "pengguna" dijalankan bersamaan (thread) untuk mensimulasikan beberapa sesi.
+# Jalankan dari folder repo:  PYTHONPATH=pothole_app python benchmarks/bench_upload_ingest.py --video rekaman.mp4 --users 4
+
+import argparse
+import io
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from upload_ingest import decode_uploaded_image, UploadSpooler, open_video_capture
+
+def legacy_video_ingest(uploaded_file, max_frames, first_frame_times):
+    start = time.perf_counter()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp_file:
+        tmp_file.write(uploaded_file.getvalue())
+        path = tmp_file.name
+    try:
+        return _decode_frames(cv2.VideoCapture(path), max_frames, start, first_frame_times)
+    finally:
+        os.remove(path)
+
+def streaming_video_ingest(uploaded_file, max_frames, first_frame_times):
+    start = time.perf_counter()
+    spooler = UploadSpooler(uploaded_file, suffix=".mp4").start()
+    try:
+        return _decode_frames(open_video_capture(spooler), max_frames, start, first_frame_times)
+    finally:
+        spooler.close()
+
+def _decode_frames(cap, max_frames, start, first_frame_times):
+    count = 0
+    while count < max_frames:
+        ret, _ = cap.read()
+        if not ret:
+            break
+        if count == 0:
+            first_frame_times.append(time.perf_counter() - start)
+        count += 1
+    cap.release()
+    return count
+
+def legacy_image_ingest(uploaded_file, *_):
+    uploaded_file.seek(0)
+    file_bytes = np.asarray(bytearray(uploaded_file.read()), dtype=np.uint8)
+    return cv2.imdecode(file_bytes, 1)
+
+def streaming_image_ingest(uploaded_file, *_):
+    return decode_uploaded_image(uploaded_file)
+
+def measure(ingest_fn, payload, users, max_frames):
+    """
+    Menjalankan ingest_fn untuk beberapa pengguna bersamaan.
+    Mengembalikan (puncak alokasi MB, detik total, rata-rata detik hingga frame pertama atau None).
+    """
+    # Seperti UploadedFile Streamlit: BytesIO yang berbagi objek bytes unggahan, dibuat sebelum pengukuran
+    uploads = [io.BytesIO(payload) for _ in range(users)]
+    first_frame_times = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=ingest_fn, args=(upload, max_frames, first_frame_times)) for upload in uploads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6, elapsed, (float(np.mean(first_frame_times)) if first_frame_times else None)
+
+def make_synthetic_video(path, width, height, n_frames):
+    from bench_pipeline import make_synthetic_frames
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (width, height))
+    for frame in make_synthetic_frames(width, height, n_frames):
+        writer.write(frame)
+    writer.release()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memori ingest unggahan.")
+    parser.add_argument("--video", default=None, help="File video contoh (default: video sintetis).")
+    parser.add_argument("--image", default=None, help="File gambar contoh (default: gambar sintetis 4K).")
+    parser.add_argument("--users", type=int, default=4, help="Jumlah unggahan bersamaan.")
+    parser.add_argument("--max-frames", type=int, default=30, help="Jumlah frame video yang di-decode per unggahan.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_upload_") as work_dir:
+        video_path = args.video
+        if video_path is None:
+            video_path = os.path.join(work_dir, "synthetic.mp4")
+            make_synthetic_video(video_path, 1920, 1080, 120)
+        with open(video_path, "rb") as f:
+            video_payload = f.read()
+        if args.image:
+            with open(args.image, "rb") as f:
+                image_payload = f.read()
+        else:
+            rng = np.random.default_rng(0)
+            image_payload = cv2.imencode(".png", rng.integers(0, 255, (2160, 3840, 3), dtype=np.uint8))[1].tobytes()
+
+        print(f"Video {len(video_payload) / 1e6:.1f} MB, gambar {len(image_payload) / 1e6:.1f} MB, {args.users} pengguna bersamaan")
+        print(f"{'Jalur':>8} | {'Cara':>5} | {'Puncak alokasi (MB)':>20} | {'Waktu (s)':>9} | {'Frame pertama (s)':>17}")
+        print("-" * 72)
+        cases = [("video", "lama", legacy_video_ingest, video_payload), ("video", "baru", streaming_video_ingest, video_payload),
+                 ("gambar", "lama", legacy_image_ingest, image_payload), ("gambar", "baru", streaming_image_ingest, image_payload)]
+        for kind, label, ingest_fn, payload in cases:
+            peak_mb, elapsed, first_frame_s = measure(ingest_fn, payload, args.users, args.max_frames)
+            first_frame = f"{first_frame_s:.3f}" if first_frame_s is not None else "-"
+            print(f"{kind:>8} | {label:>5} | {peak_mb:>20.1f} | {elapsed:>9.2f} | {first_frame:>17}")
+        print("\nCatatan: puncak alokasi Python (tracemalloc) di luar buffer unggahan; buffer decode OpenCV tidak terhitung.")
+
+if __name__ == "__main__":
+    main()
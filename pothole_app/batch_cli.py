@@ -0,0 +1,335 @@
+# batch_cli.py
+# Pemrosesan batch tanpa Streamlit untuk folder gambar dan video (misal rekaman dashcam semalam).
+# Contoh (dari folder pothole_app):
+#   python batch_cli.py /data/dashcam/2024-05-01 --output hasil_batch --workers 4 --format parquet
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+from functools import lru_cache
+import cv2
+import pandas as pd
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv"}
+
+DETECTION_COLUMNS = ["frame", "track_id", "confidence", "area_m2", "is_new", "x1", "y1", "x2", "y2"]
+
+# Model dimuat sekali per proses pekerja (lihat _init_worker)
+_worker_model = None
+_worker_args = None
+_worker_error = None
+
+def collect_input_files(paths, recursive=True):
+    """Mengumpulkan file gambar/video dari daftar file dan direktori, terurut per path."""
+    collected = []
+    for path in paths:
+        if os.path.isfile(path):
+            collected.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                collected.append(os.path.join(root, name))
+            if not recursive:
+                break
+    return [f for f in collected if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS | VIDEO_EXTENSIONS]
+
+def _init_worker(args):
+    """
+    Inisialisasi proses pekerja: batasi thread torch dan muat model milik proses ini.
+    Tidak boleh raise: initializer Pool yang gagal dijalankan ulang terus oleh multiprocessing (CLI menggantung);
+    kegagalan dicatat dan setiap file pada pekerja ini dilaporkan gagal oleh process_file.
+    """
+    global _worker_model, _worker_args, _worker_error
+    _worker_args = args
+    if args.threads_per_worker > 0:
+        try:
+            import torch
+            torch.set_num_threads(args.threads_per_worker)
+        except ImportError:
+            pass
+    from model_loader import load_yolo_model_uncached
+    _worker_model = load_yolo_model_uncached(args.model, args.backend, calibration_dir=args.calibration)
+    if _worker_model is None:
+        _worker_error = f"Gagal memuat model dari '{args.model}'."
+
+def _output_paths(input_path, args):
+    relative = os.path.relpath(input_path, args.common_root) if args.common_root else os.path.basename(input_path)
+    stem, ext = os.path.splitext(relative)
+    annotated_ext = ".png" if ext.lower() in IMAGE_EXTENSIONS else ".mp4"
+    annotated_path = os.path.join(args.output, "annotated", stem + annotated_ext)
+    table_path = os.path.join(args.output, "detections", stem + (".parquet" if args.format == "parquet" else ".csv"))
+    for path in (annotated_path, table_path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return annotated_path, table_path
+
+def _write_detection_table(details, table_path, file_format):
+    df = pd.DataFrame(details, columns=DETECTION_COLUMNS)
+    if file_format == "parquet":
+        df.to_parquet(table_path, index=False)
+    else:
+        df.to_csv(table_path, index=False)
+    return df
+
+def _tiling_config(args):
+    from tiled_inference import TilingConfig
+    return TilingConfig(args.tile_size, args.tile_overlap) if args.tile else None
+
+def _roi_profile(args):
+    """Profil ROI dari --roi-profile (dibaca dari --roi-file), atau None."""
+    if not args.roi_profile:
+        return None
+    from roi import load_roi_profiles, DEFAULT_ROI_PROFILES_PATH
+    profiles = load_roi_profiles(args.roi_file or DEFAULT_ROI_PROFILES_PATH)
+    if args.roi_profile not in profiles:
+        raise ValueError(f"Profil ROI '{args.roi_profile}' tidak ditemukan.")
+    return profiles[args.roi_profile]
+
+@lru_cache(maxsize=4)
+def _load_ground_calibration(name, path):
+    # Satu objek per pekerja: peta luas per piksel dihitung sekali, bukan untuk setiap file
+    from ground_calibration import load_ground_calibrations
+    calibrations = load_ground_calibrations(path)
+    if name not in calibrations:
+        raise ValueError(f"Kalibrasi perspektif '{name}' tidak ditemukan.")
+    return calibrations[name]
+
+def _ground_calibration(args):
+    """Kalibrasi perspektif dari --ground-calibration (dibaca dari --ground-calibration-file), atau None."""
+    if not args.ground_calibration:
+        return None
+    from ground_calibration import DEFAULT_GROUND_CALIBRATIONS_PATH
+    return _load_ground_calibration(args.ground_calibration, args.ground_calibration_file or DEFAULT_GROUND_CALIBRATIONS_PATH)
+
+def _process_image(input_path, annotated_path, args):
+    from frame_processor import process_and_draw_frame
+    from upload_ingest import decode_image_file
+    image = decode_image_file(input_path)
+    if image is None:
+        raise ValueError("File gambar tidak dapat dibaca.")
+    annotated_image, details, _ = process_and_draw_frame(
+        image, _worker_model, args.conf, args.iou, args.ppm,
+        not args.no_boxes, args.box_color_bgr, not args.no_masks,
+        tracked_potholes_session_bboxes=None, update_tracked_list=False,
+        mask_alpha=args.mask_alpha, draw_in_place=True, tiling=_tiling_config(args), roi=_roi_profile(args),
+        ground_calibration=_ground_calibration(args)
+    )
+    cv2.imwrite(annotated_path, annotated_image)
+    for pothole in details:
+        pothole["frame"] = 1
+    media = {"fps": 0, "width": image.shape[1], "height": image.shape[0]}
+    return details, 1, len(details), sum(p["area_m2"] for p in details), media
+
+def _process_video(input_path, annotated_path, args):
+    from functools import partial
+    from frame_processor import analyze_frames_batch, draw_frame_annotations
+    from tracker import PotholeTracker
+    from video_pipeline import VideoPipeline
+
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise ValueError("File video tidak dapat dibuka.")
+    frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = int(cap.get(cv2.CAP_PROP_FPS)) or 30
+    out_writer = cv2.VideoWriter(annotated_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (frame_width, frame_height))
+
+    tracker = PotholeTracker(max_age=args.tracker_max_age)
+    roi = _roi_profile(args)
+    pipeline = VideoPipeline(
+        cap, out_writer,
+        analyze_batch_fn=partial(
+            analyze_frames_batch, yolo_model=_worker_model, confidence_thresh=args.conf, iou_thresh=args.iou,
+            pixels_per_meter=args.ppm, tracked_potholes_session_bboxes=tracker, update_tracked_list=True,
+            tiling=_tiling_config(args), roi=roi, ground_calibration=_ground_calibration(args)),
+        annotate_fn=lambda frame, result, details: draw_frame_annotations(
+            frame, result, details, not args.no_boxes, args.box_color_bgr, not args.no_masks,
+            mask_alpha=args.mask_alpha, in_place=True),
+        batch_size=args.batch_size, queue_size=args.queue_size
+    )
+
+    all_details, total_new_area, frame_count = [], 0.0, 0
+    try:
+        for frame_count, frame_details, newly_detected_area in pipeline.run():
+            for pothole in frame_details:
+                pothole["frame"] = frame_count
+            all_details.extend(frame_details)
+            total_new_area += newly_detected_area
+    finally:
+        cap.release()
+        out_writer.release()
+    return all_details, frame_count, len(tracker), total_new_area, {"fps": fps, "width": frame_width, "height": frame_height}
+
+def process_file(input_path):
+    """Tugas untuk satu file (dijalankan di proses pekerja). Mengembalikan ringkasan per file."""
+    args = _worker_args
+    start = time.perf_counter()
+    ext = os.path.splitext(input_path)[1].lower()
+    summary = {"file": input_path, "status": "ok", "frames": 0, "unique_potholes": 0,
+               "total_new_area_m2": 0.0, "detections": 0, "seconds": 0.0, "error": "",
+               "fps": 0, "width": 0, "height": 0}
+    try:
+        if _worker_model is None:
+            raise RuntimeError(_worker_error or "Model pekerja belum dimuat.")
+        annotated_path, table_path = _output_paths(input_path, args)
+        if ext in IMAGE_EXTENSIONS:
+            details, frames, unique, area, media = _process_image(input_path, annotated_path, args)
+        else:
+            details, frames, unique, area, media = _process_video(input_path, annotated_path, args)
+        _write_detection_table(details, table_path, args.format)
+        summary.update(frames=frames, unique_potholes=unique, total_new_area_m2=area, detections=len(details), **media)
+    except Exception as e:
+        summary.update(status="error", error=str(e))
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+def _read_detection_table(table_path):
+    return pd.read_parquet(table_path) if table_path.endswith(".parquet") else pd.read_csv(table_path)
+
+def _gps_sessions(summaries, args):
+    """
+    (waktu mulai, video, trek) untuk setiap video yang berhasil, terurut waktu. Trek sidecar (video.gpx / video.csv)
+    diutamakan; selain itu --gps-track dipakai. Waktu mulai dari stempel waktu nama file, atau awal trek sidecar
+    (atau awal --gps-track jika hanya ada satu video).
+    """
+    from geo_dedup import load_gps_track, find_sidecar_track, start_time_from_filename
+    shared_track = load_gps_track(args.gps_track) if args.gps_track else None
+    videos = [s for s in summaries if s["status"] == "ok" and s["fps"] > 0]
+    sessions = []
+    for summary in videos:
+        video_path = summary["file"]
+        sidecar = find_sidecar_track(video_path)
+        try:
+            track = load_gps_track(sidecar) if sidecar else shared_track
+        except (OSError, ValueError) as e:
+            print(f"Trek GPS {sidecar} dilewati: {e}")
+            continue
+        if track is None:
+            print(f"Survei GPS: {video_path} dilewati (tidak ada trek GPS).")
+            continue
+        start_time = start_time_from_filename(video_path)
+        if start_time is None and (sidecar or len(videos) == 1):
+            start_time = track.start_time
+        if start_time is None:
+            print(f"Survei GPS: {video_path} dilewati (waktu mulai tidak ada di nama file).")
+            continue
+        sessions.append((start_time, video_path, track, summary))
+    return sorted(sessions, key=lambda session: session[0])
+
+def write_geo_survey(summaries, args):
+    """Deduplikasi lubang unik semua video lewat posisi GPS dan menulis GeoJSON lubang unik survei."""
+    from geo_dedup import GeoDeduplicator, geojson_bytes
+    survey = GeoDeduplicator(args.gps_radius)
+    ground_calibration = _ground_calibration(args)
+    for start_time, video_path, track, summary in _gps_sessions(summaries, args):
+        _, table_path = _output_paths(video_path, args)
+        result = survey.add_session(_read_detection_table(table_path), track, summary["fps"],
+                                    (summary["height"], summary["width"]), start_time=start_time,
+                                    offset_s=args.gps_offset, ground_calibration=ground_calibration,
+                                    source=os.path.relpath(video_path, args.common_root) if args.common_root else video_path)
+        print(f"Survei GPS {os.path.basename(video_path)}: {result['new']} lubang baru, {result['merged']} digabung"
+              + (f", {result['outside_track']} di luar rentang waktu trek" if result["outside_track"] else ""))
+    geojson_path = os.path.join(args.output, "lubang_unik.geojson")
+    with open(geojson_path, "wb") as f:
+        f.write(geojson_bytes(survey.to_geojson()))
+    print(f"{len(survey)} lubang unik bergeoreferensi ({survey.sightings} track) disimpan ke {geojson_path}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Deteksi & pengukuran lubang jalan secara batch (tanpa Streamlit).")
+    parser.add_argument("inputs", nargs="+", help="File atau direktori berisi gambar/video.")
+    parser.add_argument("--output", "-o", default="hasil_batch", help="Direktori keluaran.")
+    parser.add_argument("--model", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "best.pt"))
+    parser.add_argument("--backend", choices=["pytorch", "onnx", "openvino", "onnx-int8"], default="pytorch",
+                        help="Backend inferensi (ONNX Runtime / OpenVINO lebih cepat di CPU).")
+    parser.add_argument("--calibration", default=None,
+                        help="Folder gambar kalibrasi untuk backend onnx-int8 (default: calibration_images/).")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Jumlah proses pekerja.")
+    parser.add_argument("--threads-per-worker", type=int, default=0,
+                        help="Jumlah thread torch per pekerja (0 = bagi rata jumlah CPU).")
+    parser.add_argument("--conf", type=float, default=0.6, help="Confidence threshold.")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU threshold (NMS & tracking).")
+    parser.add_argument("--ppm", type=float, default=300, help="Referensi skala (piksel per meter).")
+    parser.add_argument("--tracker-max-age", type=int, default=30, help="Umur maksimum track (frame).")
+    parser.add_argument("--batch-size", type=int, default=4, help="Jumlah frame video per inferensi.")
+    parser.add_argument("--queue-size", type=int, default=16, help="Ukuran antrean pipeline video.")
+    parser.add_argument("--tile", action="store_true", help="Inferensi bertile untuk gambar/video resolusi tinggi.")
+    parser.add_argument("--tile-size", type=int, default=640, help="Ukuran tile (piksel) untuk --tile.")
+    parser.add_argument("--tile-overlap", type=float, default=0.2, help="Porsi tumpang tindih antar tile untuk --tile.")
+    parser.add_argument("--roi-profile", default=None, help="Nama profil ROI jalan (per kamera) yang dipakai sebelum inferensi.")
+    parser.add_argument("--roi-file", default=None, help="File profil ROI (default: roi_profiles.json / POTHOLE_ROI_PROFILES).")
+    parser.add_argument("--ground-calibration", default=None,
+                        help="Nama kalibrasi perspektif jalan (per kamera); luas dihitung per jarak dan --ppm diabaikan.")
+    parser.add_argument("--ground-calibration-file", default=None,
+                        help="File kalibrasi perspektif (default: ground_calibrations.json / POTHOLE_GROUND_CALIBRATIONS).")
+    parser.add_argument("--gps", action="store_true",
+                        help="Survei GPS: cocokkan video dengan trek bernama sama (video.gpx / video.csv) dan tulis lubang_unik.geojson.")
+    parser.add_argument("--gps-track", default=None,
+                        help="Trek GPS (GPX/CSV) untuk video tanpa trek sidecar; waktu mulai dari nama file (misal 20240501_083012.mp4).")
+    parser.add_argument("--gps-offset", type=float, default=0.0,
+                        help="Koreksi jam kamera terhadap UTC (detik), misal -25200 untuk WIB.")
+    parser.add_argument("--gps-radius", type=float, default=4.0, help="Radius penggabungan lubang survei GPS (m).")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Format tabel deteksi per file.")
+    parser.add_argument("--box-color", default="#FF0000", help="Warna bounding box (hex).")
+    parser.add_argument("--mask-alpha", type=float, default=0.5, help="Opasitas mask.")
+    parser.add_argument("--no-boxes", action="store_true", help="Jangan gambar bounding box.")
+    parser.add_argument("--no-masks", action="store_true", help="Jangan gambar mask segmentasi.")
+    parser.add_argument("--no-recursive", action="store_true", help="Jangan telusuri subdirektori.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    from utils import hex_to_bgr
+    args = parse_args(argv)
+    args.box_color_bgr = hex_to_bgr(args.box_color)
+    args.workers = max(1, args.workers)
+    if args.threads_per_worker <= 0:
+        args.threads_per_worker = max(1, (os.cpu_count() or 1) // args.workers)
+
+    input_files = collect_input_files(args.inputs, recursive=not args.no_recursive)
+    if not input_files:
+        print("Tidak ada file gambar/video yang ditemukan.")
+        return 1
+    try:
+        _roi_profile(args) # Validasi profil ROI sekali sebelum pekerja dijalankan
+    except (OSError, ValueError) as e:
+        print(f"Profil ROI tidak valid: {e}")
+        return 1
+    try:
+        _ground_calibration(args)
+    except (OSError, ValueError) as e:
+        print(f"Kalibrasi perspektif tidak valid: {e}")
+        return 1
+    dirs = [p if os.path.isdir(p) else os.path.dirname(p) for p in args.inputs]
+    args.common_root = os.path.commonpath([os.path.abspath(d) for d in dirs]) if dirs else None
+    input_files = [os.path.abspath(f) for f in input_files]
+    os.makedirs(args.output, exist_ok=True)
+    # Model divalidasi sekali di proses utama sebelum pekerja dijalankan (export backend juga dilakukan di sini,
+    # sehingga pekerja langsung memakai artefak dari cache)
+    from model_loader import load_yolo_model_uncached
+    if load_yolo_model_uncached(args.model, args.backend, calibration_dir=args.calibration) is None:
+        print(f"Gagal memuat model dari '{args.model}' (backend {args.backend}).")
+        return 1
+
+    print(f"Memproses {len(input_files)} file dengan {args.workers} pekerja...")
+    summaries = []
+    # 'spawn' agar setiap pekerja memuat torch/model secara bersih (aman untuk CUDA dan thread)
+    with mp.get_context("spawn").Pool(args.workers, initializer=_init_worker, initargs=(args,)) as pool:
+        for summary in pool.imap_unordered(process_file, input_files):
+            summaries.append(summary)
+            status = "OK" if summary["status"] == "ok" else f"GAGAL ({summary['error']})"
+            print(f"[{len(summaries)}/{len(input_files)}] {summary['file']}: {status}, "
+                  f"{summary['frames']} frame, {summary['unique_potholes']} lubang unik, {summary['seconds']:.1f} s")
+
+    summary_path = os.path.join(args.output, "ringkasan_batch.csv")
+    pd.DataFrame(summaries).sort_values("file").to_csv(summary_path, index=False)
+    print(f"Ringkasan disimpan ke {summary_path}")
+    if args.gps or args.gps_track:
+        try:
+            write_geo_survey(summaries, args)
+        except (OSError, ValueError) as e:
+            print(f"Survei GPS gagal: {e}")
+    return 0 if all(s["status"] == "ok" for s in summaries) else 2
+
+if __name__ == "__main__":
+    raise SystemExit(main())
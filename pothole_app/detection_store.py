@@ -0,0 +1,111 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Kolom deteksi sesi dan tipe datanya (urutan = urutan kolom DataFrame)
+DETECTION_COLUMNS = {
+    "frame": np.int64,
+    "track_id": np.int64, # NO_TRACK_ID jika deteksi tidak memiliki track
+    "confidence": np.float32,
+    "area_m2": np.float64,
+    "is_new": np.bool_,
+    "x1": np.int32,
+    "y1": np.int32,
+    "x2": np.int32,
+    "y2": np.int32,
+}
+NO_TRACK_ID = -1
+
+class DetectionStore:
+    """
+    Penyimpanan kolumnar hasil deteksi satu sesi (pengganti list of dict).
+    Setiap kolom adalah array NumPy yang dialokasikan di muka dan diperbesar 2x saat penuh,
+    sehingga memori per deteksi tetap kecil (~37 byte) dan to_dataframe() memberikan DataFrame
+    yang kolomnya adalah view atas array (tanpa salinan).
+    Deteksi baru ditampung dulu sebagai tuple dan dipindahkan ke array per blok (flush_size),
+    karena penulisan NumPy per nilai jauh lebih lambat daripada append list Python.
+    """
+
+    def __init__(self, initial_capacity=4096, flush_size=4096):
+        self._size = 0
+        self._capacity = max(1, int(initial_capacity))
+        self._columns = {name: np.empty(self._capacity, dtype=dtype) for name, dtype in DETECTION_COLUMNS.items()}
+        self._pending = [] # Tuple dengan urutan DETECTION_COLUMNS yang belum dipindahkan ke array
+        self._flush_size = max(1, int(flush_size))
+        self._hashers = [hashlib.blake2b(digest_size=16) for _ in DETECTION_COLUMNS]
+        self._hashed_size = 0
+
+    def __len__(self):
+        return self._size + len(self._pending)
+
+    def __iter__(self):
+        """Iterasi per deteksi sebagai dict (kompatibel dengan kode lama berbasis list of dict)."""
+        return iter(self.to_dataframe().to_dict("records"))
+
+    @property
+    def nbytes(self):
+        """Memori yang dialokasikan untuk seluruh kolom (termasuk kapasitas cadangan)."""
+        return sum(column.nbytes for column in self._columns.values())
+
+    def _reserve(self, n_extra):
+        needed = self._size + n_extra
+        if needed <= self._capacity:
+            return
+        new_capacity = max(needed, self._capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.empty(new_capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        self._capacity = new_capacity
+
+    def _flush(self):
+        """Memindahkan deteksi yang tertampung ke array kolom."""
+        if not self._pending:
+            return
+        n = len(self._pending)
+        self._reserve(n)
+        start, end = self._size, self._size + n
+        for column, values in zip(self._columns.values(), zip(*self._pending)):
+            column[start:end] = values
+        self._size = end
+        self._pending.clear()
+
+    def append(self, frame, confidence, area_m2, is_new, bbox, track_id=None):
+        """Menambahkan satu deteksi; bbox = (x1, y1, x2, y2)."""
+        x1, y1, x2, y2 = bbox
+        self._pending.append((frame, NO_TRACK_ID if track_id is None else track_id, confidence, area_m2, is_new, x1, y1, x2, y2))
+        if len(self._pending) >= self._flush_size:
+            self._flush()
+
+    def extend(self, pothole_details):
+        """Menambahkan daftar dict info lubang (format frame_processor, dengan kunci 'frame')."""
+        for p in pothole_details:
+            track_id = p.get("track_id")
+            self._pending.append((p["frame"], NO_TRACK_ID if track_id is None else track_id, p["confidence"], p["area_m2"],
+                                  p["is_new"], p["x1"], p["y1"], p["x2"], p["y2"]))
+        if len(self._pending) >= self._flush_size:
+            self._flush()
+
+    def column(self, name):
+        """View (tanpa salinan) atas kolom yang sudah terisi."""
+        self._flush()
+        return self._columns[name][:self._size]
+
+    def content_hash(self):
+        """
+        Hash isi seluruh deteksi (hex). Karena penyimpanan hanya bertambah, hash diperbarui secara
+        inkremental: hanya baris yang belum pernah di-hash yang dibaca.
+        """
+        self._flush()
+        combined = hashlib.blake2b(digest_size=16)
+        for hasher, column in zip(self._hashers, self._columns.values()):
+            hasher.update(column[self._hashed_size:self._size])
+            combined.update(hasher.digest())
+        self._hashed_size = self._size
+        combined.update(self._size.to_bytes(8, "little"))
+        return combined.hexdigest()
+
+    def to_dataframe(self):
+        """DataFrame berisi semua deteksi; setiap kolom adalah view atas array penyimpanan (tanpa salinan)."""
+        self._flush()
+        return pd.DataFrame({name: self._columns[name][:self._size] for name in DETECTION_COLUMNS}, copy=False)
@@ -1,77 +1,259 @@
-import streamlit as st # Untuk st.session_state
-import cv2
-import numpy as np
-from utils import is_new_pothole 
+import time
+from overlay_renderer import get_thread_renderer
+from mask_utils import compute_mask_pixel_counts, compute_mask_ground_areas, pixel_counts_to_area_m2
+from metrics import DETECTION_COUNT_BUCKETS
+from tiled_inference import predict_tiled
+from roi import predict_with_roi
 
 def process_and_draw_frame(frame, yolo_model, confidence_thresh, iou_thresh, pixels_per_meter,
                            show_boxes, box_color_bgr, show_masks,
-                           tracked_potholes_session_bboxes=None, update_tracked_list=False):
+                           tracked_potholes_session_bboxes=None, update_tracked_list=False,
+                           mask_alpha=0.5, draw_in_place=False, tracking_iou_thresh=None, stage_timings=None,
+                           tiling=None, roi=None, draw_roi=False, raw_log=None, mask_store=None, ground_calibration=None,
+                           metrics=None):
     """
-    Memproses satu frame, melakukan inferensi, menggambar deteksi (mask via plot(), box manual).
+    Memproses satu frame, melakukan inferensi, menggambar deteksi (mask dan box via OverlayRenderer).
     Mengembalikan frame yang telah dianotasi, daftar info lubang, dan area baru.
+    tracked_potholes_session_bboxes: PotholeTracker sesi (opsional); tanpa tracker semua deteksi dianggap baru.
+    tracking_iou_thresh: ambang IoU untuk tracking; jika None sama dengan iou_thresh (NMS).
+    stage_timings: dict opsional; durasi (detik) tahap predict, mask_area, tracking, dan drawing ditambahkan ke sini.
+    Jika tidak diberikan dan metrics (MetricsRegistry opsional milik sesi) diberikan, durasi tahap dicatat ke sana.
+    tiling: TilingConfig opsional untuk inferensi bertile pada frame beresolusi tinggi.
+    roi: RoiProfile opsional; hanya region jalan yang diberikan ke model, hasil tetap dalam koordinat frame asli.
+    draw_roi: jika True dan roi diberikan, batas ROI ikut digambar.
+    raw_log: RawPredictionLog opsional; predict dijalankan pada confidence floor log, semua deteksi mentah
+    dicatat, lalu hasil disaring ke confidence_thresh untuk analisis dan tampilan.
+    mask_store: MaskStore opsional; mask deteksi yang sama dengan raw_log (atau deteksi hasil saringan jika
+    raw_log tidak diberikan) disimpan sebagai RLE.
+    ground_calibration: GroundCalibration opsional; luas dihitung dengan koreksi perspektif (peta luas per piksel)
+    dan pixels_per_meter diabaikan.
     """
     if yolo_model is None: 
         return frame, [], 0.0
 
-    results = yolo_model.predict(source=frame, imgsz=640, conf=confidence_thresh, iou=iou_thresh, verbose=False)
-    
-    if show_masks and results[0].masks is not None:
-        annotated_frame = results[0].plot(masks=True, boxes=False, line_width=1) 
+    record_metrics = stage_timings is None and metrics is not None
+    if record_metrics:
+        stage_timings = {}
+    start = time.perf_counter()
+    results = _predict_and_log(yolo_model, [frame], confidence_thresh, iou_thresh, tiling, roi, raw_log, mask_store)
+    _add_stage_time(stage_timings, "predict", start)
+    pothole_details, newly_detected_area = _analyze_result(results[0], pixels_per_meter,
+                                                           tracked_potholes_session_bboxes, update_tracked_list,
+                                                           _tracking_iou(iou_thresh, tracking_iou_thresh), stage_timings,
+                                                           ground_calibration, metrics)
+    annotated_frame = draw_frame_annotations(frame, results[0], pothole_details, show_boxes, box_color_bgr, show_masks,
+                                             mask_alpha=mask_alpha, in_place=draw_in_place, stage_timings=stage_timings,
+                                             roi=roi if draw_roi else None)
+    if record_metrics:
+        metrics.observe_stage_timings(stage_timings)
+    return annotated_frame, pothole_details, newly_detected_area
+
+def process_and_draw_frames_batch(frames, yolo_model, confidence_thresh, iou_thresh, pixels_per_meter,
+                                  show_boxes, box_color_bgr, show_masks,
+                                  tracked_potholes_session_bboxes=None, update_tracked_list=False,
+                                  mask_alpha=0.5, tracking_iou_thresh=None, stage_timings=None, tiling=None,
+                                  roi=None, draw_roi=False, ground_calibration=None, metrics=None):
+    """
+    Memproses beberapa frame dengan satu panggilan predict (batch).
+    Hasil dipecah kembali per frame dan diolah berurutan agar tracking tetap mengikuti urutan frame.
+    Mengembalikan list tuple (frame teranotasi, daftar info lubang, area baru) sesuai urutan input.
+    """
+    analyzed = analyze_frames_batch(frames, yolo_model, confidence_thresh, iou_thresh, pixels_per_meter,
+                                    tracked_potholes_session_bboxes, update_tracked_list, tracking_iou_thresh,
+                                    stage_timings, tiling, roi, ground_calibration=ground_calibration, metrics=metrics)
+    return [
+        (draw_frame_annotations(frame, result, pothole_details, show_boxes, box_color_bgr, show_masks,
+                                mask_alpha=mask_alpha, stage_timings=stage_timings, roi=roi if draw_roi else None,
+                                metrics=metrics),
+         pothole_details, newly_detected_area)
+        for frame, (result, pothole_details, newly_detected_area) in zip(frames, analyzed)
+    ]
+
+def analyze_frames_batch(frames, yolo_model, confidence_thresh, iou_thresh, pixels_per_meter,
+                         tracked_potholes_session_bboxes=None, update_tracked_list=False,
+                         tracking_iou_thresh=None, stage_timings=None, tiling=None, roi=None, raw_log=None,
+                         mask_store=None, ground_calibration=None, metrics=None):
+    """
+    Tahap inferensi + analisis (tanpa menggambar) untuk beberapa frame sekaligus.
+    Mengembalikan list tuple (hasil YOLO, daftar info lubang, area baru) sesuai urutan input.
+    Hasil YOLO dapat diteruskan ke draw_frame_annotations di thread lain.
+    """
+    if not frames:
+        return []
+    if yolo_model is None:
+        return [(None, [], 0.0) for _ in frames]
+
+    record_metrics = stage_timings is None and metrics is not None
+    start = time.perf_counter()
+    results = _predict_and_log(yolo_model, list(frames), confidence_thresh, iou_thresh, tiling, roi, raw_log, mask_store)
+    _add_stage_time(stage_timings, "predict", start)
+    predict_per_frame = (time.perf_counter() - start) / len(frames)
+    analyzed = []
+    for result in results:
+        # Metrik dicatat per frame (waktu predict batch dibagi rata) agar sebanding dengan mode satu frame
+        frame_timings = {"predict": predict_per_frame} if record_metrics else stage_timings
+        pothole_details, newly_detected_area = _analyze_result(result, pixels_per_meter,
+                                                               tracked_potholes_session_bboxes, update_tracked_list,
+                                                               _tracking_iou(iou_thresh, tracking_iou_thresh), frame_timings,
+                                                               ground_calibration, metrics)
+        if record_metrics:
+            metrics.observe_stage_timings(frame_timings)
+        analyzed.append((result, pothole_details, newly_detected_area))
+    return analyzed
+
+def predict_frame(frame, yolo_model, confidence_thresh, iou_thresh, tiling=None, roi=None):
+    """Hanya tahap inferensi untuk satu frame: Results dengan mask resolusi penuh dalam koordinat frame asli."""
+    return _predict_frames(yolo_model, [frame], confidence_thresh, iou_thresh, tiling, roi)[0]
+
+def analyze_and_draw_result(frame, result, pixels_per_meter, show_boxes, box_color_bgr, show_masks,
+                            mask_alpha=0.5, roi=None, ground_calibration=None):
+    """
+    Menghitung luas dan menggambar anotasi dari hasil inferensi yang sudah ada (misal dari cache),
+    tanpa predict ulang. Semua deteksi dianggap baru (tanpa tracking, seperti mode gambar).
+    Mengembalikan frame yang telah dianotasi dan daftar info lubang.
+    """
+    pothole_details, _ = _analyze_result(result, pixels_per_meter, None, False, 0.0, ground_calibration=ground_calibration)
+    annotated_frame = draw_frame_annotations(frame, result, pothole_details, show_boxes, box_color_bgr, show_masks,
+                                             mask_alpha=mask_alpha, roi=roi)
+    return annotated_frame, pothole_details
+
+def _predict_frames(yolo_model, frames, confidence_thresh, iou_thresh, tiling=None, roi=None):
+    """
+    predict standar (imgsz=640, satu batch) atau inferensi bertile jika tiling diberikan dan frame lebih
+    besar dari satu tile. Keduanya mengembalikan Results dengan mask resolusi penuh.
+    Jika roi diberikan, predict dijalankan pada potongan ROI lalu hasilnya dipetakan kembali ke frame asli.
+    """
+    if roi is not None:
+        return predict_with_roi(
+            lambda crops: _predict_frames(yolo_model, crops, confidence_thresh, iou_thresh, tiling), frames, roi)
+    if _uses_tiling(frames, tiling):
+        return predict_tiled(yolo_model, frames, confidence_thresh, iou_thresh, tiling)
+    source = frames[0] if len(frames) == 1 else frames
+    return yolo_model.predict(source=source, imgsz=640, conf=confidence_thresh, iou=iou_thresh, verbose=False, retina_masks=True)
+
+def _uses_tiling(frames, tiling, roi=None):
+    """True jika predict untuk frame ini berjalan bertile (dinilai pada potongan ROI jika roi diberikan)."""
+    if tiling is None:
+        return False
+    shapes = [frame.shape for frame in frames]
+    if roi is not None:
+        shapes = [(y2 - y1, x2 - x1) for (x1, y1, x2, y2), _, _ in (roi.geometry(shape) for shape in shapes)]
+    return any(tiling.needs_tiling(shape) for shape in shapes)
+
+def _predict_and_log(yolo_model, frames, confidence_thresh, iou_thresh, tiling=None, roi=None, raw_log=None, mask_store=None):
+    """
+    predict biasa, atau (jika raw_log diberikan) predict pada confidence floor + pencatatan + penyaringan.
+    Mask dicatat ke mask_store sebelum penyaringan, sehingga setiap rekaman raw_log juga memiliki mask-nya.
+    Frame bertile di-predict pada ambang pengguna: merge_detections menggabungkan potongan tile sebelum
+    penyaringan confidence, sehingga potongan di bawah ambang akan ikut mengubah box/mask deteksi yang lolos.
+    """
+    if raw_log is None:
+        predict_confidence = confidence_thresh
+    elif _uses_tiling(frames, tiling, roi):
+        predict_confidence = raw_log.fix_confidence(confidence_thresh)
     else:
-        annotated_frame = frame.copy()
-    
+        predict_confidence = raw_log.predict_confidence(confidence_thresh)
+    results = _predict_frames(yolo_model, frames, predict_confidence, iou_thresh, tiling, roi)
+    if mask_store is not None:
+        mask_store.add_frames(results)
+    if raw_log is None:
+        return results
+    raw_log.add_frames(results)
+    return [_filter_by_confidence(result, confidence_thresh) for result in results]
+
+def _filter_by_confidence(result, confidence_thresh):
+    """
+    Results yang hanya berisi deteksi dengan confidence > ambang (sama dengan penyaringan NMS Ultralytics),
+    atau objek yang sama jika tidak ada yang dibuang.
+    """
+    if result.boxes is None or len(result.boxes) == 0:
+        return result
+    # Skalar Python dibandingkan dalam float32 (dtype tensor): sama dengan NMS Ultralytics dan replay_session
+    keep = (result.boxes.conf > float(confidence_thresh)).cpu()
+    return result if bool(keep.all()) else result[keep.numpy()]
+
+def _tracking_iou(iou_thresh, tracking_iou_thresh):
+    """Ambang IoU tracking; mengikuti ambang IoU NMS jika tidak ditentukan terpisah."""
+    return iou_thresh if tracking_iou_thresh is None else tracking_iou_thresh
+
+def _add_stage_time(stage_timings, stage, start):
+    """Menambahkan durasi sejak start ke stage_timings[stage] (tidak melakukan apa pun jika None)."""
+    if stage_timings is not None:
+        stage_timings[stage] = stage_timings.get(stage, 0.0) + (time.perf_counter() - start)
+
+def _analyze_result(result, pixels_per_meter, tracked_potholes_session_bboxes, update_tracked_list, current_iou_threshold,
+                    stage_timings=None, ground_calibration=None, metrics=None):
+    """
+    Menghitung luas dan status tracking setiap deteksi pada hasil inferensi satu frame.
+    Luas: piksel mask / pixels_per_meter², atau jumlah peta luas ground_calibration di bawah mask jika diberikan.
+    """
     pothole_details_current_frame = []
     newly_detected_area_in_frame = 0.0
 
-    if results[0].boxes is not None:
-        for i, box_obj in enumerate(results[0].boxes):
-            coords_abs = box_obj.xyxy[0].cpu().numpy().astype(int)
-            x1_box, y1_box, x2_box, y2_box = coords_abs
+    if result.boxes is not None:
+        boxes_xyxy = result.boxes.xyxy.cpu().numpy().astype(int)
+
+        # Luas semua mask dihitung sekaligus pada mask resolusi penuh (retina_masks=True)
+        start = time.perf_counter()
+        areas_m2 = []
+        if result.masks is not None and ground_calibration is not None:
+            areas_m2 = compute_mask_ground_areas(result.masks.data, result.boxes.xyxy.cpu().numpy(),
+                                                 ground_calibration.area_map(result.masks.data.shape[1:]))
+        elif result.masks is not None:
+            areas_m2 = pixel_counts_to_area_m2(compute_mask_pixel_counts(result.masks.data), pixels_per_meter)
+        _add_stage_time(stage_timings, "mask_area", start)
+
+        start = time.perf_counter()
+        track_ids = [None] * len(boxes_xyxy)
+        frame_new_flags = None
+        if tracked_potholes_session_bboxes is not None:
+            # PotholeTracker memproses semua deteksi frame sekaligus (asosiasi antar frame, hanya track aktif)
+            track_ids, frame_new_flags = tracked_potholes_session_bboxes.update(
+                boxes_xyxy, current_iou_threshold, commit=update_tracked_list)
+        _add_stage_time(stage_timings, "tracking", start)
+
+        for i, box_obj in enumerate(result.boxes):
+            x1_box, y1_box, x2_box, y2_box = boxes_xyxy[i]
             conf = float(box_obj.conf[0])
             
-            current_bbox_coords = (x1_box, y1_box, x2_box, y2_box)
-            is_new = True
-            if tracked_potholes_session_bboxes is not None:
-                # Pastikan st.session_state.iou_threshold ada dan valid
-                current_iou_threshold = st.session_state.get('iou_threshold', 0.45) # Default jika tidak ada
-                is_new = is_new_pothole(current_bbox_coords, tracked_potholes_session_bboxes, current_iou_threshold) 
+            is_new = True if frame_new_flags is None else frame_new_flags[i]
 
             pothole_area_m2 = 0.0
-            if results[0].masks is not None and i < len(results[0].masks.data):
-                mask_for_area = results[0].masks.data[i].cpu().numpy()
-                if (x2_box - x1_box) > 0 and (y2_box - y1_box) > 0: 
-                    mask_resized_to_box_for_area = cv2.resize(mask_for_area, (x2_box - x1_box, y2_box - y1_box), interpolation=cv2.INTER_NEAREST)
-                    pothole_pixels_in_frame_box = np.sum(mask_resized_to_box_for_area > 0.5)
-                    if pixels_per_meter > 0:
-                        pothole_area_m2 = pothole_pixels_in_frame_box / (pixels_per_meter ** 2)
+            if i < len(areas_m2) and (x2_box - x1_box) > 0 and (y2_box - y1_box) > 0:
+                pothole_area_m2 = float(areas_m2[i])
             
             pothole_details_current_frame.append({
-                "confidence": conf, "area_m2": pothole_area_m2, "is_new": is_new,
+                "confidence": conf, "area_m2": pothole_area_m2, "is_new": is_new, "track_id": track_ids[i],
                 "x1": x1_box, "y1": y1_box, "x2": x2_box, "y2": y2_box
             })
 
             if is_new and update_tracked_list and tracked_potholes_session_bboxes is not None:
-                tracked_potholes_session_bboxes.append(current_bbox_coords)
                 newly_detected_area_in_frame += pothole_area_m2
 
-            if show_boxes:
-                cv2.rectangle(annotated_frame, (x1_box, y1_box), (x2_box, y2_box), box_color_bgr, 2)
-                label_text = f"Area: {pothole_area_m2:.3f} m2"
-                conf_text = f"Conf: {conf:.2f}"
-                
-                (label_w, label_h), _ = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-                (conf_w, conf_h), _ = cv2.getTextSize(conf_text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-                max_text_w = max(label_w, conf_w)
-                total_text_h = label_h + conf_h + 10 
-                bg_y1 = y1_box - total_text_h 
-                text_y_area = y1_box - conf_h - 5 
-                text_y_conf = y1_box - 5 
-                if bg_y1 < 0 : 
-                    bg_y1 = y2_box + 5
-                    text_y_area = y2_box + label_h + 5
-                    text_y_conf = y2_box + label_h + conf_h + 10
-                cv2.rectangle(annotated_frame, (x1_box, bg_y1), (x1_box + max_text_w + 10, bg_y1 + total_text_h), (50,50,50), -1)
-                cv2.putText(annotated_frame, label_text, (x1_box + 5, text_y_area), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
-                cv2.putText(annotated_frame, conf_text, (x1_box + 5, text_y_conf), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
-                
-    return annotated_frame, pothole_details_current_frame, newly_detected_area_in_frame
\ No newline at end of file
+    if metrics is not None:
+        metrics.observe("pothole_detections_per_frame", len(pothole_details_current_frame), buckets=DETECTION_COUNT_BUCKETS)
+    return pothole_details_current_frame, newly_detected_area_in_frame
+
+def draw_frame_annotations(frame, result, pothole_details, show_boxes, box_color_bgr, show_masks,
+                           mask_alpha=0.5, in_place=False, stage_timings=None, roi=None, metrics=None):
+    """
+    Menggambar mask dan bounding box beserta label luas/confidence pada frame.
+    Jika in_place=True, anotasi digambar langsung pada buffer frame tanpa salinan.
+    Jika roi (RoiProfile) diberikan, batas ROI ikut digambar.
+    """
+    record_metrics = stage_timings is None and metrics is not None
+    if record_metrics:
+        stage_timings = {}
+    start = time.perf_counter()
+    annotated_frame = frame if in_place else frame.copy()
+    masks = None
+    if show_masks and result is not None and result.masks is not None:
+        masks = result.masks.data.cpu().numpy()
+    annotated_frame = get_thread_renderer(mask_alpha).render(annotated_frame, masks, pothole_details,
+                                                             show_boxes, box_color_bgr, show_masks)
+    if roi is not None:
+        roi.draw_outline(annotated_frame)
+    _add_stage_time(stage_timings, "drawing", start)
+    if record_metrics:
+        metrics.observe_stage_timings(stage_timings)
+    return annotated_frame
@@ -0,0 +1,366 @@
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+import cv2
+import numpy as np
+import pandas as pd
+
+DEFAULT_MERGE_RADIUS_M = 4.0 # Lubang dalam radius ini dianggap sama (akurasi GPS konsumen ± 3-5 m)
+EARTH_RADIUS_M = 6371008.8
+MIN_HEADING_DISTANCE_M = 1.0 # Perpindahan minimum antar titik trek agar arah hadap dihitung ulang (saat berhenti arah dipertahankan)
+GPS_TRACK_EXTENSIONS = (".gpx", ".csv")
+
+# Nama kolom CSV yang dikenali (huruf kecil)
+CSV_TIME_COLUMNS = ("time", "timestamp", "datetime", "utc", "waktu")
+CSV_LAT_COLUMNS = ("lat", "latitude")
+CSV_LON_COLUMNS = ("lon", "lng", "long", "longitude")
+CSV_HEADING_COLUMNS = ("heading", "bearing", "course")
+
+# Stempel waktu di nama file dashcam, misal 20240501_083012.mp4 atau 2024-05-01-08-30-12.mp4
+FILENAME_TIME_PATTERN = re.compile(r"(20\d{2})[-_]?(\d{2})[-_]?(\d{2})[-_T ]?(\d{2})[-_:]?(\d{2})[-_:]?(\d{2})")
+
+def parse_time(value):
+    """Waktu (ISO 8601, datetime, atau detik epoch) menjadi detik epoch UTC; waktu tanpa zona dianggap UTC."""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return float(value)
+        except ValueError:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def format_time(seconds):
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+def start_time_from_filename(name):
+    """Waktu mulai dari stempel waktu di nama file video (dianggap UTC), atau None jika tidak ada."""
+    match = FILENAME_TIME_PATTERN.search(os.path.basename(str(name)))
+    if match is None:
+        return None
+    try:
+        return datetime(*map(int, match.groups()), tzinfo=timezone.utc).timestamp()
+    except ValueError: # Angka yang mirip tanggal tetapi bukan tanggal valid
+        return None
+
+def _bearings(lats, lons):
+    """Arah hadap (derajat dari utara, searah jarum jam) di setiap titik trek dari perpindahan ke titik berikutnya."""
+    headings = np.zeros(len(lats))
+    if len(lats) < 2:
+        return headings
+    lat_rad = np.radians(lats)
+    d_east = np.radians(np.diff(lons)) * np.cos(lat_rad[:-1]) * EARTH_RADIUS_M
+    d_north = np.diff(lat_rad) * EARTH_RADIUS_M
+    moving = np.hypot(d_east, d_north) >= MIN_HEADING_DISTANCE_M
+    segment = np.degrees(np.arctan2(d_east, d_north)) % 360
+    # Segmen tanpa perpindahan berarti memakai arah segmen bergerak terakhir (atau pertama) agar tidak berputar acak
+    indices = np.where(moving, np.arange(len(segment)), -1)
+    indices = np.maximum.accumulate(indices)
+    first_moving = np.argmax(moving) if moving.any() else 0
+    indices = np.where(indices < 0, first_moving, indices)
+    headings[:-1] = segment[indices]
+    headings[-1] = headings[-2]
+    return headings
+
+class GpsTrack:
+    """
+    Trek GPS (GPX atau CSV) terurut waktu: posisi dan arah hadap kendaraan diinterpolasi linear
+    untuk waktu frame video. Tanpa kolom arah hadap, arah dihitung dari perpindahan antar titik.
+    """
+
+    def __init__(self, times, lats, lons, headings=None, name=None):
+        times = np.asarray(times, dtype=np.float64)
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.lats = np.asarray(lats, dtype=np.float64)[order]
+        self.lons = np.asarray(lons, dtype=np.float64)[order]
+        if len(self.times) < 2:
+            raise ValueError("Trek GPS membutuhkan minimal 2 titik bertanda waktu.")
+        if np.any(np.abs(self.lats) > 90) or np.any(np.abs(self.lons) > 180):
+            raise ValueError("Koordinat trek GPS di luar rentang lintang/bujur.")
+        if headings is None or np.all(np.isnan(np.asarray(headings, dtype=np.float64))):
+            headings = _bearings(self.lats, self.lons)
+        else:
+            headings = pd.Series(np.asarray(headings, dtype=np.float64)[order]).ffill().bfill().to_numpy()
+        headings_rad = np.radians(headings)
+        self._heading_sin, self._heading_cos = np.sin(headings_rad), np.cos(headings_rad)
+        self.name = name
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def start_time(self):
+        return float(self.times[0])
+
+    @property
+    def end_time(self):
+        return float(self.times[-1])
+
+    def positions_at(self, times):
+        """(lintang, bujur, arah hadap derajat, valid) untuk array waktu epoch; valid=False di luar rentang trek."""
+        times = np.asarray(times, dtype=np.float64)
+        lats = np.interp(times, self.times, self.lats)
+        lons = np.interp(times, self.times, self.lons)
+        # Arah diinterpolasi sebagai vektor satuan agar 359° -> 1° tidak melewati 180°
+        headings = np.degrees(np.arctan2(np.interp(times, self.times, self._heading_sin),
+                                         np.interp(times, self.times, self._heading_cos))) % 360
+        valid = (times >= self.times[0]) & (times <= self.times[-1])
+        return lats, lons, headings, valid
+
+def _read_gpx(source):
+    times, lats, lons = [], [], []
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag.rsplit("}", 1)[-1] != "trkpt":
+            continue
+        time_text = next((child.text for child in element if child.tag.rsplit("}", 1)[-1] == "time"), None)
+        if time_text:
+            times.append(parse_time(time_text))
+            lats.append(float(element.get("lat")))
+            lons.append(float(element.get("lon")))
+        element.clear() # Trek berjam-jam tidak ditahan utuh sebagai pohon XML
+    return times, lats, lons, None
+
+def _read_csv(source):
+    df = pd.read_csv(source)
+    columns = {str(c).strip().lower(): c for c in df.columns}
+    def column(candidates, required=True):
+        for candidate in candidates:
+            if candidate in columns:
+                return df[columns[candidate]]
+        if required:
+            raise ValueError(f"CSV trek GPS membutuhkan kolom {' / '.join(candidates)}.")
+        return None
+    time_values = column(CSV_TIME_COLUMNS)
+    if pd.api.types.is_numeric_dtype(time_values):
+        times = time_values.to_numpy(dtype=np.float64)
+    else:
+        times = np.array([parse_time(v) for v in time_values.astype(str)], dtype=np.float64)
+    headings = column(CSV_HEADING_COLUMNS, required=False)
+    return (times, column(CSV_LAT_COLUMNS).to_numpy(dtype=np.float64), column(CSV_LON_COLUMNS).to_numpy(dtype=np.float64),
+            headings.to_numpy(dtype=np.float64) if headings is not None else None)
+
+def load_gps_track(source, name=None):
+    """Membaca trek GPS dari path atau file-like (misal unggahan Streamlit); format dari ekstensi .gpx / .csv."""
+    name = name or getattr(source, "name", None) or str(source)
+    ext = os.path.splitext(str(name))[1].lower()
+    if ext not in GPS_TRACK_EXTENSIONS:
+        raise ValueError(f"Format trek GPS tidak didukung: '{ext}' (gunakan .gpx atau .csv).")
+    try:
+        times, lats, lons, headings = (_read_gpx if ext == ".gpx" else _read_csv)(source)
+    except (ET.ParseError, pd.errors.ParserError, TypeError) as e:
+        raise ValueError(f"Trek GPS tidak dapat dibaca: {e}")
+    return GpsTrack(times, lats, lons, headings=headings, name=os.path.basename(str(name)))
+
+def find_sidecar_track(video_path):
+    """File trek GPS bernama sama di sebelah video (video.gpx / video.csv), atau None."""
+    stem = os.path.splitext(video_path)[0]
+    for ext in GPS_TRACK_EXTENSIONS:
+        for candidate in (stem + ext, stem + ext.upper()):
+            if os.path.exists(candidate):
+                return candidate
+    return None
+
+class SpatialHashGrid:
+    """
+    Grid hash spasial dalam meter: sel persegi berukuran cell_size -> id item. Dengan cell_size = radius,
+    semua item dalam radius sebuah titik berada di 3x3 sel sekitarnya, sehingga biaya pencarian tetap
+    (tidak bergantung pada jumlah total item) selama kepadatan item per sel terbatas.
+    """
+
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError("Ukuran sel grid harus positif.")
+        self.cell_size = float(cell_size)
+        self._cells = {}
+
+    def cell(self, x, y):
+        return int(np.floor(x / self.cell_size)), int(np.floor(y / self.cell_size))
+
+    def insert(self, item_id, x, y):
+        self._cells.setdefault(self.cell(x, y), []).append(item_id)
+
+    def remove(self, item_id, x, y):
+        key = self.cell(x, y)
+        items = self._cells[key]
+        items.remove(item_id)
+        if not items:
+            del self._cells[key]
+
+    def candidates(self, x, y):
+        """Id item di 3x3 sel sekitar (x, y)."""
+        cx, cy = self.cell(x, y)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                yield from self._cells.get((cx + dx, cy + dy), ())
+
+class GeoDeduplicator:
+    """
+    Daftar lubang unik bergeoreferensi untuk survei panjang (banyak sesi/lintasan). Setiap pengamatan
+    diproyeksikan ke posisi dunia dan digabung dengan lubang terdekat dalam merge_radius_m (dicari lewat
+    SpatialHashGrid), sehingga lubang yang dilewati berkali-kali hanya dihitung sekali.
+    Koordinat disimpan dalam meter (proyeksi equirectangular di sekitar pengamatan pertama).
+    Luas lubang diambil dari pengamatan terdekat ke kamera (piksel terbanyak, galat terkecil); tanpa
+    jarak kamera (tanpa kalibrasi perspektif) luas dirata-rata dari semua pengamatan.
+    """
+
+    def __init__(self, merge_radius_m=DEFAULT_MERGE_RADIUS_M):
+        self.merge_radius_m = float(merge_radius_m)
+        self.grid = SpatialHashGrid(self.merge_radius_m)
+        self.potholes = []
+        self.sessions = []
+        self._origin = None
+
+    def __len__(self):
+        return len(self.potholes)
+
+    @property
+    def sightings(self):
+        return sum(p["sightings"] for p in self.potholes)
+
+    def _to_metres(self, lat, lon):
+        if self._origin is None:
+            self._origin = (float(lat), float(lon), np.cos(np.radians(lat)))
+        lat0, lon0, cos_lat0 = self._origin
+        return np.radians(lon - lon0) * cos_lat0 * EARTH_RADIUS_M, np.radians(lat - lat0) * EARTH_RADIUS_M
+
+    def _to_degrees(self, x, y):
+        lat0, lon0, cos_lat0 = self._origin
+        return lat0 + np.degrees(y / EARTH_RADIUS_M), lon0 + np.degrees(x / (EARTH_RADIUS_M * cos_lat0))
+
+    def add(self, lat, lon, area_m2, timestamp, confidence=None, camera_distance_m=None, source=None,
+            frame=None, projected=False, session=None, span=None):
+        """
+        Menambahkan satu pengamatan; mengembalikan (indeks lubang, True jika lubang baru).
+        session/span (rentang frame track): lubang yang pada sesi yang sama teramati bersamaan (rentang
+        frame tumpang tindih) adalah objek berbeda menurut tracker, sehingga tidak digabung.
+        """
+        x, y = self._to_metres(lat, lon)
+        best, best_distance = None, self.merge_radius_m
+        for candidate in self.grid.candidates(x, y):
+            pothole = self.potholes[candidate]
+            if session is not None and any(start <= span[1] and span[0] <= end
+                                           for start, end in pothole["spans"].get(session, ())):
+                continue
+            distance = np.hypot(pothole["x"] - x, pothole["y"] - y)
+            if distance <= best_distance:
+                best, best_distance = candidate, distance
+        camera_distance = float(camera_distance_m) if camera_distance_m is not None else np.inf
+        if best is None:
+            self.potholes.append({"x": x, "y": y, "area_m2": float(area_m2), "sightings": 1,
+                                  "first_seen": timestamp, "last_seen": timestamp,
+                                  "max_confidence": float(confidence) if confidence is not None else None,
+                                  "camera_distance_m": camera_distance, "sources": [source] if source else [],
+                                  "frame": frame, "projected": bool(projected),
+                                  "spans": {session: [span]} if session is not None else {}})
+            self.grid.insert(len(self.potholes) - 1, x, y)
+            return len(self.potholes) - 1, True
+
+        pothole = self.potholes[best]
+        n = pothole["sightings"]
+        new_x, new_y = (pothole["x"] * n + x) / (n + 1), (pothole["y"] * n + y) / (n + 1)
+        if self.grid.cell(new_x, new_y) != self.grid.cell(pothole["x"], pothole["y"]):
+            self.grid.remove(best, pothole["x"], pothole["y"])
+            self.grid.insert(best, new_x, new_y)
+        pothole["x"], pothole["y"] = new_x, new_y
+        if camera_distance < pothole["camera_distance_m"]:
+            pothole.update(area_m2=float(area_m2), camera_distance_m=camera_distance, frame=frame)
+        elif np.isinf(camera_distance) and np.isinf(pothole["camera_distance_m"]):
+            pothole["area_m2"] += (float(area_m2) - pothole["area_m2"]) / (n + 1)
+        pothole["sightings"] = n + 1
+        pothole["first_seen"] = min(pothole["first_seen"], timestamp)
+        pothole["last_seen"] = max(pothole["last_seen"], timestamp)
+        if confidence is not None:
+            pothole["max_confidence"] = max(pothole["max_confidence"] or 0.0, float(confidence))
+        if source and source not in pothole["sources"]:
+            pothole["sources"].append(source)
+        pothole["projected"] = pothole["projected"] or bool(projected)
+        if session is not None:
+            pothole["spans"].setdefault(session, []).append(span)
+        return best, False
+
+    def add_session(self, detections_df, track, fps, frame_shape, start_time=None, offset_s=0.0,
+                    ground_calibration=None, source=None):
+        """
+        Menambahkan lubang unik satu sesi video (DataFrame DetectionStore: frame, track_id, area_m2, box).
+        Setiap track diwakili pengamatan terdekatnya (y2 terbesar); waktu frame = start_time + (frame - 1) / fps
+        + offset_s (start_time default: awal trek). Dengan kalibrasi perspektif, pusat box diproyeksikan ke
+        bidang jalan dan diputar sesuai arah hadap kendaraan; tanpa kalibrasi (atau di luar jangkauannya)
+        posisi kendaraan yang dipakai.
+        Mengembalikan dict ringkasan: jumlah track, lubang baru, digabung, dan di luar rentang waktu trek.
+        """
+        summary = {"tracks": 0, "new": 0, "merged": 0, "outside_track": 0}
+        if detections_df is None or len(detections_df) == 0:
+            return summary
+        representatives = (detections_df.sort_values(["y2", "frame"], kind="stable")
+                           .drop_duplicates("track_id", keep="last").sort_values("frame", kind="stable"))
+        spans = detections_df.groupby("track_id")["frame"].agg(["min", "max"])
+        spans = spans.loc[representatives["track_id"]].to_numpy()
+        session = len(self.sessions)
+        summary["tracks"] = len(representatives)
+        start_time = track.start_time if start_time is None else float(start_time)
+        times = start_time + (representatives["frame"].to_numpy(dtype=np.float64) - 1) / float(fps) + float(offset_s)
+        lats, lons, headings, valid = track.positions_at(times)
+
+        lateral = forward = None
+        if ground_calibration is not None:
+            centers = np.stack([(representatives["x1"] + representatives["x2"]).to_numpy(dtype=np.float32) / 2,
+                                (representatives["y1"] + representatives["y2"]).to_numpy(dtype=np.float32) / 2], axis=1)
+            ground = cv2.perspectiveTransform(centers[None], ground_calibration.homography(frame_shape))[0]
+            area_map = ground_calibration.area_map(frame_shape)
+            rows = np.clip(centers[:, 1].astype(int), 0, area_map.shape[0] - 1)
+            cols = np.clip(centers[:, 0].astype(int), 0, area_map.shape[1] - 1)
+            in_range = area_map[rows, cols] > 0 # Di atas horizon / melewati jarak maksimum: proyeksi tidak dipakai
+            lateral, forward = np.where(in_range, ground[:, 0], np.nan), np.where(in_range, ground[:, 1], np.nan)
+
+        for i, row in enumerate(representatives.itertuples(index=False)):
+            if not valid[i]:
+                summary["outside_track"] += 1
+                continue
+            lat, lon, distance = lats[i], lons[i], None
+            projected = lateral is not None and not np.isnan(forward[i])
+            if projected:
+                heading = np.radians(headings[i])
+                # X ke kanan, Y ke depan kendaraan -> timur/utara
+                east = forward[i] * np.sin(heading) + lateral[i] * np.cos(heading)
+                north = forward[i] * np.cos(heading) - lateral[i] * np.sin(heading)
+                lat = lat + np.degrees(north / EARTH_RADIUS_M)
+                lon = lon + np.degrees(east / (EARTH_RADIUS_M * np.cos(np.radians(lat))))
+                distance = float(np.hypot(lateral[i], forward[i]))
+            _, is_new = self.add(lat, lon, row.area_m2, float(times[i]), confidence=row.confidence,
+                                 camera_distance_m=distance, source=source, frame=int(row.frame), projected=projected,
+                                 session=session, span=(int(spans[i, 0]), int(spans[i, 1])))
+            summary["new" if is_new else "merged"] += 1
+        if summary["new"] or summary["merged"]:
+            self.sessions.append({"source": source, "track": track.name, **summary})
+        return summary
+
+    def to_geojson(self):
+        """FeatureCollection GeoJSON berisi satu titik per lubang unik beserta luas dan jumlah pengamatannya."""
+        features = []
+        for i, pothole in enumerate(self.potholes):
+            lat, lon = self._to_degrees(pothole["x"], pothole["y"])
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [round(float(lon), 7), round(float(lat), 7)]},
+                "properties": {
+                    "id": i + 1, "area_m2": round(pothole["area_m2"], 4), "sightings": pothole["sightings"],
+                    "first_seen": format_time(pothole["first_seen"]), "last_seen": format_time(pothole["last_seen"]),
+                    "max_confidence": round(pothole["max_confidence"], 3) if pothole["max_confidence"] is not None else None,
+                    "camera_distance_m": round(pothole["camera_distance_m"], 1) if np.isfinite(pothole["camera_distance_m"]) else None,
+                    "position": "proyeksi kamera" if pothole["projected"] else "posisi kendaraan",
+                    "sources": pothole["sources"], "frame": pothole["frame"],
+                },
+            })
+        return {"type": "FeatureCollection", "features": features,
+                "properties": {"merge_radius_m": self.merge_radius_m, "unique_potholes": len(self.potholes),
+                               "total_area_m2": round(sum(p["area_m2"] for p in self.potholes), 4),
+                               "sightings": self.sightings, "sessions": self.sessions}}
+
+def geojson_bytes(geojson):
+    return json.dumps(geojson, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
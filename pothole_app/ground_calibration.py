@@ -0,0 +1,139 @@
+import json
+import os
+import cv2
+import numpy as np
+
+DEFAULT_GROUND_CALIBRATIONS_PATH = os.environ.get(
+    "POTHOLE_GROUND_CALIBRATIONS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ground_calibrations.json"))
+DEFAULT_MAX_DISTANCE_M = 40.0 # Piksel yang lebih jauh dari ini tidak ikut dihitung luasnya (terlalu dekat horizon)
+
+# Contoh: satu lajur selebar 3,5 m, 5-20 m di depan kamera dashcam (x,y gambar dalam porsi 0-1 = X,Y jalan dalam meter)
+DEFAULT_CALIBRATION_TEXT = "0.20,0.95 = -1.75,5\n0.80,0.95 = 1.75,5\n0.57,0.62 = 1.75,20\n0.43,0.62 = -1.75,20"
+
+class GroundCalibration:
+    """
+    Kalibrasi perspektif bidang jalan untuk satu kamera: homografi dari empat titik referensi gambar
+    (porsi 0-1 lebar/tinggi frame) ke koordinat jalan dalam meter (X ke samping, Y jarak ke depan).
+    Dari homografi dihitung peta luas per piksel (m² bidang jalan yang diwakili setiap piksel), sekali
+    per resolusi frame; luas mask = jumlah peta luas di bawah mask, menggantikan piksel / ppm².
+    """
+
+    def __init__(self, name, image_points, ground_points, max_distance_m=DEFAULT_MAX_DISTANCE_M):
+        self.name = str(name).strip()
+        if not self.name:
+            raise ValueError("Nama kalibrasi tidak boleh kosong.")
+        image_points = np.asarray(image_points, dtype=np.float64).reshape(-1, 2)
+        ground_points = np.asarray(ground_points, dtype=np.float64).reshape(-1, 2)
+        if len(image_points) != 4 or len(ground_points) != 4:
+            raise ValueError("Kalibrasi perspektif membutuhkan tepat 4 titik referensi.")
+        if np.any(image_points < 0) or np.any(image_points > 1):
+            raise ValueError("Titik gambar harus dalam porsi 0-1 lebar/tinggi frame.")
+        if abs(cv2.contourArea(image_points.astype(np.float32))) < 1e-4 or abs(cv2.contourArea(ground_points.astype(np.float32))) < 1e-6:
+            raise ValueError("Titik referensi tidak boleh segaris (luas segi empat nol).")
+        self.image_points = image_points
+        self.ground_points = ground_points
+        self.max_distance_m = float(max_distance_m) if max_distance_m else None
+        self._area_maps = {} # (tinggi, lebar) frame -> peta luas float32
+
+    def to_dict(self):
+        data = {"image_points": np.round(self.image_points, 4).tolist(), "ground_points": np.round(self.ground_points, 3).tolist()}
+        if self.max_distance_m is not None:
+            data["max_distance_m"] = self.max_distance_m
+        return data
+
+    @classmethod
+    def from_dict(cls, name, data):
+        return cls(name, data["image_points"], data["ground_points"], max_distance_m=data.get("max_distance_m"))
+
+    def homography(self, frame_shape):
+        """Homografi 3x3 dari piksel frame (tinggi, lebar) ke koordinat jalan (meter)."""
+        height, width = frame_shape[:2]
+        image_px = self.image_points * np.array([width - 1, height - 1])
+        return cv2.getPerspectiveTransform(image_px.astype(np.float32), self.ground_points.astype(np.float32))
+
+    def area_map(self, frame_shape):
+        """
+        Peta (tinggi, lebar) float32 berisi luas bidang jalan (m²) setiap piksel, dihitung sekali per resolusi.
+        Luas satu piksel = |det J| homografi pada piksel tersebut = |det H| / w³ (w: komponen homogen).
+        Piksel di atas horizon (w berlawanan tanda dengan titik referensi) atau lebih jauh dari
+        max_distance_m bernilai 0.
+        """
+        height, width = frame_shape[:2]
+        cached = self._area_maps.get((height, width))
+        if cached is None:
+            cached = self.areas_at(frame_shape, np.arange(width, dtype=np.float64)[None, :],
+                                   np.arange(height, dtype=np.float64)[:, None]).astype(np.float32)
+            self._area_maps[(height, width)] = cached
+        return cached
+
+    def areas_at(self, frame_shape, xs, ys):
+        """
+        Luas bidang jalan (m², float64) piksel pada koordinat xs, ys (array yang dapat di-broadcast), tanpa
+        membangun peta luas; nilainya sama dengan area_map pada piksel tersebut.
+        """
+        height, width = frame_shape[:2]
+        matrix = self.homography(frame_shape)
+        xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        w = matrix[2, 0] * xs + matrix[2, 1] * ys + matrix[2, 2]
+        reference = np.mean(self.image_points * np.array([width - 1, height - 1]), axis=0)
+        ground_side = np.sign(matrix[2, 0] * reference[0] + matrix[2, 1] * reference[1] + matrix[2, 2])
+        valid = w * ground_side > 0
+        safe_w = np.where(valid, w, 1.0)
+        areas = np.abs(np.linalg.det(matrix) / safe_w ** 3)
+        if self.max_distance_m is not None:
+            distance = (matrix[1, 0] * xs + matrix[1, 1] * ys + matrix[1, 2]) / safe_w
+            valid &= np.abs(distance) <= self.max_distance_m
+        return np.where(valid, areas, 0.0)
+
+    def pixels_per_meter_at(self, frame_shape, x, y):
+        """Skala setara (piksel per meter) di piksel (x, y); untuk perbandingan dengan referensi skala tunggal."""
+        area = float(np.float32(self.areas_at(frame_shape, int(x), int(y)))) # float32 seperti area_map
+        return 1.0 / np.sqrt(area) if area > 0 else None
+
+def load_ground_calibrations(path=DEFAULT_GROUND_CALIBRATIONS_PATH):
+    """Semua kalibrasi tersimpan {nama: GroundCalibration}; kosong jika file belum ada."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {name: GroundCalibration.from_dict(name, calibration) for name, calibration in data.get("calibrations", {}).items()}
+
+def _write_calibrations(calibrations, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "calibrations": {name: c.to_dict() for name, c in sorted(calibrations.items())}}, f, indent=2)
+    os.replace(tmp_path, path) # Atomik: file kalibrasi tidak pernah setengah tertulis
+
+def save_ground_calibration(calibration, path=DEFAULT_GROUND_CALIBRATIONS_PATH):
+    """Menyimpan (atau menimpa) kalibrasi berdasarkan namanya."""
+    calibrations = load_ground_calibrations(path)
+    calibrations[calibration.name] = calibration
+    _write_calibrations(calibrations, path)
+
+def delete_ground_calibration(name, path=DEFAULT_GROUND_CALIBRATIONS_PATH):
+    calibrations = load_ground_calibrations(path)
+    if calibrations.pop(name, None) is not None:
+        _write_calibrations(calibrations, path)
+
+def parse_calibration_text(text):
+    """(titik gambar, titik jalan) dari teks 'x,y = X,Y' per baris: x,y porsi 0-1 frame, X,Y meter."""
+    image_points, ground_points = [], []
+    for line in text.replace(";", "\n").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            image_part, ground_part = line.split("=")
+            image_points.append([float(v) for v in image_part.split(",")])
+            ground_points.append([float(v) for v in ground_part.split(",")])
+        except ValueError:
+            raise ValueError(f"Titik kalibrasi tidak valid: '{line}' (format: x,y = X,Y)")
+        if len(image_points[-1]) != 2 or len(ground_points[-1]) != 2:
+            raise ValueError(f"Titik kalibrasi tidak valid: '{line}' (format: x,y = X,Y)")
+    return image_points, ground_points
+
+def format_calibration_text(calibration):
+    return "\n".join(f"{x:.3f},{y:.3f} = {gx:g},{gy:g}"
+                     for (x, y), (gx, gy) in zip(calibration.image_points, calibration.ground_points))
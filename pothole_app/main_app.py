@@ -6,12 +6,24 @@ import os
 import cv2
 from datetime import datetime
 import pandas as pd
-import numpy as np # <-- Tambahkan import ini
+import time
+from functools import partial
 
 # Impor dari file-file modular
-from model_loader import load_yolo_model
-from frame_processor import process_and_draw_frame
-from ui_components import setup_sidebar, display_summary_and_export, update_sidebar_stats, add_reset_button 
+from model_loader import model_fingerprint
+from prediction_cache import PREDICTION_CACHE, content_hash, make_prediction_key
+from frame_processor import (process_and_draw_frame, analyze_frames_batch, draw_frame_annotations, predict_frame,
+                             analyze_and_draw_result)
+from video_pipeline import VideoPipeline
+from tracker import PotholeTracker
+from detection_store import DetectionStore
+from session_stats import SessionStats
+from pothole_thumbnails import ThumbnailStore
+from preview import RateLimitedPreview
+from webcam_capture import LatestFrameCapture
+from upload_ingest import decode_uploaded_image, upload_buffer, UploadSpooler, open_video_capture
+from ui_components import (load_yolo_model, setup_sidebar, display_summary_and_export, update_sidebar_stats, update_metrics_panel,
+                           session_metrics, add_reset_button, start_session_recorders, close_session_recorders)
 
 # --- Konfigurasi Aplikasi & Pemuatan Model ---
 MODEL_PATH = 'pothole_app/best.pt' # Pastikan path ini benar
@@ -24,22 +36,22 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-model = load_yolo_model(MODEL_PATH)
-if model is None: 
-    st.error("GAGAL MEMUAT MODEL. Pastikan path model benar dan file model tidak korup. Aplikasi mungkin tidak berfungsi dengan benar.")
-
 # --- Inisialisasi Session State (jika belum ada) ---
 DEFAULT_SESSION_VALUES = {
     'confidence_threshold': 0.6, 
     'iou_threshold': 0.5, 
+    'tracker_max_age': 30,
     'pixels_per_meter': 300,
     'show_boxes_opt': True, 
     'box_color_hex_val': "#FF0000", 
     'show_masks_opt': True,
+    'mask_alpha': 0.5,
     'webcam_running': False, 
-    'tracked_potholes_session': [], 
+    'tracked_potholes_session': PotholeTracker(), 
     'total_new_area_session': 0.0,
-    'all_session_detections_details': [], 
+    'all_session_detections_details': DetectionStore(), 
+    'session_stats': SessionStats(),
+    'pothole_thumbnails': ThumbnailStore(),
     'summary_displayed_after_webcam': False, 
     'frame_count_webcam': 0, 
     'current_video_processing_done': False, 
@@ -51,7 +63,30 @@ DEFAULT_SESSION_VALUES = {
     'current_image_processing_done': False,
     'processed_image_to_display': None,
     'image_detection_details': [],
-    'uploaded_image_key': 100
+    'image_source': None,
+    'image_prediction': None, # CachedPrediction gambar terakhir (opsi tampilan dirender ulang darinya)
+    # Prediksi mentah sesi video/webcam untuk hitung ulang tanpa inferensi
+    'raw_prediction_log': None,
+    'session_analysis_params': None,
+    # Mask deteksi sesi video/webcam (RLE) untuk ekspor COCO
+    'mask_store': None,
+    'coco_export': None,
+    # Survei GPS: lubang unik bergeoreferensi lintas sesi video (tidak direset per sesi)
+    'video_info': None,
+    'geo_survey': None,
+    'geo_survey_sessions': set(),
+    'uploaded_image_key': 100,
+    # Pengaturan performa
+    'inference_backend': "pytorch",
+    'video_batch_size': 4,
+    'video_queue_size': 16,
+    'preview_max_fps': 8,
+    'preview_max_width': 960,
+    # Instrumentasi
+    'metrics_enabled': False,
+    'metrics_export': "Tidak ada",
+    'metrics_textfile_path': "pothole_metrics.prom",
+    'metrics_http_port': 9108
 }
 
 for key, value in DEFAULT_SESSION_VALUES.items():
@@ -69,6 +104,12 @@ st.markdown("---")
 
 setup_sidebar() # Ini akan menginisialisasi atau mengupdate nilai slider di session_state
 
+# Model dimuat setelah sidebar agar backend inferensi yang dipilih langsung dipakai
+with st.spinner(f"Memuat model (backend: {st.session_state.inference_backend})..."):
+    model = load_yolo_model(MODEL_PATH, st.session_state.inference_backend)
+if model is None: 
+    st.error("GAGAL MEMUAT MODEL. Pastikan path model benar dan file model tidak korup. Aplikasi mungkin tidak berfungsi dengan benar.")
+
 st.markdown("---") 
 col_mode_select, col_mode_info = st.columns([1,2]) 
 with col_mode_select:
@@ -87,11 +128,14 @@ if app_mode_selected_value != st.session_state.app_mode:
     st.session_state.current_video_processing_done = False
     st.session_state.current_webcam_session_done = False
     st.session_state.current_image_processing_done = False # <-- Reset state gambar
-    st.session_state.all_session_detections_details = []
-    st.session_state.tracked_potholes_session = []
+    st.session_state.all_session_detections_details = DetectionStore()
+    st.session_state.session_stats = SessionStats()
+    st.session_state.pothole_thumbnails = ThumbnailStore()
+    st.session_state.tracked_potholes_session = PotholeTracker(max_age=st.session_state.tracker_max_age)
     st.session_state.total_new_area_session = 0.0
     st.session_state.summary_displayed_after_webcam = False
     st.session_state.frame_count_webcam = 0
+    close_session_recorders()
     update_sidebar_stats()
     st.rerun() 
 
@@ -126,27 +170,33 @@ if st.session_state.app_mode == "Unggah Gambar":
             st.session_state.current_image_processing_done = False
             st.session_state.image_detection_details = []
             
-            # Baca gambar menggunakan OpenCV
-            file_bytes = np.asarray(bytearray(uploaded_image_file.read()), dtype=np.uint8)
-            source_image = cv2.imdecode(file_bytes, 1) # 1 = cv2.IMREAD_COLOR
-            
             with st.spinner("Memproses gambar..."):
                 try:
-                    # Gunakan kembali fungsi process_and_draw_frame
-                    annotated_image, pothole_details, _ = process_and_draw_frame(
-                        source_image, model,
-                        st.session_state.confidence_threshold,
-                        st.session_state.iou_threshold, # NMS, tidak untuk tracking
-                        st.session_state.pixels_per_meter,
-                        st.session_state.show_boxes_opt,
-                        st.session_state.box_color_bgr_val,
-                        st.session_state.show_masks_opt,
-                        tracked_potholes_session_bboxes=[], # Tidak ada tracking untuk satu gambar
-                        update_tracked_list=False # Tidak ada tracking
-                    )
+                    # Hash isi file dan decode langsung dari buffer unggahan (tanpa salinan bytes tambahan)
+                    upload_view = upload_buffer(uploaded_image_file)
+                    try:
+                        image_hash = content_hash(upload_view)
+                    finally:
+                        upload_view.release()
+                    source_image = decode_uploaded_image(uploaded_image_file)
+                    tiling_image = st.session_state.get('tiling_config')
+                    roi_image = st.session_state.get('roi_profile')
+                    # Kunci hanya memuat parameter yang memengaruhi predict; opsi tampilan dan skala luas tidak
+                    prediction_key = make_prediction_key(
+                        image_hash, model_fingerprint(MODEL_PATH, st.session_state.inference_backend, model),
+                        conf=st.session_state.confidence_threshold,
+                        iou=st.session_state.iou_threshold, # NMS, tidak untuk tracking
+                        tiling=vars(tiling_image) if tiling_image is not None else None,
+                        roi=roi_image.to_dict() if roi_image is not None else None)
+                    prediction, from_cache = PREDICTION_CACHE.get_or_predict(prediction_key, partial(
+                        predict_frame, source_image, model, st.session_state.confidence_threshold,
+                        st.session_state.iou_threshold, tiling=tiling_image, roi=roi_image),
+                        use_disk=st.session_state.get('prediction_disk_cache_opt', False))
                     
-                    st.session_state.processed_image_to_display = annotated_image
-                    st.session_state.image_detection_details = pothole_details
+                    st.session_state.image_source = source_image
+                    st.session_state.image_prediction = prediction
+                    st.session_state.image_prediction_roi = roi_image
+                    st.session_state.image_prediction_from_cache = from_cache
                     st.session_state.current_image_processing_done = True
 
                 except Exception as e:
@@ -155,6 +205,23 @@ if st.session_state.app_mode == "Unggah Gambar":
 
         if st.session_state.get('current_image_processing_done', False):
             st.subheader("✔️ Hasil Deteksi Gambar")
+            if st.session_state.get('image_prediction_from_cache'):
+                st.caption("⚡ Hasil inferensi diambil dari cache (gambar, model, dan parameter sama); tidak ada predict ulang.")
+
+            # Anotasi dan luas dihitung ulang dari hasil inferensi tersimpan pada setiap rerun,
+            # sehingga perubahan opsi tampilan / skala langsung terlihat tanpa predict ulang
+            roi_outline_image = st.session_state.get('image_prediction_roi') if st.session_state.get('show_roi_outline_opt', True) else None
+            st.session_state.processed_image_to_display, st.session_state.image_detection_details = analyze_and_draw_result(
+                st.session_state.image_source,
+                st.session_state.image_prediction.to_result(st.session_state.image_source),
+                st.session_state.pixels_per_meter,
+                st.session_state.show_boxes_opt,
+                st.session_state.box_color_bgr_val,
+                st.session_state.show_masks_opt,
+                mask_alpha=st.session_state.mask_alpha,
+                roi=roi_outline_image,
+                ground_calibration=st.session_state.get('ground_calibration')
+            )
             
             # Tampilkan gambar yang sudah diproses
             processed_img_rgb = cv2.cvtColor(st.session_state.processed_image_to_display, cv2.COLOR_BGR2RGB)
@@ -208,17 +275,19 @@ elif st.session_state.app_mode == "Unggah Video":
 
         if start_detection_button_upload and uploaded_file is not None and model is not None:
             st.session_state.current_video_processing_done = False 
-            st.session_state.all_session_detections_details = []   
-            st.session_state.tracked_potholes_session = []
+            st.session_state.all_session_detections_details = DetectionStore()
+            st.session_state.session_stats = SessionStats()
+            st.session_state.pothole_thumbnails = ThumbnailStore()
+            st.session_state.tracked_potholes_session = PotholeTracker(max_age=st.session_state.tracker_max_age)
             st.session_state.total_new_area_session = 0.0
+            raw_log_video = start_session_recorders(uploaded_file.name)
             update_sidebar_stats()
             
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
-                tmp_file.write(uploaded_file.getvalue())
-                video_path_upload = tmp_file.name
+            # Unggahan disalin ke disk per chunk di thread latar; decode dimulai tanpa menunggu salinan selesai
+            upload_spooler = UploadSpooler(uploaded_file, suffix=os.path.splitext(uploaded_file.name)[1]).start()
             
             try:
-                cap = cv2.VideoCapture(video_path_upload)
+                cap = open_video_capture(upload_spooler)
                 if not cap.isOpened(): 
                     st.error("Error: Tidak dapat membuka file video.")
                 else:
@@ -226,6 +295,11 @@ elif st.session_state.app_mode == "Unggah Video":
                     frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
                     fps = int(cap.get(cv2.CAP_PROP_FPS)); 
                     if fps == 0: fps = 30 
+                    mask_store_video = st.session_state.get('mask_store')
+                    if mask_store_video is not None:
+                        mask_store_video.fps = fps # Untuk proyeksi ukuran penyimpanan mask per jam footage
+                    # Untuk mencocokkan frame dengan trek GPS di ringkasan (waktu frame = mulai + frame / fps)
+                    st.session_state.video_info = {'name': uploaded_file.name, 'fps': fps, 'frame_shape': (frame_height, frame_width)}
 
                     output_video_path_temp = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4').name
                     out_writer = cv2.VideoWriter(output_video_path_temp, cv2.VideoWriter_fourcc(*'mp4v'), fps, (frame_width, frame_height))
@@ -238,34 +312,79 @@ elif st.session_state.app_mode == "Unggah Video":
                         st.warning("Tidak dapat membaca total frame video. Progress bar mungkin tidak akurat.")
                     frame_count_video = 0
 
-                    while cap.isOpened():
-                        ret, frame = cap.read()
-                        if not ret: break
-                        frame_count_video += 1
-                        
-                        annotated_frame, frame_potholes_info, newly_detected_area = process_and_draw_frame(
-                            frame, model, st.session_state.confidence_threshold, st.session_state.iou_threshold, 
-                            st.session_state.pixels_per_meter, st.session_state.show_boxes_opt, 
-                            st.session_state.box_color_bgr_val, st.session_state.show_masks_opt, 
-                            tracked_potholes_session_bboxes=st.session_state.tracked_potholes_session, 
-                            update_tracked_list=True
-                        )
+                    # Nilai pengaturan diambil sekali di sini karena tahap anotasi berjalan di thread pekerja
+                    show_boxes_video = st.session_state.show_boxes_opt
+                    box_color_video = st.session_state.box_color_bgr_val
+                    show_masks_video = st.session_state.show_masks_opt
+                    mask_alpha_video = st.session_state.mask_alpha
+                    roi_video = st.session_state.get('roi_profile')
+                    roi_outline_video = roi_video if st.session_state.get('show_roi_outline_opt', True) else None
+                    metrics_video = session_metrics()
+                    video_pipeline = VideoPipeline(
+                        cap, out_writer,
+                        analyze_batch_fn=partial(
+                            analyze_frames_batch, yolo_model=model,
+                            confidence_thresh=st.session_state.confidence_threshold,
+                            iou_thresh=st.session_state.iou_threshold,
+                            pixels_per_meter=st.session_state.pixels_per_meter,
+                            tracked_potholes_session_bboxes=st.session_state.tracked_potholes_session,
+                            update_tracked_list=True, tiling=st.session_state.get('tiling_config'), roi=roi_video,
+                            raw_log=raw_log_video, mask_store=mask_store_video,
+                            ground_calibration=st.session_state.get('ground_calibration'), metrics=metrics_video),
+                        annotate_fn=lambda frame, result, details: draw_frame_annotations(
+                            frame, result, details, show_boxes_video, box_color_video, show_masks_video,
+                            mask_alpha=mask_alpha_video, in_place=True, roi=roi_outline_video, metrics=metrics_video),
+                        batch_size=st.session_state.get('video_batch_size', 1),
+                        queue_size=st.session_state.get('video_queue_size', 16),
+                        frame_callback=st.session_state.pothole_thumbnails.add_from_frame, # Thumbnail lubang baru untuk laporan lengkap
+                        metrics=metrics_video
+                    )
+
+                    # Pratinjau & statistik dibatasi laju agar throughput tidak bergantung pada browser/websocket
+                    video_preview = RateLimitedPreview(frame_display_placeholder_upload,
+                                                       max_fps=st.session_state.preview_max_fps,
+                                                       max_width=st.session_state.preview_max_width, source="video",
+                                                       metrics=metrics_video)
+                    last_frame_time = time.perf_counter()
+                    for frame_count_video, frame_potholes_info, newly_detected_area in video_pipeline.run():
                         st.session_state.total_new_area_session += newly_detected_area
+                        if metrics_video is not None:
+                            now = time.perf_counter()
+                            metrics_video.observe("pothole_frame_seconds", now - last_frame_time, {"source": "video"})
+                            last_frame_time = now
+                            metrics_video.inc("pothole_frames_processed_total", labels={"source": "video"})
+                            for queue_name, depth in zip(("decode", "annotate", "encode"), video_pipeline.queue_depths()):
+                                metrics_video.set_gauge("pothole_queue_depth", depth, {"queue": queue_name})
                         
                         for pothole in frame_potholes_info: pothole["frame"] = frame_count_video
                         st.session_state.all_session_detections_details.extend(frame_potholes_info)
+                        st.session_state.session_stats.update(frame_count_video, frame_potholes_info)
                         
-                        out_writer.write(annotated_frame)
-                        frame_display_placeholder_upload.image(cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB), channels="RGB", use_container_width=True)
+                        latest_preview = video_pipeline.pop_latest_preview()
+                        if latest_preview is not None:
+                            video_preview.offer(latest_preview[1])
                         
-                        if total_frames > 0 : 
-                            progress_bar_video.progress(frame_count_video / total_frames, text=f"Memproses Frame {frame_count_video}/{total_frames}")
-                        else: 
-                            progress_bar_video.progress(0, text=f"Memproses Frame {frame_count_video}")
-                        update_sidebar_stats()
-
+                        if video_preview.stats_due():
+                            if total_frames > 0 : 
+                                progress_bar_video.progress(min(frame_count_video / total_frames, 1.0), text=f"Memproses Frame {frame_count_video}/{total_frames}")
+                            else: 
+                                progress_bar_video.progress(0, text=f"Memproses Frame {frame_count_video}")
+                            update_sidebar_stats()
+                            update_metrics_panel()
+
+                    # Frame terakhir ditampilkan walaupun datang lebih cepat dari batas FPS pratinjau
+                    latest_preview = video_pipeline.pop_latest_preview()
+                    if latest_preview is not None:
+                        video_preview.offer(latest_preview[1], force=True)
+                    else:
+                        video_preview.flush()
                     cap.release()
                     out_writer.release()
+                    if raw_log_video is not None:
+                        raw_log_video.flush()
+                    if mask_store_video is not None:
+                        mask_store_video.flush()
+                    update_sidebar_stats()
                     
                     progress_bar_video.empty() 
                     st.success("Video unggahan berhasil diproses!")
@@ -279,8 +398,9 @@ elif st.session_state.app_mode == "Unggah Video":
                 st.error(f"Error pemrosesan video unggahan: {e}")
                 st.session_state.current_video_processing_done = False
             finally:
-                if 'video_path_upload' in locals() and os.path.exists(video_path_upload): 
-                    os.remove(video_path_upload)
+                if 'cap' in locals():
+                    cap.release()
+                upload_spooler.close() # Menghapus file sementara
 
         if st.session_state.get('current_video_processing_done', False):
             frame_display_placeholder_upload.empty() 
@@ -314,12 +434,15 @@ elif st.session_state.app_mode == "Deteksi Real-time (Webcam)":
             with webcam_control_cols[0]:
                 if st.button("▶️ Mulai Webcam", key="start_webcam_button_main_v5", disabled=st.session_state.webcam_running, use_container_width=True):
                     st.session_state.webcam_running = True
-                    st.session_state.tracked_potholes_session = [] 
+                    st.session_state.tracked_potholes_session = PotholeTracker(max_age=st.session_state.tracker_max_age) 
                     st.session_state.total_new_area_session = 0.0
-                    st.session_state.all_session_detections_details = [] 
+                    st.session_state.all_session_detections_details = DetectionStore()
+                    st.session_state.session_stats = SessionStats()
+                    st.session_state.pothole_thumbnails = ThumbnailStore()
                     st.session_state.summary_displayed_after_webcam = False 
                     st.session_state.frame_count_webcam = 0 
                     st.session_state.current_webcam_session_done = False 
+                    start_session_recorders(f"webcam {st.session_state.selected_camera_index}")
                     update_sidebar_stats()
                     st.rerun() 
             with webcam_control_cols[1]:
@@ -336,6 +459,7 @@ elif st.session_state.app_mode == "Deteksi Real-time (Webcam)":
                     st.info("Webcam Tidak Aktif.")
 
             stframe_webcam_placeholder = st.empty() 
+            webcam_status_placeholder = st.empty()
 
             if st.session_state.webcam_running:
                 # Gunakan indeks kamera dari session_state
@@ -347,31 +471,65 @@ elif st.session_state.app_mode == "Deteksi Real-time (Webcam)":
                     st.session_state.webcam_running = False 
                     st.rerun() 
                 else:
-                    while st.session_state.webcam_running: 
-                        ret, frame = cap_webcam.read()
-                        if not ret:
-                            st.warning("Gagal membaca frame dari webcam.")
-                            break
+                    metrics_webcam = session_metrics()
+                    webcam_preview = RateLimitedPreview(stframe_webcam_placeholder,
+                                                        max_fps=st.session_state.preview_max_fps,
+                                                        max_width=st.session_state.preview_max_width, source="webcam",
+                                                        metrics=metrics_webcam)
+                    # Kamera dibaca di thread terpisah; loop ini selalu mengambil frame terbaru
+                    webcam_capture = LatestFrameCapture(cap_webcam, metrics=metrics_webcam).start()
+                    try:
+                        while st.session_state.webcam_running: 
+                            frame_start = time.perf_counter()
+                            ret, frame, captured_at, _ = webcam_capture.read()
+                            if not ret:
+                                if metrics_webcam is not None:
+                                    metrics_webcam.inc("pothole_frames_dropped_total", labels={"source": "webcam"})
+                                st.warning("Gagal membaca frame dari webcam.")
+                                break
                         
-                        st.session_state.frame_count_webcam += 1
+                            st.session_state.frame_count_webcam += 1
                         
-                        annotated_frame, frame_potholes_info, newly_detected_area_webcam = process_and_draw_frame(
-                            frame, model, st.session_state.confidence_threshold, st.session_state.iou_threshold, 
-                            st.session_state.pixels_per_meter, st.session_state.show_boxes_opt, 
-                            st.session_state.box_color_bgr_val, st.session_state.show_masks_opt,
-                            tracked_potholes_session_bboxes=st.session_state.tracked_potholes_session, 
-                            update_tracked_list=True
-                        )
-                        st.session_state.total_new_area_session += newly_detected_area_webcam
+                            annotated_frame, frame_potholes_info, newly_detected_area_webcam = process_and_draw_frame(
+                                frame, model, st.session_state.confidence_threshold, st.session_state.iou_threshold, 
+                                st.session_state.pixels_per_meter, st.session_state.show_boxes_opt, 
+                                st.session_state.box_color_bgr_val, st.session_state.show_masks_opt,
+                                tracked_potholes_session_bboxes=st.session_state.tracked_potholes_session, 
+                                update_tracked_list=True,
+                                mask_alpha=st.session_state.mask_alpha, draw_in_place=True,
+                                tiling=st.session_state.get('tiling_config'),
+                                roi=st.session_state.get('roi_profile'),
+                                draw_roi=st.session_state.get('show_roi_outline_opt', True),
+                                raw_log=st.session_state.get('raw_prediction_log'),
+                                mask_store=st.session_state.get('mask_store'),
+                                ground_calibration=st.session_state.get('ground_calibration'),
+                                metrics=metrics_webcam
+                            )
+                            st.session_state.total_new_area_session += newly_detected_area_webcam
                         
-                        for pothole in frame_potholes_info: 
-                            pothole["frame"] = st.session_state.frame_count_webcam
-                        st.session_state.all_session_detections_details.extend(frame_potholes_info)
+                            for pothole in frame_potholes_info: 
+                                pothole["frame"] = st.session_state.frame_count_webcam
+                            st.session_state.all_session_detections_details.extend(frame_potholes_info)
+                            st.session_state.session_stats.update(st.session_state.frame_count_webcam, frame_potholes_info)
+                            # Frame sudah teranotasi (draw_in_place), thumbnail webcam ikut memuat anotasi
+                            st.session_state.pothole_thumbnails.add_from_frame(st.session_state.frame_count_webcam, annotated_frame, frame_potholes_info)
                         
-                        stframe_webcam_placeholder.image(cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB), channels="RGB", use_container_width=True)
-                        update_sidebar_stats()
-                    
-                    cap_webcam.release()
+                            webcam_preview.offer(annotated_frame)
+                            # Latensi glass-to-glass: dari frame diterima kamera hingga siap tampil
+                            glass_to_glass_latency = time.monotonic() - captured_at
+                            if metrics_webcam is not None:
+                                metrics_webcam.observe("pothole_frame_seconds", time.perf_counter() - frame_start, {"source": "webcam"})
+                                metrics_webcam.observe("pothole_glass_to_glass_seconds", glass_to_glass_latency, {"source": "webcam"})
+                                metrics_webcam.inc("pothole_frames_processed_total", labels={"source": "webcam"})
+                            if webcam_preview.stats_due():
+                                webcam_status_placeholder.caption(
+                                    f"Latensi glass-to-glass: {glass_to_glass_latency * 1000:.0f} ms | "
+                                    f"Frame dibuang: {webcam_capture.dropped} dari {webcam_capture.captured} frame kamera")
+                                update_sidebar_stats()
+                                update_metrics_panel()
+                        webcam_preview.flush() # Frame terakhir yang sempat dilewati batas FPS pratinjau
+                    finally:
+                        webcam_capture.release() # Juga saat skrip dihentikan oleh tombol Stop (rerun)
             
             if st.session_state.current_webcam_session_done: 
                 stframe_webcam_placeholder.empty() 
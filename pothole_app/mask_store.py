@@ -0,0 +1,346 @@
+import json
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+import pandas as pd
+
+DEFAULT_FLUSH_SIZE = 1 << 20 # Byte RLE yang ditampung di memori sebelum ditulis ke disk
+DEFAULT_PNG_SAMPLE_EVERY = 200 # Satu dari sekian mask juga di-encode PNG untuk perbandingan ukuran
+DEFAULT_POLYGON_EPSILON = 1.0 # Toleransi penyederhanaan polygon (piksel, approxPolyDP)
+COCO_CHUNK_SIZE = 4096 # Mask per blok saat membangun string RLE COCO
+
+# Satu entri indeks per mask (32 byte). Box integer sama dengan box di DetectionStore / log prediksi mentah
+# (kunci pencarian mask untuk suatu deteksi); region adalah potongan tempat RLE mask dibuat dan offset
+# posisi byte RLE-nya di file.
+MASK_INDEX_DTYPE = np.dtype([
+    ("frame", "<u4"),
+    ("x1", "<u2"), ("y1", "<u2"), ("x2", "<u2"), ("y2", "<u2"),
+    ("rx", "<u2"), ("ry", "<u2"), ("rw", "<u2"), ("rh", "<u2"),
+    ("pixels", "<u4"), ("offset", "<u8"),
+])
+
+def encode_mask_rle(mask):
+    """
+    Run length mask (h, w) dalam urutan kolom (column-major, seperti RLE COCO), dimulai dari run nol.
+    Batas run dicari sekaligus dengan np.diff.
+    """
+    flat = mask.T.ravel() != 0
+    if flat.size == 0:
+        return np.zeros(1, dtype=np.int64)
+    bounds = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    runs = np.diff(np.concatenate(([0], bounds, [flat.size])))
+    return np.concatenate(([0], runs)) if flat[0] else runs
+
+def decode_mask_rle(runs, height, width):
+    """Kebalikan encode_mask_rle: mask bool (height, width)."""
+    values = (np.arange(len(runs)) % 2).astype(bool)
+    return np.repeat(values, runs).reshape(width, height).T
+
+def compress_counts(counts_list):
+    """
+    Kompresi RLE COCO (skema rleToString pycocotools) untuk banyak deret count sekaligus: setiap count
+    (selisih terhadap count dua posisi sebelumnya, kecuali tiga pertama) dipecah menjadi potongan 5 bit
+    dengan bit lanjutan, satu karakter ASCII per potongan. Semua potongan dihitung per level secara vektor.
+    Mengembalikan list bytes, satu per deret.
+    """
+    if not counts_list:
+        return []
+    lengths = np.fromiter((len(counts) for counts in counts_list), dtype=np.int64, count=len(counts_list))
+    counts = np.concatenate(counts_list).astype(np.int64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    delta = np.flatnonzero(np.arange(len(counts)) - np.repeat(starts, lengths) > 2)
+    values = counts.copy()
+    values[delta] -= counts[delta - 2]
+
+    n_levels = 13 # Cukup untuk nilai 64 bit
+    chars = np.zeros((len(values), n_levels), dtype=np.uint8)
+    valid = np.zeros((len(values), n_levels), dtype=bool)
+    active = np.ones(len(values), dtype=bool)
+    for level in range(n_levels):
+        chunk = values & 0x1F
+        values = values >> 5 # Geser aritmetika, sama dengan implementasi C
+        more = np.where(chunk & 0x10, values != -1, values != 0) & active
+        valid[:, level] = active
+        chars[:, level] = (chunk | (more.astype(np.int64) << 5)) + 48
+        active = more
+        if not active.any():
+            break
+    encoded = chars[valid].tobytes()
+    bounds = np.concatenate(([0], np.cumsum(np.add.reduceat(valid.sum(axis=1), starts))))
+    return [encoded[bounds[i]:bounds[i + 1]] for i in range(len(counts_list))]
+
+def decompress_counts(data):
+    """Kebalikan compress_counts untuk satu deret (bytes / array uint8): count int64."""
+    chars = np.frombuffer(data, dtype=np.uint8).astype(np.int64) - 48
+    last = (chars & 0x20) == 0 # Potongan terakhir setiap count
+    value_id = np.concatenate(([0], np.cumsum(last)[:-1]))
+    value_starts = np.flatnonzero(np.concatenate(([True], last[:-1])))
+    shift = 5 * (np.arange(len(chars)) - value_starts[value_id])
+    values = np.add.reduceat((chars & 0x1F) << shift, value_starts)
+    negative = (chars[last] & 0x10) != 0 # Perluasan tanda dari potongan terakhir
+    values[negative] -= np.int64(1) << (shift[last][negative] + 5)
+    # Count ke-i (i > 2) disimpan sebagai selisih terhadap count ke-(i - 2): jumlah kumulatif per paritas
+    values[2::2] = np.cumsum(values[2::2])
+    values[1::2] = np.cumsum(values[1::2])
+    return values
+
+def coco_rle_counts(crop, region, frame_shape):
+    """
+    Counts RLE COCO (tanpa kompresi) untuk mask berukuran frame penuh dari potongan mask pada region (x, y).
+    Setiap kolom potongan diberi baris nol di atas dan bawah agar run tidak menyeberang kolom, lalu
+    batas run dipetakan ke indeks kolom-mayor frame penuh; run yang bersambung (mask setinggi frame) digabung.
+    """
+    frame_height, frame_width = frame_shape
+    rx, ry = region
+    height, width = crop.shape
+    padded = np.zeros((width, height + 2), dtype=bool)
+    padded[:, 1:-1] = crop.T
+    changes = np.flatnonzero(np.diff(padded.ravel())) + 1
+    starts, ends = changes[0::2], changes[1::2]
+    column_height = height + 2
+    starts = (rx + starts // column_height) * frame_height + ry + starts % column_height - 1
+    ends = (rx + (ends - 1) // column_height) * frame_height + ry + (ends - 1) % column_height
+    if len(starts) > 1:
+        touching = starts[1:] == ends[:-1]
+        if touching.any():
+            starts = starts[np.concatenate(([True], ~touching))]
+            ends = ends[np.concatenate((~touching, [True]))]
+    bounds = np.empty(2 * len(starts), dtype=np.int64)
+    bounds[0::2], bounds[1::2] = starts, ends
+    counts = np.diff(np.concatenate(([0], bounds, [frame_height * frame_width])))
+    return counts[:-1] if len(counts) > 1 and counts[-1] == 0 else counts # Seperti pycocotools: tanpa run nol penutup
+
+def coco_rle_strings(counts_list):
+    """String RLE terkompresi COCO (field "counts" segmentasi) untuk banyak deret count RLE frame penuh."""
+    return [encoded.decode("ascii") for encoded in compress_counts(counts_list)]
+
+def mask_polygons(crop, region, epsilon=DEFAULT_POLYGON_EPSILON):
+    """Polygon sederhana (format segmentasi COCO: list [x1, y1, x2, y2, ...]) dari potongan mask pada region (x, y)."""
+    contours, _ = cv2.findContours(crop.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=tuple(region))
+    polygons = []
+    for contour in contours:
+        approx = cv2.approxPolyDP(contour, epsilon, True) if epsilon > 0 else contour
+        if len(approx) >= 3: # COCO membutuhkan minimal 3 titik
+            polygons.append(approx.reshape(-1).astype(float).tolist())
+    return polygons
+
+class MaskStore:
+    """
+    Penyimpanan mask deteksi sesi video/webcam dalam bentuk RLE ringkas di file biner sementara.
+    Mask setiap deteksi dipotong ke box-nya, di-encode run length (urutan kolom seperti COCO) lalu dikompresi
+    dengan skema string RLE COCO (compress_counts; rata-rata sekitar satu byte per run), ditambah satu entri
+    indeks 32 byte. Frame dicatat berurutan mulai dari 1 (termasuk frame tanpa deteksi) sehingga nomor frame sama dengan DetectionStore dan log prediksi mentah; mask suatu deteksi
+    dicari lewat (frame, box). Sebagian kecil mask juga di-encode PNG untuk memperkirakan ukuran
+    penyimpanan mask PNG mentah sebagai pembanding.
+    """
+
+    def __init__(self, dir=None, fps=None, metadata=None, png_sample_every=DEFAULT_PNG_SAMPLE_EVERY,
+                 flush_size=DEFAULT_FLUSH_SIZE):
+        self.fps = fps # None: dihitung dari waktu antara frame pertama dan terakhir (webcam)
+        self.metadata = dict(metadata or {})
+        self.png_sample_every = png_sample_every
+        self.flush_size = flush_size
+        self.frames = 0
+        self.count = 0
+        self.frame_shape = None
+        self.encode_seconds = 0.0
+        self.png_sampled_masks = 0
+        self.png_sampled_bytes = 0
+        self._rle_bytes = 0
+        self._pending_index, self._pending_rle = [], []
+        self._pending_rle_bytes = 0
+        self._index = np.zeros(0, dtype=MASK_INDEX_DTYPE)
+        self._rle = None
+        self._first_frame_at = self._last_frame_at = None
+        fd, self.path = tempfile.mkstemp(prefix="mask_store_", suffix=".bin", dir=dir)
+        os.close(fd)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        """Ukuran RLE + indeks di disk (byte)."""
+        return self._rle_bytes + self.count * MASK_INDEX_DTYPE.itemsize
+
+    @property
+    def png_bytes_estimate(self):
+        """Perkiraan ukuran semua mask jika disimpan sebagai PNG biner frame penuh (satu file per deteksi)."""
+        if self.png_sampled_masks == 0:
+            return None
+        return self.png_sampled_bytes / self.png_sampled_masks * self.count
+
+    @property
+    def effective_fps(self):
+        if self.fps:
+            return float(self.fps)
+        if self.frames > 1 and self._last_frame_at > self._first_frame_at:
+            return (self.frames - 1) / (self._last_frame_at - self._first_frame_at)
+        return None
+
+    def bytes_per_hour(self, nbytes=None):
+        """Ukuran penyimpanan (default: RLE) yang diproyeksikan per jam footage, atau None jika FPS belum diketahui."""
+        fps = self.effective_fps
+        if fps is None or self.frames == 0:
+            return None
+        return (self.nbytes if nbytes is None else nbytes) / (self.frames / fps) * 3600
+
+    def add_frame(self, result):
+        """Mencatat mask semua deteksi satu hasil predict (Results dalam koordinat frame) sebagai frame berikutnya."""
+        self.frames += 1
+        self._last_frame_at = time.perf_counter()
+        if self._first_frame_at is None:
+            self._first_frame_at = self._last_frame_at
+        if result is None or result.boxes is None or len(result.boxes) == 0 or result.masks is None:
+            return
+        start = time.perf_counter()
+        masks = result.masks.data
+        masks = masks.cpu().numpy() if hasattr(masks, "cpu") else np.asarray(masks)
+        boxes = result.boxes.xyxy.cpu().numpy()
+        height, width = masks.shape[1:]
+        self.frame_shape = (height, width)
+        records = np.zeros(len(boxes), dtype=MASK_INDEX_DTYPE)
+        records["frame"] = self.frames
+        int_boxes = np.clip(boxes.astype(int), 0, np.iinfo(np.uint16).max)
+        for i, name in enumerate(("x1", "y1", "x2", "y2")):
+            records[name] = int_boxes[:, i]
+        frame_runs = []
+        for i, (x1, y1, x2, y2) in enumerate(boxes):
+            rx1, ry1 = max(0, int(np.floor(x1))), max(0, int(np.floor(y1)))
+            rx2, ry2 = max(rx1, min(width, int(np.ceil(x2)))), max(ry1, min(height, int(np.ceil(y2))))
+            runs = encode_mask_rle(masks[i, ry1:ry2, rx1:rx2])
+            frame_runs.append(runs)
+            records["rx"][i], records["ry"][i], records["rw"][i], records["rh"][i] = rx1, ry1, rx2 - rx1, ry2 - ry1
+            records["pixels"][i] = runs[1::2].sum()
+            if self.png_sample_every and (self.count + i) % self.png_sample_every == 0:
+                ok, encoded = cv2.imencode(".png", (masks[i] > 0).astype(np.uint8) * 255)
+                if ok:
+                    self.png_sampled_masks += 1
+                    self.png_sampled_bytes += len(encoded)
+        for i, encoded in enumerate(compress_counts(frame_runs)):
+            records["offset"][i] = self._rle_bytes
+            self._pending_rle.append(encoded)
+            self._pending_rle_bytes += len(encoded)
+            self._rle_bytes += len(encoded)
+        self._pending_index.append(records)
+        self.count += len(records)
+        self.encode_seconds += time.perf_counter() - start
+        if self._pending_rle_bytes >= self.flush_size:
+            self.flush()
+
+    def add_frames(self, results):
+        for result in results:
+            self.add_frame(result)
+
+    def flush(self):
+        """Menulis RLE yang tertunda ke file dan memindahkan indeks tertunda ke array."""
+        if self._pending_rle:
+            with open(self.path, "ab") as f:
+                f.write(b"".join(self._pending_rle))
+            self._pending_rle.clear()
+            self._pending_rle_bytes = 0
+            self._rle = None
+        if self._pending_index:
+            self._index = np.concatenate([self._index] + self._pending_index)
+            self._pending_index.clear()
+
+    def index(self):
+        """Indeks semua mask (array MASK_INDEX_DTYPE, urut per frame)."""
+        self.flush()
+        return self._index
+
+    def _all_rle(self):
+        self.flush()
+        if self._rle is None and self._rle_bytes:
+            self._rle = np.memmap(self.path, dtype=np.uint8, mode="r", shape=(self._rle_bytes,))
+        return self._rle
+
+    def mask(self, i):
+        """(region (x, y), potongan mask bool) untuk mask ke-i."""
+        index = self.index()
+        end = index[i + 1]["offset"] if i + 1 < len(index) else self._rle_bytes
+        entry = index[i]
+        runs = decompress_counts(self._all_rle()[entry["offset"]:end])
+        return (int(entry["rx"]), int(entry["ry"])), decode_mask_rle(runs, int(entry["rh"]), int(entry["rw"]))
+
+    def full_mask(self, i):
+        """Mask ke-i berukuran frame penuh (uint8 0/1)."""
+        (rx, ry), crop = self.mask(i)
+        mask = np.zeros(self.frame_shape, dtype=np.uint8)
+        mask[ry:ry + crop.shape[0], rx:rx + crop.shape[1]] = crop
+        return mask
+
+    def lookup(self, detections_df):
+        """
+        Indeks mask untuk setiap baris DataFrame deteksi (kolom frame, x1, y1, x2, y2) sekaligus lewat
+        join pada (frame, box); -1 untuk deteksi yang mask-nya tidak tercatat.
+        """
+        keys = ["frame", "x1", "y1", "x2", "y2"]
+        index = pd.DataFrame({key: self.index()[key].astype(np.int64) for key in keys})
+        index["mask_index"] = np.arange(len(index))
+        index = index.drop_duplicates(keys) # Box identik pada frame yang sama: mask pertama
+        wanted = pd.DataFrame({key: np.asarray(detections_df[key], dtype=np.int64) for key in keys})
+        merged = wanted.merge(index, on=keys, how="left")
+        return merged["mask_index"].fillna(-1).to_numpy(dtype=np.int64)
+
+    def close(self):
+        """Menghapus file RLE sementara."""
+        self._pending_rle.clear()
+        self._pending_index.clear()
+        self._rle = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def build_coco(mask_store, detections_df, segmentation="rle", polygon_epsilon=DEFAULT_POLYGON_EPSILON, category_name="pothole"):
+    """
+    Dataset COCO (dict) untuk deteksi sesi: satu image per frame yang memiliki deteksi, satu annotation per
+    deteksi yang mask-nya tersimpan. segmentation: "rle" (RLE terkompresi COCO) atau "polygon" (disederhanakan).
+    Kolom sesi (confidence, track_id, area_m2, is_new) ikut disimpan sebagai atribut tambahan annotation.
+    """
+    source_name = mask_store.metadata.get("source", "session")
+    mask_indices = mask_store.lookup(detections_df) if len(detections_df) else np.zeros(0, dtype=np.int64)
+    found = np.flatnonzero(mask_indices >= 0)
+    height, width = mask_store.frame_shape or (0, 0)
+    stem = os.path.splitext(os.path.basename(str(source_name)))[0] or "session"
+    rows = {name: np.asarray(detections_df[name])[found] for name in
+            ("frame", "track_id", "confidence", "area_m2", "is_new", "x1", "y1", "x2", "y2")} if len(found) else {}
+    index = mask_store.index()
+
+    annotations = []
+    for chunk_start in range(0, len(found), COCO_CHUNK_SIZE):
+        chunk = range(chunk_start, min(chunk_start + COCO_CHUNK_SIZE, len(found)))
+        masks = [mask_store.mask(mask_indices[found[j]]) for j in chunk]
+        if segmentation == "polygon":
+            segmentations = [mask_polygons(crop, region, polygon_epsilon) for region, crop in masks]
+        else:
+            strings = coco_rle_strings([coco_rle_counts(crop, region, (height, width)) for region, crop in masks])
+            segmentations = [{"size": [height, width], "counts": counts} for counts in strings]
+        for j, segmentation_j in zip(chunk, segmentations):
+            x1, y1, x2, y2 = (int(rows[name][j]) for name in ("x1", "y1", "x2", "y2"))
+            annotations.append({
+                "id": j + 1, "image_id": int(rows["frame"][j]), "category_id": 1,
+                "segmentation": segmentation_j, "area": int(index[mask_indices[found[j]]]["pixels"]),
+                "bbox": [x1, y1, x2 - x1, y2 - y1], "iscrowd": 0,
+                "score": round(float(rows["confidence"][j]), 4), "track_id": int(rows["track_id"][j]),
+                "area_m2": float(rows["area_m2"][j]), "is_new": bool(rows["is_new"][j]),
+            })
+
+    frames = np.unique(rows["frame"]) if len(found) else []
+    images = [{"id": int(frame), "file_name": f"{stem}_frame_{int(frame):06d}.jpg", "width": width, "height": height,
+               "frame_index": int(frame)} for frame in frames]
+    return {
+        "info": {"description": f"Deteksi lubang jalan - {source_name}", "frames": mask_store.frames,
+                 "fps": mask_store.effective_fps, "detections_without_mask": int(len(mask_indices) - len(found)),
+                 **mask_store.metadata},
+        "images": images,
+        "annotations": annotations,
+        "categories": [{"id": 1, "name": category_name, "supercategory": "road_damage"}],
+    }
+
+def coco_json_bytes(coco):
+    """JSON ringkas (tanpa spasi) siap diunduh."""
+    return json.dumps(coco, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+
+def compute_mask_pixel_counts(masks_data, threshold=0.5):
+    """
+    Menghitung jumlah piksel setiap mask instance sekaligus.
+    masks_data: tensor torch atau array NumPy berbentuk (N, H, W) pada resolusi frame asli.
+    - Tensor di GPU: satu reduksi batch di device, hanya vektor hasil (N,) yang dipindahkan ke host.
+    - Tensor di CPU / array NumPy: dibaca tanpa salinan, lalu dihitung dengan count_nonzero per mask
+      (popcount SIMD atas memori kontigu; lebih cepat daripada reduksi integer per sumbu di CPU).
+    Mask integer/bool (keluaran Ultralytics terbaru berupa uint8 0/1) tidak perlu di-threshold ulang.
+    """
+    if masks_data is None or len(masks_data) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if hasattr(masks_data, "cpu"): # Tensor torch
+        if masks_data.device.type != "cpu":
+            return (masks_data > threshold).flatten(1).sum(1).cpu().numpy().astype(np.int64)
+        masks_data = masks_data.numpy()
+
+    masks_data = np.asarray(masks_data)
+    if masks_data.dtype.kind == "f":
+        masks_data = masks_data > threshold
+    return np.fromiter((np.count_nonzero(mask) for mask in masks_data), dtype=np.int64, count=len(masks_data))
+
+def pixel_counts_to_area_m2(pixel_counts, pixels_per_meter):
+    """Konversi jumlah piksel mask menjadi luas (m²) berdasarkan referensi skala piksel per meter."""
+    pixel_counts = np.asarray(pixel_counts, dtype=np.float64)
+    if pixels_per_meter <= 0:
+        return np.zeros_like(pixel_counts)
+    return pixel_counts / (pixels_per_meter ** 2)
+
+def compute_mask_ground_areas(masks_data, boxes_xyxy, area_map, threshold=0.5):
+    """
+    Luas bidang jalan (m²) setiap mask instance dengan koreksi perspektif: jumlah peta luas per piksel
+    (GroundCalibration.area_map) di bawah mask. Mask Ultralytics dipotong ke box-nya, sehingga hanya region
+    box (dibulatkan keluar) yang dibaca.
+    - Tensor di GPU: perkalian dengan peta luas + reduksi batch di device.
+    - CPU: cv2.mean(peta, mask) * count_nonzero(mask) per potongan box; keduanya SIMD tanpa salinan,
+      sehingga biayanya setara dengan compute_mask_pixel_counts.
+    """
+    if masks_data is None or len(masks_data) == 0:
+        return np.zeros(0, dtype=np.float64)
+    if hasattr(masks_data, "cpu"): # Tensor torch
+        if masks_data.device.type != "cpu":
+            import torch
+            weights = torch.as_tensor(area_map, device=masks_data.device)
+            return ((masks_data > threshold) * weights).flatten(1).sum(1).cpu().numpy().astype(np.float64)
+        masks_data = masks_data.numpy()
+
+    masks_data = np.asarray(masks_data)
+    if masks_data.dtype.kind == "f":
+        masks_data = (masks_data > threshold).astype(np.uint8)
+    elif masks_data.dtype == np.bool_:
+        masks_data = masks_data.view(np.uint8)
+    height, width = masks_data.shape[1:]
+    areas = np.zeros(len(masks_data), dtype=np.float64)
+    for i, (x1, y1, x2, y2) in enumerate(np.asarray(boxes_xyxy, dtype=np.float64)[:, :4]):
+        x1, y1 = max(0, int(np.floor(x1))), max(0, int(np.floor(y1)))
+        x2, y2 = min(width, int(np.ceil(x2))), min(height, int(np.ceil(y2)))
+        if x2 <= x1 or y2 <= y1:
+            continue
+        mask_crop = masks_data[i, y1:y2, x1:x2]
+        pixels = np.count_nonzero(mask_crop)
+        if pixels:
+            areas[i] = cv2.mean(area_map[y1:y2, x1:x2], mask=mask_crop)[0] * pixels
+    return areas
@@ -0,0 +1,180 @@
+import bisect
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Batas bucket histogram (format Prometheus, nilai kumulatif "le")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DETECTION_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+METRIC_HELP = {
+    "pothole_stage_seconds": ("histogram", "Durasi setiap tahap pemrosesan frame (detik)."),
+    "pothole_frame_seconds": ("histogram", "Waktu per frame (webcam: baca hingga tampil; video: selang antar frame keluaran pipeline)."),
+    "pothole_glass_to_glass_seconds": ("histogram", "Latensi dari frame diterima kamera hingga frame teranotasi siap tampil (detik)."),
+    "pothole_detections_per_frame": ("histogram", "Jumlah deteksi lubang per frame."),
+    "pothole_frames_processed_total": ("counter", "Jumlah frame yang telah diproses."),
+    "pothole_frames_dropped_total": ("counter", "Jumlah frame yang dibuang/gagal dibaca sebelum diproses."),
+    "pothole_preview_frames_skipped_total": ("counter", "Jumlah frame teranotasi yang tidak sempat ditampilkan."),
+    "pothole_queue_depth": ("gauge", "Jumlah item di antrean pipeline video."),
+}
+
+class Histogram:
+    """Histogram bucket tetap (untuk ekspor Prometheus) + jendela nilai terbaru (untuk p50/p95 di panel)."""
+
+    def __init__(self, buckets, window=512):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1) # Bucket terakhir = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q):
+        """Kuantil dari jendela nilai terbaru (None jika belum ada data)."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class MetricsRegistry:
+    """
+    Registri metrik proses (timer/histogram, counter, gauge) untuk jalur pemrosesan frame.
+    Pencatatan dipilih per pemanggil: jalur pemrosesan menerima argumen metrics (registri ini atau None),
+    sehingga sesi yang tidak mengaktifkan metrik tidak mengunci atau mengalokasi apa pun (overhead nol)
+    dan tidak memengaruhi sesi lain dalam proses yang sama.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._http_server = None
+        self._textfile_path = None
+        self._textfile_interval = 5.0
+        self._last_textfile_write = 0.0
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+    # --- Pencatatan ---
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, labels=None):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, labels=None):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def observe_stage_timings(self, stage_timings):
+        """Mencatat dict {tahap: detik} (lihat stage_timings di frame_processor) ke pothole_stage_seconds."""
+        for stage, seconds in stage_timings.items():
+            self.observe("pothole_stage_seconds", seconds, {"stage": stage})
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    # --- Pembacaan untuk panel ---
+    def snapshot(self):
+        """Ringkasan metrik saat ini untuk panel sidebar."""
+        with self._lock:
+            histograms = {key: (h.count, h.sum, h.quantile(0.5), h.quantile(0.95)) for key, h in self._histograms.items()}
+            return {"histograms": histograms, "counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+    # --- Ekspor Prometheus ---
+    def render_prometheus(self):
+        """Seluruh metrik dalam format teks eksposisi Prometheus."""
+        def label_text(labels, extra=()):
+            items = list(labels) + list(extra)
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+        lines = []
+        with self._lock:
+            metrics = [(key, "histogram", h) for key, h in self._histograms.items()]
+            metrics += [(key, "counter", v) for key, v in self._counters.items()]
+            metrics += [(key, "gauge", v) for key, v in self._gauges.items()]
+        described = set()
+        for (name, labels), metric_type, value in sorted(metrics, key=lambda m: m[0]):
+            if name not in described:
+                help_text = METRIC_HELP.get(name, (metric_type, name))[1]
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+                described.add(name)
+            if metric_type != "histogram":
+                lines.append(f"{name}{label_text(labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(value.buckets) + ["+Inf"], value.bucket_counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{label_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{label_text(labels)} {value.sum}")
+            lines.append(f"{name}_count{label_text(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    def configure_textfile(self, path, interval_seconds=5.0):
+        """Mengaktifkan penulisan berkala ke file teks (misal untuk textfile collector node_exporter)."""
+        self._textfile_path = path
+        self._textfile_interval = interval_seconds
+
+    def write_textfile_if_due(self, force=False):
+        """Menulis file teks Prometheus secara atomik jika interval sudah lewat."""
+        if not self._textfile_path:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_textfile_write < self._textfile_interval:
+            return
+        self._last_textfile_write = now
+        directory = os.path.dirname(os.path.abspath(self._textfile_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".prom", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, self._textfile_path)
+
+    def start_http_server(self, port, host="127.0.0.1"):
+        """Menjalankan endpoint HTTP lokal /metrics di thread latar (sekali per proses)."""
+        if self._http_server is not None:
+            return self._http_server
+        registry = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args): # Jangan memenuhi log Streamlit
+                pass
+
+        self._http_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=self._http_server.serve_forever, daemon=True).start()
+        return self._http_server
+
+# Registri bersama untuk seluruh proses (endpoint/ekspor bersifat per proses)
+METRICS = MetricsRegistry()
@@ -1,16 +1,128 @@
-import streamlit as st
+import hashlib
+import importlib.util
+import os
+import shutil
+import tempfile
+from functools import lru_cache
 from ultralytics import YOLO
 
-@st.cache_resource # Cache model agar tidak di-load ulang setiap interaksi
-def load_yolo_model(model_path):
-    """Memuat model YOLO dari path yang diberikan."""
+# Backend inferensi yang didukung -> format export Ultralytics (None = bobot PyTorch asli)
+INFERENCE_BACKENDS = {
+    "pytorch": None,
+    "onnx": "onnx",         # ONNX Runtime
+    "openvino": "openvino", # OpenVINO (opsional, hanya jika terpasang)
+    "onnx-int8": "onnx",    # ONNX Runtime, dikuantisasi INT8 dengan kalibrasi statis
+}
+BACKEND_REQUIRED_MODULES = {"onnx": "onnxruntime", "openvino": "openvino", "onnx-int8": "onnxruntime"}
+DEFAULT_IMGSZ = 640
+
+# Folder gambar jalan untuk kalibrasi INT8; dapat diganti lewat variabel lingkungan
+DEFAULT_CALIBRATION_DIR = os.environ.get(
+    "POTHOLE_CALIBRATION_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration_images"))
+
+# Lokasi cache hasil export; dapat diganti lewat variabel lingkungan
+EXPORT_CACHE_DIR = os.environ.get(
+    "POTHOLE_EXPORT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pothole_app", "exports"))
+
+def available_backends():
+    """
+    Daftar backend yang dapat dipakai di lingkungan ini (PyTorch selalu tersedia).
+    onnx-int8 hanya ditawarkan jika folder kalibrasi default tersedia.
+    """
+    return [name for name in INFERENCE_BACKENDS
+            if (name not in BACKEND_REQUIRED_MODULES or importlib.util.find_spec(BACKEND_REQUIRED_MODULES[name]) is not None)
+            and (name != "onnx-int8" or os.path.isdir(DEFAULT_CALIBRATION_DIR))]
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hash SHA-256 isi file (dibaca bertahap)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=16)
+def _file_sha256_cached(path, size, mtime_ns):
+    return file_sha256(path)
+
+def _weights_sha256(path):
+    """file_sha256 yang dihitung ulang hanya jika ukuran/waktu ubah file berubah."""
+    stat = os.stat(path)
+    return _file_sha256_cached(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+def model_fingerprint(model_path, backend="pytorch", loaded_model=None, calibration_dir=None):
+    """
+    Identitas isi model untuk kunci cache hasil inferensi: hash bobot + backend (+ hash set kalibrasi
+    untuk onnx-int8). Untuk onnx-int8 nama artefak diambil dari model yang sudah dimuat (loaded_model.ckpt_path)
+    agar tidak perlu meng-hash ulang set kalibrasi atau memicu kuantisasi setiap kali deteksi dijalankan.
+    """
+    fingerprint = f"{_weights_sha256(model_path)[:16]}_{backend}"
+    if backend == "onnx-int8":
+        # Nama artefak INT8 memuat hash set kalibrasi
+        artifact_path = getattr(loaded_model, "ckpt_path", None) or get_int8_model_path(model_path, calibration_dir=calibration_dir)
+        fingerprint += "_" + os.path.basename(str(artifact_path))
+    return fingerprint
+
+def get_exported_model_path(model_path, backend, imgsz=DEFAULT_IMGSZ, cache_dir=None, calibration_dir=None):
+    """
+    Mengembalikan path artefak export untuk backend tertentu, melakukan export hanya jika belum ada.
+    Artefak di-cache di disk dengan kunci hash bobot + ukuran input, sehingga export hanya sekali.
+    Export dilakukan di direktori sementara lalu dipindahkan secara atomik agar aman bila
+    beberapa proses (misal pekerja CLI) meminta export yang sama bersamaan.
+    Untuk backend onnx-int8, kunci cache juga mencakup hash isi gambar kalibrasi.
+    """
+    export_format = INFERENCE_BACKENDS[backend]
+    if export_format is None:
+        return model_path
+    if backend == "onnx-int8":
+        return get_int8_model_path(model_path, imgsz, cache_dir, calibration_dir)
+
+    cache_dir = cache_dir or EXPORT_CACHE_DIR
+    weights_stem = os.path.splitext(os.path.basename(model_path))[0]
+    cache_key = f"{weights_stem}_{_weights_sha256(model_path)[:16]}_{imgsz}"
+    artifact_name = f"{weights_stem}.onnx" if export_format == "onnx" else f"{weights_stem}_{export_format}_model"
+    target_path = os.path.join(cache_dir, cache_key, artifact_name)
+    if os.path.exists(target_path):
+        return target_path
+
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="export_", dir=os.path.dirname(target_path))
+    try:
+        work_weights = shutil.copy2(model_path, os.path.join(work_dir, os.path.basename(model_path)))
+        # dynamic=True agar batch multi-frame (mode video) tetap dapat dipakai
+        exported_path = YOLO(work_weights).export(format=export_format, imgsz=imgsz, dynamic=True)
+        try:
+            os.replace(exported_path, target_path)
+        except OSError:
+            if not os.path.exists(target_path): # Bukan karena proses lain sudah selesai lebih dulu
+                raise
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return target_path
+
+def get_int8_model_path(model_path, imgsz=DEFAULT_IMGSZ, cache_dir=None, calibration_dir=None):
+    """Path model ONNX INT8 (dibangun sekali dari model ONNX FP32 + folder kalibrasi, lalu di-cache)."""
+    from quantization import list_calibration_images, calibration_set_hash, build_int8_onnx_model
+
+    calibration_dir = calibration_dir or DEFAULT_CALIBRATION_DIR
+    fp32_path = get_exported_model_path(model_path, "onnx", imgsz, cache_dir)
+    calibration_hash = calibration_set_hash(list_calibration_images(calibration_dir))[:12]
+    stem = os.path.splitext(os.path.basename(fp32_path))[0]
+    target_path = os.path.join(os.path.dirname(fp32_path), f"{stem}_int8_{calibration_hash}.onnx")
+    if not os.path.exists(target_path):
+        build_int8_onnx_model(fp32_path, target_path, calibration_dir, imgsz=imgsz)
+    return target_path
+
+def load_yolo_model_uncached(model_path, backend="pytorch", imgsz=DEFAULT_IMGSZ, calibration_dir=None):
+    """Memuat model YOLO (tanpa cache; aplikasi Streamlit memakai ui_components.load_yolo_model)."""
     try:
-        model = YOLO(model_path)
-        # Tidak perlu st.success di sini karena akan dipanggil setiap rerun jika tidak di-cache
-        # Cukup kembalikan model atau None
-        return model
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Backend '{backend}' tidak dikenal. Pilihan: {', '.join(INFERENCE_BACKENDS)}")
+        required_module = BACKEND_REQUIRED_MODULES.get(backend)
+        if required_module and importlib.util.find_spec(required_module) is None:
+            raise ImportError(f"Backend '{backend}' membutuhkan paket '{required_module}'.")
+        return YOLO(get_exported_model_path(model_path, backend, imgsz, calibration_dir=calibration_dir), task="segment")
     except Exception as e:
-        # Tampilkan error di tempat yang lebih sesuai (misal di main_app.py saat pemanggilan)
-        print(f"Error saat memuat model dari '{model_path}': {e}")
+        print(f"Error saat memuat model dari '{model_path}' (backend {backend}): {e}")
         print("Pastikan file model ada di direktori yang benar atau path sudah sesuai.")
-        return None
\ No newline at end of file
+        return None
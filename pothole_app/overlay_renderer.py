@@ -0,0 +1,122 @@
+import threading
+from functools import lru_cache
+import cv2
+import numpy as np
+
+# Palet warna mask (BGR), mengikuti palet default Ultralytics
+DEFAULT_MASK_PALETTE_HEX = [
+    "FF3838", "FF9D97", "FF701F", "FFB21D", "CFD231", "48F90A", "92CC17", "3DDB86", "1A9334", "00D4BB",
+    "2C99A8", "00C2FF", "344593", "6473FF", "0018EC", "8438FF", "520085", "CB38FF", "FF95C8", "FF37C7",
+]
+
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_FONT_SCALE = 0.5
+LABEL_THICKNESS = 1
+
+def _palette_to_bgr_table(palette_hex):
+    return np.array([[int(h[4:6], 16), int(h[2:4], 16), int(h[0:2], 16)] for h in palette_hex], dtype=np.uint8)
+
+@lru_cache(maxsize=4096)
+def _label_text_size(text):
+    """Ukuran teks label (w, h) di-cache karena teks luas/confidence sering berulang."""
+    (text_w, text_h), _ = cv2.getTextSize(text, LABEL_FONT, LABEL_FONT_SCALE, LABEL_THICKNESS)
+    return text_w, text_h
+
+class OverlayRenderer:
+    """
+    Renderer anotasi ringan sebagai pengganti `results[0].plot()`.
+    Semua mask di-blend dalam satu langkah tervektorisasi menggunakan tabel warna yang sudah
+    dihitung sebelumnya, dan hanya pada area gabungan bbox deteksi. Buffer kerja (peta label
+    dan hasil blend) dialokasikan sekali dan dipakai ulang selama resolusi frame tidak berubah.
+    Tidak thread-safe; gunakan satu instance per thread (lihat `get_thread_renderer`).
+    """
+
+    def __init__(self, mask_alpha=0.5, palette_hex=None):
+        self.mask_alpha = float(mask_alpha)
+        self.color_table = _palette_to_bgr_table(palette_hex or DEFAULT_MASK_PALETTE_HEX)
+        self._label_buffer = None
+        self._blend_buffer = None
+        self._color_lut = np.zeros((256, 1, 3), dtype=np.uint8) # Indeks label -> warna BGR
+
+    def _ensure_buffers(self, frame_shape):
+        height, width = frame_shape[:2]
+        if self._label_buffer is None or self._label_buffer.shape != (height, width):
+            self._label_buffer = np.empty((height, width), dtype=np.uint8)
+            self._blend_buffer = np.empty((height, width, 3), dtype=np.uint8)
+
+    def draw_masks(self, canvas, masks, color_keys, region):
+        """
+        Mem-blend semua mask ke canvas (in-place) dalam region (x1, y1, x2, y2).
+        masks: array (N, H, W) biner; color_keys: kunci warna per mask (mis. track_id).
+        Jika mask saling tumpang tindih, mask dengan indeks terbesar yang tampil.
+        """
+        n_masks = min(len(masks), 255)
+        x1, y1, x2, y2 = region
+        if n_masks == 0 or x2 <= x1 or y2 <= y1:
+            return canvas
+        self._ensure_buffers(canvas.shape)
+
+        masks_region = np.asarray(masks[:n_masks, y1:y2, x1:x2])
+        if masks_region.dtype == np.uint8:
+            masks_region = masks_region.view(bool) # Mask Ultralytics berupa uint8 0/1, tanpa salinan
+        elif masks_region.dtype != bool:
+            masks_region = masks_region > 0.5
+        label = self._label_buffer[y1:y2, x1:x2]
+        # Peta label: 0 = latar, k = mask ke-k (1-based) -> satu reduksi max untuk semua mask
+        np.max(masks_region * np.arange(1, n_masks + 1, dtype=np.uint8)[:, None, None], axis=0, out=label)
+
+        self._color_lut[1:n_masks + 1, 0] = self.color_table[np.asarray(color_keys[:n_masks], dtype=np.int64) % len(self.color_table)]
+        overlay = cv2.LUT(cv2.merge([label, label, label]), self._color_lut)
+        canvas_region = canvas[y1:y2, x1:x2]
+        blended = self._blend_buffer[y1:y2, x1:x2]
+        cv2.addWeighted(overlay, self.mask_alpha, canvas_region, 1.0 - self.mask_alpha, 0.0, dst=blended)
+        cv2.copyTo(blended, label, canvas_region) # Hanya piksel ber-mask (label != 0) yang ditimpa
+        return canvas
+
+    def draw_boxes(self, canvas, pothole_details, box_color_bgr):
+        """Menggambar bbox beserta label luas dan confidence untuk setiap deteksi (in-place)."""
+        for pothole in pothole_details:
+            x1_box, y1_box, x2_box, y2_box = pothole["x1"], pothole["y1"], pothole["x2"], pothole["y2"]
+            label_text = f"Area: {pothole['area_m2']:.3f} m2"
+            conf_text = f"Conf: {pothole['confidence']:.2f}"
+
+            cv2.rectangle(canvas, (x1_box, y1_box), (x2_box, y2_box), box_color_bgr, 2)
+            label_w, label_h = _label_text_size(label_text)
+            conf_w, conf_h = _label_text_size(conf_text)
+            max_text_w = max(label_w, conf_w)
+            total_text_h = label_h + conf_h + 10
+            bg_y1 = y1_box - total_text_h
+            text_y_area = y1_box - conf_h - 5
+            text_y_conf = y1_box - 5
+            if bg_y1 < 0 :
+                bg_y1 = y2_box + 5
+                text_y_area = y2_box + label_h + 5
+                text_y_conf = y2_box + label_h + conf_h + 10
+            cv2.rectangle(canvas, (x1_box, bg_y1), (x1_box + max_text_w + 10, bg_y1 + total_text_h), (50,50,50), -1)
+            cv2.putText(canvas, label_text, (x1_box + 5, text_y_area), LABEL_FONT, LABEL_FONT_SCALE, (255, 255, 255), LABEL_THICKNESS, cv2.LINE_AA)
+            cv2.putText(canvas, conf_text, (x1_box + 5, text_y_conf), LABEL_FONT, LABEL_FONT_SCALE, (255, 255, 255), LABEL_THICKNESS, cv2.LINE_AA)
+        return canvas
+
+    def render(self, canvas, masks, pothole_details, show_boxes, box_color_bgr, show_masks):
+        """Menggambar mask dan/atau bbox langsung pada canvas (in-place) lalu mengembalikannya."""
+        if show_masks and masks is not None and len(masks) > 0 and pothole_details:
+            height, width = canvas.shape[:2]
+            region = (max(0, min(int(p["x1"]) for p in pothole_details)),
+                      max(0, min(int(p["y1"]) for p in pothole_details)),
+                      min(width, max(int(p["x2"]) for p in pothole_details)),
+                      min(height, max(int(p["y2"]) for p in pothole_details)))
+            color_keys = [p.get("track_id") or i for i, p in enumerate(pothole_details)]
+            self.draw_masks(canvas, masks, color_keys, region)
+        if show_boxes:
+            self.draw_boxes(canvas, pothole_details, box_color_bgr)
+        return canvas
+
+_thread_local = threading.local()
+
+def get_thread_renderer(mask_alpha=0.5):
+    """Renderer milik thread saat ini (buffer kerja tidak dibagi antar thread/sesi Streamlit)."""
+    renderer = getattr(_thread_local, "renderer", None)
+    if renderer is None:
+        renderer = _thread_local.renderer = OverlayRenderer(mask_alpha=mask_alpha)
+    renderer.mask_alpha = float(mask_alpha)
+    return renderer
@@ -1,49 +1,16 @@
-import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
 import tempfile
-import os
-
-# --- Fungsi untuk Membuat Data Grafik untuk Streamlit Chart ---
-def create_streamlit_summary_chart_data(df_detections):
-    """
-    Menyiapkan data untuk st.line_chart atau st.bar_chart dari Streamlit.
-    Mengembalikan DataFrame yang cocok.
-    """
-    if df_detections.empty or 'is_new' not in df_detections.columns:
-        return None
-
-    df_plot = df_detections[df_detections['is_new']].copy() 
-    if df_plot.empty:
-        return None
-
-    # Agregasi data per frame
-    new_potholes_per_frame = df_plot.groupby('frame').size().reset_index(name='Jumlah Lubang Baru')
-    avg_area_new_per_frame = df_plot[df_plot['area_m2'] > 0].groupby('frame')['area_m2'].mean().reset_index(name='Rata-rata Luas Baru (m²)')
-
-    # Gabungkan data untuk plotting
-    chart_data = pd.merge(new_potholes_per_frame, avg_area_new_per_frame, on='frame', how='outer').fillna(0)
-    
-    if chart_data.empty:
-        return None
-    
-    if not chart_data.empty:
-        chart_data = chart_data.set_index('frame')
-
-    return chart_data
-
 
 # --- Fungsi untuk Membuat Grafik Statis (Matplotlib) untuk PDF ---
-def create_static_summary_plot_for_pdf(df_detections):
-    """Membuat grafik ringkasan statis untuk PDF."""
-    if df_detections.empty or 'is_new' not in df_detections.columns:
+def create_static_summary_plot_from_chart_data(chart_data):
+    """Membuat grafik ringkasan statis untuk PDF dari data grafik (misal SessionStats.chart_data())."""
+    if chart_data is None or chart_data.empty:
         return None
 
-    df_plot = df_detections[df_detections['is_new']].copy() 
-    if df_plot.empty: return None
-
-    new_potholes_per_frame = df_plot.groupby('frame').size()
-    avg_area_new_per_frame = df_plot[df_plot['area_m2'] > 0].groupby('frame')['area_m2'].mean()
+    new_potholes_per_frame = chart_data['Jumlah Lubang Baru']
+    new_potholes_per_frame = new_potholes_per_frame[new_potholes_per_frame > 0]
+    avg_area_new_per_frame = chart_data['Rata-rata Luas Baru (m²)']
+    avg_area_new_per_frame = avg_area_new_per_frame[avg_area_new_per_frame > 0]
 
     if new_potholes_per_frame.empty and avg_area_new_per_frame.empty: return None
 
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import cv2
+
+class ThumbnailStore:
+    """
+    Thumbnail JPEG kecil untuk setiap lubang unik (deteksi is_new), disimpan sebagai file di folder
+    sementara agar memori tidak bertambah seiring panjang sesi. Thumbnail ke-i milik lubang baru ke-i
+    sesuai urutan penambahan (sama dengan urutan baris is_new di DetectionStore).
+    Folder sementara baru dibuat saat thumbnail pertama disimpan dan dihapus otomatis saat objek
+    dibuang atau close() dipanggil.
+    """
+
+    def __init__(self, max_size=96, padding=0.15, jpeg_quality=75, dir=None):
+        self.max_size = max_size
+        self.padding = padding
+        self.jpeg_quality = jpeg_quality
+        self._dir = dir
+        self._tmp_dir = None
+        self._paths = [] # Path thumbnail atau None jika potongan kosong
+        self._frames = []
+
+    def __len__(self):
+        return len(self._paths)
+
+    def add_from_frame(self, frame_index, frame, pothole_details):
+        """Memotong dan menyimpan thumbnail untuk setiap lubang baru di frame (format info frame_processor)."""
+        for pothole in pothole_details:
+            if pothole.get("is_new"):
+                self._paths.append(self._save_crop(frame, pothole))
+                self._frames.append(frame_index)
+
+    def _save_crop(self, frame, pothole):
+        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = pothole["x1"], pothole["y1"], pothole["x2"], pothole["y2"]
+        pad_x, pad_y = int((x2 - x1) * self.padding), int((y2 - y1) * self.padding)
+        x1, y1 = max(0, x1 - pad_x), max(0, y1 - pad_y)
+        x2, y2 = min(width, x2 + pad_x), min(height, y2 + pad_y)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        crop = frame[y1:y2, x1:x2]
+        scale = self.max_size / max(crop.shape[:2])
+        if scale < 1:
+            crop = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", crop, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return None
+        if self._tmp_dir is None:
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="pothole_thumbs_", dir=self._dir)
+        path = os.path.join(self._tmp_dir.name, f"{len(self._paths):07d}.jpg")
+        encoded.tofile(path)
+        return path
+
+    def path(self, index):
+        """Path thumbnail lubang baru ke-index, atau None."""
+        return self._paths[index] if 0 <= index < len(self._paths) else None
+
+    def frame(self, index):
+        """Nomor frame tempat thumbnail ke-index diambil, atau None."""
+        return self._frames[index] if 0 <= index < len(self._frames) else None
+
+    def close(self):
+        self._paths.clear()
+        self._frames.clear()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
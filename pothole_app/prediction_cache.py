@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024 # Batas memori tier RAM
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024 # Batas ukuran tier disk
+
+# Lokasi tier disk; dapat diganti lewat variabel lingkungan
+PREDICTION_CACHE_DIR = os.environ.get(
+    "POTHOLE_PREDICTION_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pothole_app", "predictions"))
+
+def content_hash(buffer):
+    """Hash isi file gambar (bytes / memoryview) tanpa menyalinnya."""
+    return hashlib.blake2b(buffer, digest_size=16).hexdigest()
+
+def make_prediction_key(image_hash, model_hash, **params):
+    """Kunci cache dari hash gambar, identitas model, dan parameter inferensi (urutan parameter tidak berpengaruh)."""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.blake2b(f"{image_hash}|{model_hash}|{payload}".encode("utf-8"), digest_size=16).hexdigest()
+
+class CachedPrediction:
+    """
+    Hasil predict mentah satu gambar dalam bentuk ringkas: box + skor + kelas (N, 6) dan mask yang
+    dipotong pada box-nya lalu dipadatkan per bit (np.packbits), sehingga satu lubang pada gambar
+    4K hanya memakan beberapa KB. to_result() membangun kembali Results dengan mask resolusi penuh.
+    """
+    __slots__ = ("boxes", "shape", "names", "mask_bits", "mask_offsets")
+
+    def __init__(self, boxes, shape, names, mask_bits=None, mask_offsets=None):
+        self.boxes = boxes # float32 (N, 6): x1, y1, x2, y2, confidence, kelas
+        self.shape = tuple(shape) # (tinggi, lebar) gambar
+        self.names = names
+        self.mask_bits = mask_bits # uint8, bit mask semua deteksi berurutan (None jika model tanpa mask)
+        self.mask_offsets = mask_offsets # int64 (N + 1), batas byte mask setiap deteksi di mask_bits
+
+    def __len__(self):
+        return len(self.boxes)
+
+    @property
+    def nbytes(self):
+        return self.boxes.nbytes + (0 if self.mask_bits is None else self.mask_bits.nbytes + self.mask_offsets.nbytes)
+
+    def _mask_region(self, i):
+        """Region (x1, y1, x2, y2) piksel tempat mask ke-i disimpan (box dibulatkan keluar, dipotong ke gambar)."""
+        height, width = self.shape
+        x1, y1, x2, y2 = self.boxes[i, :4]
+        return (max(0, int(np.floor(x1))), max(0, int(np.floor(y1))),
+                min(width, int(np.ceil(x2))), min(height, int(np.ceil(y2))))
+
+    @classmethod
+    def from_result(cls, result):
+        names = dict(getattr(result, "names", None) or {0: "pothole"})
+        shape = result.orig_shape[:2]
+        if result.boxes is None or len(result.boxes) == 0:
+            return cls(np.zeros((0, 6), dtype=np.float32), shape, names)
+        prediction = cls(result.boxes.data.cpu().numpy()[:, :6].astype(np.float32), shape, names)
+        if result.masks is not None:
+            masks = result.masks.data.cpu().numpy()
+            chunks = []
+            for i in range(len(prediction)):
+                x1, y1, x2, y2 = prediction._mask_region(i)
+                chunks.append(np.packbits(masks[i, y1:y2, x1:x2] > 0.5))
+            prediction.mask_offsets = np.concatenate([[0], np.cumsum([len(c) for c in chunks])]).astype(np.int64)
+            prediction.mask_bits = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint8)
+        return prediction
+
+    def to_result(self, image):
+        """Objek Results Ultralytics untuk gambar ini, dengan mask resolusi penuh (N, H, W) uint8."""
+        import torch
+        from ultralytics.engine.results import Results
+
+        boxes = torch.from_numpy(self.boxes.copy())
+        if self.mask_bits is None or len(self) == 0:
+            return Results(image, path="", names=self.names, boxes=boxes)
+        masks = np.zeros((len(self), *self.shape), dtype=np.uint8)
+        for i in range(len(self)):
+            x1, y1, x2, y2 = self._mask_region(i)
+            bits = self.mask_bits[self.mask_offsets[i]:self.mask_offsets[i + 1]]
+            masks[i, y1:y2, x1:x2] = np.unpackbits(bits, count=(y2 - y1) * (x2 - x1)).reshape(y2 - y1, x2 - x1)
+        return Results(image, path="", names=self.names, boxes=boxes, masks=torch.from_numpy(masks))
+
+    def save(self, path):
+        arrays = {"boxes": self.boxes, "shape": np.array(self.shape, dtype=np.int64),
+                  "names": np.array(json.dumps({str(k): v for k, v in self.names.items()}))}
+        if self.mask_bits is not None:
+            arrays.update(mask_bits=self.mask_bits, mask_offsets=self.mask_offsets)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays) # Mask sudah dipadatkan per bit, kompresi tambahan tidak sebanding biayanya
+        os.replace(tmp_path, path) # Atomik: pembaca lain tidak pernah melihat file setengah tertulis
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            names = {int(k): v for k, v in json.loads(str(data["names"])).items()}
+            mask_bits = data["mask_bits"] if "mask_bits" in data else None
+            mask_offsets = data["mask_offsets"] if "mask_offsets" in data else None
+            return cls(data["boxes"], tuple(data["shape"]), names, mask_bits, mask_offsets)
+
+class PredictionCache:
+    """
+    Cache hasil inferensi berbasis isi (content-addressed): tier RAM LRU dibatasi jumlah entri dan
+    ukuran, ditambah tier disk opsional (file .npz per kunci) dibatasi total ukuran; file yang paling
+    lama tidak dipakai dihapus lebih dulu. Entri dari disk dinaikkan kembali ke tier RAM saat dipakai.
+    Tier disk dapat dilewati per panggilan (use_disk=False), karena satu cache dipakai bersama oleh semua sesi.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict() # kunci -> CachedPrediction
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.npz")
+
+    def get(self, key, use_disk=True):
+        """CachedPrediction untuk kunci ini (dari RAM, lalu disk jika use_disk) atau None."""
+        with self._lock:
+            prediction = self._entries.get(key)
+            if prediction is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return prediction
+        if use_disk and self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                prediction = CachedPrediction.load(path)
+                os.utime(path) # Penanda pemakaian terakhir untuk eviksi disk
+            except (OSError, ValueError, KeyError):
+                prediction = None
+            if prediction is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store_in_memory(key, prediction)
+                return prediction
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, prediction, use_disk=True):
+        with self._lock:
+            self._store_in_memory(key, prediction)
+        if use_disk and self.disk_dir is not None:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                prediction.save(self._disk_path(key))
+                self._evict_disk()
+            except OSError as e:
+                print(f"Gagal menyimpan cache inferensi ke disk: {e}")
+
+    def get_or_predict(self, key, predict_fn, use_disk=True):
+        """(CachedPrediction, True jika dari cache); predict_fn() -> Results hanya dipanggil jika belum ada."""
+        prediction = self.get(key, use_disk)
+        if prediction is not None:
+            return prediction, True
+        prediction = CachedPrediction.from_result(predict_fn())
+        self.put(key, prediction, use_disk)
+        return prediction, False
+
+    def _store_in_memory(self, key, prediction):
+        self._entries[key] = prediction
+        self._entries.move_to_end(key)
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.memory_bytes > self.max_bytes):
+            self._entries.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".npz"):
+                try:
+                    stat = os.stat(os.path.join(self.disk_dir, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+                total -= size
+            except OSError:
+                pass
+
+    @property
+    def memory_bytes(self):
+        return sum(prediction.nbytes for prediction in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Cache bersama untuk semua sesi Streamlit dalam proses ini (tier disk dipakai per panggilan sesuai opsi sidebar sesi)
+PREDICTION_CACHE = PredictionCache(disk_dir=PREDICTION_CACHE_DIR)
@@ -0,0 +1,73 @@
+import time
+import cv2
+
+DEFAULT_PREVIEW_MAX_FPS = 8
+DEFAULT_PREVIEW_MAX_WIDTH = 960
+DEFAULT_JPEG_QUALITY = 80
+DEFAULT_STATS_INTERVAL = 1.0 # Detik antar update statistik sidebar / progress bar
+
+def encode_preview_jpeg(frame_bgr, max_width=DEFAULT_PREVIEW_MAX_WIDTH, jpeg_quality=DEFAULT_JPEG_QUALITY):
+    """Memperkecil frame (jika lebih lebar dari max_width) lalu meng-encode ke JPEG; mengembalikan bytes."""
+    height, width = frame_bgr.shape[:2]
+    if max_width and width > max_width:
+        frame_bgr = cv2.resize(frame_bgr, (max_width, int(round(height * max_width / width))), interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode(".jpg", frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)])
+    if not ok:
+        raise ValueError("Gagal meng-encode frame pratinjau ke JPEG.")
+    return encoded.tobytes()
+
+class RateLimitedPreview:
+    """
+    Pratinjau frame ke browser yang dibatasi FPS-nya dan dipisahkan dari laju pemrosesan.
+    Frame yang datang lebih cepat dari max_fps dilewati (tanpa resize/encode), frame yang dikirim
+    diperkecil dan di-encode JPEG sekali di sini sehingga Streamlit meneruskan bytes apa adanya
+    (tanpa konversi RGB/PNG resolusi penuh). Statistik sidebar diperbarui dengan timer terpisah.
+    metrics: MetricsRegistry opsional milik sesi untuk mencatat frame yang dilewati dan waktu encode.
+    """
+
+    def __init__(self, placeholder, max_fps=DEFAULT_PREVIEW_MAX_FPS, max_width=DEFAULT_PREVIEW_MAX_WIDTH,
+                 jpeg_quality=DEFAULT_JPEG_QUALITY, stats_interval=DEFAULT_STATS_INTERVAL, source="video", metrics=None):
+        self.placeholder = placeholder
+        self.min_interval = 1.0 / max_fps if max_fps and max_fps > 0 else 0.0
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.stats_interval = stats_interval
+        self.source = source
+        self.metrics = metrics
+        self.sent = 0
+        self.skipped = 0
+        self._last_sent = float("-inf")
+        self._last_stats = float("-inf")
+        self._pending_frame = None # Frame terakhir yang dilewati, dikirim saat flush()
+
+    def offer(self, frame_bgr, force=False):
+        """Menawarkan frame teranotasi (BGR); dikirim hanya jika sudah waktunya. Mengembalikan True jika dikirim."""
+        now = time.monotonic()
+        if not force and now - self._last_sent < self.min_interval:
+            self.skipped += 1
+            self._pending_frame = frame_bgr
+            if self.metrics is not None:
+                self.metrics.inc("pothole_preview_frames_skipped_total", labels={"source": self.source})
+            return False
+        self._last_sent = now
+        self._pending_frame = None
+        start = time.perf_counter()
+        self.placeholder.image(encode_preview_jpeg(frame_bgr, self.max_width, self.jpeg_quality),
+                               output_format="JPEG", use_container_width=True)
+        if self.metrics is not None:
+            self.metrics.observe("pothole_stage_seconds", time.perf_counter() - start, {"stage": "preview"})
+        self.sent += 1
+        return True
+
+    def stats_due(self):
+        """True (dan timer diulang) jika statistik sidebar / progress sudah waktunya diperbarui."""
+        now = time.monotonic()
+        if now - self._last_stats < self.stats_interval:
+            return False
+        self._last_stats = now
+        return True
+
+    def flush(self):
+        """Mengirim frame terakhir yang sempat dilewati agar pratinjau akhir sesuai frame terakhir."""
+        if self._pending_frame is not None:
+            self.offer(self._pending_frame, force=True)
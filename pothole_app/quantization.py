@@ -0,0 +1,101 @@
+import hashlib
+import os
+import re
+import tempfile
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+def list_calibration_images(calibration_dir, max_images=200):
+    """Daftar gambar kalibrasi (terurut, dibatasi max_images) dari sebuah folder."""
+    if not calibration_dir or not os.path.isdir(calibration_dir):
+        raise FileNotFoundError(f"Folder kalibrasi '{calibration_dir}' tidak ditemukan.")
+    paths = sorted(os.path.join(calibration_dir, name) for name in os.listdir(calibration_dir)
+                   if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+    if not paths:
+        raise FileNotFoundError(f"Tidak ada gambar di folder kalibrasi '{calibration_dir}'.")
+    return paths[:max_images]
+
+def calibration_set_hash(image_paths):
+    """Hash isi gambar kalibrasi; perubahan set kalibrasi menghasilkan artefak INT8 baru."""
+    digest = hashlib.sha256()
+    for path in image_paths:
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+def letterbox_preprocess(image_bgr, imgsz=640):
+    """Praproses seperti Ultralytics: letterbox ke imgsz, BGR->RGB, skala 0-1, format NCHW float32."""
+    height, width = image_bgr.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    resized = cv2.resize(image_bgr, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - new_h) // 2, (imgsz - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = resized
+    return np.ascontiguousarray(canvas[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+def _make_calibration_reader(image_paths, input_name, imgsz):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class _FolderCalibrationReader(CalibrationDataReader):
+        """Memberikan gambar kalibrasi satu per satu ke kalibrator ONNX Runtime."""
+        def __init__(self):
+            self._paths = iter(image_paths)
+
+        def get_next(self):
+            for path in self._paths:
+                image = cv2.imread(path, cv2.IMREAD_COLOR)
+                if image is not None:
+                    return {input_name: letterbox_preprocess(image, imgsz)}
+            return None
+
+    return _FolderCalibrationReader()
+
+def _detection_head_nodes(onnx_model):
+    """Nama node pada modul terakhir (head Segment) YOLOv8; dibiarkan FP32 agar akurasi box/mask terjaga."""
+    module_index = re.compile(r"^/model\.(\d+)/")
+    indices = [int(m.group(1)) for node in onnx_model.graph.node if (m := module_index.match(node.name))]
+    if not indices:
+        return []
+    head_prefix = f"/model.{max(indices)}/"
+    return [node.name for node in onnx_model.graph.node if node.name.startswith(head_prefix)]
+
+def build_int8_onnx_model(fp32_onnx_path, output_path, calibration_dir, imgsz=640, max_images=200,
+                          keep_head_fp32=True, calibrate_method="minmax"):
+    """
+    Membuat model ONNX INT8 (format QDQ, bobot per-channel) dari model FP32 dengan kalibrasi statis
+    menggunakan gambar jalan di calibration_dir. Hasil ditulis ke output_path.
+    """
+    import onnx
+    from onnxruntime.quantization import quantize_static, QuantFormat, QuantType, CalibrationMethod
+
+    image_paths = list_calibration_images(calibration_dir, max_images)
+    onnx_model = onnx.load(fp32_onnx_path)
+    input_name = onnx_model.graph.input[0].name
+    nodes_to_exclude = _detection_head_nodes(onnx_model) if keep_head_fp32 else []
+    methods = {"minmax": CalibrationMethod.MinMax, "entropy": CalibrationMethod.Entropy,
+               "percentile": CalibrationMethod.Percentile}
+
+    # Ditulis ke file sementara lalu dipindahkan agar artefak setengah jadi tidak pernah terbaca
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".onnx", dir=output_dir)
+    os.close(fd)
+    try:
+        quantize_static(
+            fp32_onnx_path, tmp_path,
+            calibration_data_reader=_make_calibration_reader(image_paths, input_name, imgsz),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            nodes_to_exclude=nodes_to_exclude,
+            calibrate_method=methods[calibrate_method],
+        )
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
@@ -0,0 +1,165 @@
+# quantization_report.py
+# Laporan akurasi vs kecepatan model INT8 terhadap model FP32 pada gambar yang sama:
+#   - latensi inferensi per gambar (rata-rata, p50, p95)
+#   - box mAP@0.5 dan mAP@0.5:0.95 (prediksi FP32 dipakai sebagai acuan/ground truth)
+#   - galat luas rata-rata (absolut m² dan relatif %) pada deteksi yang berpasangan
+# Contoh (dari folder pothole_app):
+#   python quantization_report.py --calibration calibration_images/ --images data_uji/ --output laporan_int8
+
+import argparse
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from frame_processor import analyze_frames_batch
+from model_loader import load_yolo_model_uncached
+from tracker import iou_matrix
+from batch_cli import collect_input_files, IMAGE_EXTENSIONS
+
+MAP_IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+def average_precision(predictions, references, iou_threshold):
+    """
+    AP satu kelas (interpolasi semua titik, seperti COCO/Ultralytics).
+    predictions / references: list per gambar berisi dict deteksi (x1..y2, confidence).
+    """
+    scored = [] # (confidence, true positive?)
+    n_references = sum(len(r) for r in references)
+    for preds, refs in zip(predictions, references):
+        ref_boxes = np.array([[d["x1"], d["y1"], d["x2"], d["y2"]] for d in refs], dtype=np.float32).reshape(-1, 4)
+        matched = np.zeros(len(refs), dtype=bool)
+        for pred in sorted(preds, key=lambda d: -d["confidence"]):
+            is_tp = False
+            if len(refs):
+                ious = iou_matrix([[pred["x1"], pred["y1"], pred["x2"], pred["y2"]]], ref_boxes)[0]
+                ious[matched] = 0.0
+                best = int(np.argmax(ious))
+                if ious[best] >= iou_threshold:
+                    matched[best] = True
+                    is_tp = True
+            scored.append((pred["confidence"], is_tp))
+    if n_references == 0:
+        return float("nan")
+    if not scored:
+        return 0.0
+
+    scored.sort(key=lambda item: -item[0])
+    tp = np.cumsum([s[1] for s in scored])
+    fp = np.cumsum([not s[1] for s in scored])
+    recall = tp / n_references
+    precision = tp / np.maximum(tp + fp, 1)
+    recall = np.concatenate([[0.0], recall, [1.0]])
+    precision = np.concatenate([[1.0], precision, [0.0]])
+    precision = np.flip(np.maximum.accumulate(np.flip(precision)))
+    changes = np.where(recall[1:] != recall[:-1])[0]
+    return float(np.sum((recall[changes + 1] - recall[changes]) * precision[changes + 1]))
+
+def area_errors(predictions, references, iou_threshold=0.5):
+    """Galat luas absolut (m²) dan relatif antara deteksi INT8 dan FP32 yang berpasangan (IoU >= ambang)."""
+    abs_errors, rel_errors = [], []
+    for preds, refs in zip(predictions, references):
+        if not preds or not refs:
+            continue
+        ious = iou_matrix([[d["x1"], d["y1"], d["x2"], d["y2"]] for d in refs],
+                          [[d["x1"], d["y1"], d["x2"], d["y2"]] for d in preds])
+        for i, ref in enumerate(refs):
+            j = int(np.argmax(ious[i]))
+            if ious[i, j] >= iou_threshold:
+                diff = abs(preds[j]["area_m2"] - ref["area_m2"])
+                abs_errors.append(diff)
+                rel_errors.append(diff / max(ref["area_m2"], 1e-9))
+    return abs_errors, rel_errors
+
+def run_model(model, images, args):
+    """Menjalankan analisis per gambar; mengembalikan deteksi per gambar dan latensi (detik)."""
+    detections, latencies = [], []
+    analyze_frames_batch([images[0]], model, args.conf, args.iou, args.ppm) # Pemanasan
+    for image in images:
+        start = time.perf_counter()
+        (_, details, _), = analyze_frames_batch([image], model, args.conf, args.iou, args.ppm)
+        latencies.append(time.perf_counter() - start)
+        detections.append(details)
+    return detections, np.array(latencies)
+
+def latency_summary(latencies):
+    return {"mean_ms": float(latencies.mean() * 1e3), "p50_ms": float(np.percentile(latencies, 50) * 1e3),
+            "p95_ms": float(np.percentile(latencies, 95) * 1e3)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan akurasi vs kecepatan model INT8 terhadap FP32.")
+    parser.add_argument("--model", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "best.pt"))
+    parser.add_argument("--calibration", required=True, help="Folder gambar jalan untuk kalibrasi INT8.")
+    parser.add_argument("--images", nargs="+", required=True, help="File/direktori gambar evaluasi.")
+    parser.add_argument("--reference-backend", choices=["pytorch", "onnx"], default="onnx",
+                        help="Backend FP32 acuan (onnx = runtime yang sama dengan INT8).")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--ppm", type=float, default=300)
+    parser.add_argument("--output", default="laporan_int8", help="Prefix file laporan (.json dan .md).")
+    args = parser.parse_args()
+
+    image_paths = [p for p in collect_input_files(args.images) if os.path.splitext(p)[1].lower() in IMAGE_EXTENSIONS]
+    images = [img for img in (cv2.imread(p, cv2.IMREAD_COLOR) for p in image_paths) if img is not None]
+    if not images:
+        print("Tidak ada gambar evaluasi yang ditemukan.")
+        return 1
+
+    fp32_model = load_yolo_model_uncached(args.model, args.reference_backend)
+    int8_model = load_yolo_model_uncached(args.model, "onnx-int8", calibration_dir=args.calibration)
+    if fp32_model is None or int8_model is None:
+        return 1
+
+    fp32_detections, fp32_latency = run_model(fp32_model, images, args)
+    int8_detections, int8_latency = run_model(int8_model, images, args)
+    ap_per_iou = [average_precision(int8_detections, fp32_detections, t) for t in MAP_IOU_THRESHOLDS]
+    abs_errors, rel_errors = area_errors(int8_detections, fp32_detections)
+
+    report = {
+        "images": len(images),
+        "reference_backend": args.reference_backend,
+        "settings": {"conf": args.conf, "iou": args.iou, "pixels_per_meter": args.ppm},
+        "latency_fp32": latency_summary(fp32_latency),
+        "latency_int8": latency_summary(int8_latency),
+        "speedup": float(fp32_latency.mean() / int8_latency.mean()),
+        "box_map50": ap_per_iou[0],
+        "box_map50_95": float(np.nanmean(ap_per_iou)),
+        "detections_fp32": sum(len(d) for d in fp32_detections),
+        "detections_int8": sum(len(d) for d in int8_detections),
+        "matched_for_area": len(abs_errors),
+        "mean_area_error_m2": float(np.mean(abs_errors)) if abs_errors else None,
+        "mean_area_error_pct": float(np.mean(rel_errors) * 100) if rel_errors else None,
+        "max_area_error_pct": float(np.max(rel_errors) * 100) if rel_errors else None,
+    }
+
+    with open(args.output + ".json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    fmt = lambda v, spec: "N/A" if v is None or (isinstance(v, float) and np.isnan(v)) else format(v, spec)
+    markdown = f"""# Laporan Kuantisasi INT8 vs FP32
+
+Gambar evaluasi: {report['images']} | Acuan FP32: {report['reference_backend']} | conf {args.conf:.2f}, IoU {args.iou:.2f}, skala {args.ppm} px/m
+
+| Metrik | FP32 | INT8 |
+|---|---|---|
+| Latensi rata-rata (ms) | {report['latency_fp32']['mean_ms']:.1f} | {report['latency_int8']['mean_ms']:.1f} |
+| Latensi p50 (ms) | {report['latency_fp32']['p50_ms']:.1f} | {report['latency_int8']['p50_ms']:.1f} |
+| Latensi p95 (ms) | {report['latency_fp32']['p95_ms']:.1f} | {report['latency_int8']['p95_ms']:.1f} |
+| Jumlah deteksi | {report['detections_fp32']} | {report['detections_int8']} |
+
+- Percepatan INT8: **{report['speedup']:.2f}x**
+- Box mAP@0.5 (acuan = prediksi FP32): **{fmt(report['box_map50'], '.3f')}**
+- Box mAP@0.5:0.95 (acuan = prediksi FP32): **{fmt(report['box_map50_95'], '.3f')}**
+- Galat luas rata-rata ({report['matched_for_area']} deteksi berpasangan): **{fmt(report['mean_area_error_m2'], '.4f')} m²** ({fmt(report['mean_area_error_pct'], '.2f')}%, maks {fmt(report['max_area_error_pct'], '.2f')}%)
+
+Catatan: mAP dihitung terhadap keluaran model FP32 pada gambar yang sama, sehingga mengukur
+seberapa jauh model INT8 menyimpang dari FP32, bukan akurasi absolut terhadap anotasi manual.
+"""
+    with open(args.output + ".md", "w", encoding="utf-8") as f:
+        f.write(markdown)
+    print(markdown)
+    print(f"Laporan disimpan ke {args.output}.json dan {args.output}.md")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
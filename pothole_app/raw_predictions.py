@@ -0,0 +1,221 @@
+import json
+import os
+import tempfile
+import numpy as np
+from detection_store import DetectionStore
+from session_stats import SessionStats
+from tracker import PotholeTracker
+from mask_utils import compute_mask_pixel_counts, compute_mask_ground_areas, pixel_counts_to_area_m2
+
+DEFAULT_CONFIDENCE_FLOOR = 0.05
+DEFAULT_FLUSH_SIZE = 65536 # Rekaman yang ditampung di memori sebelum ditulis ke disk
+
+# Satu rekaman per deteksi mentah (24 byte). Luas disimpan sebagai jumlah piksel mask sehingga
+# skala (piksel per meter) dapat diubah kemudian, ditambah luas terkoreksi perspektif (m², NaN jika sesi
+# tanpa kalibrasi perspektif); box disimpan sebagai int seperti yang dipakai tracking.
+RAW_PREDICTION_DTYPE = np.dtype([
+    ("frame", "<u4"), ("confidence", "<f4"),
+    ("x1", "<u2"), ("y1", "<u2"), ("x2", "<u2"), ("y2", "<u2"),
+    ("pixels", "<u4"), ("ground_area", "<f4"),
+])
+RAW_PREDICTION_DTYPE_V1 = np.dtype([(name, RAW_PREDICTION_DTYPE.fields[name][0]) for name in RAW_PREDICTION_DTYPE.names[:-1]])
+
+class RawPredictionLog:
+    """
+    Log prediksi mentah per frame untuk sesi video/webcam, ditulis ke file biner di disk.
+    Predict dijalankan sekali pada confidence_floor yang rendah dan semua deteksinya dicatat;
+    hasil untuk tampilan langsung disaring ke confidence pengguna (himpunan deteksi sama persis
+    karena NMS tidak pernah menekan box dengan skor lebih tinggi). Setelah sesi selesai, confidence,
+    IoU tracking, umur track, dan skala dapat diubah lewat replay_session() tanpa inferensi ulang.
+    Frame dicatat berurutan mulai dari 1, termasuk frame tanpa deteksi.
+    Jika ground_calibration diberikan, luas terkoreksi perspektif ikut dicatat dan dipakai saat replay
+    (skala piksel per meter tidak berlaku untuk sesi tersebut).
+    Sesi bertile dicatat pada ambang pengguna (fix_confidence): IoU tracking, umur track, dan skala tetap
+    dapat diubah saat replay, tetapi confidence tidak.
+    """
+
+    def __init__(self, confidence_floor=DEFAULT_CONFIDENCE_FLOOR, path=None, dir=None, metadata=None,
+                 flush_size=DEFAULT_FLUSH_SIZE, ground_calibration=None):
+        self.confidence_floor = float(confidence_floor)
+        self.confidence_fixed = False
+        self.ground_calibration = ground_calibration
+        self.dtype = RAW_PREDICTION_DTYPE
+        self.metadata = dict(metadata or {})
+        self.flush_size = flush_size
+        self.frames = 0
+        self.count = 0
+        self._pending = []
+        self._pending_count = 0
+        self._owns_file = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="raw_predictions_", suffix=".bin", dir=dir)
+            os.close(fd)
+        else:
+            open(path, "wb").close()
+        self.path = path
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        """Ukuran log di disk (byte) setelah semua rekaman ditulis."""
+        return self.count * self.dtype.itemsize
+
+    @property
+    def has_ground_area(self):
+        """True jika luas terkoreksi perspektif dicatat (sesi dengan kalibrasi perspektif)."""
+        return self.ground_calibration is not None or self.metadata.get("ground_calibration") is not None
+
+    def predict_confidence(self, confidence_thresh):
+        """Confidence untuk predict: floor log, atau ambang pengguna jika lebih rendah (floor ikut turun)."""
+        if self.confidence_fixed:
+            return self.fix_confidence(confidence_thresh)
+        self.confidence_floor = min(self.confidence_floor, float(confidence_thresh))
+        return self.confidence_floor
+
+    def fix_confidence(self, confidence_thresh):
+        """
+        Confidence untuk predict frame bertile: ambang pengguna itu sendiri. Penggabungan deteksi antar tile
+        bergantung pada ambang, sehingga log hanya dapat di-replay pada confidence ini (rekaman frame tanpa tile
+        yang tercatat sebelumnya pada floor tetap tersaring sama persis).
+        """
+        self.confidence_fixed = True
+        self.confidence_floor = float(confidence_thresh)
+        return self.confidence_floor
+
+    def add_frame(self, result):
+        """Mencatat semua deteksi satu hasil predict (Results dalam koordinat frame) sebagai frame berikutnya."""
+        self.frames += 1
+        if result is None or result.boxes is None or len(result.boxes) == 0:
+            return
+        boxes = result.boxes.xyxy.cpu().numpy().astype(int)
+        records = np.empty(len(boxes), dtype=RAW_PREDICTION_DTYPE)
+        records["frame"] = self.frames
+        records["confidence"] = result.boxes.conf.cpu().numpy()
+        for i, name in enumerate(("x1", "y1", "x2", "y2")):
+            records[name] = np.clip(boxes[:, i], 0, np.iinfo(np.uint16).max)
+        records["pixels"] = compute_mask_pixel_counts(result.masks.data) if result.masks is not None else 0
+        records["ground_area"] = np.nan
+        if self.ground_calibration is not None and result.masks is not None:
+            records["ground_area"] = compute_mask_ground_areas(result.masks.data, result.boxes.xyxy.cpu().numpy(),
+                                                               self.ground_calibration.area_map(result.masks.data.shape[1:]))
+        self._append(records)
+
+    def extend_records(self, records, n_frames):
+        """Menambahkan rekaman RAW_PREDICTION_DTYPE untuk n_frames frame berikutnya (nomor frame relatif mulai dari 1)."""
+        records = np.array(records, dtype=self.dtype)
+        records["frame"] += self.frames
+        self.frames += n_frames
+        self._append(records)
+
+    def _append(self, records):
+        self._pending.append(records)
+        self._pending_count += len(records)
+        self.count += len(records)
+        if self._pending_count >= self.flush_size:
+            self.flush()
+
+    def add_frames(self, results):
+        for result in results:
+            self.add_frame(result)
+
+    def flush(self):
+        """Menulis rekaman yang tertunda ke file log dan memperbarui metadata (file .json di sebelahnya)."""
+        if self._pending:
+            with open(self.path, "ab") as f:
+                np.concatenate(self._pending).tofile(f)
+            self._pending.clear()
+            self._pending_count = 0
+        with open(self.metadata_path(self.path), "w", encoding="utf-8") as f:
+            json.dump({"version": 2, "confidence_floor": self.confidence_floor, "confidence_fixed": self.confidence_fixed,
+                       "frames": self.frames, "count": self.count,
+                       "ground_calibration": self.ground_calibration.name if self.ground_calibration is not None else None,
+                       "metadata": self.metadata}, f, indent=2, default=str)
+
+    @staticmethod
+    def metadata_path(path):
+        return os.path.splitext(path)[0] + ".json"
+
+    def records(self):
+        """Semua rekaman sebagai array terstruktur (memmap, tidak dimuat ke memori sekaligus)."""
+        self.flush()
+        if self.count == 0:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode="r", shape=(self.count,))
+
+    @classmethod
+    def open(cls, path):
+        """Membuka log yang sudah tersimpan (file .bin + .json) untuk replay (juga format versi 1 tanpa ground_area)."""
+        with open(cls.metadata_path(path), "r", encoding="utf-8") as f:
+            info = json.load(f)
+        log = cls.__new__(cls)
+        log.confidence_floor = info["confidence_floor"]
+        log.confidence_fixed = info.get("confidence_fixed", False)
+        log.metadata = info.get("metadata", {})
+        log.metadata.setdefault("ground_calibration", info.get("ground_calibration"))
+        log.ground_calibration = None
+        log.dtype = RAW_PREDICTION_DTYPE if info.get("version", 1) >= 2 else RAW_PREDICTION_DTYPE_V1
+        log.flush_size = DEFAULT_FLUSH_SIZE
+        log.frames = info["frames"]
+        log.count = info["count"]
+        log._pending, log._pending_count = [], 0
+        log._owns_file = False
+        log.path = path
+        return log
+
+    def close(self):
+        """Menghapus file log sementara (log yang dibuka dari path pengguna tidak dihapus)."""
+        self._pending.clear()
+        if self._owns_file:
+            for path in (self.path, self.metadata_path(self.path)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+def replay_session(raw_log, confidence_thresh, tracking_iou_thresh, pixels_per_meter, tracker_max_age=30):
+    """
+    Menghitung ulang hasil sesi dari log prediksi mentah tanpa inferensi: penyaringan confidence,
+    tracking (IoU + umur track), dan luas (piksel -> m²) dijalankan ulang frame demi frame dengan
+    logika yang sama seperti pemrosesan langsung.
+    Untuk log dengan luas terkoreksi perspektif, luas tersebut dipakai dan pixels_per_meter diabaikan.
+    Log sesi bertile (confidence_fixed) hanya dapat di-replay pada confidence saat sesi diproses.
+    Mengembalikan dict berisi DetectionStore, SessionStats, PotholeTracker, dan total luas lubang baru.
+    """
+    if raw_log.confidence_fixed and np.float32(confidence_thresh) != np.float32(raw_log.confidence_floor):
+        raise ValueError(f"Sesi bertile hanya dapat dihitung ulang pada confidence {raw_log.confidence_floor:.2f}.")
+    records = raw_log.records()
+    # Perbandingan float32 > ambang, sama dengan penyaringan NMS Ultralytics pada tensor float32
+    records = records[records["confidence"] > np.float32(confidence_thresh)]
+    frames = np.asarray(records["frame"], dtype=np.int64)
+    boxes = np.zeros((len(records), 4), dtype=np.int64)
+    for i, name in enumerate(("x1", "y1", "x2", "y2")):
+        boxes[:, i] = records[name]
+    confidences = np.asarray(records["confidence"], dtype=np.float64)
+    areas = pixel_counts_to_area_m2(records["pixels"], pixels_per_meter)
+    if "ground_area" in records.dtype.names:
+        ground_areas = np.asarray(records["ground_area"], dtype=np.float64)
+        areas = np.where(np.isnan(ground_areas), areas, ground_areas)
+    valid_box = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+    areas = np.where(valid_box, areas, 0.0)
+    # Rekaman sudah terurut per frame: batas tiap frame dicari sekaligus
+    bounds = np.searchsorted(frames, np.arange(1, raw_log.frames + 2))
+
+    store, stats = DetectionStore(), SessionStats()
+    tracker = PotholeTracker(max_age=tracker_max_age)
+    total_new_area = 0.0
+    for frame_index in range(1, raw_log.frames + 1):
+        start, end = bounds[frame_index - 1], bounds[frame_index]
+        track_ids, new_flags = tracker.update(boxes[start:end], tracking_iou_thresh, commit=True)
+        details = []
+        for offset, i in enumerate(range(start, end)):
+            x1, y1, x2, y2 = (int(v) for v in boxes[i])
+            details.append({"frame": frame_index, "track_id": track_ids[offset], "confidence": float(confidences[i]),
+                            "area_m2": float(areas[i]), "is_new": new_flags[offset],
+                            "x1": x1, "y1": y1, "x2": x2, "y2": y2})
+            if new_flags[offset]:
+                total_new_area += float(areas[i])
+        store.extend(details)
+        stats.update(frame_index, details)
+    return {"detections": store, "session_stats": stats, "tracker": tracker, "total_new_area": total_new_area}
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_ENTRIES = 8
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024 # Total ukuran artefak (PDF + grafik) yang disimpan
+
+def make_report_key(content_hash, **params):
+    """Kunci cache dari hash isi deteksi dan parameter laporan (urutan parameter tidak berpengaruh)."""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.blake2b(f"{content_hash}|{payload}".encode("utf-8"), digest_size=16).hexdigest()
+
+def _artifact_size(result):
+    if isinstance(result, dict):
+        return sum(len(value) for value in result.values() if isinstance(value, (bytes, bytearray)))
+    return len(result) if isinstance(result, (bytes, bytearray)) else 0
+
+class ReportCache:
+    """
+    Cache LRU untuk artefak laporan (PDF, grafik PNG) yang dibangun di thread latar.
+    Setiap kunci dibangun satu kali: pemanggilan berikutnya mendapat Future yang sama, baik yang
+    masih diproses maupun yang sudah selesai. Entri selesai tertua dibuang jika jumlah entri
+    atau total ukurannya melewati batas. Entri yang gagal tidak disimpan agar dapat dicoba lagi.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, max_workers=1):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # kunci -> Future
+        self._sizes = {}
+        self._lock = threading.Lock()
+        # Satu worker: matplotlib (pyplot) dan ReportLab tidak dijalankan paralel
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-cache")
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_submit(self, key, build_fn, *args, **kwargs):
+        """Future berisi hasil build_fn(*args, **kwargs) untuk kunci ini; dibangun hanya jika belum ada."""
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return future
+            self.misses += 1
+            future = self._executor.submit(build_fn, *args, **kwargs)
+            self._entries[key] = future
+        future.add_done_callback(lambda done, key=key: self._on_done(key, done))
+        return future
+
+    def get(self, key):
+        """Future untuk kunci ini atau None."""
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None:
+                self._entries.move_to_end(key)
+            return future
+
+    def _on_done(self, key, future):
+        with self._lock:
+            if self._entries.get(key) is not future:
+                return
+            if future.cancelled() or future.exception() is not None:
+                del self._entries[key]
+                return
+            self._sizes[key] = _artifact_size(future.result())
+            self._evict()
+
+    def _evict(self):
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_entries and self.total_bytes <= self.max_bytes:
+                return
+            if self._entries[key].done(): # Entri yang masih dibangun tidak dibuang
+                del self._entries[key]
+                self._sizes.pop(key, None)
+
+    @property
+    def total_bytes(self):
+        return sum(self._sizes.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+
+# Cache bersama untuk semua sesi Streamlit dalam proses ini
+REPORT_CACHE = ReportCache()
@@ -1,20 +1,133 @@
 import streamlit as st 
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as ReportLabImage, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as ReportLabImage, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
+from reportlab import rl_config
+from contextlib import contextmanager
 from datetime import datetime
 import tempfile
 import os
+from itertools import islice
+import numpy as np
 import pandas as pd
+from plot_utils import create_static_summary_plot_from_chart_data
+
+# Laporan lengkap menulis stream (thumbnail JPEG, konten halaman) biner, bukan ASCII85: tanpa ekstensi C rl_accel
+# encoder ASCII85 berjalan di Python murni (~3,7x lebih lambat, PDF ~24% lebih besar; lihat benchmarks/bench_report.py)
+FULL_REPORT_BINARY_STREAMS = True
+
+# --- Lampiran lengkap (mode laporan penuh) ---
+APPENDIX_ROW_HEIGHT = 0.55*inch
+APPENDIX_HEADER_HEIGHT = 0.3*inch
+APPENDIX_THUMB_SIZE = 0.5*inch
+APPENDIX_COL_WIDTHS = [0.5*inch, 0.7*inch, 0.8*inch, 0.8*inch, 1.0*inch, 1.1*inch, 2.1*inch]
+APPENDIX_HEADER = ["No", "Foto", "Track ID", "Frame", "Confidence", "Luas", "Bounding Box (x1, y1, x2, y2)"]
+APPENDIX_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#4F8BFF")),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor("#EFF5FF")]),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+])
+
+@contextmanager
+def _binary_pdf_streams(enabled=True):
+    """Menonaktifkan filter ASCII85 ReportLab (rl_config global) hanya selama blok ini, lalu memulihkannya."""
+    previous = rl_config.useA85
+    if enabled:
+        rl_config.useA85 = 0
+    try:
+        yield
+    finally:
+        rl_config.useA85 = previous
+
+class _LazyFlowables(Flowable):
+    """Penanda di story yang diganti dengan potongan flowable berikutnya dari sebuah iterator saat dibangun."""
+
+    def __init__(self, chunks):
+        super().__init__()
+        self._chunks = iter(chunks)
+
+    def next_chunk(self):
+        return next(self._chunks, None)
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        pass
+
+class _StreamingDocTemplate(SimpleDocTemplate):
+    """
+    SimpleDocTemplate yang mengisi story secara bertahap: setiap _LazyFlowables diganti potongan
+    berikutnya hanya saat akan digambar, sehingga hanya satu halaman lampiran yang ada di memori.
+    """
+
+    def handle_flowable(self, flowables):
+        while flowables and isinstance(flowables[0], _LazyFlowables):
+            chunk = flowables[0].next_chunk()
+            if chunk is None:
+                del flowables[0]
+            else:
+                flowables[0:0] = chunk
+        if flowables:
+            super().handle_flowable(flowables)
+
+def _appendix_rows_per_page(doc):
+    return max(1, int((doc.height - APPENDIX_HEADER_HEIGHT) // APPENDIX_ROW_HEIGHT))
+
+def _appendix_rows(df_detections, thumbnails):
+    """Baris lampiran (list sel) untuk setiap lubang unik (baris is_new), dibuat satu per satu."""
+    new_rows = np.flatnonzero(df_detections['is_new'].to_numpy())
+    columns = {name: df_detections[name].to_numpy() for name in ("frame", "confidence", "area_m2", "x1", "y1", "x2", "y2")}
+    track_ids = df_detections['track_id'].to_numpy() if 'track_id' in df_detections.columns else None
+    for ordinal, row in enumerate(new_rows):
+        thumb_path = thumbnails.path(ordinal) if thumbnails is not None else None
+        thumb = ReportLabImage(thumb_path, width=APPENDIX_THUMB_SIZE, height=APPENDIX_THUMB_SIZE, kind='proportional') if thumb_path else "-"
+        track_id = int(track_ids[row]) if track_ids is not None and track_ids[row] >= 0 else "-"
+        yield [ordinal + 1, thumb, track_id, int(columns["frame"][row]),
+               f"{columns['confidence'][row] * 100:.1f}%", f"{columns['area_m2'][row]:.3f} m²",
+               f"{columns['x1'][row]}, {columns['y1'][row]}, {columns['x2'][row]}, {columns['y2'][row]}"]
+
+def _appendix_table(rows):
+    table = Table([APPENDIX_HEADER] + rows, colWidths=APPENDIX_COL_WIDTHS,
+                  rowHeights=[APPENDIX_HEADER_HEIGHT] + [APPENDIX_ROW_HEIGHT] * len(rows), repeatRows=1)
+    table.setStyle(APPENDIX_TABLE_STYLE)
+    return table
+
+def _appendix_chunks(df_detections, thumbnails, rows_per_chunk):
+    """Tabel lampiran per halaman; tabel berikutnya baru dibuat setelah tabel sebelumnya digambar."""
+    rows = _appendix_rows(df_detections, thumbnails)
+    while True:
+        chunk = list(islice(rows, rows_per_chunk))
+        if not chunk:
+            return
+        yield [_appendix_table(chunk)]
 
 # --- Fungsi untuk Membuat Laporan PDF ---
-def create_detection_report_pdf(report_data, summary_image_path=None, model_path_display="N/A", logo_path_display=None):
-    """Membuat laporan PDF dari data deteksi."""
+def _scale_description(report_data):
+    """Teks referensi skala: kalibrasi perspektif (jika dipakai) atau piksel per meter."""
+    if report_data.get('ground_calibration'):
+        return f"kalibrasi perspektif bidang jalan '{report_data['ground_calibration']}' (luas per piksel sesuai jarak)"
+    return f"{report_data['pixels_per_meter']} piksel per meter"
+
+def create_detection_report_pdf(report_data, summary_image_path=None, model_path_display="N/A", logo_path_display=None,
+                                full_appendix=False, thumbnails=None):
+    """
+    Membuat laporan PDF dari data deteksi.
+    full_appendix=True menambahkan lampiran berisi setiap lubang unik (dengan thumbnail dari ThumbnailStore
+    jika diberikan) menggantikan tabel contoh 20 baris. Lampiran ditulis per halaman sehingga memori kerja
+    tetap datar untuk puluhan ribu baris.
+    """
     buffer = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
+    buffer.close()
     # Mengurangi margin atas dan bawah sedikit untuk memberi lebih banyak ruang
-    doc = SimpleDocTemplate(buffer.name, pagesize=letter, topMargin=0.6*inch, bottomMargin=0.6*inch, leftMargin=0.75*inch, rightMargin=0.75*inch)
+    doc = _StreamingDocTemplate(buffer.name, pagesize=letter, topMargin=0.6*inch, bottomMargin=0.6*inch, leftMargin=0.75*inch, rightMargin=0.75*inch)
     styles = getSampleStyleSheet()
     
     # Custom styles
@@ -47,7 +160,7 @@ def create_detection_report_pdf(report_data, summary_image_path=None, model_path
     story.append(Paragraph(f"<b>Model Digunakan:</b> YOLOv8-seg", styles['Normal']))
     story.append(Paragraph(f"<b>Confidence Threshold:</b> {report_data['confidence_threshold']:.2f}", styles['Normal']))
     story.append(Paragraph(f"<b>IoU Threshold:</b> {report_data['iou_threshold']:.2f}", styles['Normal']))
-    story.append(Paragraph(f"<b>Referensi Skala:</b> {report_data['pixels_per_meter']} piksel/meter", styles['Normal']))
+    story.append(Paragraph(f"<b>Referensi Skala:</b> {_scale_description(report_data)}", styles['Normal']))
     story.append(Spacer(1, 0.2 * inch))
 
     story.append(Paragraph("Ringkasan Statistik Deteksi:", styles['h2']))
@@ -88,7 +201,7 @@ def create_detection_report_pdf(report_data, summary_image_path=None, model_path
         except Exception as e:
             print(f"Error adding image to PDF: {e}")
 
-    if not report_data['df_all_detections'].empty:
+    if not full_appendix and not report_data['df_all_detections'].empty:
         story.append(Paragraph("Detail Deteksi per Frame (Contoh):", styles['h2']))
         
         df_for_report = report_data['df_all_detections'][["frame", "confidence", "area_m2"]].copy() # Buat salinan untuk modifikasi
@@ -131,7 +244,7 @@ def create_detection_report_pdf(report_data, summary_image_path=None, model_path
     Laporan ini merangkum hasil deteksi lubang jalan dari analisis video menggunakan model YOLOv8-seg.
     Parameter utama yang digunakan dalam sesi deteksi ini adalah: ambang batas keyakinan sebesar 
     {report_data['confidence_threshold']:.2f} dan ambang batas IoU (Intersection over Union) sebesar {report_data['iou_threshold']:.2f}.
-    Referensi skala yang digunakan untuk estimasi luas adalah {report_data['pixels_per_meter']} piksel per meter.
+    Referensi skala yang digunakan untuk estimasi luas adalah {_scale_description(report_data)}.
     <br/><br/>
     <b>Total Lubang Unik Terdeteksi</b> menunjukkan jumlah lubang berbeda yang berhasil diidentifikasi dan dilacak selama analisis.
     <b>Total Estimasi Luas Lubang Unik</b> adalah akumulasi luas dari lubang-lubang unik tersebut.
@@ -147,5 +260,36 @@ def create_detection_report_pdf(report_data, summary_image_path=None, model_path
     story.append(Paragraph(f"Laporan dihasilkan oleh Aplikasi Deteksi Lubang Jalan", styles[' 작은 '])) 
     story.append(Paragraph(f"© {datetime.now().year} Akbar Johan Firdaus - Universitas Udayana", styles[' 작은 ']))
 
-    doc.build(story)
-    return buffer.name
\ No newline at end of file
+    if full_appendix and not report_data['df_all_detections'].empty:
+        story.append(PageBreak())
+        story.append(Paragraph("Lampiran: Daftar Semua Lubang Unik", styles['h2']))
+        story.append(_LazyFlowables(_appendix_chunks(report_data['df_all_detections'], thumbnails, _appendix_rows_per_page(doc))))
+
+    with _binary_pdf_streams(full_appendix and FULL_REPORT_BINARY_STREAMS):
+        doc.build(story)
+    return buffer.name
+
+def create_detection_report_artifacts(report_data, chart_data=None, model_path_display="N/A", logo_path_display=None,
+                                      full_appendix=False, thumbnails=None):
+    """
+    Membangun grafik ringkasan dan PDF lalu mengembalikannya sebagai bytes
+    ({'pdf': ..., 'chart_png': ... atau None}); file sementara langsung dihapus.
+    Dipakai oleh ReportCache sehingga hasilnya dapat disajikan ulang tanpa membangun ulang.
+    """
+    static_plot_path = create_static_summary_plot_from_chart_data(chart_data)
+    pdf_path = None
+    try:
+        pdf_path = create_detection_report_pdf(report_data, summary_image_path=static_plot_path,
+                                               model_path_display=model_path_display, logo_path_display=logo_path_display,
+                                               full_appendix=full_appendix, thumbnails=thumbnails)
+        with open(pdf_path, "rb") as pdf_file:
+            pdf_bytes = pdf_file.read()
+        chart_png = None
+        if static_plot_path and os.path.exists(static_plot_path):
+            with open(static_plot_path, "rb") as plot_file:
+                chart_png = plot_file.read()
+        return {'pdf': pdf_bytes, 'chart_png': chart_png}
+    finally:
+        for path in (pdf_path, static_plot_path):
+            if path and os.path.exists(path):
+                os.remove(path)
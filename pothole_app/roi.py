@@ -0,0 +1,186 @@
+import json
+import os
+import cv2
+import numpy as np
+
+DEFAULT_ROI_PROFILES_PATH = os.environ.get(
+    "POTHOLE_ROI_PROFILES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "roi_profiles.json"))
+ROI_FILL_VALUE = 114 # Abu-abu yang sama dengan padding letterbox Ultralytics
+MIN_INSIDE_FRACTION = 0.5 # Porsi minimum mask yang berada di dalam ROI agar deteksi dipertahankan
+DEFAULT_TRAPEZOID = {"top_y": 0.55, "bottom_y": 1.0, "top_width": 0.35, "bottom_width": 1.0, "center_x": 0.5}
+
+class RoiProfile:
+    """
+    Region of interest jalan untuk satu kamera, berupa poligon dalam koordinat ternormalisasi (0-1)
+    sehingga berlaku untuk resolusi frame apa pun dari kamera yang sama.
+    Sebelum predict, frame dipotong ke persegi pembatas poligon dan (jika mask_outside) area di luar
+    poligon ditutup warna abu-abu; hasil deteksi dipetakan kembali ke koordinat frame asli.
+    """
+
+    def __init__(self, name, polygon, mask_outside=True, trapezoid=None):
+        points = [(min(max(float(x), 0.0), 1.0), min(max(float(y), 0.0), 1.0)) for x, y in polygon]
+        if len(points) < 3:
+            raise ValueError("Poligon ROI membutuhkan minimal 3 titik.")
+        self.name = str(name).strip()
+        if not self.name:
+            raise ValueError("Nama profil ROI tidak boleh kosong.")
+        self.polygon = points
+        self.mask_outside = bool(mask_outside)
+        self.trapezoid = trapezoid # Parameter pembentuk jika profil dibuat sebagai trapesium (untuk diedit ulang di UI)
+        self._geometry = {} # (tinggi, lebar) frame -> (region, mask dalam-ROI, latar abu-abu)
+
+    @classmethod
+    def from_trapezoid(cls, name, top_y, bottom_y, top_width, bottom_width, center_x=0.5, mask_outside=True):
+        """Trapesium simetris (tipikal jalan pada dashcam): lebar atas/bawah dalam porsi lebar frame."""
+        if bottom_y <= top_y:
+            raise ValueError("Batas bawah trapesium harus di bawah batas atas.")
+        polygon = [(center_x - top_width / 2, top_y), (center_x + top_width / 2, top_y),
+                   (center_x + bottom_width / 2, bottom_y), (center_x - bottom_width / 2, bottom_y)]
+        params = {"top_y": top_y, "bottom_y": bottom_y, "top_width": top_width, "bottom_width": bottom_width,
+                  "center_x": center_x}
+        return cls(name, polygon, mask_outside=mask_outside, trapezoid=params)
+
+    def to_dict(self):
+        data = {"polygon": [[round(x, 4), round(y, 4)] for x, y in self.polygon], "mask_outside": self.mask_outside}
+        if self.trapezoid is not None:
+            data["trapezoid"] = self.trapezoid
+        return data
+
+    @classmethod
+    def from_dict(cls, name, data):
+        return cls(name, data["polygon"], mask_outside=data.get("mask_outside", True), trapezoid=data.get("trapezoid"))
+
+    def polygon_px(self, width, height):
+        """Titik poligon dalam piksel frame (int32, siap untuk fungsi gambar OpenCV)."""
+        return np.array([[round(x * (width - 1)), round(y * (height - 1))] for x, y in self.polygon], dtype=np.int32)
+
+    def geometry(self, frame_shape):
+        """
+        (region (x1, y1, x2, y2), mask dalam-ROI uint8 seukuran region, latar abu-abu seukuran region),
+        dihitung sekali per resolusi frame.
+        """
+        height, width = frame_shape[:2]
+        cached = self._geometry.get((height, width))
+        if cached is None:
+            points = self.polygon_px(width, height)
+            x, y, w, h = cv2.boundingRect(points)
+            region = (x, y, min(x + w, width), min(y + h, height))
+            inside = np.zeros((region[3] - region[1], region[2] - region[0]), dtype=np.uint8)
+            cv2.fillPoly(inside, [points - np.array([x, y], dtype=np.int32)], 1)
+            background = np.full((*inside.shape, 3), ROI_FILL_VALUE, dtype=np.uint8)
+            cached = (region, inside, background)
+            self._geometry[(height, width)] = cached
+        return cached
+
+    def pixel_fraction(self, frame_shape):
+        """Porsi piksel frame yang masuk ke model setelah dipotong ke ROI."""
+        (x1, y1, x2, y2), _, _ = self.geometry(frame_shape)
+        return (x2 - x1) * (y2 - y1) / float(frame_shape[0] * frame_shape[1])
+
+    def crop(self, frame):
+        """Potongan frame yang diberikan ke model (view jika mask_outside=False, salinan bertopeng jika True)."""
+        (x1, y1, x2, y2), inside, background = self.geometry(frame.shape)
+        crop = frame[y1:y2, x1:x2]
+        if not self.mask_outside:
+            return crop
+        return cv2.copyTo(crop, inside, background.copy())
+
+    def to_frame_result(self, result, frame):
+        """
+        Memetakan hasil predict pada potongan ROI ke koordinat frame asli: box digeser, mask ditempatkan
+        ke kanvas resolusi penuh, dan deteksi yang sebagian besar berada di luar poligon dibuang.
+        """
+        import torch
+        from ultralytics.engine.results import Results
+
+        (x1, y1, x2, y2), inside, _ = self.geometry(frame.shape)
+        names = getattr(result, "names", None) or {0: "pothole"}
+        if result.boxes is None or len(result.boxes) == 0:
+            return Results(frame, path="", names=names, boxes=torch.zeros((0, 6), dtype=torch.float32))
+
+        boxes = result.boxes.data.cpu().numpy()[:, :6].copy()
+        masks = result.masks.data.cpu().numpy() if result.masks is not None else None
+        if masks is not None and masks.dtype.kind == "f":
+            masks = (masks > 0.5).astype(np.uint8)
+        keep = [i for i in range(len(boxes))
+                if self._inside_fraction(boxes[i], None if masks is None else masks[i], inside) >= MIN_INSIDE_FRACTION]
+        if not keep:
+            return Results(frame, path="", names=names, boxes=torch.zeros((0, 6), dtype=torch.float32))
+        boxes = boxes[keep]
+        boxes[:, [0, 2]] += x1
+        boxes[:, [1, 3]] += y1
+        full_masks = None
+        if masks is not None:
+            full_masks = np.zeros((len(keep), *frame.shape[:2]), dtype=np.uint8)
+            full_masks[:, y1:y2, x1:x2] = masks[keep]
+            full_masks = torch.from_numpy(full_masks)
+        return Results(frame, path="", names=names, boxes=torch.from_numpy(boxes), masks=full_masks)
+
+    @staticmethod
+    def _inside_fraction(box, mask, inside):
+        """Porsi mask (atau titik tengah box jika tanpa mask) yang berada di dalam poligon ROI."""
+        height, width = inside.shape
+        if mask is None:
+            cx, cy = int((box[0] + box[2]) / 2), int((box[1] + box[3]) / 2)
+            return float(inside[min(max(cy, 0), height - 1), min(max(cx, 0), width - 1)])
+        bx1, by1 = max(0, int(box[0])), max(0, int(box[1]))
+        bx2, by2 = min(width, int(np.ceil(box[2]))), min(height, int(np.ceil(box[3])))
+        mask_region = mask[by1:by2, bx1:bx2]
+        total = np.count_nonzero(mask_region)
+        if total == 0:
+            return 0.0
+        return np.count_nonzero(mask_region & inside[by1:by2, bx1:bx2]) / total
+
+    def draw_outline(self, frame, color=(0, 255, 255), thickness=2):
+        """Menggambar batas ROI pada frame (in-place)."""
+        cv2.polylines(frame, [self.polygon_px(frame.shape[1], frame.shape[0])], True, color, thickness, cv2.LINE_AA)
+        return frame
+
+def predict_with_roi(predict_fn, frames, roi):
+    """Menjalankan predict_fn(list potongan) pada potongan ROI lalu memetakan hasilnya ke setiap frame asli."""
+    results = predict_fn([roi.crop(frame) for frame in frames])
+    return [roi.to_frame_result(result, frame) for result, frame in zip(results, frames)]
+
+def load_roi_profiles(path=DEFAULT_ROI_PROFILES_PATH):
+    """Semua profil ROI tersimpan {nama: RoiProfile}; kosong jika file belum ada."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {name: RoiProfile.from_dict(name, profile) for name, profile in data.get("profiles", {}).items()}
+
+def _write_profiles(profiles, path):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "profiles": {name: p.to_dict() for name, p in sorted(profiles.items())}}, f, indent=2)
+    os.replace(tmp_path, path) # Atomik: file profil tidak pernah setengah tertulis
+
+def save_roi_profile(profile, path=DEFAULT_ROI_PROFILES_PATH):
+    """Menyimpan (atau menimpa) profil ROI berdasarkan namanya."""
+    profiles = load_roi_profiles(path)
+    profiles[profile.name] = profile
+    _write_profiles(profiles, path)
+
+def delete_roi_profile(name, path=DEFAULT_ROI_PROFILES_PATH):
+    profiles = load_roi_profiles(path)
+    if profiles.pop(name, None) is not None:
+        _write_profiles(profiles, path)
+
+def parse_polygon_text(text):
+    """Titik poligon dari teks 'x,y' per baris (atau dipisah ';'), dalam porsi 0-1 lebar/tinggi frame."""
+    points = []
+    for part in text.replace(";", "\n").splitlines():
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            x, y = (float(v) for v in part.split(","))
+        except ValueError:
+            raise ValueError(f"Titik poligon tidak valid: '{part}' (format: x,y)")
+        points.append((x, y))
+    return points
+
+def format_polygon_text(polygon):
+    return "\n".join(f"{x:.3f},{y:.3f}" for x, y in polygon)
@@ -0,0 +1,121 @@
+import math
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_CHART_POINTS = 512
+
+class RunningStats:
+    """Rata-rata/min/maks streaming (O(1) per nilai, memori konstan)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    @property
+    def minimum(self):
+        return self.min if self.count else None
+
+    @property
+    def maximum(self):
+        return self.max if self.count else None
+
+class SessionStats:
+    """
+    Agregat ringkasan sesi video/webcam yang diperbarui per frame.
+    Menggantikan groupby pandas atas seluruh deteksi di setiap rerun: statistik luas lubang baru
+    dan data grafik per frame tersedia dalam waktu konstan berapa pun panjang sesi.
+
+    Deret waktu disimpan dalam max_points bucket berurutan. Jika nomor frame melewati kapasitas,
+    lebar bucket digandakan dan setiap pasangan bucket digabung (downsampling), sehingga memori tetap.
+    Selama lebar bucket = 1, data grafik identik dengan agregasi per frame sebelumnya.
+    """
+
+    def __init__(self, max_points=DEFAULT_MAX_CHART_POINTS):
+        self.max_points = max(2, int(max_points)) // 2 * 2 # Genap agar bucket dapat digabung berpasangan
+        self.frames_processed = 0
+        self.total_detections = 0
+        self.new_potholes = 0
+        self.new_area_all = RunningStats() # Semua lubang baru (untuk luas terbesar)
+        self.new_area_valid = RunningStats() # Lubang baru dengan luas > 0 (untuk rata-rata & terkecil)
+        self.bucket_width = 1
+        self._new_counts = np.zeros(self.max_points, dtype=np.int64)
+        self._area_sums = np.zeros(self.max_points, dtype=np.float64)
+        self._area_counts = np.zeros(self.max_points, dtype=np.int64)
+
+    def _downsample(self):
+        for series in (self._new_counts, self._area_sums, self._area_counts):
+            merged = series.reshape(-1, 2).sum(axis=1)
+            series[:merged.size] = merged
+            series[merged.size:] = 0
+        self.bucket_width *= 2
+
+    def update(self, frame_index, frame_potholes_info):
+        """Memperbarui agregat dengan info lubang satu frame (format frame_processor)."""
+        self.frames_processed += 1
+        self.total_detections += len(frame_potholes_info)
+        new_count, area_sum, area_count = 0, 0.0, 0
+        for pothole in frame_potholes_info:
+            if not pothole["is_new"]:
+                continue
+            area = pothole["area_m2"]
+            new_count += 1
+            self.new_area_all.add(area)
+            if area > 0:
+                area_sum += area
+                area_count += 1
+                self.new_area_valid.add(area)
+        if new_count == 0:
+            return
+        self.new_potholes += new_count
+        bucket = frame_index // self.bucket_width
+        while bucket >= self.max_points:
+            self._downsample()
+            bucket = frame_index // self.bucket_width
+        self._new_counts[bucket] += new_count
+        self._area_sums[bucket] += area_sum
+        self._area_counts[bucket] += area_count
+
+    @property
+    def avg_area_new(self):
+        return self.new_area_valid.mean
+
+    @property
+    def max_area_new(self):
+        return self.new_area_all.maximum
+
+    @property
+    def min_area_new(self):
+        return self.new_area_valid.minimum
+
+    @property
+    def avg_detections_per_frame(self):
+        return self.total_detections / self.frames_processed if self.frames_processed else None
+
+    def chart_data(self):
+        """
+        DataFrame grafik (indeks 'frame' = frame awal bucket) dengan kolom 'Jumlah Lubang Baru'
+        dan 'Rata-rata Luas Baru (m²)'; None jika belum ada lubang baru. Ukurannya maksimal max_points baris.
+        """
+        buckets = np.flatnonzero(self._new_counts)
+        if buckets.size == 0:
+            return None
+        area_counts = self._area_counts[buckets]
+        avg_area = np.divide(self._area_sums[buckets], area_counts, out=np.zeros(buckets.size), where=area_counts > 0)
+        chart_data = pd.DataFrame({'frame': buckets * self.bucket_width,
+                                   'Jumlah Lubang Baru': self._new_counts[buckets],
+                                   'Rata-rata Luas Baru (m²)': avg_area})
+        return chart_data.set_index('frame')
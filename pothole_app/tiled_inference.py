@@ -0,0 +1,177 @@
+import numpy as np
+
+DEFAULT_TILE_SIZE = 640
+DEFAULT_TILE_OVERLAP = 0.2
+SEAM_MARGIN_PX = 2 # Jarak maksimum box ke tepi tile agar dianggap terpotong seam
+
+class TilingConfig:
+    """
+    Pengaturan inferensi bertile untuk citra resolusi tinggi.
+    tile_size         : sisi tile (piksel frame asli) sekaligus imgsz predict, sehingga tile tidak diperkecil.
+    overlap           : porsi tumpang tindih antar tile (0-0.5).
+    include_full_frame: ikut menjalankan frame utuh (diperkecil ke tile_size) dalam batch yang sama
+                        agar lubang besar yang terbelah banyak tile tetap terdeteksi utuh.
+    merge_ios         : ambang intersection-over-smaller mask untuk menggabungkan deteksi dari tile berbeda.
+    """
+
+    def __init__(self, tile_size=DEFAULT_TILE_SIZE, overlap=DEFAULT_TILE_OVERLAP, include_full_frame=True, merge_ios=0.5):
+        self.tile_size = int(tile_size)
+        self.overlap = min(max(float(overlap), 0.0), 0.5)
+        self.include_full_frame = include_full_frame
+        self.merge_ios = merge_ios
+
+    def needs_tiling(self, frame_shape):
+        """Tiling hanya bermanfaat jika frame lebih besar dari satu tile."""
+        return max(frame_shape[:2]) > self.tile_size
+
+def compute_tiles(height, width, tile_size, overlap=DEFAULT_TILE_OVERLAP):
+    """Daftar region tile (x1, y1, x2, y2) yang menutup seluruh frame; tile terakhir disejajarkan ke tepi."""
+    stride = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, stride))
+        return positions + [length - tile_size]
+
+    return [(x, y, min(x + tile_size, width), min(y + tile_size, height)) for y in starts(height) for x in starts(width)]
+
+class _Detection:
+    """Deteksi dalam koordinat frame; mask disimpan terpotong pada box-nya (hemat memori untuk frame 4K)."""
+    __slots__ = ("box", "conf", "cls", "mask", "truncated")
+
+    def __init__(self, box, conf, cls, mask, truncated):
+        self.box = box # (x1, y1, x2, y2) int, x2/y2 eksklusif
+        self.conf = conf
+        self.cls = cls
+        self.mask = mask # bool (y2 - y1, x2 - x1)
+        self.truncated = truncated
+
+    @property
+    def area(self):
+        return int(np.count_nonzero(self.mask))
+
+def _extract_detections(result, region, frame_shape):
+    """Deteksi dari hasil predict satu tile (region) atau frame utuh (region=None) dalam koordinat frame."""
+    if result.boxes is None or len(result.boxes) == 0:
+        return []
+    frame_h, frame_w = frame_shape[:2]
+    offset_x, offset_y = (region[0], region[1]) if region is not None else (0, 0)
+    data = result.boxes.data.cpu().numpy()
+    masks = result.masks.data.cpu().numpy() if result.masks is not None else None
+    local_h, local_w = result.orig_shape[:2]
+    detections = []
+    for i, (bx1, by1, bx2, by2, conf, cls) in enumerate(data[:, :6]):
+        # Box lokal dibulatkan keluar lalu dipotong ke batas tile
+        lx1, ly1 = max(0, int(np.floor(bx1))), max(0, int(np.floor(by1)))
+        lx2, ly2 = min(local_w, int(np.ceil(bx2))), min(local_h, int(np.ceil(by2)))
+        if lx2 <= lx1 or ly2 <= ly1:
+            continue
+        if masks is not None:
+            mask = masks[i, ly1:ly2, lx1:lx2] > 0.5
+        else:
+            mask = np.ones((ly2 - ly1, lx2 - lx1), dtype=bool)
+        truncated = False
+        if region is not None:
+            tx1, ty1, tx2, ty2 = region
+            truncated = ((tx1 > 0 and lx1 <= SEAM_MARGIN_PX) or (ty1 > 0 and ly1 <= SEAM_MARGIN_PX) or
+                         (tx2 < frame_w and lx2 >= (tx2 - tx1) - SEAM_MARGIN_PX) or
+                         (ty2 < frame_h and ly2 >= (ty2 - ty1) - SEAM_MARGIN_PX))
+        box = (lx1 + offset_x, ly1 + offset_y, lx2 + offset_x, ly2 + offset_y)
+        detections.append(_Detection(box, float(conf), int(cls), mask, truncated))
+    return detections
+
+def _mask_overlap(a, b):
+    """Jumlah piksel mask yang beririsan (dihitung hanya di irisan kedua box)."""
+    x1, y1 = max(a.box[0], b.box[0]), max(a.box[1], b.box[1])
+    x2, y2 = min(a.box[2], b.box[2]), min(a.box[3], b.box[3])
+    if x2 <= x1 or y2 <= y1:
+        return 0
+    region_a = a.mask[y1 - a.box[1]:y2 - a.box[1], x1 - a.box[0]:x2 - a.box[0]]
+    region_b = b.mask[y1 - b.box[1]:y2 - b.box[1], x1 - b.box[0]:x2 - b.box[0]]
+    return int(np.count_nonzero(region_a & region_b))
+
+def _should_merge(a, b, merge_ios):
+    if a.cls != b.cls:
+        return False
+    overlap = _mask_overlap(a, b)
+    if overlap == 0:
+        return False
+    if (a.truncated or b.truncated):
+        # Potongan lubang yang terbelah seam hanya beririsan di area overlap tile
+        return True
+    smaller = min(a.area, b.area)
+    return smaller > 0 and overlap / smaller >= merge_ios
+
+def _merge_pair(a, b):
+    x1, y1 = min(a.box[0], b.box[0]), min(a.box[1], b.box[1])
+    x2, y2 = max(a.box[2], b.box[2]), max(a.box[3], b.box[3])
+    mask = np.zeros((y2 - y1, x2 - x1), dtype=bool)
+    for det in (a, b):
+        mask[det.box[1] - y1:det.box[3] - y1, det.box[0] - x1:det.box[2] - x1] |= det.mask
+    return _Detection((x1, y1, x2, y2), max(a.conf, b.conf), a.cls, mask, a.truncated or b.truncated)
+
+def merge_detections(detections, merge_ios=0.5):
+    """
+    Menggabungkan deteksi yang sama dari tile yang berbeda (greedy, urut confidence).
+    Diulang sampai tidak ada lagi penggabungan agar lubang yang melintasi lebih dari dua tile ikut tergabung.
+    """
+    merged = sorted(detections, key=lambda det: det.conf, reverse=True)
+    changed = True
+    while changed:
+        changed = False
+        kept = []
+        for det in merged:
+            for k, existing in enumerate(kept):
+                if _should_merge(existing, det, merge_ios):
+                    kept[k] = _merge_pair(existing, det)
+                    changed = True
+                    break
+            else:
+                kept.append(det)
+        merged = kept
+    return merged
+
+def _make_result(frame, names, detections):
+    """Objek Results Ultralytics dengan box dan mask resolusi penuh (N, H, W) seperti retina_masks=True."""
+    import torch
+    from ultralytics.engine.results import Results
+
+    frame_h, frame_w = frame.shape[:2]
+    if not detections:
+        return Results(frame, path="", names=names, boxes=torch.zeros((0, 6), dtype=torch.float32))
+    boxes = torch.tensor([[*det.box, det.conf, det.cls] for det in detections], dtype=torch.float32)
+    masks = np.zeros((len(detections), frame_h, frame_w), dtype=np.uint8)
+    for i, det in enumerate(detections):
+        x1, y1, x2, y2 = det.box
+        masks[i, y1:y2, x1:x2] = det.mask
+    return Results(frame, path="", names=names, boxes=boxes, masks=torch.from_numpy(masks))
+
+def predict_tiled(yolo_model, frames, confidence_thresh, iou_thresh, tiling):
+    """
+    Inferensi bertile untuk satu atau beberapa frame. Semua tile (dan frame utuh jika diaktifkan)
+    dari semua frame dijalankan dalam satu panggilan predict (satu batch), lalu deteksi dipetakan
+    kembali ke koordinat frame asli dan digabung di sepanjang seam.
+    Mengembalikan list Results (satu per frame) dengan mask resolusi penuh, sehingga luas dihitung
+    dalam piksel frame asli.
+    """
+    batch, owners = [], []
+    for frame_index, frame in enumerate(frames):
+        frame_h, frame_w = frame.shape[:2]
+        for region in compute_tiles(frame_h, frame_w, tiling.tile_size, tiling.overlap):
+            x1, y1, x2, y2 = region
+            batch.append(frame[y1:y2, x1:x2]) # View, tanpa salinan
+            owners.append((frame_index, region))
+        if tiling.include_full_frame:
+            batch.append(frame)
+            owners.append((frame_index, None))
+
+    results = yolo_model.predict(source=batch, imgsz=tiling.tile_size, conf=confidence_thresh, iou=iou_thresh,
+                                 verbose=False, retina_masks=True)
+    detections_per_frame = [[] for _ in frames]
+    for (frame_index, region), result in zip(owners, results):
+        detections_per_frame[frame_index].extend(_extract_detections(result, region, frames[frame_index].shape))
+
+    names = getattr(yolo_model, "names", None) or {0: "pothole"}
+    return [_make_result(frame, names, merge_detections(detections, tiling.merge_ios))
+            for frame, detections in zip(frames, detections_per_frame)]
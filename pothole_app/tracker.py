@@ -0,0 +1,122 @@
+import numpy as np
+
+def iou_matrix(boxes_a, boxes_b):
+    """Matriks IoU (len(a), len(b)) antara dua kumpulan bbox xyxy, dihitung tervektorisasi."""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    inter_w = np.clip(np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2]) - np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0]), 0, None)
+    inter_h = np.clip(np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3]) - np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1]), 0, None)
+    intersection = inter_w * inter_h
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+class PotholeTracker:
+    """
+    Multi-object tracker sederhana untuk lubang jalan.
+    Setiap frame, posisi track aktif diprediksi dengan model kecepatan konstan, lalu dicocokkan
+    dengan deteksi frame tersebut berdasarkan IoU (greedy, IoU terbesar lebih dulu).
+    Track yang tidak cocok selama lebih dari `max_age` frame dihapus, sehingga memori dan biaya
+    per frame bergantung pada jumlah track aktif, bukan panjang sesi.
+    `len(tracker)` mengembalikan jumlah lubang unik (track) yang pernah dibuat dalam sesi.
+    """
+
+    def __init__(self, max_age=30, velocity_smoothing=0.5):
+        self.max_age = max(0, int(max_age))
+        self.velocity_smoothing = float(velocity_smoothing)
+        self._boxes = np.empty((0, 4), dtype=np.float32)      # bbox terakhir tiap track aktif
+        self._velocities = np.empty((0, 4), dtype=np.float32) # perubahan bbox per frame
+        self._track_ids = np.empty(0, dtype=np.int64)
+        self._ages = np.empty(0, dtype=np.int64)               # jumlah frame sejak track dibuat
+        self._misses = np.empty(0, dtype=np.int64)             # frame berturut-turut tanpa deteksi
+        self._next_track_id = 1
+
+    def __len__(self):
+        return self._next_track_id - 1
+
+    @property
+    def num_unique(self):
+        """Jumlah lubang unik (track) yang pernah dibuat."""
+        return len(self)
+
+    @property
+    def num_active(self):
+        """Jumlah track yang masih aktif."""
+        return len(self._track_ids)
+
+    def predicted_boxes(self):
+        """Prediksi posisi bbox track aktif pada frame berikutnya."""
+        return self._boxes + self._velocities * (self._misses[:, None] + 1)
+
+    def _associate(self, detections, iou_threshold):
+        """Pencocokan greedy track-deteksi; mengembalikan list pasangan (indeks track, indeks deteksi)."""
+        if len(detections) == 0 or self.num_active == 0:
+            return []
+        ious = iou_matrix(self.predicted_boxes(), detections)
+        candidate_pairs = np.argwhere(ious > iou_threshold)
+        if candidate_pairs.size == 0:
+            return []
+        order = np.argsort(-ious[candidate_pairs[:, 0], candidate_pairs[:, 1]], kind="stable")
+        matched_tracks, matched_detections, pairs = set(), set(), []
+        for track_idx, det_idx in candidate_pairs[order]:
+            if track_idx in matched_tracks or det_idx in matched_detections:
+                continue
+            matched_tracks.add(track_idx)
+            matched_detections.add(det_idx)
+            pairs.append((int(track_idx), int(det_idx)))
+        return pairs
+
+    def update(self, detections, iou_threshold=0.3, commit=True):
+        """
+        Memproses deteksi satu frame (array (N, 4) xyxy).
+        Mengembalikan (track_ids, is_new) untuk setiap deteksi sesuai urutan input.
+        Jika commit=False, status tracker tidak diubah (hanya pratinjau hasil pencocokan).
+        """
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 4)
+        pairs = self._associate(detections, iou_threshold)
+
+        track_ids = [0] * len(detections)
+        is_new = [True] * len(detections)
+        for track_idx, det_idx in pairs:
+            track_ids[det_idx] = int(self._track_ids[track_idx])
+            is_new[det_idx] = False
+
+        unmatched_detections = [i for i in range(len(detections)) if is_new[i]]
+        for offset, det_idx in enumerate(unmatched_detections):
+            track_ids[det_idx] = self._next_track_id + offset
+
+        if not commit:
+            return track_ids, is_new
+
+        # Perbarui track yang cocok: kecepatan dihaluskan secara eksponensial
+        if pairs:
+            track_idx = np.array([p[0] for p in pairs])
+            det_idx = np.array([p[1] for p in pairs])
+            steps = (self._misses[track_idx] + 1)[:, None].astype(np.float32)
+            observed_velocity = (detections[det_idx] - self._boxes[track_idx]) / steps
+            alpha = self.velocity_smoothing
+            self._velocities[track_idx] = alpha * observed_velocity + (1 - alpha) * self._velocities[track_idx]
+            self._boxes[track_idx] = detections[det_idx]
+            self._misses[track_idx] = -1 # Menjadi 0 setelah penambahan di bawah
+
+        self._ages += 1
+        self._misses += 1
+
+        # Hapus track yang kedaluwarsa
+        alive = self._misses <= self.max_age
+        if not alive.all():
+            self._boxes, self._velocities = self._boxes[alive], self._velocities[alive]
+            self._track_ids, self._ages, self._misses = self._track_ids[alive], self._ages[alive], self._misses[alive]
+
+        # Buat track baru untuk deteksi yang tidak cocok
+        if unmatched_detections:
+            n_new = len(unmatched_detections)
+            self._boxes = np.concatenate([self._boxes, detections[unmatched_detections]])
+            self._velocities = np.concatenate([self._velocities, np.zeros((n_new, 4), dtype=np.float32)])
+            self._track_ids = np.concatenate([self._track_ids, np.arange(self._next_track_id, self._next_track_id + n_new)])
+            self._ages = np.concatenate([self._ages, np.zeros(n_new, dtype=np.int64)])
+            self._misses = np.concatenate([self._misses, np.zeros(n_new, dtype=np.int64)])
+            self._next_track_id += n_new
+
+        return track_ids, is_new
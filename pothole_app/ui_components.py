@@ -1,13 +1,36 @@
 # ui_components.py
 
 import streamlit as st
-import pandas as pd
 from utils import hex_to_bgr 
-from plot_utils import create_streamlit_summary_chart_data, create_static_summary_plot_for_pdf 
-from report_generator import create_detection_report_pdf 
+from tracker import PotholeTracker
+from detection_store import DetectionStore
+from session_stats import SessionStats
+from pothole_thumbnails import ThumbnailStore
+from model_loader import available_backends, load_yolo_model_uncached, DEFAULT_IMGSZ
+from tiled_inference import TilingConfig
+from roi import (RoiProfile, DEFAULT_TRAPEZOID, load_roi_profiles, save_roi_profile, delete_roi_profile,
+                 parse_polygon_text, format_polygon_text)
+from ground_calibration import (GroundCalibration, DEFAULT_CALIBRATION_TEXT, DEFAULT_MAX_DISTANCE_M, DEFAULT_GROUND_CALIBRATIONS_PATH,
+                                load_ground_calibrations, save_ground_calibration, delete_ground_calibration,
+                                parse_calibration_text, format_calibration_text)
+from metrics import METRICS
+from report_generator import create_detection_report_artifacts 
+from report_cache import REPORT_CACHE, make_report_key
+from prediction_cache import PREDICTION_CACHE_DIR
+from raw_predictions import RawPredictionLog, replay_session
+from mask_store import MaskStore, build_coco, coco_json_bytes
+from geo_dedup import (GeoDeduplicator, DEFAULT_MERGE_RADIUS_M, load_gps_track, parse_time, start_time_from_filename,
+                       format_time, geojson_bytes)
 import os
 from datetime import datetime
 
+@st.cache_resource # Cache model agar tidak di-load ulang setiap interaksi
+def load_yolo_model(model_path, backend="pytorch", imgsz=DEFAULT_IMGSZ, calibration_dir=None):
+    """Memuat model YOLO dari path yang diberikan dengan backend inferensi yang dipilih."""
+    # Error ditampilkan di tempat yang lebih sesuai (misal di main_app.py saat pemanggilan),
+    # di sini cukup kembalikan model atau None
+    return load_yolo_model_uncached(model_path, backend, imgsz, calibration_dir)
+
 def setup_sidebar():
     """Mengatur dan menampilkan widget di sidebar."""
     st.sidebar.header("⚙️ Pengaturan Deteksi")
@@ -17,9 +40,25 @@ def setup_sidebar():
         min_value=0.0, max_value=1.0, value=st.session_state.get('confidence_threshold', 0.6), step=0.05, key="conf_slider_ui_v6")
     st.session_state.iou_threshold = st.sidebar.slider('IoU Threshold (NMS & Tracking)', 
         min_value=0.0, max_value=1.0, value=st.session_state.get('iou_threshold', 0.5), step=0.05, key="iou_slider_ui_v6")
+    st.session_state.tracker_max_age = st.sidebar.slider('Umur Maksimum Track (frame)',
+        min_value=1, max_value=300, value=st.session_state.get('tracker_max_age', 30), step=1, key="tracker_age_slider_ui_v6",
+        help="Jumlah frame berturut-turut tanpa deteksi sebelum sebuah lubang berhenti dilacak. Lubang yang muncul lagi setelahnya dihitung sebagai lubang baru.")
     st.session_state.pixels_per_meter = st.sidebar.slider('Referensi Skala (Piksel per Meter)', 
         min_value=10, max_value=2000, value=st.session_state.get('pixels_per_meter', 300), step=10, key="ppm_slider_ui_v6",
         help="Sesuaikan nilai ini berdasarkan jarak kamera ke objek dan resolusi video untuk akurasi pengukuran luas.")
+    st.session_state.tiled_inference_opt = st.sidebar.checkbox('Inferensi Bertile (citra resolusi tinggi)',
+        st.session_state.get('tiled_inference_opt', False), key="tiled_inference_check_ui_v6",
+        help="Frame besar (misal 4K drone/survei) dipecah menjadi tile 640 px yang saling tumpang tindih dan diproses dalam satu batch, "
+             "sehingga lubang kecil tidak hilang saat frame diperkecil. Jauh lebih lambat (sebanding dengan jumlah tile).")
+    if st.session_state.tiled_inference_opt:
+        st.session_state.tile_overlap = st.sidebar.select_slider('Tumpang Tindih Tile', [0.1, 0.15, 0.2, 0.25, 0.3],
+            value=st.session_state.get('tile_overlap', 0.2), key="tile_overlap_slider_ui_v6",
+            help="Porsi tumpang tindih antar tile. Lebih besar = seam lebih jarang memotong lubang, namun tile lebih banyak.")
+        st.session_state.tiling_config = TilingConfig(overlap=st.session_state.tile_overlap)
+    else:
+        st.session_state.tiling_config = None
+    setup_roi_settings()
+    setup_ground_calibration_settings()
 
     # Pengaturan Spesifik Webcam
     st.sidebar.header("📷 Pengaturan Webcam")
@@ -44,8 +83,50 @@ def setup_sidebar():
     elif 'box_color_bgr_val' not in st.session_state: 
         st.session_state.box_color_bgr_val = hex_to_bgr(st.session_state.get('box_color_hex_val', "#FF0000"))
 
-    st.session_state.show_masks_opt = st.sidebar.checkbox("Tampilkan Mask Segmentasi (via plot())", st.session_state.get('show_masks_opt', True), key="show_mask_check_ui_v6")
-    st.sidebar.markdown("_Catatan: Warna & opasitas mask diatur oleh fungsi `plot()` bawaan YOLO._")
+    st.session_state.show_masks_opt = st.sidebar.checkbox("Tampilkan Mask Segmentasi", st.session_state.get('show_masks_opt', True), key="show_mask_check_ui_v6")
+    st.session_state.mask_alpha = st.sidebar.slider('Opasitas Mask', 
+        min_value=0.1, max_value=1.0, value=st.session_state.get('mask_alpha', 0.5), step=0.05, key="mask_alpha_slider_ui_v6")
+    st.sidebar.markdown("_Catatan: Warna mask mengikuti ID lubang (track) agar konsisten antar frame._")
+    st.session_state.show_roi_outline_opt = st.sidebar.checkbox("Tampilkan Batas ROI", st.session_state.get('show_roi_outline_opt', True),
+        key="show_roi_outline_check_ui_v6", help="Menggambar batas region of interest jalan pada hasil deteksi (jika profil ROI dipilih).")
+
+    st.sidebar.header("🚀 Pengaturan Performa")
+    backend_options = available_backends()
+    if st.session_state.get('inference_backend') not in backend_options:
+        st.session_state.inference_backend = "pytorch"
+    st.session_state.inference_backend = st.sidebar.selectbox('Backend Inferensi', backend_options,
+        index=backend_options.index(st.session_state.inference_backend), key="backend_select_ui_v6",
+        help="ONNX Runtime / OpenVINO biasanya lebih cepat di CPU. Export model dilakukan sekali lalu disimpan di cache disk.")
+    st.session_state.video_batch_size = st.sidebar.slider('Ukuran Batch Video (frame per inferensi)',
+        min_value=1, max_value=32, value=st.session_state.get('video_batch_size', 4), step=1, key="video_batch_slider_ui_v6",
+        help="Jumlah frame video yang diproses dalam satu panggilan predict. Nilai lebih besar meningkatkan throughput di CPU, namun menambah pemakaian memori.")
+    st.session_state.video_queue_size = st.sidebar.slider('Ukuran Antrean Pipeline Video (frame)',
+        min_value=4, max_value=64, value=st.session_state.get('video_queue_size', 16), step=4, key="video_queue_slider_ui_v6",
+        help="Batas jumlah frame yang boleh menunggu di antara tahap decode, inferensi, anotasi, dan encode. Membatasi pemakaian memori saat satu tahap lebih lambat.")
+    st.session_state.preview_max_fps = st.sidebar.slider('Batas FPS Pratinjau',
+        min_value=1, max_value=30, value=st.session_state.get('preview_max_fps', 8), step=1, key="preview_fps_slider_ui_v6",
+        help="Frame pratinjau dikirim ke browser paling banyak sebanyak ini per detik. Pemrosesan tetap berjalan dengan kecepatan penuh.")
+    preview_width_options = [480, 640, 960, 1280]
+    st.session_state.preview_max_width = st.sidebar.select_slider('Lebar Maksimum Pratinjau (px)', preview_width_options,
+        value=st.session_state.get('preview_max_width', 960), key="preview_width_slider_ui_v6",
+        help="Pratinjau diperkecil ke lebar ini dan dikirim sebagai JPEG. Video hasil tetap beresolusi penuh.")
+    st.session_state.prediction_disk_cache_opt = st.sidebar.checkbox('Simpan Cache Inferensi Gambar di Disk',
+        st.session_state.get('prediction_disk_cache_opt', False), key="prediction_disk_cache_check_ui_v6",
+        help="Hasil inferensi mode gambar selalu di-cache di memori (kunci: isi gambar + model + parameter). "
+             f"Jika aktif, hasil juga disimpan di {PREDICTION_CACHE_DIR} (dibatasi ukurannya) sehingga tetap ada setelah aplikasi dimulai ulang.")
+    st.session_state.raw_prediction_opt = st.sidebar.checkbox('Simpan Prediksi Mentah Video/Webcam',
+        st.session_state.get('raw_prediction_opt', True), key="raw_prediction_check_ui_v6",
+        help="Prediksi disimpan sekali pada confidence floor rendah (file ringkas di disk), sehingga confidence, IoU tracking, "
+             "dan skala dapat diubah setelah sesi tanpa memproses ulang video. Predict pada confidence rendah sedikit lebih lambat.")
+    if st.session_state.raw_prediction_opt:
+        st.session_state.raw_confidence_floor = st.sidebar.select_slider('Confidence Floor Prediksi Mentah', [0.01, 0.05, 0.1, 0.25],
+            value=st.session_state.get('raw_confidence_floor', 0.05), key="raw_confidence_floor_slider_ui_v6",
+            help="Deteksi di bawah nilai ini tidak disimpan; confidence hanya dapat diturunkan sampai batas ini saat hitung ulang.")
+    st.session_state.mask_store_opt = st.sidebar.checkbox('Simpan Mask Deteksi Video/Webcam (RLE)',
+        st.session_state.get('mask_store_opt', True), key="mask_store_check_ui_v6",
+        help="Mask setiap deteksi disimpan ringkas (run-length encoding) di disk sehingga sesi dapat diekspor ke COCO JSON "
+             "(RLE atau polygon) untuk anotasi/pelatihan ulang.")
+    setup_metrics_settings()
 
     st.sidebar.markdown("---")
     st.sidebar.subheader("Statistik Sesi Video/Webcam") # <-- Judul diubah agar lebih spesifik
@@ -53,7 +134,12 @@ def setup_sidebar():
         st.session_state.total_new_area_placeholder = st.sidebar.empty()
     if 'total_new_potholes_placeholder' not in st.session_state:
         st.session_state.total_new_potholes_placeholder = st.sidebar.empty()
+    if 'area_stats_placeholder' not in st.session_state:
+        st.session_state.area_stats_placeholder = st.sidebar.empty()
+    if 'metrics_panel_placeholder' not in st.session_state:
+        st.session_state.metrics_panel_placeholder = st.sidebar.empty()
     update_sidebar_stats() 
+    update_metrics_panel()
 
     st.sidebar.markdown("---")
     st.sidebar.markdown(
@@ -65,36 +151,293 @@ def setup_sidebar():
         """, unsafe_allow_html=True
     )
 
+NO_ROI_OPTION = "(Seluruh Frame)"
+
+def setup_roi_settings():
+    """Pemilihan, pembuatan, dan penghapusan profil region of interest (ROI) jalan per kamera di sidebar."""
+    try:
+        profiles = load_roi_profiles()
+    except (OSError, ValueError, KeyError) as e:
+        st.sidebar.error(f"File profil ROI tidak dapat dibaca: {e}")
+        profiles = {}
+    options = [NO_ROI_OPTION] + sorted(profiles)
+    # Profil yang baru disimpan/dihapus dipilih sebelum widget dibuat (nilai widget tidak boleh diubah setelahnya)
+    if 'roi_profile_pending' in st.session_state:
+        st.session_state.roi_profile_select_ui_v6 = st.session_state.pop('roi_profile_pending')
+    if st.session_state.get('roi_profile_select_ui_v6') not in options:
+        st.session_state.roi_profile_select_ui_v6 = NO_ROI_OPTION
+    selected_name = st.sidebar.selectbox('Profil ROI Jalan (per Kamera)', options, key="roi_profile_select_ui_v6",
+        help="Hanya area jalan dalam ROI yang diberikan ke model: piksel per inferensi berkurang dan deteksi di luar jalan "
+             "(langit, kap mobil, pinggir jalan) dibuang. Luas dan anotasi tetap dalam koordinat frame asli.")
+    st.session_state.roi_profile = profiles.get(selected_name)
+
+    with st.sidebar.expander("Buat / Ubah Profil ROI"):
+        base = st.session_state.roi_profile
+        key_suffix = selected_name # Widget diisi ulang dari profil setiap kali pilihan profil berganti
+        name = st.text_input("Nama Profil (misal ID kamera)", value=base.name if base else "", key=f"roi_name_input_{key_suffix}_ui_v6")
+        shape = st.radio("Bentuk ROI", ["Trapesium", "Poligon"], index=0 if base is None or base.trapezoid else 1, horizontal=True,
+                         key=f"roi_shape_radio_{key_suffix}_ui_v6")
+        if shape == "Trapesium":
+            params = (base.trapezoid if base is not None and base.trapezoid else DEFAULT_TRAPEZOID)
+            top_y, bottom_y = st.slider("Batas Atas & Bawah (porsi tinggi frame)", 0.0, 1.0, (params["top_y"], params["bottom_y"]),
+                                        step=0.01, key=f"roi_trap_y_slider_{key_suffix}_ui_v6")
+            top_width = st.slider("Lebar Atas (porsi lebar frame)", 0.05, 1.0, params["top_width"], step=0.01,
+                                  key=f"roi_trap_top_slider_{key_suffix}_ui_v6")
+            bottom_width = st.slider("Lebar Bawah (porsi lebar frame)", 0.05, 1.0, params["bottom_width"], step=0.01,
+                                     key=f"roi_trap_bottom_slider_{key_suffix}_ui_v6")
+            center_x = st.slider("Posisi Tengah Horizontal", 0.0, 1.0, params["center_x"], step=0.01,
+                                 key=f"roi_trap_center_slider_{key_suffix}_ui_v6")
+        else:
+            polygon_text = st.text_area("Titik Poligon (x,y dalam porsi 0-1, satu titik per baris)",
+                                        value=format_polygon_text(base.polygon) if base is not None else "0.30,0.55\n0.70,0.55\n1.00,1.00\n0.00,1.00",
+                                        key=f"roi_polygon_text_{key_suffix}_ui_v6")
+        mask_outside = st.checkbox("Tutup area di luar poligon", base.mask_outside if base is not None else True,
+                                   key=f"roi_mask_outside_check_{key_suffix}_ui_v6",
+                                   help="Jika nonaktif, frame hanya dipotong ke persegi pembatas ROI tanpa menutup area di luarnya.")
+
+        save_col, delete_col = st.columns(2)
+        if save_col.button("💾 Simpan", key=f"roi_save_button_{key_suffix}_ui_v6", use_container_width=True):
+            try:
+                if shape == "Trapesium":
+                    profile = RoiProfile.from_trapezoid(name, top_y, bottom_y, top_width, bottom_width, center_x, mask_outside=mask_outside)
+                else:
+                    profile = RoiProfile(name, parse_polygon_text(polygon_text), mask_outside=mask_outside)
+                save_roi_profile(profile)
+                st.session_state.roi_profile_pending = profile.name
+                st.rerun()
+            except (OSError, ValueError) as e:
+                st.error(f"Profil ROI tidak dapat disimpan: {e}")
+        if base is not None and delete_col.button("🗑️ Hapus", key=f"roi_delete_button_{key_suffix}_ui_v6", use_container_width=True):
+            delete_roi_profile(base.name)
+            st.session_state.roi_profile_pending = NO_ROI_OPTION
+            st.rerun()
+
+NO_CALIBRATION_OPTION = "(Skala Tunggal - Piksel per Meter)"
+
+def _load_ground_calibrations_cached():
+    """
+    load_ground_calibrations yang dicache di session_state selama file kalibrasi tidak berubah (mtime + ukuran):
+    objek GroundCalibration, beserta peta luas per piksel yang sudah dihitungnya, bertahan antar rerun.
+    """
+    path = DEFAULT_GROUND_CALIBRATIONS_PATH
+    if os.path.exists(path):
+        stat = os.stat(path)
+        file_key = (path, stat.st_mtime_ns, stat.st_size)
+    else:
+        file_key = (path, None, None)
+    cached = st.session_state.get('ground_calibrations_cache')
+    if cached is None or cached[0] != file_key:
+        cached = (file_key, load_ground_calibrations(path))
+        st.session_state.ground_calibrations_cache = cached
+    return cached[1]
+
+def setup_ground_calibration_settings():
+    """Pemilihan, pembuatan, dan penghapusan kalibrasi perspektif bidang jalan per kamera di sidebar."""
+    try:
+        calibrations = _load_ground_calibrations_cached()
+    except (OSError, ValueError, KeyError) as e:
+        st.sidebar.error(f"File kalibrasi perspektif tidak dapat dibaca: {e}")
+        calibrations = {}
+    options = [NO_CALIBRATION_OPTION] + sorted(calibrations)
+    if 'ground_calibration_pending' in st.session_state:
+        st.session_state.ground_calibration_select_ui_v6 = st.session_state.pop('ground_calibration_pending')
+    if st.session_state.get('ground_calibration_select_ui_v6') not in options:
+        st.session_state.ground_calibration_select_ui_v6 = NO_CALIBRATION_OPTION
+    selected_name = st.sidebar.selectbox('Kalibrasi Perspektif Jalan (per Kamera)', options, key="ground_calibration_select_ui_v6",
+        help="Pada dashcam, satu piksel dekat horizon mewakili area jalan jauh lebih luas daripada piksel dekat kap mobil. "
+             "Dengan kalibrasi, luas lubang dihitung dari peta luas per piksel (homografi bidang jalan) dan Referensi Skala diabaikan.")
+    st.session_state.ground_calibration = calibrations.get(selected_name)
+
+    with st.sidebar.expander("Buat / Ubah Kalibrasi Perspektif"):
+        base = st.session_state.ground_calibration
+        key_suffix = selected_name
+        name = st.text_input("Nama Kalibrasi (misal ID kamera)", value=base.name if base else "",
+                             key=f"calib_name_input_{key_suffix}_ui_v6")
+        points_text = st.text_area("4 Titik Referensi: x,y gambar (porsi 0-1) = X,Y jalan (meter)",
+                                   value=format_calibration_text(base) if base is not None else DEFAULT_CALIBRATION_TEXT,
+                                   key=f"calib_points_text_{key_suffix}_ui_v6",
+                                   help="Misalnya empat sudut segi empat yang ukurannya diketahui di jalan (marka lajur, kotak parkir). "
+                                        "X ke samping, Y jarak ke depan kamera.")
+        max_distance = st.slider("Jarak Maksimum Estimasi Luas (m)", 5.0, 100.0,
+                                 float(base.max_distance_m or DEFAULT_MAX_DISTANCE_M) if base is not None else DEFAULT_MAX_DISTANCE_M,
+                                 step=5.0, key=f"calib_max_distance_slider_{key_suffix}_ui_v6",
+                                 help="Piksel yang lebih jauh (dekat horizon) tidak dihitung luasnya karena galatnya terlalu besar.")
+        try:
+            preview = GroundCalibration(name or "pratinjau", *parse_calibration_text(points_text), max_distance_m=max_distance)
+            near, far = (preview.pixels_per_meter_at((1080, 1920), 959, y) for y in (1079, 648))
+            if near is None:
+                st.caption("Tepi bawah frame berada di luar jangkauan kalibrasi; periksa titik referensi.")
+            else:
+                st.caption(f"Pada frame 1920x1080: ≈ {near:.0f} px/m di tepi bawah, "
+                           f"{f'{far:.0f} px/m' if far else 'di luar jangkauan'} pada 60% tinggi frame.")
+        except ValueError as e:
+            st.caption(f"⚠️ {e}")
+
+        save_col, delete_col = st.columns(2)
+        if save_col.button("💾 Simpan", key=f"calib_save_button_{key_suffix}_ui_v6", use_container_width=True):
+            try:
+                calibration = GroundCalibration(name, *parse_calibration_text(points_text), max_distance_m=max_distance)
+                save_ground_calibration(calibration)
+                st.session_state.ground_calibration_pending = calibration.name
+                st.rerun()
+            except (OSError, ValueError) as e:
+                st.error(f"Kalibrasi tidak dapat disimpan: {e}")
+        if base is not None and delete_col.button("🗑️ Hapus", key=f"calib_delete_button_{key_suffix}_ui_v6", use_container_width=True):
+            delete_ground_calibration(base.name)
+            st.session_state.ground_calibration_pending = NO_CALIBRATION_OPTION
+            st.rerun()
+
 def update_sidebar_stats():
     """Mengupdate tampilan statistik di sidebar untuk sesi video/webcam."""
     if hasattr(st.session_state.get('total_new_area_placeholder'), 'markdown'):
         st.session_state.total_new_area_placeholder.markdown(f"**Total Luas Baru:** {st.session_state.get('total_new_area_session', 0.0):.3f} m²")
     if hasattr(st.session_state.get('total_new_potholes_placeholder'), 'markdown'):
         st.session_state.total_new_potholes_placeholder.markdown(f"**Total Lubang Baru:** {len(st.session_state.get('tracked_potholes_session', []))}")
+    if hasattr(st.session_state.get('area_stats_placeholder'), 'markdown'):
+        # Dari agregat berjalan (O(1)), aman dipanggil di setiap pembaruan statistik selama pemrosesan
+        session_stats = st.session_state.get('session_stats')
+        avg_area_new = session_stats.avg_area_new if session_stats is not None else None
+        max_area_new = session_stats.max_area_new if session_stats is not None else None
+        st.session_state.area_stats_placeholder.markdown(
+            f"**Rata-rata Luas Baru:** {f'{avg_area_new:.3f} m²' if avg_area_new is not None else 'N/A'}  \n"
+            f"**Luas Baru Terbesar:** {f'{max_area_new:.3f} m²' if max_area_new is not None else 'N/A'}")
+
+def session_metrics():
+    """
+    Registri metrik untuk diteruskan ke jalur pemrosesan sesi ini (argumen metrics), atau None jika sesi ini
+    tidak mengaktifkan metrik. Registri dipakai bersama seluruh proses, namun pencatatan dipilih per sesi.
+    """
+    return METRICS if st.session_state.get('metrics_enabled', False) else None
+
+def setup_metrics_settings():
+    """Pengaturan instrumentasi (metrik langsung + ekspor Prometheus) di sidebar."""
+    st.session_state.metrics_enabled = st.sidebar.checkbox("Aktifkan Metrik Langsung", st.session_state.get('metrics_enabled', False),
+        key="metrics_enabled_check_ui_v6",
+        help="Mencatat latensi per tahap, jumlah deteksi per frame, frame yang dibuang, dan kedalaman antrean. Nonaktifkan untuk overhead nol.")
+    if not st.session_state.metrics_enabled:
+        return
+
+    export_options = ["Tidak ada", "File teks Prometheus", "Endpoint HTTP lokal"]
+    st.session_state.metrics_export = st.sidebar.selectbox('Ekspor Metrik', export_options,
+        index=export_options.index(st.session_state.get('metrics_export', "Tidak ada")), key="metrics_export_select_ui_v6")
+    if st.session_state.metrics_export == "File teks Prometheus":
+        st.session_state.metrics_textfile_path = st.sidebar.text_input('Path File Metrik (.prom)',
+            st.session_state.get('metrics_textfile_path', "pothole_metrics.prom"), key="metrics_textfile_input_ui_v6",
+            help="Ditulis ulang secara berkala; dapat dibaca textfile collector node_exporter.")
+        METRICS.configure_textfile(st.session_state.metrics_textfile_path)
+    else:
+        METRICS.configure_textfile(None)
+    if st.session_state.metrics_export == "Endpoint HTTP lokal":
+        st.session_state.metrics_http_port = st.sidebar.number_input('Port Endpoint Metrik', min_value=1024, max_value=65535,
+            value=st.session_state.get('metrics_http_port', 9108), step=1, key="metrics_port_input_ui_v6")
+        try:
+            server = METRICS.start_http_server(int(st.session_state.metrics_http_port))
+            st.sidebar.caption(f"Endpoint aktif: http://127.0.0.1:{server.server_address[1]}/metrics")
+        except OSError as e:
+            st.sidebar.error(f"Endpoint metrik gagal dijalankan: {e}")
+
+def update_metrics_panel():
+    """Mengupdate panel metrik langsung di sidebar (dan file teks Prometheus jika diaktifkan)."""
+    placeholder = st.session_state.get('metrics_panel_placeholder')
+    if not hasattr(placeholder, 'markdown'):
+        return
+    if session_metrics() is None:
+        placeholder.empty()
+        return
+    METRICS.write_textfile_if_due()
+
+    snapshot = METRICS.snapshot()
+    fmt_ms = lambda seconds: "-" if seconds is None else f"{seconds * 1e3:.1f}"
+    rows = ["| Tahap | p50 (ms) | p95 (ms) |", "|---|---|---|"]
+    for (name, labels), (count, total, p50, p95) in sorted(snapshot["histograms"].items()):
+        if name == "pothole_stage_seconds":
+            rows.append(f"| {dict(labels)['stage']} | {fmt_ms(p50)} | {fmt_ms(p95)} |")
+        elif name == "pothole_frame_seconds":
+            rows.append(f"| **frame ({dict(labels)['source']})** | {fmt_ms(p50)} | {fmt_ms(p95)} |")
+        elif name == "pothole_glass_to_glass_seconds":
+            rows.append(f"| **glass-to-glass ({dict(labels)['source']})** | {fmt_ms(p50)} | {fmt_ms(p95)} |")
+
+    detections = [(count, total) for (name, _), (count, total, _, _) in snapshot["histograms"].items()
+                  if name == "pothole_detections_per_frame"]
+    counter_total = lambda metric: sum(v for (name, _), v in snapshot["counters"].items() if name == metric)
+    queue_depths = {dict(labels)['queue']: v for (name, labels), v in snapshot["gauges"].items() if name == "pothole_queue_depth"}
+    lines = ["**Metrik Langsung**", "", *rows, "",
+             f"Frame diproses: {counter_total('pothole_frames_processed_total')} | "
+             f"dibuang: {counter_total('pothole_frames_dropped_total')} | "
+             f"pratinjau dilewati: {counter_total('pothole_preview_frames_skipped_total')}"]
+    if detections and detections[0][0]:
+        lines.append(f"Deteksi/frame (rata-rata): {detections[0][1] / detections[0][0]:.2f}")
+    if queue_depths:
+        lines.append("Antrean: " + ", ".join(f"{name} {depth}" for name, depth in queue_depths.items()))
+    placeholder.markdown("\n".join(lines))
+
+def start_session_recorders(source_name):
+    """
+    Menutup perekam sesi sebelumnya (log prediksi mentah dan penyimpanan mask), lalu membuat yang baru sesuai
+    opsi sidebar: st.session_state.raw_prediction_log dan st.session_state.mask_store. Mengembalikan log
+    prediksi mentah (atau None). Parameter analisis sesi dicatat agar ringkasan/laporan memakai nilai saat sesi diproses.
+    """
+    close_session_recorders()
+    st.session_state.session_analysis_params = _current_analysis_params()
+    if st.session_state.get('mask_store_opt', True):
+        st.session_state.mask_store = MaskStore(metadata={'source': source_name})
+    if not st.session_state.get('raw_prediction_opt', True):
+        return None
+    st.session_state.raw_prediction_log = RawPredictionLog(
+        st.session_state.get('raw_confidence_floor', 0.05), metadata={'source': source_name, **st.session_state.session_analysis_params},
+        ground_calibration=st.session_state.get('ground_calibration'))
+    return st.session_state.raw_prediction_log
+
+def _current_analysis_params():
+    return {'confidence_threshold': st.session_state.confidence_threshold, 'iou_threshold': st.session_state.iou_threshold,
+            'pixels_per_meter': st.session_state.pixels_per_meter, 'tracker_max_age': st.session_state.tracker_max_age,
+            'ground_calibration': getattr(st.session_state.get('ground_calibration'), 'name', None)}
+
+def session_analysis_params():
+    """Parameter analisis hasil sesi saat ini (saat diproses atau setelah hitung ulang); default nilai sidebar."""
+    return st.session_state.get('session_analysis_params') or _current_analysis_params()
+
+def close_session_recorders():
+    """Menutup perekam sesi saat ini (menghapus file log prediksi mentah dan penyimpanan mask, jika ada)."""
+    raw_log = st.session_state.get('raw_prediction_log')
+    if raw_log is not None:
+        raw_log.close()
+    mask_store = st.session_state.get('mask_store')
+    if mask_store is not None:
+        mask_store.close()
+    st.session_state.raw_prediction_log = None
+    st.session_state.mask_store = None
+    st.session_state.coco_export = None
+    st.session_state.session_analysis_params = None
+    st.session_state.video_info = None
 
 def reset_session_state_values():
     """Mereset nilai-nilai kunci di session state untuk memulai sesi baru."""
+    close_session_recorders()
     keys_to_reset = [
         # State Video & Webcam
         'tracked_potholes_session', 'total_new_area_session', 
-        'all_session_detections_details', 'summary_displayed_after_webcam',
+        'all_session_detections_details', 'session_stats', 'pothole_thumbnails', 'summary_displayed_after_webcam',
         'frame_count_webcam', 'current_video_processing_done', 
         'current_webcam_session_done', 'processed_video_path',
         'original_video_name_for_download',
         # BARU: State Gambar
         'current_image_processing_done', 'processed_image_to_display',
-        'image_detection_details'
+        'image_detection_details', 'image_source', 'image_prediction'
     ]
     default_values_for_reset = {
         # Default Video & Webcam
-        'tracked_potholes_session': [], 'total_new_area_session': 0.0,
-        'all_session_detections_details': [], 'summary_displayed_after_webcam': False,
+        'tracked_potholes_session': PotholeTracker(max_age=st.session_state.get('tracker_max_age', 30)), 'total_new_area_session': 0.0,
+        'all_session_detections_details': DetectionStore(), 'session_stats': SessionStats(), 'pothole_thumbnails': ThumbnailStore(),
+        'summary_displayed_after_webcam': False,
         'frame_count_webcam': 0, 'current_video_processing_done': False,
         'current_webcam_session_done': False,
         # BARU: Default Gambar
         'current_image_processing_done': False,
         'processed_image_to_display': None,
-        'image_detection_details': []
+        'image_detection_details': [],
+        'image_source': None,
+        'image_prediction': None
     }
 
     for key in keys_to_reset:
@@ -128,7 +471,8 @@ def display_summary_and_export(session_type_name, model_path_display, logo_path_
     """Menampilkan ringkasan deteksi, grafik, dan tombol ekspor PDF."""
     if st.session_state.get('all_session_detections_details'):
         st.header(f"📊 Ringkasan Hasil Deteksi {session_type_name}")
-        df_session_potholes = pd.DataFrame(st.session_state.all_session_detections_details)
+        df_session_potholes = st.session_state.all_session_detections_details.to_dataframe() # View tanpa salinan
+        session_stats = st.session_state.get('session_stats') or SessionStats()
         num_unique_potholes_session = len(st.session_state.tracked_potholes_session)
         
         col_sum1, col_sum2 = st.columns(2)
@@ -137,64 +481,257 @@ def display_summary_and_export(session_type_name, model_path_display, logo_path_
         with col_sum2:
             st.metric("Total Luas Lubang Unik", f"{st.session_state.total_new_area_session:.3f} m²", help="Akumulasi luas dari lubang-lubang unik yang terdeteksi.")
 
-        df_new_potholes_session = df_session_potholes[df_session_potholes['is_new'] == True]
-        if not df_new_potholes_session.empty and 'area_m2' in df_new_potholes_session.columns and not df_new_potholes_session['area_m2'].empty :
-            valid_areas = df_new_potholes_session['area_m2'][df_new_potholes_session['area_m2'] > 0]
-            avg_area_new = valid_areas.mean() if not valid_areas.empty else None
-            max_area_new = df_new_potholes_session['area_m2'].max() if not df_new_potholes_session['area_m2'].empty else None
-            min_area_new = valid_areas.min() if not valid_areas.empty else None
-            
+        # Statistik & grafik dari agregat berjalan (waktu konstan), bukan groupby atas seluruh deteksi
+        avg_area_new = session_stats.avg_area_new
+        max_area_new = session_stats.max_area_new
+        min_area_new = session_stats.min_area_new
+        if session_stats.new_potholes > 0:
             st.subheader("Statistik Luas Lubang Baru:")
             col1_res, col2_res, col3_res = st.columns(3)
-            col1_res.metric("Rata-rata Luas", f"{avg_area_new:.3f} m²" if avg_area_new is not None and not pd.isna(avg_area_new) else "N/A")
-            col2_res.metric("Luas Terbesar", f"{max_area_new:.3f} m²" if max_area_new is not None and not pd.isna(max_area_new) else "N/A")
-            col3_res.metric("Luas Terkecil", f"{min_area_new:.3f} m²" if min_area_new is not None and not pd.isna(min_area_new) else "N/A")
+            col1_res.metric("Rata-rata Luas", f"{avg_area_new:.3f} m²" if avg_area_new is not None else "N/A")
+            col2_res.metric("Luas Terbesar", f"{max_area_new:.3f} m²" if max_area_new is not None else "N/A")
+            col3_res.metric("Luas Terkecil", f"{min_area_new:.3f} m²" if min_area_new is not None else "N/A")
         
-        streamlit_chart_data = create_streamlit_summary_chart_data(df_new_potholes_session) 
+        streamlit_chart_data = session_stats.chart_data()
         if streamlit_chart_data is not None and not streamlit_chart_data.empty:
             st.subheader("Grafik Analisis Deteksi Lubang Baru per Frame")
+            if session_stats.bucket_width > 1:
+                st.caption(f"Sesi panjang: setiap titik merangkum {session_stats.bucket_width} frame.")
             if 'Jumlah Lubang Baru' in streamlit_chart_data.columns:
                     st.area_chart(streamlit_chart_data['Jumlah Lubang Baru'], use_container_width=True)
             if 'Rata-rata Luas Baru (m²)' in streamlit_chart_data.columns:
                     st.line_chart(streamlit_chart_data['Rata-rata Luas Baru (m²)'], use_container_width=True)
         
         with st.expander("Lihat Detail Semua Deteksi per Frame"):
-            st.dataframe(df_session_potholes[["frame", "confidence", "area_m2", "is_new", "x1", "y1", "x2", "y2"]].style.format({
+            st.dataframe(df_session_potholes[["frame", "track_id", "confidence", "area_m2", "is_new", "x1", "y1", "x2", "y2"]].style.format({
                 "confidence": "{:.2f}", "area_m2": "{:.3f}"}))
 
+        analysis_params = session_analysis_params()
+        if st.session_state.get('raw_prediction_log') is not None and not st.session_state.get('webcam_running', False):
+            render_replay_controls(st.session_state.raw_prediction_log, analysis_params, session_type_name)
+
         st.markdown("---")
         st.subheader("Ekspor Laporan")
-        static_plot_path = create_static_summary_plot_for_pdf(df_new_potholes_session)
-
         report_data_dict = {
-            'confidence_threshold': st.session_state.confidence_threshold,
-            'iou_threshold': st.session_state.iou_threshold,
-            'pixels_per_meter': st.session_state.pixels_per_meter,
+            'confidence_threshold': analysis_params['confidence_threshold'],
+            'iou_threshold': analysis_params['iou_threshold'],
+            'pixels_per_meter': analysis_params['pixels_per_meter'],
+            'ground_calibration': analysis_params.get('ground_calibration'),
             'total_unique_potholes': num_unique_potholes_session,
             'total_new_area_session': st.session_state.total_new_area_session,
-            'avg_area_new': avg_area_new if 'avg_area_new' in locals() and avg_area_new is not None and not pd.isna(avg_area_new) else None,
-            'max_area_new': max_area_new if 'max_area_new' in locals() and max_area_new is not None and not pd.isna(max_area_new) else None,
-            'min_area_new': min_area_new if 'min_area_new' in locals() and min_area_new is not None and not pd.isna(min_area_new) else None,
+            'avg_area_new': avg_area_new,
+            'max_area_new': max_area_new,
+            'min_area_new': min_area_new,
             'df_all_detections': df_session_potholes
         }
         
+        full_report = st.checkbox("Laporan lengkap (lampiran semua lubang unik + foto)", st.session_state.get('full_report_opt', False),
+            key=f"full_report_check_{session_type_name}_v6",
+            help="Menambahkan lampiran berisi setiap lubang unik beserta thumbnail-nya. Cocok untuk survei jalan yang panjang.")
+        st.session_state.full_report_opt = full_report
+        thumbnails = st.session_state.get('pothole_thumbnails')
+
+        # Grafik & PDF dibangun sekali per isi sesi + parameter laporan (di thread latar), lalu disajikan dari cache
+        report_key = make_report_key(
+            st.session_state.all_session_detections_details.content_hash(),
+            session_type=session_type_name, confidence_threshold=analysis_params['confidence_threshold'],
+            iou_threshold=analysis_params['iou_threshold'], pixels_per_meter=analysis_params['pixels_per_meter'],
+            ground_calibration=analysis_params.get('ground_calibration'),
+            total_unique_potholes=num_unique_potholes_session, total_new_area_session=st.session_state.total_new_area_session,
+            model_path_display=model_path_display, logo_path_display=logo_path_display,
+            full_appendix=full_report, thumbnail_count=len(thumbnails) if thumbnails is not None else 0)
+        report_future = REPORT_CACHE.get_or_submit(report_key, create_detection_report_artifacts, report_data_dict,
+                                                   chart_data=streamlit_chart_data, model_path_display=model_path_display,
+                                                   logo_path_display=logo_path_display, full_appendix=full_report,
+                                                   thumbnails=thumbnails if full_report else None)
         pdf_file_name = f"laporan_deteksi_lubang_{session_type_name.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        try:
-            pdf_path = create_detection_report_pdf(report_data_dict, 
-                                                   summary_image_path=static_plot_path, 
-                                                   model_path_display=model_path_display, 
-                                                   logo_path_display=logo_path_display)
-            with open(pdf_path, "rb") as pdf_file:
-                st.download_button(
-                    label="Unduh Laporan PDF", data=pdf_file, file_name=pdf_file_name,
-                    mime="application/octet-stream", key=f"pdf_download_btn_{session_type_name}_v6" 
-                )
-            if os.path.exists(pdf_path): os.remove(pdf_path) 
-        except Exception as e:
-            st.error(f"Gagal membuat laporan PDF: {e}")
-        
-        if static_plot_path and os.path.exists(static_plot_path): 
-            os.remove(static_plot_path) 
+        if report_future.done():
+            render_report_download(report_future, pdf_file_name, session_type_name)
+        else:
+            wait_for_report(report_future)
+
+        if st.session_state.get('mask_store') is not None and not st.session_state.get('webcam_running', False):
+            render_coco_export(st.session_state.mask_store, df_session_potholes, session_type_name)
+
+        if st.session_state.get('video_info') is not None and not st.session_state.get('webcam_running', False):
+            render_geo_survey(df_session_potholes, analysis_params, session_type_name)
 
     elif not st.session_state.get('webcam_running', False): 
-        st.info(f"Tidak ada lubang terdeteksi selama sesi {session_type_name} ini.")
\ No newline at end of file
+        st.info(f"Tidak ada lubang terdeteksi selama sesi {session_type_name} ini.")
+        if st.session_state.get('raw_prediction_log') is not None:
+            # Misalnya confidence terlalu tinggi: ambang dapat diturunkan tanpa memproses ulang
+            render_replay_controls(st.session_state.raw_prediction_log, session_analysis_params(), session_type_name)
+
+def render_replay_controls(raw_log, analysis_params, session_type_name):
+    """Pengaturan hitung ulang ringkasan sesi dari log prediksi mentah (tanpa inferensi ulang)."""
+    with st.expander("🔁 Hitung Ulang dari Prediksi Mentah (tanpa memproses ulang video)"):
+        st.caption(f"{raw_log.frames} frame, {len(raw_log)} deteksi mentah (confidence > {raw_log.confidence_floor:.2f}), "
+                   f"{raw_log.nbytes / 1e6:.1f} MB di disk.")
+        replay_cols = st.columns(2)
+        if raw_log.confidence_fixed:
+            # Deteksi antar tile digabung pada ambang saat diproses; confidence lain membutuhkan inferensi ulang
+            confidence = raw_log.confidence_floor
+            replay_cols[0].caption(f"Sesi bertile: confidence tetap {confidence:.2f}.")
+        else:
+            confidence = replay_cols[0].slider("Confidence Threshold", min_value=float(raw_log.confidence_floor), max_value=1.0,
+                value=max(float(raw_log.confidence_floor), float(analysis_params['confidence_threshold'])), step=0.01,
+                key=f"replay_conf_slider_{session_type_name}_v6")
+        tracking_iou = replay_cols[1].slider("IoU Tracking", min_value=0.0, max_value=1.0, value=float(analysis_params['iou_threshold']),
+            step=0.05, key=f"replay_iou_slider_{session_type_name}_v6")
+        if raw_log.has_ground_area:
+            # Luas terkoreksi perspektif sudah tercatat per deteksi; skala tunggal tidak berlaku
+            pixels_per_meter = analysis_params['pixels_per_meter']
+            replay_cols[0].caption(f"Luas memakai kalibrasi perspektif '{analysis_params.get('ground_calibration')}'.")
+        else:
+            pixels_per_meter = replay_cols[0].slider("Referensi Skala (Piksel per Meter)", min_value=10, max_value=2000,
+                value=int(analysis_params['pixels_per_meter']), step=10, key=f"replay_ppm_slider_{session_type_name}_v6")
+        tracker_max_age = replay_cols[1].slider("Umur Maksimum Track (frame)", min_value=1, max_value=300,
+            value=int(analysis_params.get('tracker_max_age', 30)), step=1, key=f"replay_age_slider_{session_type_name}_v6")
+        st.caption("Video hasil anotasi tidak dibuat ulang. Thumbnail lampiran laporan tidak tersedia setelah hitung ulang.")
+        if st.button("Hitung Ulang Ringkasan", key=f"replay_button_{session_type_name}_v6", use_container_width=True):
+            with st.spinner("Menghitung ulang dari prediksi mentah..."):
+                replayed = replay_session(raw_log, confidence, tracking_iou, pixels_per_meter, tracker_max_age)
+            st.session_state.all_session_detections_details = replayed['detections']
+            st.session_state.session_stats = replayed['session_stats']
+            st.session_state.tracked_potholes_session = replayed['tracker']
+            st.session_state.total_new_area_session = replayed['total_new_area']
+            # Urutan lubang baru berubah sehingga thumbnail tidak lagi sesuai; frame asli sudah tidak tersedia
+            st.session_state.pothole_thumbnails = ThumbnailStore()
+            st.session_state.session_analysis_params = {'confidence_threshold': confidence, 'iou_threshold': tracking_iou,
+                                                        'pixels_per_meter': pixels_per_meter, 'tracker_max_age': tracker_max_age,
+                                                        'ground_calibration': analysis_params.get('ground_calibration')}
+            update_sidebar_stats()
+            st.rerun()
+
+def render_coco_export(mask_store, df_session_potholes, session_type_name):
+    """Ukuran penyimpanan mask sesi (dibanding PNG mentah) dan ekspor deteksi + mask ke COCO JSON."""
+    st.subheader("Ekspor Mask (COCO JSON)")
+    lines = [f"{len(mask_store)} mask tersimpan sebagai RLE: {mask_store.nbytes / 1e6:.2f} MB"]
+    rle_per_hour = mask_store.bytes_per_hour()
+    if rle_per_hour is not None:
+        lines[0] += f" (≈ {rle_per_hour / 1e6:.1f} MB per jam footage)"
+    png_bytes = mask_store.png_bytes_estimate
+    if png_bytes:
+        png_line = f"Sebagai PNG mentah (satu file per mask) ≈ {png_bytes / 1e6:.1f} MB"
+        png_per_hour = mask_store.bytes_per_hour(png_bytes)
+        if png_per_hour is not None:
+            png_line += f" (≈ {png_per_hour / 1e9:.2f} GB per jam)"
+        lines.append(f"{png_line}, {png_bytes / max(mask_store.nbytes, 1):.0f}x lebih besar")
+    if mask_store.frames:
+        lines.append(f"Waktu encode rata-rata {mask_store.encode_seconds / mask_store.frames * 1000:.2f} ms per frame")
+    st.caption(" · ".join(lines))
+
+    coco_format = st.radio("Format segmentasi", ["RLE", "Polygon"], horizontal=True, key=f"coco_format_radio_{session_type_name}_v6",
+        help="RLE: mask persis (format RLE terkompresi COCO). Polygon: kontur disederhanakan, lebih mudah diedit di alat anotasi.")
+    export_key = (st.session_state.all_session_detections_details.content_hash(), coco_format, len(mask_store))
+    if st.button("Siapkan COCO JSON", key=f"coco_prepare_button_{session_type_name}_v6", use_container_width=True):
+        with st.spinner("Membangun COCO JSON dari mask tersimpan..."):
+            coco = build_coco(mask_store, df_session_potholes, segmentation=coco_format.lower())
+        st.session_state.coco_export = {'key': export_key, 'data': coco_json_bytes(coco),
+                                        'missing': coco['info']['detections_without_mask']}
+    coco_export = st.session_state.get('coco_export')
+    if coco_export is not None and coco_export['key'] == export_key:
+        if coco_export['missing']:
+            st.caption(f"{coco_export['missing']} deteksi tidak memiliki mask tersimpan dan tidak diekspor.")
+        source_stem = os.path.splitext(os.path.basename(str(mask_store.metadata.get('source', 'sesi'))))[0]
+        st.download_button(
+            label=f"Unduh COCO JSON ({len(coco_export['data']) / 1e6:.1f} MB)", data=coco_export['data'],
+            file_name=f"coco_{source_stem}_{coco_format.lower()}.json", mime="application/json",
+            key=f"coco_download_btn_{session_type_name}_v6")
+
+def _session_ground_calibration(analysis_params):
+    """Kalibrasi perspektif yang dipakai saat sesi diproses (berdasarkan nama), atau None."""
+    name = analysis_params.get('ground_calibration')
+    if not name:
+        return None
+    current = st.session_state.get('ground_calibration')
+    if current is not None and current.name == name:
+        return current
+    try:
+        return _load_ground_calibrations_cached().get(name)
+    except (OSError, ValueError, KeyError):
+        return None
+
+def render_geo_survey(df_session_potholes, analysis_params, session_type_name):
+    """
+    Georeferensi lubang unik sesi video dengan trek GPS lokal (GPX/CSV) dan deduplikasi lintas sesi: survei
+    (st.session_state.geo_survey) bertahan antar unggahan video sehingga lubang yang dilewati berkali-kali
+    dihitung sekali; hasilnya diunduh sebagai GeoJSON.
+    """
+    video_info = st.session_state.video_info
+    survey = st.session_state.get('geo_survey')
+    st.subheader("Survei GPS (GeoJSON Lubang Unik)")
+    track_file = st.file_uploader("Trek GPS (GPX/CSV) yang mencakup waktu rekaman video", type=["gpx", "csv"],
+                                  key=f"gps_track_uploader_{session_type_name}_v6",
+                                  help="CSV: kolom waktu (time/timestamp), lat/latitude, lon/longitude, opsional heading.")
+    col_start, col_offset = st.columns(2)
+    start_text = col_start.text_input("Waktu Mulai Video (UTC, ISO 8601)", key=f"gps_start_input_{session_type_name}_v6",
+                                      placeholder="Otomatis: dari nama file, atau awal trek",
+                                      help="Misalnya 2024-05-01T08:30:12Z. Kosongkan untuk memakai stempel waktu di nama file video.")
+    offset_s = col_offset.number_input("Koreksi Jam Kamera (detik)", value=0.0, step=1.0, key=f"gps_offset_input_{session_type_name}_v6",
+                                       help="Ditambahkan ke waktu video, misal -25200 jika jam kamera memakai WIB (UTC+7).")
+    radius = st.slider("Radius Penggabungan Lubang (m)", 1.0, 15.0,
+                       survey.merge_radius_m if survey is not None else DEFAULT_MERGE_RADIUS_M, 0.5,
+                       key=f"gps_radius_slider_{session_type_name}_v6", disabled=survey is not None,
+                       help="Lubang yang posisinya dalam radius ini dianggap sama (akurasi GPS konsumen ± 3-5 m). "
+                            "Tetap selama survei berjalan; reset survei untuk mengubah.")
+
+    session_key = (st.session_state.all_session_detections_details.content_hash(), video_info['name'])
+    already_added = session_key in st.session_state.get('geo_survey_sessions', set())
+    if st.button("Tambahkan Sesi ke Survei GPS", key=f"gps_add_button_{session_type_name}_v6", use_container_width=True,
+                 disabled=track_file is None or already_added):
+        try:
+            track = load_gps_track(track_file)
+            start_time = parse_time(start_text) if start_text.strip() else start_time_from_filename(video_info['name'])
+            if start_time is None:
+                start_time = track.start_time
+            if survey is None:
+                survey = st.session_state.geo_survey = GeoDeduplicator(radius)
+            summary = survey.add_session(df_session_potholes, track, video_info['fps'], video_info['frame_shape'],
+                                         start_time=start_time, offset_s=offset_s,
+                                         ground_calibration=_session_ground_calibration(analysis_params),
+                                         source=video_info['name'])
+            if summary['outside_track'] == summary['tracks']:
+                st.warning(f"Waktu video ({format_time(start_time + offset_s)}) di luar rentang trek GPS "
+                           f"({format_time(track.start_time)} - {format_time(track.end_time)}); periksa waktu mulai / koreksi jam.")
+            else:
+                st.session_state.setdefault('geo_survey_sessions', set()).add(session_key)
+                already_added = True
+                st.success(f"{summary['new']} lubang baru, {summary['merged']} digabung dengan lubang yang sudah ada"
+                           + (f", {summary['outside_track']} di luar rentang waktu trek" if summary['outside_track'] else "") + ".")
+        except (OSError, ValueError) as e:
+            st.error(f"Trek GPS tidak dapat dipakai: {e}")
+    if already_added:
+        st.caption("Sesi ini sudah termasuk dalam survei.")
+
+    if survey is not None and len(survey):
+        st.caption(f"Survei: {len(survey)} lubang unik dari {survey.sightings} track pada {len(survey.sessions)} sesi, "
+                   f"total luas {sum(p['area_m2'] for p in survey.potholes):.3f} m² (radius {survey.merge_radius_m:g} m).")
+        col_download, col_reset = st.columns(2)
+        col_download.download_button("Unduh GeoJSON Lubang Unik", data=geojson_bytes(survey.to_geojson()),
+                                     file_name=f"lubang_unik_survei_{datetime.now().strftime('%Y%m%d_%H%M%S')}.geojson",
+                                     mime="application/geo+json", key=f"gps_download_btn_{session_type_name}_v6",
+                                     use_container_width=True)
+        if col_reset.button("Reset Survei GPS", key=f"gps_reset_button_{session_type_name}_v6", use_container_width=True):
+            st.session_state.geo_survey = None
+            st.session_state.geo_survey_sessions = set()
+            st.rerun()
+
+def render_report_download(report_future, pdf_file_name, session_type_name):
+    """Tombol unduh PDF dari hasil cache laporan (atau pesan galat jika pembuatan gagal)."""
+    try:
+        report_artifacts = report_future.result()
+    except Exception as e:
+        st.error(f"Gagal membuat laporan PDF: {e}")
+        return
+    st.download_button(
+        label="Unduh Laporan PDF", data=report_artifacts['pdf'], file_name=pdf_file_name,
+        mime="application/octet-stream", key=f"pdf_download_btn_{session_type_name}_v6"
+    )
+
+@st.fragment(run_every=1.0)
+def wait_for_report(report_future):
+    """Memeriksa laporan yang sedang dibuat tanpa memblokir halaman; rerun penuh sekali saat selesai."""
+    if report_future.done():
+        st.rerun()
+    st.info("⏳ Laporan PDF sedang dibuat di latar belakang...")
\ No newline at end of file
@@ -0,0 +1,188 @@
+import io
+import mmap
+import os
+import tempfile
+import threading
+import cv2
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024 # 8 MB per penulisan ke disk
+
+def decode_image_buffer(buffer, flags=cv2.IMREAD_COLOR):
+    """Decode gambar langsung dari buffer (memoryview, mmap, bytes) tanpa menyalin isinya."""
+    encoded = np.frombuffer(buffer, dtype=np.uint8)
+    if encoded.size == 0:
+        return None
+    return cv2.imdecode(encoded, flags)
+
+def upload_buffer(uploaded_file):
+    """
+    memoryview atas isi file unggahan tanpa menyalinnya.
+    UploadedFile Streamlit adalah BytesIO yang berbagi objek bytes aslinya (copy-on-write CPython):
+    getvalue() mengembalikan objek bytes yang sama, sedangkan getbuffer() memaksa BytesIO membuat
+    salinan penuh. Karena itu getvalue() dipakai jika tersedia.
+    """
+    if hasattr(uploaded_file, "getvalue"):
+        return memoryview(uploaded_file.getvalue())
+    return uploaded_file.getbuffer()
+
+def decode_uploaded_image(uploaded_file, flags=cv2.IMREAD_COLOR):
+    """Decode gambar dari st.file_uploader langsung dari buffer unggahan (tanpa salinan read()/bytearray)."""
+    view = upload_buffer(uploaded_file)
+    try:
+        return decode_image_buffer(view, flags)
+    finally:
+        view.release()
+
+def decode_image_file(path, flags=cv2.IMREAD_COLOR):
+    """Decode file gambar lewat mmap (juga aman untuk path non-ASCII di Windows, tidak seperti cv2.imread)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            encoded = np.frombuffer(mapped, dtype=np.uint8)
+            image = cv2.imdecode(encoded, flags)
+            del encoded # Lepas referensi sebelum mmap ditutup
+    return image
+
+def supports_stream_capture():
+    """True jika build OpenCV dapat membuka video dari objek stream Python (OpenCV >= 4.11)."""
+    return hasattr(cv2, "IStreamReader")
+
+class UploadSpooler:
+    """
+    Menyalin file unggahan ke file sementara di disk secara bertahap (per chunk) di thread latar.
+    Sumber dibaca lewat upload_buffer() sehingga tidak ada salinan penuh tambahan di memori.
+    Pembaca dari open_reader() dapat mulai membaca (misal decode video) sebelum penyalinan selesai;
+    pembacaan menunggu hanya sampai byte yang diminta sudah tertulis.
+    """
+
+    def __init__(self, uploaded_file, suffix="", chunk_size=DEFAULT_CHUNK_SIZE, dir=None):
+        self._view = upload_buffer(uploaded_file)
+        self.total_size = len(self._view)
+        self.chunk_size = chunk_size
+        fd, self.path = tempfile.mkstemp(suffix=suffix, dir=dir)
+        os.close(fd)
+        self.bytes_written = 0
+        self.error = None
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self._readers = []
+
+    def start(self):
+        self._thread = threading.Thread(target=self._copy_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def _copy_loop(self):
+        try:
+            with open(self.path, "wb") as f:
+                for offset in range(0, self.total_size, self.chunk_size):
+                    if self._stopped:
+                        return
+                    written = f.write(self._view[offset:offset + self.chunk_size]) # Slice memoryview: tanpa salinan
+                    f.flush()
+                    with self._condition:
+                        self.bytes_written += written
+                        self._condition.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._condition:
+                self._condition.notify_all()
+
+    @property
+    def done(self):
+        return self.bytes_written >= self.total_size
+
+    def wait_for(self, n_bytes, timeout=None):
+        """Menunggu sampai minimal n_bytes tertulis (atau penyalinan gagal/berhenti)."""
+        n_bytes = min(n_bytes, self.total_size)
+        with self._condition:
+            self._condition.wait_for(lambda: self.bytes_written >= n_bytes or self.error is not None or self._stopped,
+                                     timeout=timeout)
+        if self.error is not None:
+            raise self.error
+        return self.bytes_written >= n_bytes
+
+    def wait(self, timeout=None):
+        """Menunggu seluruh file selesai disalin."""
+        return self.wait_for(self.total_size, timeout)
+
+    def open_reader(self):
+        """File-like (io.BufferedIOBase) atas file sementara yang menunggu data yang belum tertulis."""
+        reader = _SpooledFileReader(self)
+        self._readers.append(reader)
+        return reader
+
+    def close(self, remove_file=True):
+        """Menghentikan penyalinan, menutup pembaca, melepas buffer unggahan, dan menghapus file sementara."""
+        self._stopped = True
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        for reader in self._readers:
+            reader.close()
+        self._readers.clear()
+        self._view.release()
+        if remove_file and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class _SpooledFileReader(io.BufferedIOBase):
+    """Pembaca file yang masih ditulis oleh UploadSpooler; ukuran total sudah diketahui sejak awal."""
+
+    def __init__(self, spooler):
+        super().__init__()
+        self._spooler = spooler
+        self._file = open(spooler.path, "rb")
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._file.tell()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_END: # Ukuran akhir diketahui walau file belum selesai ditulis
+            return self._file.seek(self._spooler.total_size + offset, io.SEEK_SET)
+        return self._file.seek(offset, whence)
+
+    def read(self, size=-1):
+        position = self._file.tell()
+        end = self._spooler.total_size if size is None or size < 0 else min(position + size, self._spooler.total_size)
+        self._spooler.wait_for(end)
+        return self._file.read(end - position) if end > position else b""
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+def open_video_capture(spooler):
+    """
+    Membuka cv2.VideoCapture untuk unggahan yang sedang disalin.
+    Jika OpenCV mendukung stream Python, decode langsung dimulai dari file yang masih ditulis;
+    jika tidak, menunggu penyalinan selesai lalu membuka path file sementara.
+    """
+    if supports_stream_capture():
+        reader = spooler.open_reader()
+        try:
+            video_capture = cv2.VideoCapture(reader, cv2.CAP_FFMPEG, [])
+            if video_capture.isOpened():
+                return video_capture
+        except cv2.error:
+            pass
+        reader.close()
+    spooler.wait()
+    return cv2.VideoCapture(spooler.path)
@@ -0,0 +1,90 @@
+# verify_backend.py
+# Membandingkan keluaran backend inferensi (ONNX Runtime / OpenVINO) dengan PyTorch pada gambar yang sama,
+# melalui jalur analisis yang sama dengan aplikasi (box, confidence, luas mask dari frame_processor).
+# Contoh (dari folder pothole_app):
+#   python verify_backend.py --backend onnx --images contoh_jalan/
+
+import argparse
+import os
+import sys
+import cv2
+import numpy as np
+from frame_processor import analyze_frames_batch
+from model_loader import load_yolo_model_uncached, INFERENCE_BACKENDS
+from tracker import iou_matrix
+from batch_cli import collect_input_files, IMAGE_EXTENSIONS
+
+def compare_detections(reference, candidate, conf_thresh, conf_tol):
+    """
+    Mencocokkan deteksi kandidat dengan referensi (IoU terbesar) dan menghitung selisihnya.
+    Deteksi tanpa pasangan yang confidence-nya dekat ambang (dalam toleransi) tidak dihitung sebagai galat.
+    """
+    ref_boxes = np.array([[d["x1"], d["y1"], d["x2"], d["y2"]] for d in reference], dtype=np.float32).reshape(-1, 4)
+    cand_boxes = np.array([[d["x1"], d["y1"], d["x2"], d["y2"]] for d in candidate], dtype=np.float32).reshape(-1, 4)
+    ious = iou_matrix(ref_boxes, cand_boxes)
+    stats = {"matched": 0, "unmatched": 0, "box_iou": [], "conf_diff": [], "area_rel_diff": []}
+    used = set()
+    for i, ref in enumerate(reference):
+        j = int(np.argmax(ious[i])) if ious.shape[1] else -1
+        if j < 0 or j in used or ious[i, j] < 0.5:
+            if ref["confidence"] > conf_thresh + conf_tol:
+                stats["unmatched"] += 1
+            continue
+        used.add(j)
+        stats["matched"] += 1
+        stats["box_iou"].append(float(ious[i, j]))
+        stats["conf_diff"].append(abs(ref["confidence"] - candidate[j]["confidence"]))
+        stats["area_rel_diff"].append(abs(ref["area_m2"] - candidate[j]["area_m2"]) / max(ref["area_m2"], 1e-9))
+    stats["unmatched"] += sum(1 for j, cand in enumerate(candidate)
+                              if j not in used and cand["confidence"] > conf_thresh + conf_tol)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifikasi keluaran backend inferensi terhadap PyTorch.")
+    parser.add_argument("--backend", choices=[b for b in INFERENCE_BACKENDS if b != "pytorch"], default="onnx")
+    parser.add_argument("--model", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "best.pt"))
+    parser.add_argument("--images", nargs="+", required=True, help="File/direktori gambar uji.")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--ppm", type=float, default=300)
+    parser.add_argument("--box-iou-tol", type=float, default=0.95, help="IoU box minimum per pasangan.")
+    parser.add_argument("--conf-tol", type=float, default=0.02, help="Selisih confidence maksimum.")
+    parser.add_argument("--area-tol", type=float, default=0.03, help="Selisih relatif luas maksimum.")
+    args = parser.parse_args()
+
+    image_paths = [p for p in collect_input_files(args.images) if os.path.splitext(p)[1].lower() in IMAGE_EXTENSIONS]
+    if not image_paths:
+        print("Tidak ada gambar uji yang ditemukan.")
+        return 1
+    reference_model = load_yolo_model_uncached(args.model, "pytorch")
+    candidate_model = load_yolo_model_uncached(args.model, args.backend)
+    if reference_model is None or candidate_model is None:
+        return 1
+
+    totals = {"matched": 0, "unmatched": 0, "box_iou": [], "conf_diff": [], "area_rel_diff": []}
+    for path in image_paths:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            continue
+        (_, reference, _), = analyze_frames_batch([image], reference_model, args.conf, args.iou, args.ppm)
+        (_, candidate, _), = analyze_frames_batch([image], candidate_model, args.conf, args.iou, args.ppm)
+        stats = compare_detections(reference, candidate, args.conf, args.conf_tol)
+        for key in totals:
+            totals[key] += stats[key]
+
+    min_box_iou = min(totals["box_iou"], default=1.0)
+    max_conf_diff = max(totals["conf_diff"], default=0.0)
+    max_area_diff = max(totals["area_rel_diff"], default=0.0)
+    print(f"Backend {args.backend} vs PyTorch pada {len(image_paths)} gambar:")
+    print(f"  Deteksi cocok       : {totals['matched']} (tidak cocok: {totals['unmatched']})")
+    print(f"  IoU box minimum     : {min_box_iou:.4f} (batas {args.box_iou_tol})")
+    print(f"  Selisih conf maks   : {max_conf_diff:.4f} (batas {args.conf_tol})")
+    print(f"  Selisih luas maks   : {max_area_diff * 100:.2f}% (batas {args.area_tol * 100:.1f}%)")
+
+    passed = (totals["unmatched"] == 0 and min_box_iou >= args.box_iou_tol
+              and max_conf_diff <= args.conf_tol and max_area_diff <= args.area_tol)
+    print("LULUS" if passed else "GAGAL")
+    return 0 if passed else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
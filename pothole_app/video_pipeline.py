@@ -0,0 +1,163 @@
+import queue
+import threading
+
+_END_OF_STREAM = object() # Penanda akhir aliran frame antar tahap
+
+class VideoPipeline:
+    """
+    Pipeline video bertahap: decode -> inferensi/analisis -> anotasi -> encode.
+    Decode, anotasi, dan encode berjalan di thread pekerja, sedangkan inferensi + tracking
+    berjalan di thread pemanggil (thread Streamlit) sehingga urutan frame tetap terjaga.
+    Antar tahap dihubungkan antrean berukuran terbatas agar pemakaian memori tetap terbatas
+    walaupun salah satu tahap lebih lambat.
+    """
+
+    def __init__(self, video_capture, out_writer, analyze_batch_fn, annotate_fn, batch_size=4, queue_size=16, frame_callback=None,
+                 metrics=None):
+        """
+        video_capture   : objek dengan read()/release() seperti cv2.VideoCapture.
+        out_writer      : objek dengan write(frame) seperti cv2.VideoWriter (boleh None).
+        analyze_batch_fn: fungsi(list frame) -> list (hasil, info lubang, area baru), dipanggil berurutan.
+        annotate_fn     : fungsi(frame, hasil, info lubang) -> frame teranotasi.
+        frame_callback  : fungsi(frame_index, frame, info lubang) opsional, dipanggil di thread pemanggil
+                          sebelum frame dianotasi (misal untuk menyimpan thumbnail lubang baru).
+        metrics         : MetricsRegistry opsional milik sesi untuk mencatat pratinjau yang terlewat.
+        """
+        self.video_capture = video_capture
+        self.out_writer = out_writer
+        self.analyze_batch_fn = analyze_batch_fn
+        self.annotate_fn = annotate_fn
+        self.frame_callback = frame_callback
+        self.metrics = metrics
+        self.batch_size = max(1, int(batch_size))
+        queue_size = max(self.batch_size, int(queue_size))
+
+        self._decoded_queue = queue.Queue(maxsize=queue_size)
+        self._annotate_queue = queue.Queue(maxsize=queue_size)
+        self._encode_queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._worker_errors = []
+        self._preview_lock = threading.Lock()
+        self._latest_preview = None
+        self._threads = []
+
+    # --- Utilitas antrean ---
+    def _put(self, target_queue, item):
+        """Memasukkan item ke antrean; berhenti menunggu jika pipeline dihentikan."""
+        while not self._stop_event.is_set():
+            try:
+                target_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source_queue):
+        """Mengambil item dari antrean; mengembalikan _END_OF_STREAM jika pipeline dihentikan."""
+        while not self._stop_event.is_set():
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END_OF_STREAM
+
+    def _run_worker(self, target):
+        try:
+            target()
+        except Exception as e:
+            self._worker_errors.append(e)
+            self._stop_event.set()
+
+    # --- Tahap-tahap pekerja ---
+    def _decode_stage(self):
+        frame_index = 0
+        while not self._stop_event.is_set():
+            ret, frame = self.video_capture.read()
+            if not ret:
+                break
+            frame_index += 1
+            if not self._put(self._decoded_queue, (frame_index, frame)):
+                return
+        self._put(self._decoded_queue, _END_OF_STREAM)
+
+    def _annotate_stage(self):
+        while True:
+            item = self._get(self._annotate_queue)
+            if item is _END_OF_STREAM:
+                break
+            frame_index, frame, result, pothole_details = item
+            annotated_frame = self.annotate_fn(frame, result, pothole_details)
+            with self._preview_lock:
+                if self._latest_preview is not None and self.metrics is not None: # Pratinjau sebelumnya belum sempat diambil
+                    self.metrics.inc("pothole_preview_frames_skipped_total", labels={"source": "video"})
+                self._latest_preview = (frame_index, annotated_frame)
+            if not self._put(self._encode_queue, annotated_frame):
+                return
+        self._put(self._encode_queue, _END_OF_STREAM)
+
+    def _encode_stage(self):
+        while True:
+            annotated_frame = self._get(self._encode_queue)
+            if annotated_frame is _END_OF_STREAM:
+                break
+            if self.out_writer is not None:
+                self.out_writer.write(annotated_frame)
+
+    # --- API publik ---
+    def pop_latest_preview(self):
+        """Mengambil frame teranotasi terbaru (frame_index, frame) untuk pratinjau, atau None."""
+        with self._preview_lock:
+            latest, self._latest_preview = self._latest_preview, None
+        return latest
+
+    def queue_depths(self):
+        """Jumlah item di setiap antrean (decode, anotasi, encode)."""
+        return self._decoded_queue.qsize(), self._annotate_queue.qsize(), self._encode_queue.qsize()
+
+    def stop(self):
+        """Menghentikan seluruh tahap lebih awal."""
+        self._stop_event.set()
+
+    def run(self):
+        """
+        Generator yang dijalankan di thread pemanggil. Menghasilkan tuple
+        (frame_index, info lubang, area baru) berurutan untuk setiap frame.
+        Setelah generator selesai, semua frame telah ditulis oleh out_writer.
+        """
+        for stage in (self._decode_stage, self._annotate_stage, self._encode_stage):
+            thread = threading.Thread(target=self._run_worker, args=(stage,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        try:
+            end_of_stream = False
+            while not end_of_stream and not self._stop_event.is_set():
+                batch = []
+                while len(batch) < self.batch_size:
+                    item = self._get(self._decoded_queue)
+                    if item is _END_OF_STREAM:
+                        end_of_stream = True
+                        break
+                    batch.append(item)
+                if not batch:
+                    break
+
+                analyzed = self.analyze_batch_fn([frame for _, frame in batch])
+                for (frame_index, frame), (result, pothole_details, newly_detected_area) in zip(batch, analyzed):
+                    if self.frame_callback is not None:
+                        self.frame_callback(frame_index, frame, pothole_details)
+                    if not self._put(self._annotate_queue, (frame_index, frame, result, pothole_details)):
+                        break
+                    yield frame_index, pothole_details, newly_detected_area
+
+            self._put(self._annotate_queue, _END_OF_STREAM)
+            for thread in self._threads:
+                while thread.is_alive() and not self._stop_event.is_set():
+                    thread.join(timeout=0.1)
+        finally:
+            self._stop_event.set()
+            for thread in self._threads:
+                thread.join(timeout=1.0)
+
+        if self._worker_errors:
+            raise self._worker_errors[0]
@@ -0,0 +1,71 @@
+import threading
+import time
+import cv2
+
+class LatestFrameCapture:
+    """
+    Pembacaan kamera di thread terpisah yang hanya menyimpan frame terbaru.
+    Jika inferensi lebih lambat dari kamera, frame lama ditimpa (dihitung sebagai frame dibuang)
+    alih-alih menumpuk di buffer driver, sehingga loop inferensi selalu memproses frame paling baru.
+    Setiap frame membawa timestamp saat diterima dari kamera (time.monotonic()) untuk
+    menghitung latensi glass-to-glass. metrics: MetricsRegistry opsional milik sesi untuk mencatat frame dibuang.
+    """
+
+    def __init__(self, video_capture, source="webcam", metrics=None):
+        self.video_capture = video_capture
+        self.source = source
+        self.metrics = metrics
+        # Minta driver menyimpan sesedikit mungkin frame (tidak semua backend mendukung)
+        self.video_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.captured = 0
+        self.dropped = 0
+        self._condition = threading.Condition()
+        self._latest = None # (nomor frame, frame, timestamp tangkap)
+        self._consumed_seq = 0
+        self._stopped = False
+        self._failed = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture_loop(self):
+        while not self._stopped:
+            ret, frame = self.video_capture.read()
+            captured_at = time.monotonic()
+            with self._condition:
+                if not ret:
+                    self._failed = True
+                    self._condition.notify_all()
+                    return
+                self.captured += 1
+                if self._latest is not None and self._latest[0] > self._consumed_seq:
+                    # Frame sebelumnya belum sempat diproses dan kini digantikan
+                    self.dropped += 1
+                    if self.metrics is not None:
+                        self.metrics.inc("pothole_frames_dropped_total", labels={"source": self.source})
+                self._latest = (self.captured, frame, captured_at)
+                self._condition.notify_all()
+
+    def read(self, timeout=2.0):
+        """
+        Menunggu frame yang belum pernah diambil lalu mengembalikan (ret, frame, captured_at, nomor_frame).
+        ret=False jika kamera gagal dibaca atau tidak ada frame baru dalam batas waktu.
+        """
+        with self._condition:
+            has_new_frame = lambda: self._latest is not None and self._latest[0] > self._consumed_seq
+            self._condition.wait_for(lambda: has_new_frame() or self._failed or self._stopped, timeout=timeout)
+            if not has_new_frame():
+                return False, None, None, self._consumed_seq
+            seq, frame, captured_at = self._latest
+            self._consumed_seq = seq
+            return True, frame, captured_at, seq
+
+    def release(self):
+        """Menghentikan thread pembaca dan melepas kamera."""
+        self._stopped = True
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.video_capture.release()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modul aplikasi diimpor langsung dari folder pothole_app (seperti saat dijalankan dengan streamlit);
+# folder benchmarks untuk detektor dan footage sintetis (bench_pipeline)
+sys.path.insert(0, os.path.join(REPO_DIR, "pothole_app"))
+sys.path.insert(1, os.path.join(REPO_DIR, "benchmarks"))
@@ -0,0 +1,78 @@
+# Kesetaraan hasil backend PyTorch vs ONNX (FP32) pada satu gambar.
+# Bobot: POTHOLE_MODEL_PATH atau pothole_app/best.pt; gambar: POTHOLE_TEST_IMAGE, gambar kalibrasi pertama,
+# atau gambar jalan sintetis. Export ONNX memakai cache model_loader (POTHOLE_EXPORT_CACHE_DIR).
+import os
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+from model_loader import DEFAULT_CALIBRATION_DIR, load_yolo_model_uncached
+from frame_processor import predict_frame
+from mask_utils import compute_mask_pixel_counts
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pothole_app")
+MODEL_PATH = os.environ.get("POTHOLE_MODEL_PATH", os.path.join(APP_DIR, "best.pt"))
+
+CONFIDENCE = 0.25
+IOU = 0.5
+# Hanya deteksi PyTorch dengan confidence >= CONFIDENCE + CONFIDENCE_MARGIN yang wajib ada di ONNX, agar deteksi
+# di tepi threshold (selisih numerik kecil dapat membuatnya lolos di satu backend saja) tidak membuat tes rapuh
+CONFIDENCE_MARGIN = 0.1
+MIN_BOX_IOU = 0.95 # IoU minimum bbox PyTorch vs ONNX untuk deteksi yang sama
+MAX_PIXEL_COUNT_REL_DIFF = 0.05 # Selisih relatif maksimum jumlah piksel mask (5%)
+
+def _test_image():
+    """Gambar uji: POTHOLE_TEST_IMAGE, gambar kalibrasi pertama, atau jalan sintetis berlubang gelap."""
+    candidates = [os.environ.get("POTHOLE_TEST_IMAGE")]
+    if os.path.isdir(DEFAULT_CALIBRATION_DIR):
+        candidates += [os.path.join(DEFAULT_CALIBRATION_DIR, name) for name in sorted(os.listdir(DEFAULT_CALIBRATION_DIR))]
+    for path in candidates:
+        image = cv2.imread(path) if path else None
+        if image is not None:
+            return image
+    rng = np.random.default_rng(0)
+    image = np.clip(rng.normal(110, 18, (720, 1280, 3)), 0, 255).astype(np.uint8)
+    cv2.ellipse(image, (520, 470), (150, 70), 0, 0, 360, (35, 38, 40), -1)
+    cv2.ellipse(image, (930, 560), (90, 45), 15, 0, 360, (45, 45, 50), -1)
+    return image
+
+def _box_iou(box_a, box_b):
+    inter_w = max(0.0, min(box_a[2], box_b[2]) - max(box_a[0], box_b[0]))
+    inter_h = max(0.0, min(box_a[3], box_b[3]) - max(box_a[1], box_b[1]))
+    intersection = inter_w * inter_h
+    union = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1]) + (box_b[2] - box_b[0]) * (box_b[3] - box_b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+def _detections(result):
+    """(bbox xyxy, confidence, jumlah piksel mask) per deteksi."""
+    if result.boxes is None or len(result.boxes) == 0:
+        return np.zeros((0, 4)), np.zeros(0), np.zeros(0, dtype=np.int64)
+    counts = compute_mask_pixel_counts(result.masks.data) if result.masks is not None else np.zeros(len(result.boxes), dtype=np.int64)
+    return result.boxes.xyxy.cpu().numpy(), result.boxes.conf.cpu().numpy(), counts
+
+@pytest.fixture(scope="module")
+def models():
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip(f"Bobot model tidak ditemukan: {MODEL_PATH}")
+    pytorch_model = load_yolo_model_uncached(MODEL_PATH, "pytorch")
+    onnx_model = load_yolo_model_uncached(MODEL_PATH, "onnx")
+    assert pytorch_model is not None and onnx_model is not None
+    return pytorch_model, onnx_model
+
+def test_onnx_matches_pytorch_boxes_and_mask_areas(models):
+    image = _test_image()
+    pytorch_boxes, pytorch_conf, pytorch_counts = _detections(predict_frame(image, models[0], CONFIDENCE, IOU))
+    onnx_boxes, _, onnx_counts = _detections(predict_frame(image, models[1], CONFIDENCE, IOU))
+
+    confident = np.flatnonzero(pytorch_conf >= CONFIDENCE + CONFIDENCE_MARGIN)
+    if len(pytorch_boxes) == 0:
+        assert len(onnx_boxes) == 0
+    for i in confident:
+        ious = [_box_iou(pytorch_boxes[i], box) for box in onnx_boxes]
+        assert ious, f"Deteksi PyTorch {i} (conf {pytorch_conf[i]:.2f}) tidak ada di ONNX"
+        j = int(np.argmax(ious))
+        assert ious[j] >= MIN_BOX_IOU, f"IoU bbox deteksi {i}: {ious[j]:.3f} < {MIN_BOX_IOU}"
+        rel_diff = abs(int(onnx_counts[j]) - int(pytorch_counts[i])) / max(int(pytorch_counts[i]), 1)
+        assert rel_diff <= MAX_PIXEL_COUNT_REL_DIFF, (
+            f"Piksel mask deteksi {i}: PyTorch {pytorch_counts[i]} vs ONNX {onnx_counts[j]} ({rel_diff:.1%})")
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+import batch_cli
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pothole_app")
+
+def test_headless_modules_do_not_import_streamlit():
+    # sys.modules["streamlit"] = None membuat setiap import streamlit gagal
+    code = ("import sys; sys.modules['streamlit'] = None; "
+            "import batch_cli, model_loader, frame_processor, video_pipeline, raw_predictions, mask_store, geo_dedup")
+    subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, check=True)
+
+def test_unloadable_model_fails_before_starting_workers(tmp_path, capsys):
+    image = tmp_path / "input" / "jalan.jpg"
+    image.parent.mkdir()
+    image.write_bytes(b"")
+    exit_code = batch_cli.main([str(image.parent), "--output", str(tmp_path / "output"), "--workers", "2",
+                                "--model", str(tmp_path / "tidak_ada.pt")])
+    assert exit_code == 1
+    assert "Gagal memuat model" in capsys.readouterr().out
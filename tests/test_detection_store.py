@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from detection_store import DETECTION_COLUMNS, NO_TRACK_ID, DetectionStore
+
+def _details(n, seed=0):
+    """Daftar dict info lubang seperti keluaran frame_processor (dengan kunci 'frame')."""
+    rng = np.random.default_rng(seed)
+    details = []
+    for i in range(n):
+        x1, y1 = (int(v) for v in rng.integers(0, 1800, 2))
+        details.append({
+            "frame": i // 3 + 1, "confidence": float(rng.uniform(0.3, 1.0)), "area_m2": float(rng.uniform(0, 2)),
+            "is_new": bool(rng.random() < 0.3), "track_id": None if i % 7 == 0 else i // 2,
+            "x1": x1, "y1": y1, "x2": x1 + int(rng.integers(1, 200)), "y2": y1 + int(rng.integers(1, 200)),
+        })
+    return details
+
+def _reference_dataframe(details):
+    """DataFrame dari list of dict (cara lama), dengan kolom dan tipe DetectionStore."""
+    df = pd.DataFrame(details)
+    df["track_id"] = df["track_id"].fillna(NO_TRACK_ID)
+    return df[list(DETECTION_COLUMNS)].astype(DETECTION_COLUMNS)
+
+@pytest.mark.parametrize("initial_capacity, flush_size", [(4096, 4096), (1, 1), (5, 8)])
+def test_dataframe_matches_list_of_dicts(initial_capacity, flush_size):
+    details = _details(100)
+    store = DetectionStore(initial_capacity=initial_capacity, flush_size=flush_size)
+    for start in range(0, len(details), 9): # Per frame dalam potongan tidak rata, melewati batas flush/kapasitas
+        store.extend(details[start:start + 9])
+    assert len(store) == len(details)
+    df = store.to_dataframe()
+    assert list(df.columns) == list(DETECTION_COLUMNS)
+    assert dict(df.dtypes) == {name: np.dtype(dtype) for name, dtype in DETECTION_COLUMNS.items()}
+    pd.testing.assert_frame_equal(df, _reference_dataframe(details))
+
+def test_append_matches_extend():
+    details = _details(20)
+    appended, extended = DetectionStore(flush_size=3), DetectionStore()
+    for p in details:
+        appended.append(p["frame"], p["confidence"], p["area_m2"], p["is_new"], (p["x1"], p["y1"], p["x2"], p["y2"]),
+                        track_id=p["track_id"])
+    extended.extend(details)
+    pd.testing.assert_frame_equal(appended.to_dataframe(), extended.to_dataframe())
+    assert appended.content_hash() == extended.content_hash()
+
+def test_empty_store_gives_typed_empty_dataframe():
+    df = DetectionStore().to_dataframe()
+    assert df.empty and list(df.columns) == list(DETECTION_COLUMNS)
+    assert df["is_new"].dtype == np.bool_
+
+def test_dataframe_columns_are_views_without_copy():
+    store = DetectionStore()
+    store.extend(_details(10))
+    assert np.shares_memory(store.to_dataframe()["area_m2"].to_numpy(), store.column("area_m2"))
+
+def test_content_hash_is_incremental_and_tracks_appends():
+    details = _details(30)
+    incremental = DetectionStore(flush_size=4)
+    incremental.extend(details[:10])
+    first_hash = incremental.content_hash()
+    incremental.extend(details[10:])
+    whole = DetectionStore()
+    whole.extend(details)
+    assert incremental.content_hash() == whole.content_hash() != first_hash
+
+def test_iteration_yields_detection_dicts():
+    details = _details(5)
+    store = DetectionStore()
+    store.extend(details)
+    rows = list(store)
+    assert [row["frame"] for row in rows] == [p["frame"] for p in details]
+    assert rows[0]["track_id"] == NO_TRACK_ID # Deteksi tanpa track
+    assert rows[1]["area_m2"] == pytest.approx(details[1]["area_m2"])
@@ -0,0 +1,127 @@
+import json
+import numpy as np
+import pytest
+from bench_pipeline import SyntheticDetector, make_synthetic_frames
+from mask_store import (MaskStore, build_coco, coco_json_bytes, coco_rle_counts, coco_rle_strings, compress_counts,
+                        decode_mask_rle, decompress_counts, encode_mask_rle)
+
+def _reference_rle_string(counts):
+    """Port langsung rleToString pycocotools (maskApi.c), satu count per iterasi."""
+    chars = []
+    for i, count in enumerate(counts):
+        x = int(count) - (int(counts[i - 2]) if i > 2 else 0)
+        more = True
+        while more:
+            c = x & 0x1F
+            x >>= 5
+            more = x != -1 if c & 0x10 else x != 0
+            chars.append(chr((c | (0x20 if more else 0)) + 48))
+    return "".join(chars).encode("ascii")
+
+def _masks(seed=0):
+    """Mask uji: acak, kosong, penuh, diawali piksel 1, satu baris, dan berukuran nol."""
+    rng = np.random.default_rng(seed)
+    random_mask = rng.random((37, 53)) < 0.3
+    starts_with_one = np.zeros((10, 12), dtype=bool)
+    starts_with_one[0, 0] = starts_with_one[4:8, 3:9] = True
+    return [random_mask, np.zeros((8, 5), dtype=bool), np.ones((6, 9), dtype=bool), starts_with_one,
+            rng.random((1, 40)) < 0.5, np.zeros((0, 4), dtype=bool)]
+
+def _full_frame_counts(mask):
+    """Counts RLE COCO acuan (kolom-mayor, tanpa run nol penutup) langsung dari mask frame penuh."""
+    counts = encode_mask_rle(mask)
+    return counts[:-1] if len(counts) > 1 and counts[-1] == 0 else counts
+
+@pytest.mark.parametrize("index", range(6))
+def test_rle_encode_decode_round_trip(index):
+    mask = _masks()[index]
+    runs = encode_mask_rle(mask)
+    assert runs.sum() == mask.size and runs[1::2].sum() == np.count_nonzero(mask)
+    np.testing.assert_array_equal(decode_mask_rle(runs, *mask.shape), mask)
+
+def test_compress_counts_matches_pycocotools_scheme_and_round_trips():
+    rng = np.random.default_rng(1)
+    counts_list = [encode_mask_rle(mask) for mask in _masks()]
+    counts_list += [rng.integers(0, 1 << 40, 25), np.array([5]), np.array([0, 3, 1 << 33, 2, 7]), np.array([1, 0, 1])]
+    encoded = compress_counts(counts_list)
+    assert len(encoded) == len(counts_list)
+    for counts, data in zip(counts_list, encoded):
+        assert data == _reference_rle_string(counts)
+        np.testing.assert_array_equal(decompress_counts(data), counts)
+    assert compress_counts([]) == []
+
+@pytest.mark.parametrize("region", [(10, 5), (0, 0), (60, 24)])
+def test_coco_counts_from_crop_match_full_frame_mask(region):
+    frame_shape = (40, 120)
+    rng = np.random.default_rng(2)
+    crop = rng.random((16, 30)) < 0.4
+    crop[:, 7] = True # Kolom potongan penuh: run berakhir tepat di batas potongan
+    rx, ry = region
+    full = np.zeros(frame_shape, dtype=bool)
+    full[ry:ry + crop.shape[0], rx:rx + crop.shape[1]] = crop
+    np.testing.assert_array_equal(coco_rle_counts(crop, region, frame_shape), _full_frame_counts(full))
+
+def test_crop_spanning_full_frame_height_merges_runs_across_columns():
+    frame_shape = (20, 30)
+    crop = np.ones((20, 4), dtype=bool)
+    full = np.zeros(frame_shape, dtype=bool)
+    full[:, 10:14] = crop
+    counts = coco_rle_counts(crop, (10, 0), frame_shape)
+    np.testing.assert_array_equal(counts, [200, 80, 320]) # Satu run untuk empat kolom penuh
+    np.testing.assert_array_equal(counts, _full_frame_counts(full))
+
+def test_coco_rle_is_compatible_with_pycocotools():
+    mask_utils = pytest.importorskip("pycocotools.mask")
+    frame_shape = (48, 64)
+    for seed, region in enumerate([(3, 2), (0, 0), (40, 30)]):
+        crop = np.random.default_rng(seed).random((18, 24)) < 0.35
+        full = np.zeros(frame_shape, dtype=np.uint8)
+        full[region[1]:region[1] + 18, region[0]:region[0] + 24] = crop
+        expected = mask_utils.encode(np.asfortranarray(full))
+        counts = coco_rle_strings([coco_rle_counts(crop, region, frame_shape)])[0]
+        assert counts == expected["counts"].decode("ascii")
+        np.testing.assert_array_equal(mask_utils.decode({"size": list(frame_shape), "counts": counts}), full)
+        assert mask_utils.area(expected) == np.count_nonzero(crop)
+
+def _recorded_session(n_frames=6):
+    detector, store = SyntheticDetector(5, seed=3), MaskStore(fps=30, metadata={"source": "uji.mp4"})
+    results = [detector.predict(frame)[0] for frame in make_synthetic_frames(320, 180, n_frames)]
+    store.add_frame(None) # Frame tanpa hasil tetap mendapat nomor frame
+    store.add_frames(results)
+    return store, results
+
+def test_mask_store_restores_every_mask():
+    store, results = _recorded_session()
+    try:
+        originals = [mask for result in results for mask in result.masks.data.numpy()]
+        assert len(store) == len(originals) and store.frames == len(results) + 1
+        for i, original in enumerate(originals):
+            np.testing.assert_array_equal(store.full_mask(i), original)
+        assert store.index()["frame"].min() == 2
+        assert store.nbytes < sum(mask.nbytes for mask in originals) / 20
+    finally:
+        store.close()
+
+def test_coco_export_annotations_decode_to_stored_masks():
+    store, results = _recorded_session()
+    try:
+        index = store.index()
+        detections = {name: index[name].astype(np.int64) for name in ("frame", "x1", "y1", "x2", "y2")}
+        detections.update(track_id=np.arange(len(index)), confidence=np.full(len(index), 0.9),
+                          area_m2=np.zeros(len(index)), is_new=np.ones(len(index), dtype=bool))
+        detections["frame"] = np.append(detections["frame"], 99) # Deteksi tanpa mask tercatat
+        for name in ("x1", "y1", "x2", "y2", "track_id", "confidence", "area_m2", "is_new"):
+            detections[name] = np.append(detections[name], detections[name][0])
+        coco = json.loads(coco_json_bytes(build_coco(store, detections)))
+        assert coco["info"]["detections_without_mask"] == 1
+        assert [image["id"] for image in coco["images"]] == sorted(set(index["frame"].tolist()))
+        for i, annotation in enumerate(coco["annotations"]):
+            counts = decompress_counts(annotation["segmentation"]["counts"].encode("ascii"))
+            full = decode_mask_rle(np.append(counts, store.frame_shape[0] * store.frame_shape[1] - counts.sum()),
+                                   *store.frame_shape)
+            np.testing.assert_array_equal(full, store.full_mask(i).astype(bool))
+            assert annotation["area"] == np.count_nonzero(full)
+        polygons = build_coco(store, detections, segmentation="polygon")["annotations"]
+        assert all(len(polygon) >= 6 for annotation in polygons for polygon in annotation["segmentation"])
+    finally:
+        store.close()
@@ -0,0 +1,34 @@
+import cv2
+import numpy as np
+import pytest
+import torch
+from mask_utils import compute_mask_pixel_counts
+
+def _reference_counts(masks, threshold=0.5):
+    """Jumlah piksel per mask dengan cv2.countNonZero (mask float di-threshold lebih dulu)."""
+    if masks.dtype.kind == "f":
+        masks = masks > threshold
+    return np.array([cv2.countNonZero(mask.astype(np.uint8)) for mask in masks], dtype=np.int64)
+
+def _make_masks(dtype, n=5, shape=(90, 160), seed=0):
+    rng = np.random.default_rng(seed)
+    if dtype == np.float32:
+        return rng.random((n, *shape), dtype=np.float32) # Probabilitas, sebagian di bawah threshold
+    masks = rng.random((n, *shape)) < rng.uniform(0.0, 0.3, (n, 1, 1))
+    masks[0] = False # Mask kosong
+    return masks.astype(dtype)
+
+@pytest.mark.parametrize("dtype", [np.float32, np.uint8, np.bool_])
+def test_pixel_counts_match_count_non_zero(dtype):
+    masks = _make_masks(dtype)
+    expected = _reference_counts(masks)
+    np.testing.assert_array_equal(compute_mask_pixel_counts(masks), expected)
+    np.testing.assert_array_equal(compute_mask_pixel_counts(torch.from_numpy(masks)), expected)
+
+def test_uint8_masks_count_any_non_zero_value():
+    masks = _make_masks(np.uint8) * 255 # Mask 0/255
+    np.testing.assert_array_equal(compute_mask_pixel_counts(masks), _reference_counts(masks))
+
+def test_empty_input():
+    assert compute_mask_pixel_counts(None).shape == (0,)
+    assert compute_mask_pixel_counts(np.zeros((0, 4, 4), dtype=np.float32)).shape == (0,)
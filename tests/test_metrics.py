@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from bench_pipeline import SyntheticDetector, make_synthetic_frames
+from frame_processor import analyze_frames_batch, process_and_draw_frame
+from metrics import Histogram, MetricsRegistry
+from tracker import PotholeTracker
+
+def _frames(n):
+    return list(make_synthetic_frames(320, 180, n))
+
+def test_histogram_buckets_are_le_inclusive_with_inf_overflow():
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for value in (0.005, 0.01, 0.05, 1.0, 7.0):
+        histogram.observe(value)
+    assert histogram.bucket_counts == [2, 1, 1, 1] # Nilai sama dengan batas masuk bucket "le" tersebut
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(8.065)
+
+def test_histogram_quantiles_use_recent_window():
+    histogram = Histogram((1.0,), window=100)
+    assert histogram.quantile(0.5) is None
+    for value in range(1000):
+        histogram.observe(float(value))
+    assert histogram.count == 1000 # Bucket dan jumlah tetap mencakup semua nilai
+    assert histogram.quantile(0.5) == 950.0 # Kuantil hanya dari 100 nilai terakhir
+    assert histogram.quantile(0.95) == 995.0
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.observe("pothole_stage_seconds", 0.002, {"stage": "predict"}, buckets=(0.001, 0.01))
+    registry.observe("pothole_stage_seconds", 0.02, {"stage": "predict"}, buckets=(0.001, 0.01))
+    registry.observe("pothole_stage_seconds", 0.0005, {"stage": "drawing"}, buckets=(0.001, 0.01))
+    registry.inc("pothole_frames_processed_total", 3)
+    registry.set_gauge("pothole_queue_depth", 2, {"queue": "decode"})
+    lines = registry.render_prometheus().splitlines()
+
+    assert lines.count("# TYPE pothole_stage_seconds histogram") == 1
+    assert 'pothole_stage_seconds_bucket{stage="predict",le="0.001"} 0' in lines
+    assert 'pothole_stage_seconds_bucket{stage="predict",le="0.01"} 1' in lines
+    assert 'pothole_stage_seconds_bucket{stage="predict",le="+Inf"} 2' in lines
+    assert 'pothole_stage_seconds_count{stage="predict"} 2' in lines
+    assert 'pothole_stage_seconds_bucket{stage="drawing",le="0.001"} 1' in lines
+    assert "# TYPE pothole_frames_processed_total counter" in lines
+    assert "pothole_frames_processed_total 3" in lines
+    assert 'pothole_queue_depth{queue="decode"} 2' in lines
+
+def test_textfile_export_is_written_when_due(tmp_path):
+    registry = MetricsRegistry()
+    path = tmp_path / "prom" / "pothole.prom"
+    registry.configure_textfile(str(path), interval_seconds=3600)
+    registry.inc("pothole_frames_processed_total")
+    registry.write_textfile_if_due()
+    assert "pothole_frames_processed_total 1" in path.read_text()
+    registry.inc("pothole_frames_processed_total")
+    registry.write_textfile_if_due() # Interval belum lewat
+    assert "pothole_frames_processed_total 1" in path.read_text()
+    registry.write_textfile_if_due(force=True)
+    assert "pothole_frames_processed_total 2" in path.read_text()
+
+def test_frame_processing_records_each_stage_once_per_frame():
+    registry = MetricsRegistry()
+    detector, tracker = SyntheticDetector(density=4), PotholeTracker()
+    for frame in _frames(3):
+        process_and_draw_frame(frame, detector, 0.5, 0.5, 300, True, (0, 0, 255), True,
+                               tracked_potholes_session_bboxes=tracker, update_tracked_list=True, metrics=registry)
+    histograms = registry.snapshot()["histograms"]
+    for stage in ("predict", "mask_area", "tracking", "drawing"):
+        assert histograms[("pothole_stage_seconds", (("stage", stage),))][0] == 3
+    assert histograms[("pothole_detections_per_frame", ())][0] == 3
+
+def test_batch_analysis_records_per_frame_and_skips_without_registry():
+    registry = MetricsRegistry()
+    frames = _frames(4)
+    analyze_frames_batch(frames, SyntheticDetector(density=4), 0.5, 0.5, 300, PotholeTracker(), True, metrics=registry)
+    histograms = registry.snapshot()["histograms"]
+    assert histograms[("pothole_stage_seconds", (("stage", "predict"),))][0] == 4
+    assert histograms[("pothole_stage_seconds", (("stage", "tracking"),))][0] == 4
+
+    # Tanpa registri (metrics=None) hasil analisis sama dan tidak ada yang dicatat di mana pun
+    with_metrics = analyze_frames_batch(frames, SyntheticDetector(density=4), 0.5, 0.5, 300, metrics=registry)
+    without_metrics = analyze_frames_batch(frames, SyntheticDetector(density=4), 0.5, 0.5, 300)
+    assert [details for _, details, _ in with_metrics] == [details for _, details, _ in without_metrics]
+    assert np.sum([area for *_, area in without_metrics]) == 0.0
+
+def test_explicit_stage_timings_are_not_recorded_twice():
+    registry = MetricsRegistry()
+    stage_timings = {}
+    process_and_draw_frame(_frames(1)[0], SyntheticDetector(density=2), 0.5, 0.5, 300, True, (0, 0, 255), True,
+                           stage_timings=stage_timings, metrics=registry)
+    assert set(stage_timings) >= {"predict", "mask_area", "drawing"}
+    assert not any(name == "pothole_stage_seconds" for name, _ in registry.snapshot()["histograms"])
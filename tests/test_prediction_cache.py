@@ -0,0 +1,98 @@
+import os
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+from bench_pipeline import SyntheticDetector, make_synthetic_frames
+from prediction_cache import CachedPrediction, PredictionCache, content_hash, make_prediction_key
+
+def _image_and_result(density=6, width=640, height=360):
+    image = next(make_synthetic_frames(width, height, 1))
+    return image, SyntheticDetector(density).predict(image)[0]
+
+def _assert_same_result(restored, original):
+    np.testing.assert_array_equal(restored.boxes.data.numpy(), original.boxes.data.numpy())
+    np.testing.assert_array_equal(restored.masks.data.numpy(), original.masks.data.numpy())
+    assert restored.orig_shape == original.orig_shape
+    assert restored.names == original.names
+
+def test_packbits_round_trip_restores_full_resolution_masks():
+    image, result = _image_and_result()
+    prediction = CachedPrediction.from_result(result)
+    assert len(prediction) == len(result.boxes)
+    assert prediction.nbytes < result.masks.data.numpy().nbytes / 100 # Mask dipotong ke box dan dipadatkan per bit
+    _assert_same_result(prediction.to_result(image), result)
+
+def test_fractional_boxes_and_float_masks_round_trip():
+    image = np.zeros((100, 160, 3), dtype=np.uint8)
+    masks = np.zeros((2, 100, 160), dtype=np.float32)
+    masks[0, 10:20, 30:45] = 0.9
+    masks[0, 12, 31] = 0.4 # Di bawah threshold 0.5
+    masks[1, 90:100, 150:160] = 0.7 # Menempel ke tepi gambar
+    boxes = torch.tensor([[29.6, 9.2, 45.4, 20.0, 0.8, 0], [149.5, 89.5, 160.0, 100.0, 0.6, 0]])
+    result = Results(image, path="", names={0: "pothole"}, boxes=boxes, masks=torch.from_numpy(masks))
+    restored = CachedPrediction.from_result(result).to_result(image)
+    np.testing.assert_array_equal(restored.masks.data.numpy(), (masks > 0.5).astype(np.uint8))
+    np.testing.assert_array_equal(restored.boxes.data.numpy(), boxes.numpy())
+
+def test_npz_save_and_load_round_trip(tmp_path):
+    image, result = _image_and_result()
+    path = str(tmp_path / "prediksi.npz")
+    CachedPrediction.from_result(result).save(path)
+    assert os.listdir(tmp_path) == ["prediksi.npz"] # File sementara sudah dipindahkan
+    _assert_same_result(CachedPrediction.load(path).to_result(image), result)
+
+def test_empty_prediction_round_trip(tmp_path):
+    image = np.zeros((50, 80, 3), dtype=np.uint8)
+    empty = Results(image, path="", names={0: "pothole"}, boxes=torch.zeros((0, 6)))
+    path = str(tmp_path / "kosong.npz")
+    CachedPrediction.from_result(empty).save(path)
+    restored = CachedPrediction.load(path).to_result(image)
+    assert len(restored.boxes) == 0 and restored.masks is None
+
+def test_prediction_key_depends_on_image_model_and_params():
+    image_hash = content_hash(memoryview(b"isi gambar"))
+    key = make_prediction_key(image_hash, "model-a", conf=0.5, iou=0.45)
+    assert key == make_prediction_key(image_hash, "model-a", iou=0.45, conf=0.5)
+    assert key != make_prediction_key(image_hash, "model-b", conf=0.5, iou=0.45)
+    assert key != make_prediction_key(image_hash, "model-a", conf=0.6, iou=0.45)
+    assert key != make_prediction_key(content_hash(b"gambar lain"), "model-a", conf=0.5, iou=0.45)
+
+def test_get_or_predict_calls_model_once_and_evicts_lru():
+    _, result = _image_and_result()
+    cache, calls = PredictionCache(max_entries=2), []
+    def predict():
+        calls.append(1)
+        return result
+    assert cache.get_or_predict("a", predict)[1] is False
+    assert cache.get_or_predict("a", predict)[1] is True
+    cache.get_or_predict("b", predict)
+    cache.get("a") # "a" dipakai terakhir, "b" menjadi yang tertua
+    cache.get_or_predict("c", predict)
+    assert "a" in cache and "b" not in cache and len(cache) == 2
+    assert len(calls) == 3 and (cache.hits, cache.misses) == (2, 3)
+
+def test_disk_tier_survives_new_cache_and_respects_use_disk(tmp_path):
+    image, result = _image_and_result()
+    disk_dir = str(tmp_path / "cache")
+    PredictionCache(disk_dir=disk_dir).put("kunci", CachedPrediction.from_result(result))
+    PredictionCache(disk_dir=disk_dir).put("tanpa_disk", CachedPrediction.from_result(result), use_disk=False)
+    assert os.listdir(disk_dir) == ["kunci.npz"]
+
+    fresh = PredictionCache(disk_dir=disk_dir) # Seperti proses baru: tier RAM kosong
+    assert fresh.get("kunci", use_disk=False) is None
+    _assert_same_result(fresh.get("kunci").to_result(image), result)
+    assert fresh.disk_hits == 1 and "kunci" in fresh # Dinaikkan ke tier RAM
+
+def test_disk_tier_evicts_least_recently_used_files(tmp_path):
+    _, result = _image_and_result()
+    prediction = CachedPrediction.from_result(result)
+    disk_dir = str(tmp_path / "cache")
+    cache = PredictionCache(disk_dir=disk_dir)
+    for used_at, key in enumerate(("lama", "dipakai", "baru")):
+        cache.put(key, prediction)
+        os.utime(os.path.join(disk_dir, f"{key}.npz"), (used_at, used_at)) # Waktu pakai berurutan secara eksplisit
+    PredictionCache(disk_dir=disk_dir).get("dipakai") # Pemakaian memperbarui waktu file
+    file_size = os.path.getsize(os.path.join(disk_dir, "baru.npz"))
+    cache.max_disk_bytes = 2 * file_size
+    cache.put("terbaru", prediction)
+    assert sorted(os.listdir(disk_dir)) == ["dipakai.npz", "terbaru.npz"]
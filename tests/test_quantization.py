@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+import pytest
+from quantization import calibration_set_hash, letterbox_preprocess, list_calibration_images
+
+def _write_images(folder, names, seed=0):
+    rng = np.random.default_rng(seed)
+    for name in names:
+        cv2.imwrite(str(folder / name), rng.integers(0, 255, (32, 48, 3), dtype=np.uint8))
+
+def test_calibration_images_are_sorted_filtered_and_capped(tmp_path):
+    _write_images(tmp_path, ["c.png", "a.jpg", "b.JPEG"])
+    (tmp_path / "catatan.txt").write_text("bukan gambar")
+    assert [p.split("/")[-1] for p in list_calibration_images(str(tmp_path))] == ["a.jpg", "b.JPEG", "c.png"]
+    assert len(list_calibration_images(str(tmp_path), max_images=2)) == 2
+
+def test_missing_or_empty_calibration_folder_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list_calibration_images(str(tmp_path / "tidak_ada"))
+    with pytest.raises(FileNotFoundError):
+        list_calibration_images(str(tmp_path))
+
+def test_calibration_hash_follows_image_content(tmp_path):
+    _write_images(tmp_path, ["a.png", "b.png"])
+    paths = list_calibration_images(str(tmp_path))
+    first_hash = calibration_set_hash(paths)
+    assert calibration_set_hash(paths) == first_hash
+    _write_images(tmp_path, ["b.png"], seed=1) # Isi berubah, nama tetap
+    assert calibration_set_hash(paths) != first_hash
+    assert calibration_set_hash(paths[:1]) != calibration_set_hash(paths)
+
+@pytest.mark.parametrize("shape", [(720, 1280, 3), (500, 333, 3)])
+def test_letterbox_matches_ultralytics_preprocessing(shape):
+    augment = pytest.importorskip("ultralytics.data.augment")
+    image = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+    letterboxed = augment.LetterBox((640, 640), auto=False)(image=image)
+    expected = letterboxed[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+    tensor = letterbox_preprocess(image)
+    assert tensor.dtype == np.float32 and tensor.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(tensor, expected)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bench_pipeline import SyntheticDetector, make_synthetic_frames
+from detection_store import DetectionStore
+from frame_processor import analyze_frames_batch
+from raw_predictions import RawPredictionLog, replay_session
+from session_stats import SessionStats
+from tiled_inference import TilingConfig
+from tracker import PotholeTracker
+
+N_FRAMES = 60
+BATCH_SIZE = 4
+SESSION = {"confidence": 0.8, "iou": 0.3, "ppm": 300}
+
+@pytest.fixture(scope="module")
+def frames():
+    return list(make_synthetic_frames(640, 360, N_FRAMES))
+
+def _live(frames, confidence, iou, ppm, raw_log=None, tiling=None):
+    """Pemrosesan langsung seperti loop video: hasil per frame ke DetectionStore, SessionStats, dan total luas baru."""
+    detector, tracker, store, stats = SyntheticDetector(12, seed=1), PotholeTracker(), DetectionStore(), SessionStats()
+    total_new_area = 0.0
+    for start in range(0, len(frames), BATCH_SIZE):
+        analyzed = analyze_frames_batch(frames[start:start + BATCH_SIZE], detector, confidence, 0.5, ppm,
+                                        tracker, True, iou, raw_log=raw_log, tiling=tiling)
+        for offset, (_, details, new_area) in enumerate(analyzed):
+            for pothole in details:
+                pothole["frame"] = start + offset + 1
+            store.extend(details)
+            stats.update(start + offset + 1, details)
+            total_new_area += new_area
+    return {"detections": store, "session_stats": stats, "tracker": tracker, "total_new_area": total_new_area}
+
+def _assert_same_session(replayed, live):
+    pd.testing.assert_frame_equal(replayed["detections"].to_dataframe(), live["detections"].to_dataframe())
+    assert len(replayed["tracker"]) == len(live["tracker"])
+    assert replayed["total_new_area"] == pytest.approx(live["total_new_area"])
+    replayed_stats, live_stats = replayed["session_stats"], live["session_stats"]
+    assert (replayed_stats.new_potholes, replayed_stats.total_detections) == (live_stats.new_potholes, live_stats.total_detections)
+    pd.testing.assert_frame_equal(replayed_stats.chart_data(), live_stats.chart_data())
+
+@pytest.fixture(scope="module")
+def recorded(frames):
+    log = RawPredictionLog(confidence_floor=0.05)
+    live = _live(frames, SESSION["confidence"], SESSION["iou"], SESSION["ppm"], raw_log=log)
+    yield log, live
+    log.close()
+
+@pytest.fixture(scope="module")
+def recorded_tiled(frames):
+    log, tiling = RawPredictionLog(confidence_floor=0.05), TilingConfig(tile_size=320)
+    live = _live(frames, 0.7, SESSION["iou"], SESSION["ppm"], raw_log=log, tiling=tiling)
+    yield log, live, tiling
+    log.close()
+
+def test_logging_does_not_change_live_results(frames, recorded):
+    _, logged = recorded
+    _assert_same_session(logged, _live(frames, SESSION["confidence"], SESSION["iou"], SESSION["ppm"]))
+
+@pytest.mark.parametrize("confidence, iou, ppm", [(0.8, 0.3, 300), (0.65, 0.5, 150), (0.9, 0.1, 500)])
+def test_replay_matches_live_processing(frames, recorded, confidence, iou, ppm):
+    log, _ = recorded
+    _assert_same_session(replay_session(log, confidence, iou, ppm), _live(frames, confidence, iou, ppm))
+
+def test_reopened_log_replays_identically(frames, recorded):
+    log, live = recorded
+    log.flush()
+    reopened = RawPredictionLog.open(log.path)
+    assert (reopened.frames, len(reopened)) == (N_FRAMES, len(log))
+    _assert_same_session(replay_session(reopened, SESSION["confidence"], SESSION["iou"], SESSION["ppm"]), live)
+
+@pytest.mark.parametrize("iou, ppm", [(0.3, 300), (0.1, 500)])
+def test_tiled_replay_matches_live_at_session_confidence(frames, recorded_tiled, iou, ppm):
+    log, _, tiling = recorded_tiled
+    assert log.confidence_fixed
+    _assert_same_session(replay_session(log, 0.7, iou, ppm), _live(frames, 0.7, iou, ppm, tiling=tiling))
+
+def test_tiled_log_rejects_other_confidence(recorded_tiled):
+    log, _, _ = recorded_tiled
+    with pytest.raises(ValueError):
+        replay_session(log, 0.6, 0.3, 300)
+
+def test_frames_without_detections_keep_frame_numbering():
+    log = RawPredictionLog()
+    try:
+        log.add_frames([None, None])
+        assert log.frames == 2 and len(log) == 0
+        replayed = replay_session(log, 0.5, 0.3, 300)
+        assert len(replayed["detections"]) == 0 and replayed["session_stats"].frames_processed == 2
+        assert np.isclose(replayed["total_new_area"], 0.0)
+    finally:
+        log.close()
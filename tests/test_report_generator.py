@@ -0,0 +1,40 @@
+import os
+import pytest
+from reportlab import rl_config
+import report_generator
+from detection_store import DetectionStore
+
+def _report_data(n_rows=30):
+    store = DetectionStore()
+    store.extend([{"frame": i + 1, "track_id": i + 1, "confidence": 0.8, "area_m2": 0.1 * i, "is_new": True,
+                   "x1": 10, "y1": 20, "x2": 110, "y2": 100} for i in range(n_rows)])
+    df = store.to_dataframe()
+    return {'confidence_threshold': 0.6, 'iou_threshold': 0.5, 'pixels_per_meter': 300, 'total_unique_potholes': len(df),
+            'total_new_area_session': float(df['area_m2'].sum()), 'avg_area_new': None, 'max_area_new': None,
+            'min_area_new': None, 'df_all_detections': df}
+
+def _build(full_appendix):
+    path = report_generator.create_detection_report_pdf(_report_data(), full_appendix=full_appendix)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+def test_importing_report_generator_keeps_reportlab_defaults():
+    assert rl_config.useA85 == 1
+
+def test_full_report_uses_binary_streams_only_during_its_build():
+    full_pdf = _build(full_appendix=True)
+    assert rl_config.useA85 == 1
+    assert b"/ASCII85Decode" not in full_pdf
+    assert b"/ASCII85Decode" in _build(full_appendix=False) # Laporan biasa tetap memakai bawaan ReportLab
+
+def test_ascii85_setting_is_restored_when_build_fails(monkeypatch):
+    def failing_build(self, flowables, **kwargs):
+        assert rl_config.useA85 == 0
+        raise RuntimeError("gagal")
+    monkeypatch.setattr(report_generator._StreamingDocTemplate, "build", failing_build)
+    with pytest.raises(RuntimeError):
+        _build(full_appendix=True)
+    assert rl_config.useA85 == 1
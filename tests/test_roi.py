@@ -0,0 +1,97 @@
+import cv2
+import numpy as np
+import pytest
+import torch
+from ultralytics.engine.results import Results
+from bench_tiled_inference import ScaleLimitedDetector
+from roi import (ROI_FILL_VALUE, RoiProfile, delete_roi_profile, format_polygon_text, load_roi_profiles,
+                 parse_polygon_text, predict_with_roi, save_roi_profile)
+
+FRAME_H, FRAME_W = 720, 1280
+
+def _road_profile(mask_outside=True):
+    return RoiProfile.from_trapezoid("dashcam", top_y=0.5, bottom_y=1.0, top_width=0.4, bottom_width=0.9,
+                                     mask_outside=mask_outside)
+
+def _frame_with_potholes(ellipses):
+    """Frame abu-abu dengan lubang gelap (elips) dan mask ground truth-nya dalam koordinat frame."""
+    frame = np.full((FRAME_H, FRAME_W, 3), 120, dtype=np.uint8)
+    masks = []
+    for center, axes in ellipses:
+        mask = np.zeros((FRAME_H, FRAME_W), dtype=np.uint8)
+        cv2.ellipse(mask, center, axes, 0, 0, 360, 1, -1)
+        frame[mask > 0] = 25
+        masks.append(mask)
+    return frame, masks
+
+def _predict_full_resolution(crops):
+    """Detektor area gelap tanpa memperkecil potongan, sehingga mask tepat per piksel."""
+    return ScaleLimitedDetector(min_px=1).predict(crops, imgsz=10_000)
+
+def test_geometry_region_and_inside_mask():
+    profile = _road_profile()
+    region, inside, background = profile.geometry((FRAME_H, FRAME_W, 3))
+    assert region == (64, 360, 1216, 720) # Tepi bawah trapesium: x 0.05-0.95 (dibulatkan ke piksel), tepi atas y 0.5
+    assert inside.shape == background.shape[:2] == (360, 1152)
+    assert inside[-1].all() and not inside[0, 0] and not inside[0, -1] # Bawah penuh, sudut atas di luar
+    assert profile.geometry((FRAME_H, FRAME_W))[1] is inside # Dihitung sekali per resolusi
+    assert profile.pixel_fraction((FRAME_H, FRAME_W)) == pytest.approx(1152 * 360 / (FRAME_W * FRAME_H))
+
+def test_crop_masks_outside_polygon_or_returns_view():
+    frame = np.random.default_rng(0).integers(0, 255, (FRAME_H, FRAME_W, 3), dtype=np.uint8)
+    (x1, y1, x2, y2), inside, _ = _road_profile().geometry(frame.shape)
+    masked = _road_profile().crop(frame)
+    np.testing.assert_array_equal(masked[inside > 0], frame[y1:y2, x1:x2][inside > 0])
+    assert (masked[inside == 0] == ROI_FILL_VALUE).all()
+    assert np.shares_memory(_road_profile(mask_outside=False).crop(frame), frame)
+
+def test_detections_are_mapped_back_to_frame_coordinates():
+    frame, gt_masks = _frame_with_potholes([((640, 600), (80, 40)), ((500, 450), (30, 20)), ((1050, 650), (60, 30))])
+    result = predict_with_roi(_predict_full_resolution, [frame], _road_profile())[0]
+    assert result.orig_shape == frame.shape[:2]
+    assert result.masks.data.shape == (3, FRAME_H, FRAME_W)
+    boxes = result.boxes.xyxy.numpy()
+    for gt in gt_masks:
+        x, y, w, h = cv2.boundingRect(gt)
+        i = int(np.argmin(np.abs(boxes - [x, y, x + w, y + h]).sum(axis=1)))
+        np.testing.assert_array_equal(boxes[i], [x, y, x + w, y + h])
+        np.testing.assert_array_equal(result.masks.data[i].numpy(), gt)
+
+def test_potholes_outside_the_road_are_not_reported():
+    # Kiri atas berada di luar region ROI; kiri tengah di dalam region tetapi di luar poligon trapesium
+    frame, _ = _frame_with_potholes([((100, 100), (40, 20)), ((200, 420), (20, 10)), ((640, 600), (80, 40))])
+    for mask_outside in (True, False):
+        result = predict_with_roi(_predict_full_resolution, [frame], _road_profile(mask_outside))[0]
+        assert len(result.boxes) == 1
+        assert result.boxes.xyxy[0, 0] > 500
+
+def test_detection_straddling_the_edge_is_kept_only_if_mostly_inside():
+    profile = _road_profile(mask_outside=False)
+    region, inside, _ = profile.geometry((FRAME_H, FRAME_W))
+    crop_h, crop_w = inside.shape
+    masks = np.zeros((2, crop_h, crop_w), dtype=np.uint8)
+    # Tepi kiri trapesium di bagian atas potongan berada sekitar x 285-320: mask pertama sebagian besar di luar,
+    # mask kedua melewati tepi tetapi sebagian besar di dalam
+    masks[0, 0:40, 200:350] = 1
+    masks[1, 0:40, 300:500] = 1
+    boxes = torch.tensor([[200, 0, 350, 40, 0.9, 0], [300, 0, 500, 40, 0.8, 0]], dtype=torch.float32)
+    crop = np.zeros((crop_h, crop_w, 3), dtype=np.uint8)
+    crop_result = Results(crop, path="", names={0: "pothole"}, boxes=boxes, masks=torch.from_numpy(masks))
+    frame = np.zeros((FRAME_H, FRAME_W, 3), dtype=np.uint8)
+    result = profile.to_frame_result(crop_result, frame)
+    assert len(result.boxes) == 1
+    np.testing.assert_array_equal(result.boxes.xyxy[0].numpy(), [300 + region[0], region[1], 500 + region[0], 40 + region[1]])
+
+def test_profiles_round_trip_through_json(tmp_path):
+    path = str(tmp_path / "roi_profiles.json")
+    save_roi_profile(_road_profile(), path)
+    polygon = parse_polygon_text("0.1,0.9; 0.5,0.4\n0.9,0.9")
+    save_roi_profile(RoiProfile("manual", polygon, mask_outside=False), path)
+    profiles = load_roi_profiles(path)
+    assert profiles["dashcam"].trapezoid == _road_profile().trapezoid
+    assert profiles["manual"].polygon == polygon and not profiles["manual"].mask_outside
+    assert parse_polygon_text(format_polygon_text(polygon)) == polygon
+    delete_roi_profile("dashcam", path)
+    assert list(load_roi_profiles(path)) == ["manual"]
+    with pytest.raises(ValueError):
+        parse_polygon_text("0.1;0.2")
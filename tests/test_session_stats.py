@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from session_stats import RunningStats, SessionStats
+
+def _session(n_frames, seed=0):
+    """Info lubang per frame (format frame_processor), termasuk frame kosong dan lubang baru berluas 0."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(n_frames):
+        n = int(rng.integers(0, 5))
+        areas = np.where(rng.random(n) < 0.2, 0.0, rng.uniform(0.01, 3.0, n))
+        frames.append([{"is_new": bool(is_new), "area_m2": float(area)} for is_new, area in zip(rng.random(n) < 0.4, areas)])
+    return frames
+
+def _stats(frames, max_points=512):
+    stats = SessionStats(max_points=max_points)
+    for frame_index, details in enumerate(frames, start=1):
+        stats.update(frame_index, details)
+    return stats
+
+def _reference_dataframe(frames):
+    return pd.DataFrame([{"frame": i, **p} for i, details in enumerate(frames, start=1) for p in details])
+
+def _reference_chart_data(df):
+    """Agregasi groupby per frame atas seluruh deteksi (cara sebelum SessionStats)."""
+    df_new = df[df["is_new"]]
+    counts = df_new.groupby("frame").size().reset_index(name="Jumlah Lubang Baru")
+    areas = df_new[df_new["area_m2"] > 0].groupby("frame")["area_m2"].mean().reset_index(name="Rata-rata Luas Baru (m²)")
+    return pd.merge(counts, areas, on="frame", how="outer").fillna(0).set_index("frame")
+
+def test_summary_statistics_match_pandas():
+    frames = _session(300)
+    stats, df = _stats(frames), _reference_dataframe(frames)
+    new_areas = df.loc[df["is_new"], "area_m2"]
+    assert stats.frames_processed == 300
+    assert stats.total_detections == len(df)
+    assert stats.new_potholes == len(new_areas)
+    assert stats.avg_area_new == pytest.approx(new_areas[new_areas > 0].mean())
+    assert stats.min_area_new == pytest.approx(new_areas[new_areas > 0].min())
+    assert stats.max_area_new == pytest.approx(new_areas.max())
+    assert stats.avg_detections_per_frame == pytest.approx(len(df) / 300)
+
+def test_chart_data_matches_per_frame_groupby_while_not_downsampled():
+    frames = _session(300)
+    chart_data = _stats(frames).chart_data()
+    expected = _reference_chart_data(_reference_dataframe(frames))
+    pd.testing.assert_frame_equal(chart_data, expected, check_dtype=False, check_index_type=False)
+
+def test_downsampled_chart_data_keeps_totals_and_bounded_size():
+    frames = _session(1000)
+    stats = _stats(frames, max_points=64)
+    chart_data = stats.chart_data()
+    df = _reference_dataframe(frames)
+    df_new = df[df["is_new"]]
+    assert stats.bucket_width == 16 # 1000 frame / 64 bucket -> lebar 16
+    assert len(chart_data) <= 64
+    assert chart_data["Jumlah Lubang Baru"].sum() == len(df_new)
+
+    # Rata-rata luas per bucket sama dengan groupby pada frame // lebar bucket
+    valid = df_new[df_new["area_m2"] > 0]
+    expected = valid.groupby(valid["frame"] // stats.bucket_width * stats.bucket_width)["area_m2"].mean()
+    np.testing.assert_allclose(chart_data.loc[expected.index, "Rata-rata Luas Baru (m²)"], expected)
+
+def test_empty_session_has_no_chart_or_averages():
+    stats = _stats([[], [{"is_new": False, "area_m2": 1.0}]])
+    assert stats.chart_data() is None
+    assert stats.avg_area_new is None and stats.max_area_new is None and stats.min_area_new is None
+    assert stats.avg_detections_per_frame == 0.5
+
+def test_running_stats_matches_numpy():
+    values = np.random.default_rng(1).normal(size=500)
+    running = RunningStats()
+    for value in values:
+        running.add(value)
+    assert running.count == 500
+    assert running.mean == pytest.approx(values.mean())
+    assert (running.minimum, running.maximum) == (values.min(), values.max())
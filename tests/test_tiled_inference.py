@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from bench_tiled_inference import ScaleLimitedDetector, evaluate, make_survey_image
+from frame_processor import _predict_frames
+from tiled_inference import TilingConfig, _Detection, compute_tiles, merge_detections, predict_tiled
+
+def _detection(box, conf=0.9, cls=0, truncated=False, mask=None):
+    x1, y1, x2, y2 = box
+    return _Detection(box, conf, cls, np.ones((y2 - y1, x2 - x1), dtype=bool) if mask is None else mask, truncated)
+
+@pytest.mark.parametrize("height, width", [(1080, 1920), (2160, 3840), (640, 1000), (500, 500)])
+def test_tiles_cover_frame_with_overlap(height, width):
+    tiles = compute_tiles(height, width, 640, 0.2)
+    coverage = np.zeros((height, width), dtype=np.int32)
+    for x1, y1, x2, y2 in tiles:
+        assert x2 - x1 <= 640 and y2 - y1 <= 640
+        coverage[y1:y2, x1:x2] += 1
+    assert coverage.min() >= 1
+    assert max(x2 for *_, x2, _ in tiles) == width and max(y2 for *_, y2 in tiles) == height
+    if width > 640: # Tile bertetangga tumpang tindih paling sedikit overlap * tile_size
+        first_row = sorted(tile for tile in tiles if tile[1] == 0)
+        assert all(a[2] - b[0] >= 128 for a, b in zip(first_row, first_row[1:]))
+
+def test_halves_split_by_a_seam_are_merged_into_one_detection():
+    left = _detection((100, 50, 200, 150), conf=0.8, truncated=True)
+    right = _detection((180, 60, 260, 140), conf=0.9, truncated=True)
+    merged = merge_detections([left, right])
+    assert len(merged) == 1
+    assert merged[0].box == (100, 50, 260, 150)
+    assert merged[0].conf == 0.9
+    assert merged[0].area == 100 * 100 + 80 * 80 - 20 * 80 # Gabungan mask, irisan dihitung sekali
+
+def test_duplicate_from_full_frame_is_deduplicated_by_intersection_over_smaller():
+    tile_detection = _detection((100, 100, 200, 200))
+    full_frame_detection = _detection((95, 95, 205, 205), conf=0.7) # Sedikit lebih besar (dari input diperkecil)
+    assert len(merge_detections([tile_detection, full_frame_detection])) == 1
+
+def test_distinct_potholes_stay_separate():
+    touching = [_detection((0, 0, 50, 50)), _detection((50, 0, 100, 50))] # Box bersebelahan tanpa irisan mask
+    partly_overlapping = [_detection((0, 0, 100, 100)), _detection((80, 0, 180, 100))] # IoS 0.2 < 0.5
+    other_class = [_detection((0, 0, 50, 50)), _detection((0, 0, 50, 50), cls=1)]
+    for detections in (touching, partly_overlapping, other_class):
+        assert len(merge_detections(detections)) == 2
+
+def test_masks_not_boxes_decide_overlap():
+    ring = np.ones((100, 100), dtype=bool)
+    ring[10:90, 10:90] = False
+    outer = _detection((0, 0, 100, 100), mask=ring)
+    inner = _detection((20, 20, 80, 80)) # Di dalam box outer tetapi tidak menyentuh mask-nya
+    assert len(merge_detections([outer, inner])) == 2
+
+def test_pothole_across_three_tiles_merges_into_one():
+    # Potongan tengah (confidence terendah) baru menyambungkan kedua ujung pada putaran penggabungan kedua
+    pieces = [_detection((x, 0, x + 120, 60), conf=conf, truncated=True) for x, conf in ((0, 0.9), (200, 0.8), (100, 0.5))]
+    merged = merge_detections(pieces)
+    assert len(merged) == 1 and merged[0].box == (0, 0, 320, 60)
+
+@pytest.mark.parametrize("include_full_frame", [True, False])
+def test_tiled_prediction_finds_each_pothole_once_in_frame_coordinates(include_full_frame):
+    image, gt_masks = make_survey_image(1920, 1080, 25, np.random.default_rng(0))
+    tiling = TilingConfig(include_full_frame=include_full_frame)
+    result = predict_tiled(ScaleLimitedDetector(), [image], 0.25, 0.5, tiling)[0]
+    hits, duplicates, area_errors = evaluate(result, gt_masks)
+    assert hits == len(gt_masks)
+    assert duplicates == 0
+    assert max(area_errors) <= 0.06 # Mask frame utuh (diperkecil) dapat sedikit memperbesar lubang hasil gabungan
+    assert result.masks.data.shape[1:] == image.shape[:2]
+
+def test_tiling_recovers_potholes_lost_when_downscaling():
+    image, gt_masks = make_survey_image(3840, 2160, 25, np.random.default_rng(1))
+    detector = ScaleLimitedDetector()
+    untiled_hits = evaluate(_predict_frames(detector, [image], 0.25, 0.5)[0], gt_masks)[0]
+    tiled_hits = evaluate(_predict_frames(detector, [image], 0.25, 0.5, TilingConfig())[0], gt_masks)[0]
+    assert untiled_hits < tiled_hits == len(gt_masks)
+
+def test_frames_of_a_batch_keep_their_own_detections():
+    rng = np.random.default_rng(2)
+    (image_a, gt_a), (image_b, gt_b) = make_survey_image(1280, 720, 5, rng), make_survey_image(1280, 720, 9, rng)
+    results = predict_tiled(ScaleLimitedDetector(), [image_a, image_b], 0.25, 0.5, TilingConfig())
+    assert [len(result.boxes) for result in results] == [5, 9]
+    assert evaluate(results[1], gt_b)[:2] == (9, 0)
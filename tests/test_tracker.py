@@ -0,0 +1,51 @@
+import numpy as np
+from tracker import PotholeTracker
+
+def test_active_tracks_stay_bounded_as_session_grows():
+    # Lubang berpindah posisi tiap 5 frame: jumlah lubang unik terus bertambah, track aktif tidak
+    tracker = PotholeTracker(max_age=3)
+    rng = np.random.default_rng(0)
+    for frame_index in range(500):
+        if frame_index % 5 == 0:
+            x = rng.uniform(0, 1800, 4)
+            y = rng.uniform(0, 1000, 4)
+            boxes = np.c_[x, y, x + 80, y + 40]
+        tracker.update(boxes, 0.3)
+        assert tracker.num_active <= 8 # Lubang frame ini + lubang sebelumnya yang belum kedaluwarsa
+    assert len(tracker) >= 300
+
+def test_moving_pothole_keeps_its_track():
+    tracker = PotholeTracker()
+    ids, flags = [], []
+    for step in range(10):
+        track_ids, is_new = tracker.update([[100, 100 + 15 * step, 140, 140 + 15 * step]], 0.3)
+        ids += track_ids
+        flags += is_new
+    assert ids == [1] * 10
+    assert flags == [True] + [False] * 9
+    assert len(tracker) == 1
+
+def test_detections_are_matched_to_their_own_tracks():
+    tracker = PotholeTracker()
+    tracker.update([[0, 0, 50, 50], [200, 0, 250, 50]], 0.3)
+    # Urutan deteksi dibalik: id mengikuti posisi, bukan urutan
+    track_ids, is_new = tracker.update([[202, 2, 252, 52], [2, 2, 52, 52]], 0.3)
+    assert track_ids == [2, 1]
+    assert is_new == [False, False]
+
+def test_track_survives_up_to_max_age_missed_frames():
+    tracker = PotholeTracker(max_age=2)
+    box = [[0, 0, 50, 50]]
+    tracker.update(box, 0.3)
+    tracker.update([], 0.3)
+    tracker.update([], 0.3)
+    assert tracker.update(box, 0.3) == ([1], [False])
+    for _ in range(3): # Lebih dari max_age frame tanpa deteksi: track dihapus
+        tracker.update([], 0.3)
+    assert tracker.update(box, 0.3) == ([2], [True])
+    assert tracker.num_unique == 2
+
+def test_preview_without_commit_does_not_change_state():
+    tracker = PotholeTracker()
+    assert tracker.update([[0, 0, 50, 50]], 0.3, commit=False) == ([1], [True])
+    assert len(tracker) == 0 and tracker.num_active == 0